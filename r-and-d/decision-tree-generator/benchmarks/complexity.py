@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Empirical complexity of tree and catalog operations.
+
+Each operation runs at geometrically growing input sizes; the slope of
+log(time) against log(size) estimates its exponent (1 for linear, 2 for
+quadratic). An operation whose slope exceeds its declared exponent by
+more than ``TOLERANCE`` is reported (and fails ``tests/test_complexity.py``),
+so a quadratic regression shows on small inputs, long before catalogs grow
+large enough to notice.
+
+Sizes are node counts for trees and project counts for catalogs. Balanced
+trees grow in breadth; chains (``synthetic.make_chain``) grow in depth,
+which is where per-node path copies and joins turn quadratic.
+
+Usage:
+    python benchmarks/complexity.py
+    python benchmarks/complexity.py --only render
+"""
+
+import argparse
+import functools
+import gc
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from suite import README_TEMPLATE, load_script
+from synthetic import make_catalog, make_chain, make_tree, project_name, tree_size
+
+CONSTANT = 0.0
+LINEAR = 1.0
+QUADRATIC = 2.0
+# Allowed excess of the fitted slope over the declared exponent; n log n
+# and timer noise stay well inside it, an extra factor of n does not
+TOLERANCE = 0.4
+# Shortest timing (seconds); faster operations are run several times per timing
+MIN_TIMING = 0.005
+
+BALANCED_DEPTHS = [3, 4, 5, 6]          # branching 4: 85 to 5461 nodes
+CHAIN_LENGTHS = [100, 200, 400, 800]    # recursion stays below the default limit
+CATALOG_SIZES = [500, 1000, 2000, 4000]
+SMALL_CATALOG_SIZES = [250, 500, 1000, 2000]
+MARKER_COUNTS = [2500, 5000, 10000, 20000]
+
+
+def _balanced(depth: int) -> Tuple[int, dict]:
+    return tree_size(depth, 4), make_tree(depth, 4)
+
+
+def _chain(length: int) -> Tuple[int, dict]:
+    return 2 * length + 1, make_chain(length)
+
+
+def _coverage_input(depth: int) -> Tuple[int, tuple]:
+    size, tree = _balanced(depth)
+    # Half of the required projects are in the tree, half are not
+    return size, (tree, [project_name(i) for i in range(0, 2 * 4 ** depth, 2)])
+
+
+@functools.lru_cache(maxsize=None)
+def _catalog(count: int) -> Dict[str, dict]:
+    return make_catalog(count)
+
+
+def _catalog_rows(count: int) -> Tuple[int, list]:
+    """Catalog as the scripts' own load_projects() returns it (fresh rows)."""
+    catalog = _catalog(count)
+    return count, [dict(data, _filename=name.replace('/', '--')) for name, data in sorted(catalog.items())]
+
+
+def _enterprise_rows(count: int) -> Tuple[int, list]:
+    """Catalog rows that all belong in the README's enterprise table."""
+    n, rows = _catalog_rows(count)
+    for i, row in enumerate(rows):
+        row['category'] = 'enterprise-gateway' if i % 2 else 'docker-integration'
+        row['reputable-source'] = True
+    return n, rows
+
+
+def _bounded_sections(count: int) -> Tuple[int, object]:
+    """Indexed catalog whose README sections hold the same rows at every size."""
+    readme = load_script('generate-readme')
+    n, rows = _catalog_rows(count)
+    for row in rows[100:]:
+        row['category'] = 'official-tool'
+    return n, (readme.ProjectIndex(rows), README_TEMPLATE.read_text())
+
+
+def _unmatched_markers(count: int) -> Tuple[int, str]:
+    """Template of start markers without end markers, then complete sections."""
+    return count, ('<!-- AUTOGEN:OPEN -->\n' * count
+                   + '<!-- AUTOGEN:A:1 -->\nx\n<!-- /AUTOGEN:A -->\n' * count)
+
+
+def _classify_input(count: int) -> Tuple[int, tuple]:
+    from decision_tree import induce_tree
+    catalog = _catalog(count)
+    return count, (induce_tree(catalog, max_depth=8), catalog)
+
+
+def operations() -> Dict[str, tuple]:
+    """name -> (declared exponent, sizes, make input(size) -> (n, input), run(input))."""
+    from decision_tree import (Classifier, check_coverage, induce_tree, iter_paths, load_tree,
+                               render_graphviz, render_html, render_mermaid, render_svg, validate_tree)
+    readme = load_script('generate-readme')
+    tables = load_script('generate-tables')
+    decision_tree_script = load_script('generate-decision-tree')
+    autogen = sys.modules['autogen']
+
+    def details(tree):
+        return decision_tree_script._render_details_tree(tree['tree']['root'], is_root=True, definitions={})
+
+    def all_tables(rows):
+        return [tables.generate_stats(rows), tables.generate_overview_table(rows),
+                tables.generate_by_category(rows), tables.generate_transport_matrix(rows),
+                tables.generate_reputable_sources(rows), tables.generate_authentication_matrix(rows),
+                tables.generate_enterprise_auth_table(rows), tables.generate_installation_methods_table(rows)]
+
+    return {
+        'validate_tree': (LINEAR, BALANCED_DEPTHS, _balanced, validate_tree),
+        'validate_tree.chain': (LINEAR, CHAIN_LENGTHS, _chain, validate_tree),
+        'load_tree.dict.chain': (LINEAR, CHAIN_LENGTHS, _chain, load_tree),
+        'render_mermaid': (LINEAR, BALANCED_DEPTHS, _balanced, render_mermaid),
+        'render_graphviz': (LINEAR, BALANCED_DEPTHS, _balanced, render_graphviz),
+        'render_html': (LINEAR, BALANCED_DEPTHS, _balanced, render_html),
+        'render_svg': (LINEAR, BALANCED_DEPTHS, _balanced, render_svg),
+        'iter_paths': (LINEAR, BALANCED_DEPTHS, _balanced, lambda tree: sum(1 for _ in iter_paths(tree))),
+        'check_coverage': (LINEAR, BALANCED_DEPTHS, _coverage_input, lambda args: check_coverage(*args)),
+        'Classifier.chain': (LINEAR, CHAIN_LENGTHS, _chain, Classifier),
+        'classify': (LINEAR, SMALL_CATALOG_SIZES, _classify_input,
+                     lambda args: Classifier(args[0]).classify(args[1])),
+        # Every split tests bitsets as wide as the catalog
+        'induce_tree': (QUADRATIC, SMALL_CATALOG_SIZES, lambda count: (count, _catalog(count)),
+                        lambda catalog: induce_tree(catalog, max_depth=None)),
+        'generate-decision-tree.details': (LINEAR, BALANCED_DEPTHS, _balanced, details),
+        'generate-readme.enterprise': (LINEAR, CATALOG_SIZES, _enterprise_rows, readme.generate_enterprise),
+        'generate-readme.stats': (LINEAR, CATALOG_SIZES, _catalog_rows, readme.generate_stats),
+        # With the per-load index, sections cost their rows, not the catalog
+        'generate-readme.sections': (CONSTANT, CATALOG_SIZES, _bounded_sections,
+                                     lambda args: readme.process_template(args[1], args[0])),
+        'generate-tables': (LINEAR, CATALOG_SIZES, _catalog_rows, all_tables),
+        # Unmatched start markers must not each search the rest of the text
+        'autogen.scan': (LINEAR, MARKER_COUNTS, _unmatched_markers, autogen._scan),
+    }
+
+
+def best_time(run: Callable, argument, repeat: int, number: int = 1) -> float:
+    """Fastest of ``repeat`` timings of ``number`` runs (per run), GC paused."""
+    best = math.inf
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                run(argument)
+            best = min(best, (time.perf_counter() - start) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def fit_slope(sizes: List[float], times: List[float]) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(seconds, 1e-9)) for seconds in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+            / sum((x - mean_x) ** 2 for x in xs))
+
+
+def scaling(make_input: Callable, run: Callable, sizes: List[int], repeat: int = 5) -> dict:
+    """
+    Time ``run`` at every size.
+
+    Returns:
+        ``{'sizes': [n, ...], 'seconds': [...], 'slope': fitted exponent}``
+    """
+    ns, times = [], []
+    for size in sizes:
+        n, argument = make_input(size)
+        # Enough runs per timing that each takes at least MIN_TIMING
+        number = max(1, math.ceil(MIN_TIMING / max(best_time(run, argument, 1), 1e-9)))
+        ns.append(n)
+        times.append(best_time(run, argument, repeat, number))
+    return {'sizes': ns, 'seconds': times, 'slope': fit_slope(ns, times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Runs per size (default: 5)')
+    parser.add_argument('--only', help='Run operations whose name contains this')
+    args = parser.parse_args()
+
+    failed = 0
+    print(f"{'operation':32} {'n':>13} {'slope':>6} {'limit':>6}")
+    for name, (exponent, sizes, make_input, run) in operations().items():
+        if args.only and args.only not in name:
+            continue
+        result = scaling(make_input, run, sizes, args.repeat)
+        over = result['slope'] > exponent + TOLERANCE
+        failed += over
+        span = f"{result['sizes'][0]}-{result['sizes'][-1]}"
+        print(f"{name:32} {span:>13} {result['slope']:>6.2f} {exponent + TOLERANCE:>6.1f}"
+              f"{'  OVER' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
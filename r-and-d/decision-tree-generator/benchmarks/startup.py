@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup cost of each ``dt`` subcommand, measured with ``python -X importtime``.
+
+Every subcommand runs in a fresh interpreter on a small tree; the import
+time is the summed self time of every module imported beyond a bare
+``python -c pass``. Each row also lists the decision_tree modules the
+command loaded, and whether PyYAML was among them.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+EXAMPLE = PROJECT_DIR / 'examples' / 'laptop-chooser.yaml'
+
+# name -> (dt arguments, modules that must not be imported, import budget in ms).
+# {json}, {yaml} and {out} are replaced by a compiled tree, its YAML source
+# and a scratch output path. Budgets leave headroom for slow CI machines;
+# the forbidden modules are the precise check.
+RENDERERS = ['mermaid', 'graphviz', 'html_details', 'html_explorer', 'svg', 'layout', 'paths',
+             'coverage', 'batch']
+ALWAYS_FORBIDDEN = ['yaml', 'concurrent.futures']
+
+
+def _forbidden(*needed: str, yaml: bool = False) -> list:
+    """Renderer modules other than ``needed``, plus PyYAML unless ``yaml``."""
+    modules = [f'decision_tree.{name}' for name in RENDERERS if name not in needed]
+    return modules + [name for name in ALWAYS_FORBIDDEN if not (yaml and name == 'yaml')]
+
+
+SUBCOMMANDS = {
+    'help': (['--help'], _forbidden(), 100),
+    'mermaid': (['mermaid', '{json}', '-o', '{out}'], _forbidden('mermaid'), 100),
+    'graphviz': (['graphviz', '{json}', '-o', '{out}'], _forbidden('graphviz'), 100),
+    'html': (['html', '{json}', '-o', '{out}'], _forbidden('html_details'), 100),
+    'svg': (['svg', '{json}', '-o', '{out}'], _forbidden('svg', 'layout', 'graphviz'), 100),
+    'paths': (['paths', '{json}', '-o', '{out}'], _forbidden('paths'), 100),
+    'mermaid-yaml': (['mermaid', '{yaml}', '-o', '{out}'], _forbidden('mermaid', yaml=True), 200),
+}
+
+
+def _import_times(args: list, env: dict) -> dict:
+    """Run Python with -X importtime; return {module: self time in us}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def measure(dt_args: list, repeat: int = 5) -> dict:
+    """
+    Measure one ``dt`` invocation.
+
+    Returns:
+        Dict with 'import_ms' (best of ``repeat`` runs) and 'modules'
+        (names of all modules the command imported beyond the baseline)
+    """
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+    baseline = set(_import_times(['-c', 'pass'], env))
+    code = 'import sys; from decision_tree.cli import main; main(sys.argv[1:])'
+
+    best = None
+    modules = set()
+    for _ in range(repeat):
+        times = _import_times(['-c', code, *dt_args], env)
+        extra = {name: us for name, us in times.items() if name not in baseline}
+        total = sum(extra.values()) / 1000
+        best = total if best is None else min(best, total)
+        modules = set(extra)
+    return {'import_ms': best, 'modules': modules}
+
+
+def run_all(repeat: int = 5) -> dict:
+    """Measure every entry of SUBCOMMANDS; return {name: measure() result}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled = Path(tmp) / 'tree.json'
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+        subprocess.run(
+            [sys.executable, '-c', 'import sys; from decision_tree.cli import main; main(sys.argv[1:])',
+             'compile', str(EXAMPLE), '-o', str(compiled)],
+            env=env, check=True,
+        )
+        paths = {'json': str(compiled), 'yaml': str(EXAMPLE), 'out': str(Path(tmp) / 'out')}
+        results = {}
+        for name, (args, _, _) in SUBCOMMANDS.items():
+            results[name] = measure([arg.format(**paths) for arg in args], repeat)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure dt subcommand startup (import) time')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Runs per subcommand (best is kept)')
+    args = parser.parse_args()
+
+    print(f"{'subcommand':<14}{'imports':>10}{'budget':>9}  yaml  decision_tree modules")
+    for name, result in run_all(args.repeat).items():
+        budget = SUBCOMMANDS[name][2]
+        ours = sorted(m.split('.', 1)[1] for m in result['modules'] if m.startswith('decision_tree.'))
+        yaml = 'yes' if 'yaml' in result['modules'] else 'no'
+        print(f"{name:<14}{result['import_ms']:>8.1f}ms{budget:>7}ms  {yaml:<4}  {', '.join(ours)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Time and peak memory of tree and catalog operations over growing inputs.
+
+Tree operations run on ``synthetic.make_tree`` trees of each size
+(depth x branching); catalog operations on ``synthetic.write_catalog``
+projects, including the repository's ``generate-readme.py`` and
+``generate-tables.py`` scripts. Each result is the best of ``--repeat``
+timed runs plus the peak traced memory (``tracemalloc``) of one more run,
+so numbers from different commits on the same machine are comparable:
+
+    python benchmarks/suite.py -o base.json
+    git checkout feature && python benchmarks/suite.py --compare base.json
+
+Usage:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --quick --only render
+    python benchmarks/suite.py --repeat 5 -o results.json
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import PROJECT_DIR, make_tree, project_name, tree_size, write_catalog
+
+SCRIPTS_DIR = PROJECT_DIR.parent.parent / 'scripts'
+README_TEMPLATE = PROJECT_DIR.parent.parent / 'README.template.md'
+
+# (depth, branching) of the synthetic trees; catalog sizes in projects
+TREE_SIZES = [(3, 4), (4, 4), (5, 4), (6, 4)]
+CATALOG_SIZES = [50, 200, 1000]
+QUICK_TREE_SIZES = [(3, 3), (4, 4)]
+QUICK_CATALOG_SIZES = [50, 200]
+
+
+def load_script(name: str):
+    """Import ``scripts/<name>.py`` (hyphenated names) as a module, once."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))  # for git_metadata
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
+
+
+def _tree_operations() -> Dict[str, Callable[[dict], object]]:
+    from decision_tree import (check_coverage, iter_paths, load_tree, render_graphviz,
+                               render_html, render_mermaid, render_svg)
+    return {
+        'load_tree.yaml': lambda f: load_tree(f['yaml']),
+        'load_tree.json': lambda f: load_tree(f['json']),
+        'render_mermaid': lambda f: render_mermaid(f['tree']),
+        'render_graphviz': lambda f: render_graphviz(f['tree']),
+        'render_html': lambda f: render_html(f['tree']),
+        'render_svg': lambda f: render_svg(f['tree']),
+        'iter_paths': lambda f: sum(1 for _ in iter_paths(f['tree'])),
+        'check_coverage': lambda f: check_coverage(f['tree'], f['required']),
+    }
+
+
+def _catalog_operations() -> Dict[str, Callable[[dict], object]]:
+    from decision_tree import Classifier, induce_tree, load_projects
+    readme = load_script('generate-readme')
+    tables = load_script('generate-tables')
+    table_generators = [
+        tables.generate_stats, tables.generate_overview_table, tables.generate_by_category,
+        tables.generate_transport_matrix, tables.generate_reputable_sources,
+        tables.generate_authentication_matrix, tables.generate_enterprise_auth_table,
+        tables.generate_installation_methods_table,
+    ]
+
+    def script_projects(module, directory):
+        module.PROJECTS_DIR = directory
+        return module.load_projects()
+
+    return {
+        'load_projects': lambda f: load_projects([f['dir']]),
+        'generate-readme.load_projects': lambda f: script_projects(readme, f['dir']),
+        'generate-readme.process_template': lambda f: readme.process_template(f['template'], f['rows']),
+        'generate-tables': lambda f: [generate(f['rows']) for generate in table_generators],
+        'classify': lambda f: Classifier(f['induced']).classify(f['catalog']),
+        'induce_tree': lambda f: induce_tree(f['catalog']),
+    }
+
+
+def _tree_fixture(directory: Path, depth: int, branching: int, label_length: int) -> dict:
+    import yaml
+    tree = make_tree(depth, branching, label_length)
+    yaml_path = directory / f'tree-d{depth}-b{branching}.yaml'
+    json_path = yaml_path.with_suffix('.json')
+    yaml_path.write_text(yaml.safe_dump(tree, sort_keys=False))
+    json_path.write_text(json.dumps(tree))
+    leaves = branching ** depth
+    # Half of the required projects are in the tree, half are not
+    required = [project_name(i) for i in range(0, 2 * leaves, 2)]
+    return {'tree': tree, 'yaml': yaml_path, 'json': json_path, 'required': required}
+
+
+def _catalog_fixture(directory: Path, count: int, template: str) -> dict:
+    from decision_tree import induce_tree, load_projects
+    catalog_dir = directory / f'projects-{count}'
+    write_catalog(catalog_dir, count)
+    catalog = load_projects([catalog_dir])
+    # What the scripts' own load_projects() returns
+    rows = sorted((dict(data, _filename=name.replace('/', '--')) for name, data in catalog.items()),
+                  key=lambda row: row['_filename'])
+    return {'dir': catalog_dir, 'catalog': catalog, 'rows': rows, 'template': template,
+            'induced': induce_tree(catalog)}
+
+
+def measure(run: Callable[[dict], object], fixture: dict, repeat: int) -> dict:
+    """Best and median seconds of ``repeat`` runs, and peak bytes of one traced run."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(fixture)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(fixture)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': times[0], 'median_seconds': times[len(times) // 2], 'peak_bytes': peak}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(tree_sizes: List[tuple] = TREE_SIZES, catalog_sizes: List[int] = CATALOG_SIZES,
+              repeat: int = 3, only: Optional[str] = None, label_length: int = 40,
+              progress: Callable[[dict], None] = None) -> dict:
+    """
+    Run every operation (or those whose name contains ``only``) at every size.
+
+    Returns:
+        ``{'meta': {...}, 'results': [{'operation', 'size', 'params',
+        'seconds', 'median_seconds', 'peak_bytes'}, ...]}``; ``size`` is the
+        node count of a tree or the project count of a catalog
+    """
+    tree_operations = _tree_operations()
+    catalog_operations = _catalog_operations()
+    if only:
+        tree_operations = {k: v for k, v in tree_operations.items() if only in k}
+        catalog_operations = {k: v for k, v in catalog_operations.items() if only in k}
+
+    results = []
+
+    def record(operation, run, fixture, size, params):
+        result = {'operation': operation, 'size': size, 'params': params,
+                  **measure(run, fixture, repeat)}
+        results.append(result)
+        if progress:
+            progress(result)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        if tree_operations:
+            for depth, branching in tree_sizes:
+                fixture = _tree_fixture(directory, depth, branching, label_length)
+                params = {'depth': depth, 'branching': branching, 'label_length': label_length}
+                for operation, run in tree_operations.items():
+                    record(operation, run, fixture, tree_size(depth, branching), params)
+        if catalog_operations:
+            template = README_TEMPLATE.read_text()
+            for count in catalog_sizes:
+                fixture = _catalog_fixture(directory, count, template)
+                for operation, run in catalog_operations.items():
+                    record(operation, run, fixture, count, {'projects': count})
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _key(result: dict) -> tuple:
+    return result['operation'], result['size']
+
+
+def compare(base: dict, current: dict) -> List[str]:
+    """Lines comparing ``current`` with a ``base`` run: time and memory ratios."""
+    base_results = {_key(result): result for result in base['results']}
+    lines = [f"{'operation':32} {'size':>7} {'time':>9} {'ratio':>6} {'peak':>9} {'ratio':>6}"]
+    for result in current['results']:
+        old = base_results.get(_key(result))
+        time_ratio = f"{result['seconds'] / old['seconds']:.2f}" if old and old['seconds'] else '-'
+        peak_ratio = f"{result['peak_bytes'] / old['peak_bytes']:.2f}" if old and old['peak_bytes'] else '-'
+        lines.append(f"{result['operation']:32} {result['size']:>7} "
+                     f"{result['seconds'] * 1000:>7.1f}ms {time_ratio:>6} "
+                     f"{result['peak_bytes'] / 1024:>7.0f}kB {peak_ratio:>6}")
+    return lines
+
+
+def _print_result(result: dict) -> None:
+    print(f"{result['operation']:32} {result['size']:>7} {result['seconds'] * 1000:>9.1f}ms "
+          f"{result['peak_bytes'] / 1024:>9.0f}kB", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timed runs per operation (default: 3)')
+    parser.add_argument('--quick', action='store_true', help='Small sizes only')
+    parser.add_argument('--only', help='Run operations whose name contains this')
+    parser.add_argument('--label-length', type=int, default=40, help='Tree label length (default: 40)')
+    parser.add_argument('-o', '--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASE', help='Compare with results JSON from an earlier run')
+    args = parser.parse_args()
+
+    results = run_suite(
+        QUICK_TREE_SIZES if args.quick else TREE_SIZES,
+        QUICK_CATALOG_SIZES if args.quick else CATALOG_SIZES,
+        repeat=args.repeat, only=args.only, label_length=args.label_length,
+        progress=None if args.compare else _print_result,
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+    if args.compare:
+        print('\n'.join(compare(json.loads(Path(args.compare).read_text()), results)))
+    elif not args.output:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
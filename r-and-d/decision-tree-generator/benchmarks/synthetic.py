@@ -0,0 +1,176 @@
+"""
+Deterministic synthetic inputs for the benchmarks.
+
+``make_tree`` builds a decision tree of a given depth, branching factor and
+label length, ``make_chain`` a degenerate one as deep as it is large;
+``make_catalog`` builds project YAML data whose fields, types and enum
+values follow the repository's ``spec.yaml``. The same arguments always
+give the same data, so timings stay comparable across commits.
+
+    tree = make_tree(depth=5, branching=4)          # 1365 nodes
+    chain = make_chain(500)                         # 500 questions deep
+    write_catalog('/tmp/projects', 1000)            # 1000 project YAML files
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+SPEC_FILE = PROJECT_DIR.parent.parent / 'spec.yaml'
+
+WORDS = (
+    'server client bridge proxy gateway transport stdio http stream auth token oauth '
+    'local remote cloud enterprise docker kubernetes python node go rust java cli '
+    'interactive batch test debug inspect convert openapi grpc websocket sse'
+).split()
+
+# Chance that an optional field of the spec is filled in
+OPTIONAL_FIELD_RATE = 0.6
+# Projects per owner, so some owners have several projects
+PROJECTS_PER_OWNER = 3
+
+
+def _label(rng: random.Random, length: int) -> str:
+    """Space-separated words, cut to ``length`` characters."""
+    words = []
+    size = -1
+    while size < length:
+        words.append(rng.choice(WORDS))
+        size += len(words[-1]) + 1
+    return ' '.join(words)[:length].rstrip() or 'x'
+
+
+def project_name(i: int) -> str:
+    """``owner/repo`` of synthetic project ``i``."""
+    return f'org{i // PROJECTS_PER_OWNER}/tool-{i}'
+
+
+def tree_size(depth: int, branching: int) -> int:
+    """Node count of ``make_tree(depth, branching)``."""
+    return sum(branching ** level for level in range(depth + 1))
+
+
+def make_tree(depth: int, branching: int, label_length: int = 40, seed: int = 0,
+              structured_rate: float = 0.5) -> dict:
+    """
+    Full tree: questions down to ``depth``, ``branching`` branches each.
+
+    Leaves are numbered in depth-first order; leaf ``i`` recommends
+    ``project_name(i)``, as a leaf-structured node (with notes) at the
+    given rate and as a plain leaf otherwise.
+
+    Returns:
+        Tree dict in the shape ``load_tree`` returns
+    """
+    rng = random.Random(seed)
+    leaves = 0
+
+    def build(level: int) -> dict:
+        nonlocal leaves
+        if level == depth:
+            name = project_name(leaves)
+            leaves += 1
+            text = f'Use {name}: {_label(rng, max(label_length - len(name) - 6, 1))}'
+            if rng.random() < structured_rate:
+                return {'leaf-structured': {'recommendation': text, 'projects': [name],
+                                            'notes': _label(rng, label_length)}}
+            return {'leaf': text}
+        return {
+            'question': _label(rng, label_length) + '?',
+            'branches': [{'condition': f'{b + 1}. {_label(rng, max(label_length // 2, 1))}',
+                          'next': build(level + 1)} for b in range(branching)],
+        }
+
+    return {'tree': {
+        'id': f'synthetic-d{depth}-b{branching}',
+        'title': f'Synthetic tree (depth {depth}, branching {branching})',
+        'root': build(0),
+    }}
+
+
+def make_chain(length: int, label_length: int = 40, seed: int = 0) -> dict:
+    """
+    Degenerate tree ``length`` questions deep: each question has a leaf
+    branch and a branch to the next question (``2 * length + 1`` nodes).
+    """
+    rng = random.Random(seed)
+    node = {'leaf': f'Use {project_name(length)}'}
+    for i in reversed(range(length)):
+        node = {
+            'question': _label(rng, label_length) + '?',
+            'branches': [
+                {'condition': 'Yes', 'next': {'leaf': f'Use {project_name(i)}'}},
+                {'condition': 'No', 'next': node},
+            ],
+        }
+    return {'tree': {'id': f'synthetic-chain-{length}', 'title': f'Synthetic chain ({length} questions)',
+                     'root': node}}
+
+
+def load_spec(path: Union[str, Path] = SPEC_FILE) -> dict:
+    """The ``fields`` section of ``spec.yaml``."""
+    import yaml
+    return yaml.safe_load(Path(path).read_text())['fields']
+
+
+def _value(rng: random.Random, name: str, field: dict, i: int):
+    kind = field.get('type')
+    if kind == 'boolean':
+        return rng.random() < 0.5
+    if kind == 'integer':
+        return int(10 ** rng.uniform(0, 4.5))
+    if kind == 'array':
+        return [_label(rng, rng.randint(10, 60)) for _ in range(rng.randint(0, 4))]
+    if kind == 'object':
+        return _fields(rng, field.get('properties', {}), i)
+    if 'enum' in field:
+        return rng.choice(field['enum'])
+    if field.get('format') == 'YYYY-MM-DD':
+        return f'{rng.randint(2023, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+    if field.get('format') == 'url' or name.endswith('-url'):
+        return f'https://github.com/{project_name(i)}'
+    if name.endswith('commit'):
+        return f'{rng.getrandbits(160):040x}'
+    return _label(rng, rng.randint(5, 80))
+
+
+def _fields(rng: random.Random, spec: dict, i: int) -> dict:
+    data = {}
+    for name, field in spec.items():
+        if field.get('required') or rng.random() < OPTIONAL_FIELD_RATE:
+            data[name] = _value(rng, name, field, i)
+    return data
+
+
+def make_catalog(count: int, seed: int = 0, spec: Optional[dict] = None) -> Dict[str, dict]:
+    """
+    ``count`` synthetic projects with the fields of ``spec.yaml``.
+
+    Required fields are always set, optional ones at ``OPTIONAL_FIELD_RATE``;
+    values follow the field's type, enum or format. ``repo-url`` names the
+    project, so ``load_projects`` finds it under ``project_name(i)``.
+
+    Returns:
+        ``{owner/repo: project fields}``
+    """
+    spec = load_spec() if spec is None else spec
+    catalog = {}
+    for i in range(count):
+        rng = random.Random(f'{seed}:{i}')
+        catalog[project_name(i)] = _fields(rng, spec, i)
+    return catalog
+
+
+def write_catalog(directory: Union[str, Path], count: int, seed: int = 0,
+                  spec: Optional[dict] = None) -> List[Path]:
+    """Write ``make_catalog`` projects as ``owner--repo.yaml`` files; returns the paths."""
+    import yaml
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, data in make_catalog(count, seed, spec).items():
+        path = directory / (name.replace('/', '--') + '.yaml')
+        path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True))
+        paths.append(path)
+    return paths
@@ -4,12 +4,22 @@ Decision Tree Generator Library
 Deterministic, reproducible decision tree generation from YAML.
 
 Usage:
-    from decision_tree import load_tree, render_mermaid, render_html, render_graphviz
+    from decision_tree import load_tree, render_mermaid, render_html, render_graphviz, render_svg
 
     tree = load_tree('my-tree.yaml')
     print(render_mermaid(tree))
     print(render_html(tree, full_page=True))
     print(render_graphviz(tree))
+    print(render_svg(tree))      # SVG image, laid out without Graphviz
+
+    # Large trees: embed compact JSON, build nodes only when opened
+    from decision_tree import render_html_explorer
+    print(render_html_explorer(tree, full_page=True))
+
+    # Stream straight to a file or stdout instead of building a string
+    from decision_tree import render_mermaid_to
+    with open('tree.mmd', 'w') as f:
+        render_mermaid_to(f, tree)
 
     # Split large trees into multiple smaller diagrams
     from decision_tree import render_mermaid_split
@@ -18,34 +28,135 @@ Usage:
     for section in split['sections']:
         print(f"## {section['title']}")
         print(section['mermaid'])
+
+    # Or cut wherever a subtree outgrows a node budget
+    from decision_tree import render_mermaid_partitioned
+    parts = render_mermaid_partitioned(tree, max_nodes=40)
+    print(parts['index'])     # Nested markdown navigation
+
+    # Re-render only what changed since the last run
+    from decision_tree import FragmentCache
+    cache = FragmentCache('.dt-cache')
+    html = render_html(tree, cache=cache)
+
+    # Several formats from one walk of the tree
+    from decision_tree import fan_out, MermaidEmitter, HtmlEmitter, CoverageCollector
+    coverage = CoverageCollector()
+    with open('tree.mmd', 'w') as mmd, open('tree.html', 'w') as html:
+        fan_out(tree, [MermaidEmitter(mmd), HtmlEmitter(html), coverage])
 """
 
-from .loader import load_tree, validate_tree
-from .mermaid import render_mermaid, render_mermaid_split
-from .graphviz import render_graphviz
-from .html_details import render_html
-from .coverage import (
-    extract_referenced_items,
-    find_paths_to_item,
-    check_coverage,
-    generate_coverage_report,
-    get_all_tree_items,
-    get_all_tree_projects,
-)
+import importlib
+
+# Public name -> submodule defining it. Submodules are imported on first
+# attribute access (PEP 562), so ``import decision_tree`` - and every ``dt``
+# command - only pays for the renderers it actually uses.
+_EXPORTS = {
+    'load_tree': 'loader',
+    'close_tree': 'loader',
+    'validate_tree': 'loader',
+    'ParseCache': 'loader',
+    'LazyInclude': 'loader',
+    'compile_binary': 'binary',
+    'BinaryTree': 'binary',
+    'render_mermaid': 'mermaid',
+    'render_mermaid_to': 'mermaid',
+    'render_mermaid_split': 'mermaid',
+    'render_mermaid_partitioned': 'mermaid',
+    'MermaidEmitter': 'mermaid',
+    'MermaidSplitEmitter': 'mermaid',
+    'render_graphviz': 'graphviz',
+    'render_graphviz_to': 'graphviz',
+    'GraphvizEmitter': 'graphviz',
+    'render_html': 'html_details',
+    'render_html_to': 'html_details',
+    'HtmlEmitter': 'html_details',
+    'render_html_explorer': 'html_explorer',
+    'render_html_explorer_to': 'html_explorer',
+    'render_svg': 'svg',
+    'render_svg_to': 'svg',
+    'iter_paths': 'paths',
+    'TreeService': 'server',
+    'Classifier': 'classify',
+    'load_projects': 'classify',
+    'induce_tree': 'induce',
+    'Questionnaire': 'ask',
+    'FragmentCache': 'cache',
+    'StructuralHashes': 'cache',
+    'Emitter': 'fanout',
+    'Visit': 'fanout',
+    'fan_out': 'fanout',
+    'CoverageCollector': 'coverage',
+    'CoverageIndex': 'coverage',
+    'extract_referenced_items': 'coverage',
+    'find_paths_to_item': 'coverage',
+    'check_coverage': 'coverage',
+    'generate_coverage_report': 'coverage',
+    'get_all_tree_items': 'coverage',
+    'get_all_tree_projects': 'coverage',
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __version__ = '0.2.1'
 __all__ = [
     'load_tree',
+    'close_tree',
     'validate_tree',
+    'ParseCache',
+    'LazyInclude',
+    'compile_binary',
+    'BinaryTree',
     'render_mermaid',
+    'render_mermaid_to',
     'render_mermaid_split',
+    'render_mermaid_partitioned',
     'render_graphviz',
+    'render_graphviz_to',
     'render_html',
+    'render_html_to',
+    'render_html_explorer',
+    'render_html_explorer_to',
+    'render_svg',
+    'render_svg_to',
+    # Single-walk rendering to several formats
+    'fan_out',
+    'Emitter',
+    'Visit',
+    'MermaidEmitter',
+    'MermaidSplitEmitter',
+    'GraphvizEmitter',
+    'HtmlEmitter',
     # Coverage analysis
+    'CoverageCollector',
+    'CoverageIndex',
     'extract_referenced_items',
     'find_paths_to_item',
     'check_coverage',
     'generate_coverage_report',
     'get_all_tree_items',
     'get_all_tree_projects',
+    'iter_paths',
+    'TreeService',
+    # Routing projects through when: expressions
+    'Classifier',
+    'load_projects',
+    'induce_tree',
+    # Scripted question answering
+    'Questionnaire',
+    # Incremental rendering
+    'FragmentCache',
+    'StructuralHashes',
 ]
@@ -0,0 +1,157 @@
+"""
+Answer a tree's questions from scripts: a precompiled transition table.
+
+``Questionnaire`` compiles a tree once into a flat table keyed by
+``(node id, normalized answer)`` over the compact tree's node ids (shared
+``$ref`` subtrees are one node). Following a sequence of answers is then
+one dict lookup per answer:
+
+    questionnaire = Questionnaire(load_tree('examples/mcp-tool-chooser.yaml'))
+    questionnaire.answer(['3', 'sse (server-sent events)'])
+    # {'status': 'leaf', 'recommendation': ..., 'projects': [...], 'notes': ...}
+
+An answer is a branch condition (case and runs of whitespace ignored) or
+the branch number, counting from 1. Results have a 'status':
+
+    leaf        recommendation, projects and notes of the leaf reached
+    incomplete  the answers ran out at 'question' (with its 'options')
+    invalid     'answer' matches no option of 'question' (null 'question':
+                answers left over after reaching a leaf)
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .compact import QUESTION, LEAF, compact_tree
+
+# Result statuses
+LEAF_REACHED = 'leaf'
+INCOMPLETE = 'incomplete'
+INVALID = 'invalid'
+
+
+def normalize_answer(text: str) -> str:
+    """Answer key: casefolded, with whitespace runs collapsed."""
+    return ' '.join(text.split()).casefold()
+
+
+def _dumps(result: dict) -> str:
+    return json.dumps(result, ensure_ascii=False, sort_keys=True)
+
+
+class Questionnaire:
+    """A tree compiled into a transition table for scripted answering."""
+
+    def __init__(self, tree_data: dict):
+        compact = compact_tree(tree_data)
+        strings = compact['s']
+        self.root = compact['r']
+        self.table: Dict[Tuple[int, str], int] = {}
+        self._questions = {}
+        self._options = {}
+        self._leaves = {}
+
+        for node_id, record in enumerate(compact['n']):
+            if record[0] == QUESTION:
+                branches = record[2]
+                conditions = [strings[i] for i in branches[0::2]]
+                children = branches[1::2]
+                self._questions[node_id] = strings[record[1]]
+                self._options[node_id] = conditions
+                for condition, child in zip(conditions, children):
+                    self.table.setdefault((node_id, normalize_answer(condition)), child)
+                # Numbers only where no condition has the same key
+                for number, child in enumerate(children, 1):
+                    self.table.setdefault((node_id, str(number)), child)
+            elif record[0] == LEAF:
+                self._leaves[node_id] = {'recommendation': strings[record[1]], 'projects': [], 'notes': None}
+            else:
+                self._leaves[node_id] = {
+                    'recommendation': strings[record[1]],
+                    'projects': [strings[i] for i in record[2]],
+                    'notes': strings[record[3]] if record[3] >= 0 else None,
+                }
+
+        # Serialized terminal results, shared by every sequence ending there
+        self._json = {}
+        self._keys = {}
+
+    def question(self, node: int) -> Optional[str]:
+        """Question asked at ``node`` (None at a leaf)."""
+        return self._questions.get(node)
+
+    def options(self, node: int) -> List[str]:
+        """Branch conditions of ``node``, in order (empty at a leaf)."""
+        return self._options.get(node, [])
+
+    def step(self, node: int, answer: str) -> Optional[int]:
+        """Node an answer at ``node`` leads to, or None if it matches no option."""
+        key = self._keys.get(answer)
+        if key is None:
+            key = self._keys[answer] = normalize_answer(answer)
+        return self.table.get((node, key))
+
+    def _follow(self, answers: Iterable[str]) -> Tuple[int, Optional[str]]:
+        """Node reached and the first answer that could not be followed."""
+        table = self.table
+        keys = self._keys
+        leaves = self._leaves
+        node = self.root
+        for answer in answers:
+            if node in leaves:
+                return node, answer
+            key = keys.get(answer)
+            if key is None:
+                key = keys[answer] = normalize_answer(answer)
+            child = table.get((node, key))
+            if child is None:
+                return node, answer
+            node = child
+        return node, None
+
+    def result(self, node: int, answer: Optional[str] = None) -> dict:
+        """Result dict for stopping at ``node``, on an unmatched ``answer`` if given."""
+        if answer is not None:
+            return {'status': INVALID, 'answer': answer,
+                    'question': self.question(node), 'options': self.options(node)}
+        if node in self._leaves:
+            return {'status': LEAF_REACHED, **self._leaves[node]}
+        return {'status': INCOMPLETE, 'question': self.question(node), 'options': self.options(node)}
+
+    def answer(self, answers: Iterable[str]) -> dict:
+        """Follow a sequence of answers from the root."""
+        return self.result(*self._follow(answers))
+
+    def answer_many(self, sequences: Iterable[Iterable[str]]) -> Iterator[str]:
+        """
+        Follow many answer sequences; yields one JSON result per sequence.
+
+        Results for leaves and unanswered questions are serialized once and
+        reused.
+        """
+        serialized = self._json
+        for answers in sequences:
+            node, answer = self._follow(answers)
+            if answer is not None:
+                yield _dumps(self.result(node, answer))
+                continue
+            text = serialized.get(node)
+            if text is None:
+                text = serialized[node] = _dumps(self.result(node))
+            yield text
+
+
+def read_sequences(stream) -> Iterator[List[str]]:
+    """
+    Answer sequences from a batch file: one per line, answers separated by
+    tabs, or a JSON array of strings for lines starting with ``[``.
+    Blank lines are skipped.
+    """
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        if line.lstrip().startswith('['):
+            yield json.loads(line)
+        else:
+            yield line.split('\t')
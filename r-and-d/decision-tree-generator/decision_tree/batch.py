@@ -0,0 +1,225 @@
+"""
+Batch rendering of many tree files in one process (``dt-build``).
+
+Running one ``dt-*`` command per tree and format pays interpreter startup
+and YAML parsing every time. ``build`` expands glob patterns, renders all
+requested formats of each tree from one load (Mermaid, Graphviz and HTML in
+a single ``fan_out`` walk), optionally on a pool of worker processes, and
+skips trees whose content has not changed since the last build.
+
+Change detection uses a manifest in the output directory mapping each input
+to a hash of its bytes, the files it pulls in with ``$include``, the
+requested formats and the renderer sources, so editing the tree, any file
+it includes or the renderer code triggers a rebuild.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .fanout import fan_out
+from .graphviz import GraphvizEmitter
+from .html_details import HtmlEmitter
+from .loader import close_tree, load_tree
+from .mermaid import MermaidEmitter
+from .svg import render_svg_to
+
+# Format name -> output file extension
+FORMATS = {
+    'mermaid': '.mmd',
+    'graphviz': '.dot',
+    'html': '.html',
+    'svg': '.svg',
+}
+
+MANIFEST_NAME = '.dt-build.json'
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """
+    Expand glob patterns (``**`` allowed) into a sorted list of files.
+
+    A pattern without wildcards is taken as a file name and must exist.
+    """
+    found = set()
+    for pattern in patterns:
+        if any(ch in pattern for ch in '*?['):
+            found.update(Path(p) for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(pattern):
+            found.add(Path(pattern))
+        else:
+            raise FileNotFoundError(f"No such file: {pattern}")
+    return sorted(found)
+
+
+def output_names(inputs: List[Path]) -> Dict[Path, str]:
+    """
+    Output name (relative path without extension) of every input.
+
+    The directory layout below the inputs' common parent is kept, so trees
+    with the same file name in different directories do not collide.
+    """
+    if not inputs:
+        return {}
+    base = Path(os.path.commonpath([str(p.resolve().parent) for p in inputs]))
+    return {path: path.resolve().relative_to(base).with_suffix('').as_posix() for path in inputs}
+
+
+def output_paths(name: str, out_dir: Union[str, Path], formats: List[str]) -> Dict[str, Path]:
+    """``{format: output file}`` for one output name."""
+    return {fmt: Path(out_dir) / f'{name}{FORMATS[fmt]}' for fmt in formats}
+
+
+def renderer_fingerprint() -> str:
+    """Hash of the package sources, so renderer changes invalidate builds."""
+    digest = hashlib.sha256()
+    for source in sorted(_PACKAGE_DIR.glob('*.py')):
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def render_tree_file(input_path: Union[str, Path], outputs: Dict[str, Path]) -> List[str]:
+    """
+    Load one tree and write each of its ``{format: path}`` outputs.
+
+    Returns:
+        Paths of the files the tree includes
+    """
+    includes = []
+    tree = load_tree(Path(input_path), includes=includes)
+    for path in outputs.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    files = {fmt: open(path, 'w') for fmt, path in outputs.items()}
+    try:
+        emitters = []
+        if 'mermaid' in files:
+            emitters.append(MermaidEmitter(files['mermaid']))
+        if 'graphviz' in files:
+            emitters.append(GraphvizEmitter(files['graphviz']))
+        if 'html' in files:
+            emitters.append(HtmlEmitter(files['html'], full_page=True))
+        if emitters:
+            fan_out(tree, emitters)
+        if 'svg' in files:
+            render_svg_to(files['svg'], tree)
+    finally:
+        for f in files.values():
+            f.close()
+        close_tree(tree)
+    return [str(path) for path in includes]
+
+
+def _build_one(task: tuple) -> dict:
+    """Render one input (runs in a worker process when jobs > 1)."""
+    input_path, outputs = task
+    start = time.perf_counter()
+    try:
+        includes = render_tree_file(input_path, outputs)
+    except Exception as e:
+        return {'input': input_path, 'status': 'failed', 'error': str(e),
+                'seconds': time.perf_counter() - start}
+    return {'input': input_path, 'status': 'rendered', 'error': None,
+            'seconds': time.perf_counter() - start, 'includes': includes}
+
+
+def _with_includes(content_hash: str, includes: List[str]) -> Optional[str]:
+    """Extend an input's hash with its included files (None if one is gone)."""
+    digest = hashlib.sha256(content_hash.encode())
+    for include in includes:
+        try:
+            digest.update(b'\0' + Path(include).read_bytes())
+        except OSError:
+            return None
+    return digest.hexdigest()
+
+
+def _load_manifest(path: Path) -> Dict[str, dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build(patterns: List[str], formats: List[str], out_dir: Union[str, Path] = 'output',
+          jobs: int = 1, force: bool = False) -> List[dict]:
+    """
+    Render every tree matched by ``patterns`` to every format in ``formats``.
+
+    Args:
+        patterns: File names or glob patterns of tree YAML files
+        formats: Format names (keys of ``FORMATS``)
+        out_dir: Output directory (created if needed)
+        jobs: Number of worker processes (1 renders in this process)
+        force: Render even the inputs that are unchanged since the last build
+
+    Returns:
+        One dict per input, in input order, with 'input', 'status'
+        ('rendered', 'unchanged' or 'failed'), 'seconds' and 'error'
+    """
+    if not formats:
+        raise ValueError("No output formats given")
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown)} (choose from {', '.join(FORMATS)})")
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+
+    out_dir = Path(out_dir)
+    inputs = expand_inputs(patterns)
+    names = output_names(inputs)
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+    prefix = f"{renderer_fingerprint()}\0{','.join(sorted(formats))}\0".encode()
+
+    results = {}
+    hashes = {}
+    tasks = []
+    for path in inputs:
+        outputs = output_paths(names[path], out_dir, formats)
+        content_hash = hashlib.sha256(prefix + path.read_bytes()).hexdigest()
+        hashes[path] = content_hash
+        entry = manifest.get(names[path])
+        # Entries from older or hand-edited manifests may lack fields: treat as stale
+        if not isinstance(entry, dict) or not isinstance(entry.get('includes'), list):
+            entry = {}
+        unchanged = (entry.get('hash') is not None
+                     and entry['hash'] == _with_includes(content_hash, entry['includes'])
+                     and all(p.exists() for p in outputs.values()))
+        if unchanged and not force:
+            results[path] = {'input': str(path), 'status': 'unchanged', 'error': None, 'seconds': 0.0}
+        else:
+            tasks.append((str(path), outputs))
+
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            done = list(pool.map(_build_one, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    else:
+        done = [_build_one(task) for task in tasks]
+
+    for result in done:
+        path = Path(result['input'])
+        results[path] = result
+        if result['status'] == 'rendered':
+            manifest[names[path]] = {'hash': _with_includes(hashes[path], result['includes']),
+                                     'includes': result['includes']}
+        else:
+            manifest.pop(names[path], None)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(MANIFEST_NAME + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, manifest_path)
+
+    return [results[path] for path in inputs]
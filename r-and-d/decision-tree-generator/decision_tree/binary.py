@@ -0,0 +1,335 @@
+"""
+Memory-mapped binary form of a decision tree.
+
+``compile_binary`` turns a validated tree into a compact file that a
+``BinaryTree`` reader maps into memory instead of parsing it. Nodes are
+decoded only when a traversal reaches them, and every process that opens
+the same file shares one page-cached copy:
+
+    with open('tree.dtb', 'wb') as f:
+        f.write(compile_binary(load_tree('tree.yaml')))
+
+    with BinaryTree('tree.dtb') as tree:
+        root = tree.root
+        for condition, child in root.children:
+            print(condition, child.label)
+        print(render_mermaid(tree.tree_data))   # renderers run over it too
+
+Layout (little-endian, every section 4-byte aligned):
+
+    header   magic 'DTB1', version, counts, root node, tree id/title strings,
+             position of the definitions in the table
+    nodes    fixed-width records: kind, flags, text, first, count, extra
+    table    u32 entries referenced by records: (condition, child node)
+             pairs of a question, project strings of a structured leaf,
+             (name, node) pairs of the definitions
+    strings  u32 offsets into the heap, then the deduplicated UTF-8 heap
+
+A ``$ref`` is a record of its own pointing at its definition, so shared
+subtrees are stored once and render exactly as in the source tree. Only the
+fields renderers use are stored (tree id, title and definitions; question,
+branches, leaf and leaf-structured recommendation, projects and notes).
+"""
+
+import mmap
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from .compact import QUESTION, LEAF, STRUCTURED, _StringTable
+from .loader import REF_KEY, get_definitions
+
+REF = 3
+
+MAGIC = b'DTB1'
+VERSION = 1
+NONE = 0xFFFFFFFF
+
+# magic, version, reserved, node count, table count, string count,
+# root node, tree id, title, definitions start, definitions count
+_HEADER = struct.Struct('<4sHHIIIIIIII')
+# kind, flags, reserved, text, first, count, extra
+_RECORD = struct.Struct('<BBHIIII')
+_PAIR = struct.Struct('<II')
+
+# Record flags
+_HAS_PROJECTS = 1
+
+_KEYS = {
+    QUESTION: ('question', 'branches'),
+    LEAF: ('leaf',),
+    STRUCTURED: ('leaf-structured',),
+    REF: (REF_KEY,),
+}
+
+
+def compile_binary(tree_data: dict) -> bytes:
+    """
+    Compile a validated tree into the binary format.
+
+    Nodes are numbered depth-first from the root, with the children of a
+    question stored next to each other; definitions follow when first
+    referenced (unreferenced ones at the end).
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+
+    Returns:
+        File content for ``BinaryTree``
+
+    Raises:
+        ValueError: If a stored field is not a string
+    """
+    tree = tree_data['tree']
+    definitions = get_definitions(tree_data)
+    intern = _StringTable()
+    records = []
+    table = []
+    ref_ids = {}
+    body_ids = {}
+    stack = []
+
+    def alloc(node: dict) -> int:
+        if REF_KEY in node:
+            name = node[REF_KEY]
+            if name not in ref_ids:
+                ref_ids[name] = len(records)
+                records.append(None)
+                records[ref_ids[name]] = (REF, 0, intern(name), define(name), 0, NONE)
+            return ref_ids[name]
+        records.append(None)
+        stack.append((node, len(records) - 1))
+        return len(records) - 1
+
+    def define(name: str) -> int:
+        if name not in body_ids:
+            body_ids[name] = alloc(definitions[name])
+        return body_ids[name]
+
+    def drain() -> None:
+        while stack:
+            node, node_id = stack.pop()
+            if 'question' in node:
+                mark = len(stack)
+                first = len(table)
+                branches = node.get('branches', [])
+                for branch in branches:
+                    table.append(intern(branch['condition']))
+                    table.append(alloc(branch['next']))
+                # Visit children (and newly reached definitions) in branch order
+                stack[mark:] = reversed(stack[mark:])
+                records[node_id] = (QUESTION, 0, intern(node['question']), first, len(branches), NONE)
+            elif 'leaf' in node:
+                records[node_id] = (LEAF, 0, intern(node['leaf']), 0, 0, NONE)
+            else:
+                ls = node['leaf-structured']
+                first = len(table)
+                projects = ls.get('projects', [])
+                table.extend(intern(project) for project in projects)
+                notes = intern(ls['notes']) if ls.get('notes') is not None else NONE
+                flags = _HAS_PROJECTS if 'projects' in ls else 0
+                records[node_id] = (STRUCTURED, flags, intern(ls['recommendation']),
+                                    first, len(projects), notes)
+
+    tree_id = intern(tree['id'])
+    title = intern(tree['title']) if 'title' in tree else NONE
+    root = alloc(tree['root'])
+    drain()
+    for name in definitions:
+        define(name)
+        drain()
+    defs_start = len(table)
+    for name in definitions:
+        table.append(intern(name))
+        table.append(body_ids[name])
+
+    heap = []
+    offsets = [0]
+    for text in intern.strings:
+        if not isinstance(text, str):
+            raise ValueError(f"Binary trees store strings only, got {text!r}")
+        heap.append(text.encode())
+        offsets.append(offsets[-1] + len(heap[-1]))
+
+    return b''.join([
+        _HEADER.pack(MAGIC, VERSION, 0, len(records), len(table), len(intern.strings),
+                     root, tree_id, title, defs_start, len(definitions)),
+        b''.join(_RECORD.pack(kind, flags, 0, text, first, count, extra)
+                 for kind, flags, text, first, count, extra in records),
+        struct.pack(f'<{len(table)}I', *table),
+        struct.pack(f'<{len(offsets)}I', *offsets),
+        b''.join(heap),
+    ])
+
+
+class BinaryTree:
+    """
+    Read-only view of a binary tree file, mapped into memory.
+
+    ``tree_data`` has the shape ``load_tree`` returns, with ``BinaryNode``
+    mappings in place of node dicts, so every renderer accepts it. A node
+    is decoded the first time it is reached, and decoded strings are
+    shared.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        with open(path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buf[:len(MAGIC)] != MAGIC:
+            self._buf.close()
+            raise ValueError(f"Not a binary decision tree: {path}")
+        (_, version, _, node_count, table_count, string_count,
+         root, tree_id, title, defs_start, defs_count) = _HEADER.unpack_from(self._buf)
+        if version != VERSION:
+            self._buf.close()
+            raise ValueError(f"Unsupported binary tree version {version}: {path}")
+
+        self.node_count = node_count
+        self._nodes_at = _HEADER.size
+        self._table_at = self._nodes_at + _RECORD.size * node_count
+        self._offsets_at = self._table_at + 4 * table_count
+        self._heap_at = self._offsets_at + 4 * (string_count + 1)
+        self._view = memoryview(self._buf)
+        self._nodes = {}
+        self._strings = {}
+
+        tree = {'id': self.string(tree_id)}
+        if title != NONE:
+            tree['title'] = self.string(title)
+        if defs_count:
+            tree['definitions'] = {self.string(name): self.node(node)
+                                   for name, node in self.pairs(defs_start, defs_count)}
+        tree['root'] = self.node(root)
+        self.tree_data = BinaryTreeData(tree=tree)
+        self.tree_data.binary = self
+
+    @property
+    def root(self) -> 'BinaryNode':
+        return self.tree_data['tree']['root']
+
+    def string(self, index: int) -> str:
+        """String ``index`` of the heap, decoded on first use."""
+        text = self._strings.get(index)
+        if text is None:
+            start, end = _PAIR.unpack_from(self._buf, self._offsets_at + 4 * index)
+            text = str(self._view[self._heap_at + start:self._heap_at + end], 'utf-8')
+            self._strings[index] = text
+        return text
+
+    def node(self, index: int) -> 'BinaryNode':
+        """Node ``index``; the same object every time it is asked for."""
+        node = self._nodes.get(index)
+        if node is None:
+            kind, flags, _, text, first, count, extra = _RECORD.unpack_from(
+                self._buf, self._nodes_at + _RECORD.size * index)
+            node = BinaryNode(self, index, (kind, flags, text, first, count, extra))
+            self._nodes[index] = node
+        return node
+
+    def entries(self, first: int, count: int) -> Tuple[int, ...]:
+        """``count`` table entries starting at ``first``."""
+        return struct.unpack_from(f'<{count}I', self._buf, self._table_at + 4 * first)
+
+    def pairs(self, first: int, count: int) -> List[Tuple[int, int]]:
+        """``count`` pairs of table entries starting at ``first``."""
+        flat = self.entries(first, 2 * count)
+        return list(zip(flat[0::2], flat[1::2]))
+
+    def close(self) -> None:
+        """Unmap the file; its nodes cannot be read afterwards."""
+        self._view.release()
+        self._buf.close()
+
+    def __enter__(self) -> 'BinaryTree':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BinaryTreeData(dict):
+    """
+    ``tree_data`` of a ``BinaryTree``: the usual ``{'tree': ...}`` dict that
+    also keeps its reader as ``binary``, so code holding only the tree data
+    (from ``load_tree``) can close the mapping (``close_tree``).
+    """
+
+    __slots__ = ('binary',)
+
+
+class BinaryNode(Mapping):
+    """
+    One node of a ``BinaryTree``.
+
+    As a mapping it has the keys of the source node ('question' and
+    'branches', 'leaf', 'leaf-structured' or '$ref'), built on access.
+    ``label`` and ``children`` give direct access with ``$ref`` resolved.
+    """
+
+    __slots__ = ('_tree', 'index', '_record')
+
+    def __init__(self, tree: BinaryTree, index: int, record: tuple):
+        self._tree = tree
+        self.index = index
+        self._record = record
+
+    @property
+    def kind(self) -> str:
+        """'question', 'leaf', 'leaf-structured' or '$ref'."""
+        return _KEYS[self._record[0]][0]
+
+    @property
+    def target(self) -> 'BinaryNode':
+        """The definition a ``$ref`` points at (the node itself otherwise)."""
+        kind, _, _, first, _, _ = self._record
+        return self._tree.node(first) if kind == REF else self
+
+    @property
+    def label(self) -> str:
+        """Question, leaf text or recommendation."""
+        return self._tree.string(self.target._record[2])
+
+    @property
+    def children(self) -> List[Tuple[str, 'BinaryNode']]:
+        """``(condition, node)`` per branch, with ``$ref`` resolved (empty for leaves)."""
+        kind, _, _, first, count, _ = self.target._record
+        if kind != QUESTION:
+            return []
+        tree = self._tree
+        return [(tree.string(condition), tree.node(child).target)
+                for condition, child in tree.pairs(first, count)]
+
+    def __getitem__(self, key: str):
+        kind, flags, text, first, count, extra = self._record
+        keys = _KEYS[kind]
+        if key == keys[0]:
+            if kind == STRUCTURED:
+                tree = self._tree
+                ls = {'recommendation': tree.string(text)}
+                if flags & _HAS_PROJECTS:
+                    ls['projects'] = [tree.string(i) for i in tree.entries(first, count)]
+                if extra != NONE:
+                    ls['notes'] = tree.string(extra)
+                return ls
+            return self._tree.string(text)
+        if key == 'branches' and kind == QUESTION:
+            tree = self._tree
+            return [{'condition': tree.string(condition), 'next': tree.node(child)}
+                    for condition, child in tree.pairs(first, count)]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in _KEYS[self._record[0]]
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        return iter(_KEYS[self._record[0]])
+
+    def __len__(self) -> int:
+        return len(_KEYS[self._record[0]])
+
+    def __repr__(self) -> str:
+        return f'BinaryNode({self.index}, {self.kind}={self._tree.string(self._record[2])!r})'
@@ -0,0 +1,175 @@
+"""
+Structural hashing and an on-disk cache of rendered fragments.
+
+Every subtree gets a Merkle-style hash computed bottom-up from its own
+fields and its children's hashes, so editing one leaf only changes the
+hashes on the path from that leaf to the root. Renderers look fragments up
+by ``(renderer, options, position context, subtree hash)``: after an edit,
+only the changed spine is re-rendered and every untouched subtree is
+spliced in from the cache, byte for byte as a cold render would write it.
+
+The renderer's own source file is part of every key, so changing renderer
+code invalidates its fragments automatically.
+"""
+
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .loader import REF_KEY, get_definitions
+
+
+class StructuralHashes:
+    """
+    Merkle hashes of every subtree of a tree, computed in one pass.
+
+    A ``$ref`` node hashes like the definition it points at (inlining a
+    shared subtree does not change its content); ``has_refs`` tells whether
+    a subtree contains any ``$ref``, which matters to renderers that emit
+    shared subtrees only once.
+
+    Nodes are identified by object identity, so the tree must not be
+    mutated while the hashes are in use.
+    """
+
+    def __init__(self, tree_data: dict):
+        self._hash = {}
+        self._has_refs = {}
+        definitions = get_definitions(tree_data)
+        for node in [tree_data['tree']['root'], *definitions.values()]:
+            self._add(node, definitions)
+
+    def _add(self, root: dict, definitions: dict) -> None:
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in self._hash:
+                continue
+
+            if REF_KEY in node:
+                target = definitions[node[REF_KEY]]
+                if id(target) in self._hash:
+                    self._hash[id(node)] = self._hash[id(target)]
+                    self._has_refs[id(node)] = True
+                else:
+                    stack.append((node, True))
+                    stack.append((target, False))
+                continue
+
+            branches = node.get('branches', []) if 'question' in node else []
+            if not expanded and branches:
+                stack.append((node, True))
+                stack.extend((branch['next'], False) for branch in reversed(branches))
+                continue
+
+            own = {key: value for key, value in node.items() if key != 'branches'}
+            own_json = json.dumps(own, sort_keys=True, ensure_ascii=False, default=str)
+            digest = hashlib.sha256(own_json.encode())
+            has_refs = False
+            for branch in branches:
+                child = branch['next']
+                digest.update(b'\0')
+                digest.update(branch['condition'].encode())
+                digest.update(b'\0')
+                digest.update(self._hash[id(child)].encode())
+                has_refs = has_refs or self._has_refs[id(child)]
+            self._hash[id(node)] = digest.hexdigest()
+            self._has_refs[id(node)] = has_refs
+
+    def __getitem__(self, node: dict) -> str:
+        return self._hash[id(node)]
+
+    def has_refs(self, node: dict) -> bool:
+        return self._has_refs[id(node)]
+
+
+class FragmentCache:
+    """
+    Rendered fragments stored as files under a directory, one per key.
+
+    Entries are written atomically (temporary file, then rename), so
+    concurrent or interrupted runs never leave a partial fragment behind.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key[2:]
+
+    def get(self, key: str) -> Optional[List[str]]:
+        try:
+            text = self._path(key).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text.split('\n')
+
+    def put(self, key: str, lines: List[str]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp.write_text('\n'.join(lines), encoding='utf-8')
+        os.replace(tmp, path)
+
+
+@functools.lru_cache(maxsize=None)
+def source_digest(path: str) -> str:
+    """Hash of a source file (renderer code version for cache keys)."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class FragmentMemo:
+    """
+    Cache lookups for one render: binds a cache to a renderer and a tree.
+
+    Args:
+        cache: FragmentCache to read and fill
+        renderer: Renderer name, part of every key
+        source: Path of the renderer's source file, part of every key
+        hashes: StructuralHashes of the tree being rendered
+        options: Render options that affect fragments
+        inline_refs: True if the renderer expands ``$ref`` subtrees at every
+            reference (fragments are then pure functions of content);
+            otherwise subtrees containing a ``$ref`` are never cached
+    """
+
+    def __init__(self, cache: FragmentCache, renderer: str, source: str,
+                 hashes: StructuralHashes, options: tuple = (), inline_refs: bool = False):
+        self.cache = cache
+        self.hashes = hashes
+        self.inline_refs = inline_refs
+        self._prefix = f'{renderer}\0{source_digest(source)}\0{options!r}\0'
+
+    def lookup(self, node: dict, *context) -> Tuple[Optional[str], Optional[List[str]]]:
+        """
+        Look up the fragment of ``node`` rendered at ``context``.
+
+        Returns:
+            ``(key, lines)``: ``lines`` is None on a miss (render, then
+            ``store(key, ...)``); ``key`` is None if the node is not cacheable
+        """
+        if not self.inline_refs and self.hashes.has_refs(node):
+            return None, None
+        key = hashlib.sha256(
+            f'{self._prefix}{context!r}\0{self.hashes[node]}'.encode()
+        ).hexdigest()
+        return key, self.cache.get(key)
+
+    def store(self, key: str, lines: List[str]) -> None:
+        self.cache.put(key, lines)
+
+
+def make_memo(cache: Optional[FragmentCache], renderer: str, source: str, tree_data: dict,
+              options: tuple = (), inline_refs: bool = False) -> Optional[FragmentMemo]:
+    """FragmentMemo for one render, or None when rendering without a cache."""
+    if cache is None:
+        return None
+    return FragmentMemo(cache, renderer, source, StructuralHashes(tree_data), options, inline_refs)
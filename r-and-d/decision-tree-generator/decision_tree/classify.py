@@ -0,0 +1,443 @@
+"""
+Route projects through a tree with machine-evaluable branch conditions.
+
+Next to its free-text ``condition`` a branch may carry a ``when``
+expression over the fields of a project YAML file:
+
+    - condition: "SSE bridge"
+      when: "transports.sse and category == 'http-bridge'"
+      next: ...
+
+Expressions know field paths (``transports.sse``, ``reputable-source``),
+string, number, ``true``/``false``/``null`` and list literals,
+``== != < <= > >=``, ``in`` / ``not in``, ``and`` / ``or`` / ``not`` and
+parentheses. A missing field is null; comparing incompatible values is
+false. Expressions are parsed, never passed to ``eval``.
+
+``Classifier`` routes a whole catalog in one pass. Each distinct
+comparison is evaluated once per distinct value of its field, giving the
+set of matching projects as a bitmask; routing then only intersects masks
+at each question (the first matching branch wins), so the cost does not
+grow with projects times nodes.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .binary import BinaryNode
+from .coverage import _leaf_items
+from .loader import REF_KEY, _parse, get_definitions
+from .matching import canonical_project_key, project_keys_in_text, project_ref
+
+# A key, and a dotted field path, of a ``when`` expression
+FIELD_KEY = r'[A-Za-z_][\w-]*'
+FIELD_PATH = rf'{FIELD_KEY}(?:\.{FIELD_KEY})*'
+
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<string>'[^']*'|"[^"]*")
+  | (?P<number>-?\d+(?:\.\d+)?(?![\w.-]))
+  | (?P<op>==|!=|<=|>=|<|>|\(|\)|\[|\]|,)
+  | (?P<name>''' + FIELD_PATH + r''')
+)''', re.VERBOSE)
+
+_CONSTANTS = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+_COMPARISONS = ('==', '!=', '<', '<=', '>', '>=')
+
+# Classification statuses
+LISTED = 'listed'        # reached a leaf that names the project
+ELSEWHERE = 'elsewhere'  # reached a leaf that does not name it
+STUCK = 'stuck'          # no branch of a question matched
+
+
+def _tokenize(text: str) -> List[Tuple[str, object, int]]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unexpected character at {pos}: {text[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = value[1:-1]
+        elif kind == 'number':
+            value = float(value) if '.' in value else int(value)
+        tokens.append((kind, value, match.start(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing tuple expressions."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def parse(self) -> tuple:
+        if not self.tokens:
+            raise ValueError("Empty expression")
+        expr = self._or()
+        if self.pos < len(self.tokens):
+            self._fail("Unexpected")
+        return expr
+
+    def _peek(self, value) -> bool:
+        if self.pos < len(self.tokens):
+            kind, token, _ = self.tokens[self.pos]
+            return token == value and kind in ('op', 'name')
+        return False
+
+    def _fail(self, what: str):
+        if self.pos < len(self.tokens):
+            _, token, at = self.tokens[self.pos]
+            raise ValueError(f"{what} {token!r} at {at}")
+        raise ValueError(f"{what} end of expression")
+
+    def _expect(self, value) -> None:
+        if not self._peek(value):
+            self._fail(f"Expected {value!r}, got")
+        self.pos += 1
+
+    def _or(self) -> tuple:
+        terms = [self._and()]
+        while self._peek('or'):
+            self.pos += 1
+            terms.append(self._and())
+        return terms[0] if len(terms) == 1 else ('or', *terms)
+
+    def _and(self) -> tuple:
+        terms = [self._not()]
+        while self._peek('and'):
+            self.pos += 1
+            terms.append(self._not())
+        return terms[0] if len(terms) == 1 else ('and', *terms)
+
+    def _not(self) -> tuple:
+        if self._peek('not'):
+            self.pos += 1
+            return ('not', self._not())
+        if self._peek('('):
+            self.pos += 1
+            expr = self._or()
+            self._expect(')')
+            return expr
+        left = self._value()
+        for op in _COMPARISONS + ('in',):
+            if self._peek(op):
+                self.pos += 1
+                return ('cmp', op, left, self._value())
+        if self._peek('not'):
+            self.pos += 1
+            self._expect('in')
+            return ('cmp', 'not in', left, self._value())
+        return ('test', left)
+
+    def _value(self) -> tuple:
+        if self._peek('['):
+            self.pos += 1
+            items = []
+            while not self._peek(']'):
+                if items:
+                    self._expect(',')
+                item = self._value()
+                if item[0] != 'const':
+                    self._fail("List items must be literals, got")
+                items.append(item[1])
+            self.pos += 1
+            return ('const', tuple(items))
+        if self.pos >= len(self.tokens):
+            self._fail("Expected a value, got")
+        kind, token, _ = self.tokens[self.pos]
+        if kind in ('string', 'number'):
+            self.pos += 1
+            return ('const', token)
+        if kind == 'name' and token in _CONSTANTS:
+            self.pos += 1
+            return ('const', _CONSTANTS[token])
+        if kind == 'name' and token not in ('and', 'or', 'not', 'in'):
+            self.pos += 1
+            return ('field', tuple(token.split('.')))
+        self._fail("Expected a value, got")
+
+
+def parse_when(text: str) -> tuple:
+    """
+    Parse a ``when`` expression.
+
+    Returns:
+        Nested tuples: ``('or', ...)``, ``('and', ...)``, ``('not', x)``,
+        ``('cmp', op, left, right)``, ``('test', value)``, with values
+        ``('field', path)`` or ``('const', value)``
+
+    Raises:
+        ValueError: If the expression is malformed
+    """
+    return _Parser(text).parse()
+
+
+def _field(project: dict, path: tuple):
+    value = project
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _compare(op: str, left, right) -> bool:
+    try:
+        if op == '==':
+            return left == right
+        if op == '!=':
+            return left != right
+        if op == '<':
+            return left < right
+        if op == '<=':
+            return left <= right
+        if op == '>':
+            return left > right
+        if op == '>=':
+            return left >= right
+        if op == 'in':
+            return right is not None and left in right
+        return right is None or left not in right
+    except TypeError:
+        return False
+
+
+def _group_key(value):
+    try:
+        hash(value)
+        return type(value).__name__, value
+    except TypeError:
+        return 'json', json.dumps(value, sort_keys=True, default=str)
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Indices of the set bits of ``mask``, ascending."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class _Columns:
+    """A catalog viewed field by field: distinct values and the projects holding them."""
+
+    def __init__(self, projects: List[dict]):
+        self.projects = projects
+        self.all = (1 << len(projects)) - 1
+        self._groups = {}
+
+    def groups(self, path: tuple) -> List[Tuple[object, int]]:
+        """``(value, mask of projects with that value)`` per distinct value of a field."""
+        groups = self._groups.get(path)
+        if groups is None:
+            by_key = {}
+            for i, project in enumerate(self.projects):
+                value = _field(project, path)
+                entry = by_key.get(_group_key(value))
+                if entry is None:
+                    by_key[_group_key(value)] = [value, 1 << i]
+                else:
+                    entry[1] |= 1 << i
+            groups = self._groups[path] = [tuple(entry) for entry in by_key.values()]
+        return groups
+
+    def mask(self, test, path: tuple) -> int:
+        """Projects whose field value passes ``test``; each distinct value is tested once."""
+        mask = 0
+        for value, holders in self.groups(path):
+            if test(value):
+                mask |= holders
+        return mask
+
+
+def _unlink(path) -> list:
+    """Path list of a ``(parent path, branch index)`` link chain."""
+    indices = []
+    while isinstance(path, tuple):
+        path, i = path
+        indices.append(i)
+    return path + indices[::-1]
+
+
+class Classifier:
+    """
+    Routes projects through the ``when`` expressions of a tree.
+
+    Every ``when`` in the tree (definitions included) is parsed up front, so
+    syntax errors surface before any project is classified. Branches
+    without ``when`` never match.
+
+    Raises:
+        ValueError: If a ``when`` is invalid, or the tree was read from the
+            binary format (which does not store ``when``)
+    """
+
+    def __init__(self, tree_data: dict):
+        if isinstance(tree_data['tree']['root'], BinaryNode):
+            raise ValueError("Binary trees do not store 'when' expressions; "
+                             "classify with the YAML or JSON source of the tree")
+        self.tree_data = tree_data
+        self._parsed = {}
+        definitions = get_definitions(tree_data)
+        roots = [(tree_data['tree']['root'], [])]
+        roots += [(node, ['definitions', name]) for name, node in definitions.items()]
+        for root, root_path in roots:
+            # Paths as (parent path, branch index) links, spelled out only for errors
+            stack = [(root, root_path)]
+            while stack:
+                node, path = stack.pop()
+                for i, branch in enumerate(node.get('branches', []) if 'question' in node else []):
+                    text = branch.get('when')
+                    if text is not None and text not in self._parsed:
+                        try:
+                            self._parsed[text] = parse_when(text)
+                        except ValueError as e:
+                            path_str = '/'.join(map(str, _unlink((path, i))))
+                            raise ValueError(f"Invalid 'when' at {path_str}: {e}") from None
+                    stack.append((branch['next'], (path, i)))
+
+    def classify(self, projects: Dict[str, dict]) -> Dict[str, dict]:
+        """
+        Route every project of a catalog through the tree.
+
+        Args:
+            projects: ``{name: project fields}``; names in ``owner/repo`` form
+                are checked against the projects a leaf names
+
+        Returns:
+            ``{name: result}`` in input order; a result has 'status'
+            (LISTED, ELSEWHERE or STUCK), 'node' (label of the leaf reached,
+            or of the question where no branch matched) and 'path' (branch
+            conditions taken)
+        """
+        names = list(projects)
+        columns = _Columns([projects[name] for name in names])
+        definitions = get_definitions(self.tree_data)
+        masks = {}
+
+        def resolve(node: dict) -> dict:
+            return definitions[node[REF_KEY]] if REF_KEY in node else node
+
+        def evaluate(expr: tuple) -> int:
+            key = repr(expr)
+            mask = masks.get(key)
+            if mask is None:
+                mask = masks[key] = self._evaluate(expr, columns, evaluate)
+            return mask
+
+        # Visits: (condition, parent visit) so paths are only built per result
+        visits = [(None, -1)]
+        placed = []
+        stack = [(resolve(self.tree_data['tree']['root']), columns.all, 0)]
+        while stack:
+            node, reach, visit = stack.pop()
+            if 'question' not in node:
+                placed.append((reach, visit, node, None))
+                continue
+
+            remaining = reach
+            children = []
+            for branch in node.get('branches', []):
+                text = branch.get('when')
+                if text is None or not remaining:
+                    continue
+                matched = remaining & evaluate(self._parsed[text])
+                if matched:
+                    remaining &= ~matched
+                    visits.append((branch['condition'], visit))
+                    children.append((resolve(branch['next']), matched, len(visits) - 1))
+            if remaining:
+                placed.append((remaining, visit, node, STUCK))
+            stack.extend(reversed(children))
+
+        results = {}
+        for reach, visit, node, status in placed:
+            path = []
+            while visit > 0:
+                condition, visit = visits[visit]
+                path.append(condition)
+            path.reverse()
+            if status == STUCK:
+                label, listed = node['question'], set()
+            else:
+                items = _leaf_items(node)
+                label = node['leaf'] if 'leaf' in node else node['leaf-structured']['recommendation']
+                listed = {key for item in items for key in project_keys_in_text(item)}
+            for i in _bits(reach):
+                name = names[i]
+                if status is None:
+                    result_status = LISTED if canonical_project_key(name) in listed else ELSEWHERE
+                else:
+                    result_status = status
+                results[name] = {'status': result_status, 'node': label, 'path': list(path)}
+        return {name: results[name] for name in names}
+
+    @staticmethod
+    def _evaluate(expr: tuple, columns: _Columns, evaluate) -> int:
+        """Mask of the projects satisfying ``expr``; sub-expressions go through ``evaluate``."""
+        op = expr[0]
+        if op == 'or':
+            mask = 0
+            for term in expr[1:]:
+                mask |= evaluate(term)
+            return mask
+        if op == 'and':
+            mask = columns.all
+            for term in expr[1:]:
+                mask &= evaluate(term)
+            return mask
+        if op == 'not':
+            return columns.all & ~evaluate(expr[1])
+        if op == 'test':
+            value = expr[1]
+            if value[0] == 'const':
+                return columns.all if value[1] else 0
+            return columns.mask(bool, value[1])
+
+        _, cmp, left, right = expr
+        if left[0] == 'const' and right[0] == 'const':
+            return columns.all if _compare(cmp, left[1], right[1]) else 0
+        if right[0] == 'const':
+            return columns.mask(lambda value: _compare(cmp, value, right[1]), left[1])
+        if left[0] == 'const':
+            return columns.mask(lambda value: _compare(cmp, left[1], value), right[1])
+        mask = 0
+        for i, project in enumerate(columns.projects):
+            if _compare(cmp, _field(project, left[1]), _field(project, right[1])):
+                mask |= 1 << i
+        return mask
+
+
+def load_projects(paths: List[Union[str, Path]]) -> Dict[str, dict]:
+    """
+    Load project YAML/JSON files (directories: their ``*.yaml`` files).
+
+    Projects are named ``owner/repo`` from their ``repo-url``, else from an
+    ``owner--repo.yaml`` file name, else by the file name itself.
+
+    Returns:
+        ``{name: project fields}`` in sorted file order
+    """
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob('*.yaml')) if path.is_dir() else [path])
+
+    projects = {}
+    for path in sorted(set(files)):
+        data = _parse(path.read_text(), path.suffix) or {}
+        name = project_ref(str(data.get('repo-url') or '')) or project_ref(path.name) or path.stem
+        projects[name] = data
+    return projects
+
+
+def classify_projects(tree_data: dict, projects: Dict[str, dict]) -> Dict[str, dict]:
+    """Shortcut for ``Classifier(tree_data).classify(projects)``."""
+    return Classifier(tree_data).classify(projects)
@@ -2,111 +2,640 @@
 Command-line interface for decision tree renderers.
 
 These functions are entry points for pip-installed commands:
+  dt          - All of the below as subcommands (dt mermaid, dt html, ...)
   dt-mermaid  - Render to Mermaid
   dt-graphviz - Render to Graphviz DOT
   dt-html     - Render to HTML
+  dt-svg      - Render to SVG (built-in layout, no Graphviz needed)
+  dt-paths    - Stream all root-to-leaf paths as TSV or NDJSON
+  dt-build    - Render many trees to several formats in one process
+  dt-serve    - Serve a tree's nodes, paths and search over HTTP
+  dt-classify - Route project files through a tree's ``when`` expressions
+  dt-induce   - Generate a tree from the facets of project files
+  dt-ask      - Answer a tree's questions (interactively, from argv or in batch)
+
+Renderers are imported inside the command that uses them, and PyYAML only
+when a YAML file is read, so short invocations start fast.
 """
 
 import sys
+import json
+import time
 import argparse
 from pathlib import Path
 
-from .loader import load_tree
-from .mermaid import render_mermaid
-from .graphviz import render_graphviz
-from .html_details import render_html
+from .loader import BINARY_SUFFIX, dump_tree_json, load_tree
+
+# Subcommand -> (entry point, summary) for the dt command
+COMMANDS = {
+    'mermaid': ('mermaid_main', 'Render to Mermaid flowchart'),
+    'graphviz': ('graphviz_main', 'Render to Graphviz DOT'),
+    'html': ('html_main', 'Render to HTML with <details> elements'),
+    'svg': ('svg_main', 'Render to SVG (no Graphviz needed)'),
+    'paths': ('paths_main', 'Stream all root-to-leaf paths'),
+    'build': ('build_main', 'Render many trees to several formats'),
+    'serve': ('serve_main', 'Serve nodes, paths and search of a tree over HTTP'),
+    'ask': ('ask_main', 'Answer the questions of a tree and print the leaf reached as JSON'),
+    'classify': ('classify_main', 'Route project files through the when: expressions of a tree'),
+    'induce': ('induce_main', 'Generate a tree from the facets of project files'),
+    'compile': ('compile_main', 'Validate a tree and save it as JSON or binary for fast loading'),
+}
+
+
+def _write_output(render_to, tree: dict, output: str = None, **options) -> None:
+    """Stream a renderer's output to the --output file or stdout."""
+    if output:
+        with open(output, 'w') as f:
+            render_to(f, tree, **options)
+    else:
+        render_to(sys.stdout, tree, **options)
+        # Keep the trailing blank line that print(output) used to add
+        sys.stdout.write('\n')
+
+
+def _write_compact(render, tree: dict, output: str = None, **options) -> None:
+    """Write a renderer's compact output and report the bytes saved on stderr."""
+    from .streams import render_to_string
+    text = render_to_string(render, tree, compact=True, **options)
+    full = len(render_to_string(render, tree, **options).encode())
+    size = len(text.encode())
+    if output:
+        Path(output).write_text(text)
+    else:
+        sys.stdout.write(text)
+        sys.stdout.write('\n')
+    saved = full - size
+    print(f"Compact output: {size} bytes, {saved} bytes ({saved / full:.0%}) smaller than the default",
+          file=sys.stderr)
 
 
-def mermaid_main():
+def mermaid_main(argv: list = None, prog: str = None):
     """Entry point for dt-mermaid command."""
     parser = argparse.ArgumentParser(
+        prog=prog,
         description='Render decision tree YAML to Mermaid flowchart'
     )
-    parser.add_argument('input_file', help='Input YAML file')
+    parser.add_argument('input_file', help='Input YAML or JSON file')
     parser.add_argument(
         '--direction', '-d',
         choices=['TD', 'TB', 'LR', 'RL', 'BT'],
         default='TD',
         help='Flowchart direction (default: TD = top-down)'
     )
+    parser.add_argument(
+        '--compact', '-c',
+        action='store_true',
+        help='Smaller output: identical leaves merged, short ids; reports the bytes saved'
+    )
     parser.add_argument(
         '--output', '-o',
         help='Output file (default: stdout)'
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     try:
+        from .mermaid import render_mermaid_to
         tree = load_tree(Path(args.input_file))
-        output = render_mermaid(tree, direction=args.direction)
-
-        if args.output:
-            Path(args.output).write_text(output)
+        if args.compact:
+            _write_compact(render_mermaid_to, tree, args.output, direction=args.direction)
         else:
-            print(output)
+            _write_output(render_mermaid_to, tree, args.output, direction=args.direction)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 
-def graphviz_main():
+def graphviz_main(argv: list = None, prog: str = None):
     """Entry point for dt-graphviz command."""
     parser = argparse.ArgumentParser(
+        prog=prog,
         description='Render decision tree YAML to Graphviz DOT format'
     )
-    parser.add_argument('input_file', help='Input YAML file')
+    parser.add_argument('input_file', help='Input YAML or JSON file')
     parser.add_argument(
         '--rankdir', '-r',
         choices=['TB', 'BT', 'LR', 'RL'],
         default='TB',
         help='Graph direction (default: TB = top-bottom)'
     )
+    parser.add_argument(
+        '--compact', '-c',
+        action='store_true',
+        help='Smaller output: identical leaves merged, short ids; reports the bytes saved'
+    )
     parser.add_argument(
         '--output', '-o',
         help='Output file (default: stdout)'
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     try:
+        from .graphviz import render_graphviz_to
         tree = load_tree(Path(args.input_file))
-        output = render_graphviz(tree, rankdir=args.rankdir)
-
-        if args.output:
-            Path(args.output).write_text(output)
+        if args.compact:
+            _write_compact(render_graphviz_to, tree, args.output, rankdir=args.rankdir)
         else:
-            print(output)
+            _write_output(render_graphviz_to, tree, args.output, rankdir=args.rankdir)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 
-def html_main():
+def html_main(argv: list = None, prog: str = None):
     """Entry point for dt-html command."""
     parser = argparse.ArgumentParser(
+        prog=prog,
         description='Render decision tree YAML to HTML with <details> elements'
     )
-    parser.add_argument('input_file', help='Input YAML file')
+    parser.add_argument('input_file', help='Input YAML or JSON file')
     parser.add_argument(
         '--full-page', '-f',
         action='store_true',
         help='Generate full HTML page with styling (default: fragment only)'
     )
+    parser.add_argument(
+        '--lazy', '-l',
+        action='store_true',
+        help='Embed the tree as JSON and build nodes on expand (for large trees)'
+    )
+    parser.add_argument(
+        '--search', '-s',
+        action='store_true',
+        help='Add a search box backed by a precomputed index (implies --lazy)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        help='Output file (default: stdout)'
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        tree = load_tree(Path(args.input_file))
+        if args.lazy or args.search:
+            from .html_explorer import render_html_explorer_to
+            _write_output(render_html_explorer_to, tree, args.output,
+                          full_page=args.full_page, search=args.search)
+        else:
+            from .html_details import render_html_to
+            _write_output(render_html_to, tree, args.output, full_page=args.full_page)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def svg_main(argv: list = None, prog: str = None):
+    """Entry point for dt-svg command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Render decision tree YAML to an SVG image (no Graphviz needed)'
+    )
+    parser.add_argument('input_file', help='Input YAML or JSON file')
+    parser.add_argument(
+        '--output', '-o',
+        help='Output file (default: stdout)'
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        from .svg import render_svg_to
+        tree = load_tree(Path(args.input_file))
+        _write_output(render_svg_to, tree, args.output)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _tsv_field(text: str) -> str:
+    """Escape a value for one TSV column."""
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def write_paths(stream, tree: dict, fmt: str = 'tsv', item: str = None) -> None:
+    """Write every (item, path) pair of the tree to a stream, one per line."""
+    from .paths import iter_paths
+    if fmt == 'tsv':
+        stream.write('item\tpath\n')
+        for leaf_item, path in iter_paths(tree, item=item):
+            stream.write(f"{_tsv_field(leaf_item)}\t{_tsv_field(' → '.join(path))}\n")
+    else:
+        for leaf_item, path in iter_paths(tree, item=item):
+            record = {'item': leaf_item, 'path': list(path)}
+            stream.write(json.dumps(record, ensure_ascii=False, sort_keys=True))
+            stream.write('\n')
+
+
+def paths_main(argv: list = None, prog: str = None):
+    """Entry point for dt-paths command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Stream all root-to-leaf paths of a decision tree'
+    )
+    parser.add_argument('input_file', help='Input YAML or JSON file')
+    parser.add_argument(
+        '--format', '-f',
+        choices=['tsv', 'ndjson'],
+        default='tsv',
+        help='Output format (default: tsv with item and path columns)'
+    )
+    parser.add_argument(
+        '--item', '-i',
+        help='Only output paths leading to this exact item'
+    )
     parser.add_argument(
         '--output', '-o',
         help='Output file (default: stdout)'
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     try:
         tree = load_tree(Path(args.input_file))
-        output = render_html(tree, full_page=args.full_page)
 
         if args.output:
-            Path(args.output).write_text(output)
+            with open(args.output, 'w') as f:
+                write_paths(f, tree, args.format, args.item)
+        else:
+            write_paths(sys.stdout, tree, args.format, args.item)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def build_main(argv: list = None, prog: str = None):
+    """Entry point for dt-build command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Render many decision tree YAML files to several formats in one process'
+    )
+    parser.add_argument('inputs', nargs='+', help="Input YAML files or glob patterns (quote '**' patterns)")
+    parser.add_argument(
+        '--format', '-f',
+        action='append',
+        help="Output format(s), comma-separated or repeated: mermaid, graphviz, html, svg (default: all)"
+    )
+    parser.add_argument(
+        '--out-dir', '-o',
+        default='output',
+        help='Output directory (default: output)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Number of worker processes (default: 1)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Render all inputs, even those unchanged since the last build'
+    )
+
+    args = parser.parse_args(argv)
+
+    from .batch import FORMATS, build
+    formats = [f for value in args.format or [','.join(FORMATS)] for f in value.split(',') if f]
+
+    start = time.perf_counter()
+    try:
+        results = build(args.inputs, formats, args.out_dir, jobs=args.jobs, force=args.force)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    counts = {'rendered': 0, 'unchanged': 0, 'failed': 0}
+    for result in results:
+        counts[result['status']] += 1
+        print(f"{result['seconds'] * 1000:9.1f} ms  {result['status']:<9}  {result['input']}")
+        if result['error']:
+            print(f"Error: {result['input']}: {result['error']}", file=sys.stderr)
+    print(f"{counts['rendered']} rendered, {counts['unchanged']} unchanged, "
+          f"{counts['failed']} failed in {elapsed:.2f}s")
+
+    if counts['failed']:
+        sys.exit(1)
+
+
+def serve_main(argv: list = None, prog: str = None):
+    """Entry point for dt-serve command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Serve a decision tree one level at a time as JSON over HTTP'
+    )
+    parser.add_argument('input_file', help='Input YAML, JSON or binary tree file')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', '-p', type=int, default=8000, help='Port (default: 8000)')
+    parser.add_argument(
+        '--allow-origin',
+        help='Access-Control-Allow-Origin header, for pages served from another origin'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=1024,
+        help='Serialized responses kept in memory (default: 1024)'
+    )
+
+    args = parser.parse_args(argv)
+
+    from .server import TreeService, make_server
+    try:
+        service = TreeService(load_tree(Path(args.input_file)), cache_size=args.cache_size)
+        server = make_server(service, args.host, args.port, args.allow_origin)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    host, port = server.server_address[:2]
+    print(f"Serving {service.tree_data['tree']['id']} on http://{host}:{port}/tree", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def compile_main(argv: list = None, prog: str = None):
+    """Entry point for dt compile: validated YAML to JSON or binary."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Validate a decision tree and save it as JSON (loads without PyYAML) '
+                    'or as a memory-mapped binary tree'
+    )
+    parser.add_argument('input_file', help='Input YAML or JSON file')
+    parser.add_argument(
+        '--output', '-o',
+        help='Output file (default: input name with .json or .dtb suffix, - for stdout)'
+    )
+    parser.add_argument(
+        '--binary', '-b',
+        action='store_true',
+        help=f'Write the binary format (implied by an output name ending in {BINARY_SUFFIX})'
+    )
+
+    args = parser.parse_args(argv)
+    binary = args.binary or (args.output or '').endswith(BINARY_SUFFIX)
+
+    input_path = Path(args.input_file)
+    output = args.output or input_path.with_suffix(BINARY_SUFFIX if binary else '.json')
+
+    try:
+        # Compiling resolves $include and $ref, so never replace the source
+        if output != '-' and Path(output).resolve() == input_path.resolve():
+            raise ValueError(f"refusing to overwrite the input file {input_path}; pass -o")
+        tree = load_tree(input_path)
+        if binary:
+            from .binary import compile_binary
+            content = compile_binary(tree)
+            if output == '-':
+                sys.stdout.buffer.write(content)
+            else:
+                with open(output, 'wb') as f:
+                    f.write(content)
+        elif output == '-':
+            dump_tree_json(tree, sys.stdout)
+        else:
+            with open(output, 'w') as f:
+                dump_tree_json(tree, f)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def write_classification(stream, results: dict, fmt: str = 'tsv') -> None:
+    """Write one classification result per project to a stream."""
+    if fmt == 'tsv':
+        stream.write('project\tstatus\tnode\tpath\n')
+        for name, result in results.items():
+            fields = [name, result['status'], result['node'], ' → '.join(result['path'])]
+            stream.write('\t'.join(map(_tsv_field, fields)) + '\n')
+    else:
+        for name, result in results.items():
+            record = dict(result, project=name)
+            stream.write(json.dumps(record, ensure_ascii=False, sort_keys=True))
+            stream.write('\n')
+
+
+def classify_main(argv: list = None, prog: str = None):
+    """Entry point for dt-classify command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Route project YAML files through the 'when' expressions of a decision tree"
+    )
+    parser.add_argument('input_file', help="Input YAML or JSON tree file (binary trees do not store 'when')")
+    parser.add_argument('projects', nargs='+', help='Project YAML files or directories of them')
+    parser.add_argument(
+        '--format', '-f',
+        choices=['tsv', 'ndjson'],
+        default='tsv',
+        help='Output format (default: tsv with project, status, node and path columns)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        help='Output file (default: stdout)'
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Exit with status 1 unless every project reaches a leaf that lists it'
+    )
+
+    args = parser.parse_args(argv)
+
+    from .classify import LISTED, Classifier, load_projects
+    try:
+        classifier = Classifier(load_tree(Path(args.input_file)))
+        results = classifier.classify(load_projects(args.projects))
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                write_classification(f, results, args.format)
+        else:
+            write_classification(sys.stdout, results, args.format)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print(', '.join(f'{count} {status}' for status, count in sorted(counts.items())) or 'No projects',
+          file=sys.stderr)
+    if args.check and counts.get(LISTED, 0) != len(results):
+        sys.exit(1)
+
+
+def induce_main(argv: list = None, prog: str = None):
+    """Entry point for dt-induce command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Generate a decision tree (with when: expressions) from the boolean '
+                    'and enum facets of project YAML files'
+    )
+    parser.add_argument('projects', nargs='+', help='Project YAML files or directories of them')
+    parser.add_argument(
+        '--output', '-o',
+        help='Output YAML file, or JSON for a .json name (default: YAML to stdout)'
+    )
+    parser.add_argument(
+        '--facet',
+        action='append',
+        help='Top-level field to split on, repeatable (default: transports, authentication, '
+             'category, installation)'
+    )
+    parser.add_argument(
+        '--target', '-t',
+        help='Field to predict, e.g. category (default: tell projects apart)'
+    )
+    parser.add_argument(
+        '--max-depth', '-d',
+        type=int,
+        default=6,
+        help='Most questions on a path, 0 for no limit (default: 6)'
+    )
+    parser.add_argument(
+        '--min-leaf',
+        type=int,
+        default=1,
+        help='Fewest projects on either side of a split (default: 1)'
+    )
+    parser.add_argument(
+        '--criterion',
+        choices=['entropy', 'gini'],
+        default='entropy',
+        help='Split criterion: ID3 information gain or CART Gini (default: entropy)'
+    )
+    parser.add_argument('--id', default='generated', help='Tree id (default: generated)')
+    parser.add_argument('--title', help='Tree title')
+
+    args = parser.parse_args(argv)
+
+    from .classify import load_projects
+    from .induce import DEFAULT_FACETS, induce_tree
+    try:
+        sources = [f'{path.rstrip("/")}/*.yaml' if Path(path).is_dir() else path for path in args.projects]
+        tree = induce_tree(
+            load_projects(args.projects),
+            facets=args.facet or DEFAULT_FACETS,
+            target=args.target,
+            max_depth=args.max_depth or None,
+            min_leaf=args.min_leaf,
+            criterion=args.criterion,
+            tree_id=args.id,
+            title=args.title,
+            generated_from=' '.join(sources),
+        )
+        if args.output and args.output.endswith('.json'):
+            with open(args.output, 'w') as f:
+                dump_tree_json(tree, f)
         else:
-            print(output)
+            from .loader import _yaml
+            text = _yaml().safe_dump(tree, sort_keys=False, allow_unicode=True)
+            if args.output:
+                Path(args.output).write_text(text)
+            else:
+                sys.stdout.write(text)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+
+
+def _ask_interactively(questionnaire, stdin, stderr) -> dict:
+    """Prompt for answers on stderr until a leaf is reached (or stdin ends)."""
+    node = questionnaire.root
+    while questionnaire.question(node) is not None:
+        stderr.write(f"\n{questionnaire.question(node)}\n")
+        for number, option in enumerate(questionnaire.options(node), 1):
+            stderr.write(f"  {number}. {option}\n")
+        stderr.write('> ')
+        stderr.flush()
+        line = stdin.readline()
+        if not line:
+            return questionnaire.result(node)
+        child = questionnaire.step(node, line.strip())
+        if child is None:
+            stderr.write(f"Unknown answer: {line.strip()!r}\n")
+        else:
+            node = child
+    return questionnaire.result(node)
+
+
+def ask_main(argv: list = None, prog: str = None):
+    """Entry point for dt-ask command."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description='Answer the questions of a decision tree and print the leaf reached as JSON. '
+                    'Answers are branch conditions (case-insensitive) or branch numbers.'
+    )
+    parser.add_argument('input_file', help='Input YAML, JSON or binary tree file')
+    parser.add_argument('answers', nargs='*', help='Answers in order (default: ask interactively)')
+    parser.add_argument(
+        '--batch', '-b',
+        metavar='FILE',
+        help='Answer sequences, one per line (tab-separated or a JSON array; - for stdin); '
+             'prints one JSON result per line'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        help='Output file (default: stdout)'
+    )
+
+    args = parser.parse_args(argv)
+
+    from .ask import LEAF_REACHED, Questionnaire, read_sequences
+    try:
+        questionnaire = Questionnaire(load_tree(Path(args.input_file)))
+        out = open(args.output, 'w') if args.output else sys.stdout
+        try:
+            if args.batch:
+                source = sys.stdin if args.batch == '-' else open(args.batch)
+                try:
+                    for line in questionnaire.answer_many(read_sequences(source)):
+                        out.write(line)
+                        out.write('\n')
+                finally:
+                    if source is not sys.stdin:
+                        source.close()
+                return
+            if args.answers:
+                result = questionnaire.answer(args.answers)
+            else:
+                result = _ask_interactively(questionnaire, sys.stdin, sys.stderr)
+            json.dump(result, out, ensure_ascii=False, indent=2)
+            out.write('\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if result['status'] != LEAF_REACHED:
+        sys.exit(1)
+
+
+def main(argv: list = None):
+    """Entry point for the dt command: dispatch to a subcommand."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print('usage: dt <command> [options] ...\n')
+        print('Decision tree tools. Run dt <command> --help for command options.\n')
+        print('commands:')
+        for name, (_, summary) in COMMANDS.items():
+            print(f'  {name:<10}{summary}')
+        sys.exit(0 if argv else 2)
+    if argv[0] == '--version':
+        from . import __version__
+        print(f'dt {__version__}')
+        return
+
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        print(f"dt: unknown command '{argv[0]}' (choose from {', '.join(COMMANDS)})", file=sys.stderr)
+        sys.exit(2)
+    globals()[command[0]](argv[1:], prog=f'dt {argv[0]}')
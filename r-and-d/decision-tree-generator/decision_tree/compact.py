@@ -0,0 +1,150 @@
+"""
+Compact, JSON-ready form of a decision tree.
+
+Every string is interned once in a string table and every node becomes a
+small list in a flat node table, so the tree can be embedded in a page (or
+sent over the wire) far more compactly than as nested markup:
+
+    {"s": [strings...], "n": [nodes...], "r": root_id}
+
+Node records reference strings and children by index:
+
+    [0, question, [condition, child_id, condition, child_id, ...]]
+    [1, leaf]
+    [2, recommendation, [project, ...], notes]      (notes -1 if absent)
+
+A ``$ref`` branch simply points at the node id of its definition, so shared
+subtrees are stored once and may have several parents.
+"""
+
+import json
+from typing import List
+
+from .loader import REF_KEY, get_definitions
+
+QUESTION, LEAF, STRUCTURED = 0, 1, 2
+
+
+class _StringTable:
+    """Interns strings in first-seen order."""
+
+    def __init__(self):
+        self.strings = []
+        self._ids = {}
+
+    def __call__(self, text: str) -> int:
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+
+def short_id(node_id: int) -> str:
+    """Short diagram id of a compact node: ``n`` and the id in base 36."""
+    digits = ''
+    while True:
+        node_id, digit = divmod(node_id, 36)
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'[digit] + digits
+        if not node_id:
+            return 'n' + digits
+
+
+def diagram_ids(compact: dict) -> List[str]:
+    """
+    Short diagram id of every compact node, shared by leaves with one text.
+
+    Ids count up in node order. A leaf whose text (or recommendation)
+    repeats an earlier leaf's gets that leaf's id, so a diagram draws it
+    once, with several incoming edges.
+    """
+    ids = []
+    leaf_ids = {}
+    count = 0
+    for record in compact['n']:
+        if record[0] != QUESTION:
+            merged = leaf_ids.get(record[1])
+            if merged is not None:
+                ids.append(merged)
+                continue
+            leaf_ids[record[1]] = short_id(count)
+        ids.append(short_id(count))
+        count += 1
+    return ids
+
+
+def compact_tree(tree_data: dict, sources: list = None) -> dict:
+    """
+    Compile a tree into its compact form.
+
+    Node ids are assigned deterministically: a question's children get
+    consecutive ids when it is visited, depth-first from the root, and each
+    definition is compiled once, when its first reference is reached.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        sources: Optional list; receives the source node dict of every node
+            id (for ``$ref`` nodes, the definition)
+
+    Returns:
+        Dict with 's' (string table), 'n' (node table) and 'r' (root id)
+    """
+    definitions = get_definitions(tree_data)
+    intern = _StringTable()
+    nodes = []
+    ref_ids = {}
+    stack = []
+
+    def alloc(node: dict) -> int:
+        if REF_KEY in node:
+            name = node[REF_KEY]
+            if name not in ref_ids:
+                ref_ids[name] = alloc(definitions[name])
+            return ref_ids[name]
+        nodes.append(None)
+        if sources is not None:
+            sources.append(node)
+        stack.append((node, len(nodes) - 1))
+        return len(nodes) - 1
+
+    root_id = alloc(tree_data['tree']['root'])
+
+    while stack:
+        node, node_id = stack.pop()
+
+        if 'question' in node:
+            mark = len(stack)
+            record = [QUESTION, intern(node['question']), []]
+            for branch in node.get('branches', []):
+                record[2].append(intern(branch['condition']))
+                record[2].append(alloc(branch['next']))
+            # Visit children (and newly reached definitions) in branch order
+            stack[mark:] = reversed(stack[mark:])
+
+        elif 'leaf' in node:
+            record = [LEAF, intern(node['leaf'])]
+
+        else:
+            ls = node['leaf-structured']
+            record = [
+                STRUCTURED,
+                intern(ls['recommendation']),
+                [intern(project) for project in ls.get('projects', [])],
+                intern(ls['notes']) if ls.get('notes') else -1,
+            ]
+
+        nodes[node_id] = record
+
+    return {'s': intern.strings, 'n': nodes, 'r': root_id}
+
+
+def compact_json(compact: dict) -> str:
+    """
+    Serialize a compact tree as minimal JSON safe to embed in HTML.
+
+    ``<`` only ever occurs inside JSON strings, so escaping it as ``\\u003c``
+    keeps ``</script>`` and ``<!--`` out of the markup without changing the
+    decoded value.
+    """
+    text = json.dumps(compact, ensure_ascii=False, separators=(',', ':'))
+    return text.replace('<', '\\u003c')
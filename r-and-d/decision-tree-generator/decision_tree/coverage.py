@@ -7,11 +7,279 @@ and identifies items not covered by the tree.
 
 from typing import List, Dict, Set, Tuple, Optional
 
+from .fanout import Emitter, Visit
+from .loader import REF_KEY, get_definitions
+from .matching import canonical_project_key, match_names_in_texts, project_keys_in_text
+
+# Item key recording where a shared subtree is referenced, and the first
+# path element of items found inside that subtree.
+REF_ITEM_PREFIX = '$ref:'
+
+
+def _leaf_items(node: dict) -> List[str]:
+    """Items a leaf mentions: its text, or its projects then recommendation."""
+    if 'leaf' in node:
+        return [node['leaf']]
+    if 'leaf-structured' in node:
+        ls = node['leaf-structured']
+        rec = ls.get('recommendation', '')
+        return ls.get('projects', []) + ([rec] if rec else [])
+    return []
+
+
+class CoverageIndex:
+    """
+    Item index over a decision tree, built in a single walk.
+
+    Every visited node gets an integer id with a parent pointer and the
+    condition of the branch leading to it. Items (leaf texts, projects,
+    recommendations) map to the ids of the leaves that mention them, so
+    exact lookups are O(1) and condition paths are only rebuilt, by
+    following parent pointers, for the items a caller actually asks about.
+
+    Shared subtrees (``$ref``) are walked once; their root carries the
+    condition ``'$ref:<name>'`` and each reference site is indexed under
+    that same item key.
+
+    Build one per tree with ``CoverageIndex.from_tree()`` and pass it to the
+    module functions via ``index=`` to avoid re-walking the tree.
+    """
+
+    def __init__(self):
+        self._parent = []       # node id -> parent node id (-1 for walk roots)
+        self._condition = []    # node id -> incoming condition (None for walk roots)
+        self._leaves = {}       # item -> list of node ids, in depth-first order
+        self._tree_items = None
+        self._project_keys = None
+
+    @classmethod
+    def from_tree(cls, tree_data: dict) -> 'CoverageIndex':
+        """Index the whole tree, walking each reachable definition once."""
+        index = cls()
+        definitions = get_definitions(tree_data)
+        pending = index._add_subtree(tree_data['tree']['root'], -1, None)
+
+        walked = set()
+        i = 0
+        while i < len(pending):
+            name = pending[i]
+            i += 1
+            if name in walked:
+                continue
+            walked.add(name)
+            pending.extend(index._add_subtree(definitions[name], -1, REF_ITEM_PREFIX + name))
+
+        return index
+
+    @classmethod
+    def from_node(cls, node: dict, path: List[str] = None) -> 'CoverageIndex':
+        """Index a single subtree; ``$ref`` nodes are recorded, not followed."""
+        index = cls()
+        parent = -1
+        for condition in path or []:
+            parent = index._new_node(parent, condition)
+        index._add_subtree(node, parent, None)
+        return index
+
+    def _new_node(self, parent: int, condition: Optional[str]) -> int:
+        self._parent.append(parent)
+        self._condition.append(condition)
+        return len(self._parent) - 1
+
+    def _add_item(self, item: str, node_id: int) -> None:
+        leaves = self._leaves.get(item)
+        if leaves is None:
+            self._leaves[item] = [node_id]
+        else:
+            leaves.append(node_id)
+
+    def _add_subtree(self, node: dict, parent: int, condition: Optional[str]) -> List[str]:
+        """Index ``node`` and its descendants; return the $ref names met."""
+        refs = []
+        stack = [(node, parent, condition)]
+
+        while stack:
+            node, parent, condition = stack.pop()
+            node_id = self._new_node(parent, condition)
+
+            if 'question' in node:
+                # Reversed so branches are popped (and indexed) in order
+                for branch in reversed(node.get('branches', [])):
+                    stack.append((branch['next'], node_id, branch['condition']))
+
+            elif REF_KEY in node:
+                self._add_item(REF_ITEM_PREFIX + node[REF_KEY], node_id)
+                refs.append(node[REF_KEY])
+
+            else:
+                for item in _leaf_items(node):
+                    self._add_item(item, node_id)
+
+        return refs
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._leaves
+
+    def __len__(self) -> int:
+        return len(self._leaves)
+
+    def path(self, node_id: int) -> List[str]:
+        """Rebuild the condition path from the walk root to a node."""
+        conditions = []
+        while node_id != -1:
+            condition = self._condition[node_id]
+            if condition is not None:
+                conditions.append(condition)
+            node_id = self._parent[node_id]
+        conditions.reverse()
+        return conditions
+
+    def leaf_ids(self, item: str) -> List[int]:
+        """Ids of the leaves that mention ``item`` (empty if none)."""
+        return self._leaves.get(item, [])
+
+    def paths(self, item: str) -> List[List[str]]:
+        """All condition paths leading to ``item`` (empty if none)."""
+        return [self.path(node_id) for node_id in self.leaf_ids(item)]
+
+    def keys(self):
+        """All indexed keys in first-seen order, including ``$ref:`` sites."""
+        return self._leaves.keys()
+
+    def tree_items(self) -> Set[str]:
+        """All items referenced in the tree, excluding ``$ref:`` sites."""
+        if self._tree_items is None:
+            self._tree_items = {
+                item for item in self._leaves if not item.startswith(REF_ITEM_PREFIX)
+            }
+        return self._tree_items
+
+    def project_keys(self) -> Dict[str, str]:
+        """
+        Map canonical ``owner/repo`` keys to the first item mentioning them.
+
+        Built on first use from every ``owner/repo`` token in the tree items
+        (project entries, recommendations, leaf text).
+        """
+        if self._project_keys is None:
+            keys = {}
+            for item in self._leaves:
+                if item.startswith(REF_ITEM_PREFIX):
+                    continue
+                for key in project_keys_in_text(item):
+                    keys.setdefault(key, item)
+            self._project_keys = keys
+        return self._project_keys
+
+    def match(self, items: List[str]) -> Dict[str, str]:
+        """
+        Resolve required item names to the tree items that cover them.
+
+        Tries, in order: exact item, canonical ``owner/repo`` key (URLs,
+        filenames and any casing resolve to the same key), then whole-name
+        substring matching of all remaining names in one Aho-Corasick pass
+        over the tree items.
+
+        Returns:
+            Dict mapping each covered name to its tree item
+        """
+        tree_items = self.tree_items()
+        project_keys = self.project_keys()
+        matched = {}
+        fuzzy = []
+
+        for item in items:
+            if item in tree_items:
+                matched[item] = item
+                continue
+            key = canonical_project_key(item)
+            if key is not None and key in project_keys:
+                matched[item] = project_keys[key]
+            else:
+                fuzzy.append(item)
+
+        if fuzzy:
+            texts = (key for key in self._leaves if key in tree_items)
+            matched.update(match_names_in_texts(fuzzy, texts))
+
+        return matched
+
+    def to_dict(self) -> Dict[str, List[List[str]]]:
+        """Materialize ``{item: paths}`` for every key (legacy format)."""
+        return {item: self.paths(item) for item in self._leaves}
+
+
+class CoverageCollector(Emitter):
+    """
+    ``fan_out`` emitter building the same index as ``CoverageIndex.from_tree``.
+
+    Nodes are recorded per walk unit (the main tree or one shared subtree)
+    and replayed in ``from_tree`` order once the walk ends, so node ids,
+    paths and key order all match. The result is in ``index``.
+    """
+
+    def __init__(self):
+        self.index = None
+
+    def start(self, tree_data: dict) -> None:
+        self.units = {None: []}     # unit -> [(local parent id, condition, items)]
+        self.refs = {None: []}      # unit -> $ref names met, in order
+        self.frames = []            # (unit, local id) per entered question
+
+    def _record(self, unit: Optional[str], parent: int, condition: Optional[str],
+                items: List[str]) -> int:
+        records = self.units[unit]
+        records.append((parent, condition, items))
+        return len(records) - 1
+
+    def enter(self, node: dict, visit: Visit) -> bool:
+        unit, parent = self.frames[-1] if self.frames else (None, -1)
+        condition = visit.condition
+        if visit.ref is not None:
+            name = visit.ref
+            self._record(unit, parent, condition, [REF_ITEM_PREFIX + name])
+            self.refs[unit].append(name)
+            if name in self.units:
+                return False
+            self.units[name] = []
+            self.refs[name] = []
+            unit, parent, condition = name, -1, REF_ITEM_PREFIX + name
+
+        if 'question' not in node:
+            self._record(unit, parent, condition, _leaf_items(node))
+            return False
+        self.frames.append((unit, self._record(unit, parent, condition, [])))
+        return True
+
+    def leave(self, node: dict, visit: Visit) -> None:
+        self.frames.pop()
+
+    def finish(self) -> None:
+        order = [None]
+        i = 0
+        while i < len(order):
+            for name in self.refs[order[i]]:
+                if name not in order:
+                    order.append(name)
+            i += 1
+
+        index = CoverageIndex()
+        for unit in order:
+            base = len(index._parent)
+            for parent, condition, items in self.units[unit]:
+                node_id = index._new_node(base + parent if parent != -1 else -1, condition)
+                for item in items:
+                    index._add_item(item, node_id)
+        self.index = index
+
 
 def extract_referenced_items(node: dict, path: List[str] = None) -> Dict[str, List[List[str]]]:
     """
     Extract all items referenced in leaf nodes and their paths.
 
+    ``$ref`` nodes are not followed; each reference site is recorded under
+    the item ``'$ref:<name>'`` instead (see ``CoverageIndex.from_tree``).
+
     Args:
         node: Decision tree node
         path: Current path of conditions leading to this node
@@ -19,79 +287,56 @@ def extract_referenced_items(node: dict, path: List[str] = None) -> Dict[str, Li
     Returns:
         Dict mapping item names to list of paths (each path is list of conditions)
     """
-    if path is None:
-        path = []
-
-    items = {}
-
-    if 'question' in node:
-        for branch in node.get('branches', []):
-            condition = branch['condition']
-            child_path = path + [condition]
-            child_items = extract_referenced_items(branch['next'], child_path)
-
-            # Merge child items
-            for item, paths in child_items.items():
-                if item not in items:
-                    items[item] = []
-                items[item].extend(paths)
-
-    elif 'leaf' in node:
-        # Simple leaf - extract item name from text
-        leaf_text = node['leaf']
-        items[leaf_text] = [path.copy()]
-
-    elif 'leaf-structured' in node:
-        # Structured leaf - extract project names
-        ls = node['leaf-structured']
-        for project in ls.get('projects', []):
-            if project not in items:
-                items[project] = []
-            items[project].append(path.copy())
+    return CoverageIndex.from_node(node, path).to_dict()
 
-        # Also track the recommendation text
-        rec = ls.get('recommendation', '')
-        if rec:
-            if rec not in items:
-                items[rec] = []
-            items[rec].append(path.copy())
-
-    return items
 
-
-def find_paths_to_item(tree_data: dict, item: str) -> List[List[str]]:
+def find_paths_to_item(
+    tree_data: dict,
+    item: str,
+    index: CoverageIndex = None
+) -> List[List[str]]:
     """
     Find all paths in the decision tree that lead to a specific item.
 
     Args:
         tree_data: Tree dict with 'tree' key
         item: Item name to search for (project name, recommendation text, etc.)
+        index: Prebuilt CoverageIndex for tree_data (built if omitted)
 
     Returns:
         List of paths, where each path is a list of condition strings
     """
-    root = tree_data['tree']['root']
-    all_items = extract_referenced_items(root)
+    if index is None:
+        index = CoverageIndex.from_tree(tree_data)
 
-    # Exact match
-    if item in all_items:
-        return all_items[item]
+    # Exact match (including '$ref:<name>' reference sites)
+    if item in index:
+        return index.paths(item)
 
-    # Partial match (item contained in key)
-    for key, paths in all_items.items():
-        if item in key or key in item:
-            return paths
+    # Canonical project key, then whole-name partial match
+    tree_item = index.match([item]).get(item)
+    if tree_item is not None:
+        return index.paths(tree_item)
 
     return []
 
 
-def check_coverage(tree_data: dict, required_items: List[str]) -> Dict[str, any]:
+def check_coverage(
+    tree_data: dict,
+    required_items: List[str],
+    index: CoverageIndex = None
+) -> Dict[str, any]:
     """
     Check which required items are covered by the decision tree.
 
+    Items match exactly, by canonical ``owner/repo`` key, or as a whole
+    name inside a tree item (see ``CoverageIndex.match``); the cost is
+    linear in the number of required items plus the tree text.
+
     Args:
         tree_data: Tree dict with 'tree' key
         required_items: List of item names that should be reachable
+        index: Prebuilt CoverageIndex for tree_data (built if omitted)
 
     Returns:
         Dict with:
@@ -99,29 +344,20 @@ def check_coverage(tree_data: dict, required_items: List[str]) -> Dict[str, any]
             'missing': List[item] - items not found in tree
             'tree_items': Set[str] - all items referenced in tree
     """
-    root = tree_data['tree']['root']
-    tree_items_dict = extract_referenced_items(root)
-    tree_items = set(tree_items_dict.keys())
+    if index is None:
+        index = CoverageIndex.from_tree(tree_data)
+    tree_items = index.tree_items()
+    matched = index.match(required_items)
 
     covered = {}
     missing = []
 
     for item in required_items:
-        # Try exact match first
-        if item in tree_items_dict:
-            covered[item] = tree_items_dict[item]
-            continue
-
-        # Try partial match (item as substring)
-        found = False
-        for tree_item, paths in tree_items_dict.items():
-            if item in tree_item or tree_item in item:
-                covered[item] = paths
-                found = True
-                break
-
-        if not found:
+        tree_item = matched.get(item)
+        if tree_item is None:
             missing.append(item)
+        else:
+            covered[item] = index.paths(tree_item)
 
     return {
         'covered': covered,
@@ -141,7 +377,8 @@ def format_path(path: List[str], separator: str = ' → ') -> str:
 def generate_coverage_report(
     tree_data: dict,
     required_items: List[str],
-    verbose: bool = False
+    verbose: bool = False,
+    index: CoverageIndex = None
 ) -> Tuple[List[str], bool]:
     """
     Generate a coverage report with warning lines.
@@ -150,11 +387,12 @@ def generate_coverage_report(
         tree_data: Tree dict with 'tree' key
         required_items: List of item names that should be reachable
         verbose: If True, also report covered items
+        index: Prebuilt CoverageIndex for tree_data (built if omitted)
 
     Returns:
         Tuple of (list of report lines, all_covered bool)
     """
-    result = check_coverage(tree_data, required_items)
+    result = check_coverage(tree_data, required_items, index=index)
     lines = []
 
     if result['missing']:
@@ -176,15 +414,15 @@ def generate_coverage_report(
     return lines, all_covered
 
 
-def get_all_tree_items(tree_data: dict) -> Set[str]:
+def get_all_tree_items(tree_data: dict, index: CoverageIndex = None) -> Set[str]:
     """Get all items (projects, recommendations) referenced in the tree."""
-    root = tree_data['tree']['root']
-    items_dict = extract_referenced_items(root)
-    return set(items_dict.keys())
+    if index is None:
+        index = CoverageIndex.from_tree(tree_data)
+    return set(index.tree_items())
 
 
-def get_all_tree_projects(tree_data: dict) -> Set[str]:
+def get_all_tree_projects(tree_data: dict, index: CoverageIndex = None) -> Set[str]:
     """Get all project names (org/repo format) referenced in the tree."""
-    all_items = get_all_tree_items(tree_data)
+    all_items = get_all_tree_items(tree_data, index=index)
     # Filter to items that look like project names (contain /)
     return {item for item in all_items if '/' in item}
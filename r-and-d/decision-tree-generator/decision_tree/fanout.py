@@ -0,0 +1,112 @@
+"""
+Render one tree to several formats in a single walk.
+
+Each ``render_*`` function walks the tree on its own, so producing Mermaid,
+Graphviz, HTML and a coverage index costs one traversal per format.
+``fan_out`` walks the tree once and hands every node to a list of emitters,
+each writing its own output:
+
+    from decision_tree import fan_out, MermaidEmitter, HtmlEmitter, CoverageCollector
+
+    coverage = CoverageCollector()
+    with open('tree.mmd', 'w') as mmd, open('tree.html', 'w') as html:
+        fan_out(tree, [MermaidEmitter(mmd), HtmlEmitter(html, full_page=True), coverage])
+    coverage.index.paths('org/project')
+
+Every emitter's output is byte-identical to its standalone renderer.
+
+``$ref`` subtrees are walked at every reference site (some outputs inline
+them each time); emitters that draw a shared subtree only once decline the
+later visits, and the walk skips any subtree no emitter wants.
+"""
+
+from typing import Iterable, Optional
+
+from .loader import REF_KEY, child_path, get_definitions, ref_path
+
+
+class Visit:
+    """Where the walk reached a node."""
+
+    __slots__ = ('path', 'depth', 'index', 'condition', 'is_last', 'ref', 'parent')
+
+    def __init__(self, path: list, depth: int = 0, index: int = -1,
+                 condition: Optional[str] = None, is_last: bool = True,
+                 ref: Optional[str] = None, parent: 'Visit' = None):
+        self.path = path              # render path (``ref_path`` for $ref nodes)
+        self.depth = depth            # branches from the root
+        self.index = index            # branch index in the parent (-1 for the root)
+        self.condition = condition    # incoming branch condition (None for the root)
+        self.is_last = is_last        # last branch of the parent
+        self.ref = ref                # $ref name, if reached through a $ref
+        self.parent = parent          # Visit of the parent question
+
+
+class Emitter:
+    """
+    Base class for ``fan_out`` consumers; every hook defaults to a no-op.
+
+    ``enter`` is called for every node offered to the emitter, with ``$ref``
+    nodes already resolved (``visit.ref`` holds the name). For a question,
+    returning True asks for its branches, followed by ``leave``; returning
+    False skips the subtree for this emitter only.
+    """
+
+    def start(self, tree_data: dict) -> None:
+        pass
+
+    def enter(self, node: dict, visit: Visit) -> bool:
+        return False
+
+    def leave(self, node: dict, visit: Visit) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+def fan_out(tree_data: dict, emitters: Iterable[Emitter]) -> None:
+    """
+    Walk ``tree_data`` once, depth-first, feeding every node to ``emitters``.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        emitters: Emitter instances; each gets ``start``, its ``enter`` and
+            ``leave`` calls in pre-order, then ``finish``
+    """
+    emitters = list(emitters)
+    definitions = get_definitions(tree_data)
+    root = tree_data['tree']['root']
+    for emitter in emitters:
+        emitter.start(tree_data)
+
+    root_ref = root[REF_KEY] if REF_KEY in root else None
+    root_path = ref_path(root_ref) if root_ref else []
+    stack = [(root, Visit(root_path, ref=root_ref), emitters, False)]
+    while stack:
+        node, visit, active, leaving = stack.pop()
+        if leaving:
+            for emitter in active:
+                emitter.leave(node, visit)
+            continue
+
+        if visit.ref is not None:
+            node = definitions[visit.ref]
+        wanted = [emitter for emitter in active if emitter.enter(node, visit)]
+        if not wanted or 'question' not in node:
+            continue
+
+        stack.append((node, visit, wanted, True))
+        branches = node.get('branches', [])
+        last = len(branches) - 1
+        for i in range(last, -1, -1):
+            child = branches[i]['next']
+            child_visit = Visit(
+                child_path(visit.path, i, child), visit.depth + 1, i,
+                branches[i]['condition'], i == last,
+                child[REF_KEY] if REF_KEY in child else None, visit,
+            )
+            stack.append((child, child_visit, wanted, False))
+
+    for emitter in emitters:
+        emitter.finish()
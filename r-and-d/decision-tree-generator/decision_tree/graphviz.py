@@ -2,7 +2,15 @@
 Graphviz DOT renderer for decision trees.
 """
 
-from .loader import generate_node_id
+from typing import TextIO
+
+from .compact import QUESTION, compact_tree, diagram_ids
+from .fanout import Emitter, Visit
+from .loader import REF_KEY, child_path, get_definitions, ref_path
+from .streams import LineWriter, NullSink, render_to_string
+
+# Ids that DOT reads as keywords (case-insensitively) unless quoted
+DOT_KEYWORDS = {'digraph', 'edge', 'graph', 'node', 'strict', 'subgraph'}
 
 
 def escape_dot(text: str) -> str:
@@ -22,6 +30,11 @@ def truncate(text: str, max_len: int = 40) -> str:
 
 def wrap_text(text: str, width: int = 30) -> str:
     """Wrap text at word boundaries."""
+    return '\\n'.join(wrap_lines(text, width))
+
+
+def wrap_lines(text: str, width: int = 30) -> list:
+    """Split text into lines of about ``width`` characters at word boundaries."""
     words = text.split()
     lines = []
     current_line = []
@@ -39,72 +52,191 @@ def wrap_text(text: str, width: int = 30) -> str:
     if current_line:
         lines.append(' '.join(current_line))
 
-    return '\\n'.join(lines)
+    return lines
+
 
+def _dot_id(diagram_id: str) -> str:
+    """``diagram_id`` as a DOT id: quoted if it spells a keyword (``node``)."""
+    return f'"{diagram_id}"' if diagram_id.lower() in DOT_KEYWORDS else diagram_id
 
-def _render_node(node: dict, tree_id: str, path: list, nodes: list, edges: list) -> None:
-    """Recursively render a node and its children."""
-    node_id = generate_node_id(tree_id, path, sep='_')
-    # Use shorter IDs for graphviz
-    short_id = f"n_{'_'.join(map(str, path))}" if path else "n_root"
 
+def _short_id(path: list) -> str:
+    """Graphviz node id (shorter than ``generate_node_id``)."""
+    return f"n_{'_'.join(map(str, path))}" if path else "n_root"
+
+
+def _node_line(short_id: str, node: dict) -> str:
     if 'question' in node:
         question = escape_dot(wrap_text(node['question'], 25))
-        nodes.append(f'    {short_id} [label="{question}" shape=box];')
+        return f'    {short_id} [label="{question}" shape=box];'
+    if 'leaf' in node:
+        label = escape_dot(wrap_text(node['leaf'], 30))
+    else:
+        label = escape_dot(wrap_text(node['leaf-structured']['recommendation'], 30))
+    return f'    {short_id} [label="{label}" shape=ellipse style=filled fillcolor=lightgreen];'
 
-        for i, branch in enumerate(node.get('branches', [])):
-            child_path = path + [i]
-            child_short = f"n_{'_'.join(map(str, child_path))}"
-            condition = escape_dot(truncate(branch['condition'], 20))
 
-            edges.append(f'    {short_id} -> {child_short} [label="{condition}"];')
-            _render_node(branch['next'], tree_id, child_path, nodes, edges)
+def _edge_line(short_id: str, condition: str, child_short: str) -> str:
+    return f'    {short_id} -> {child_short} [label="{escape_dot(truncate(condition, 20))}"];'
+
 
-    elif 'leaf' in node:
-        leaf = escape_dot(wrap_text(node['leaf'], 30))
-        nodes.append(f'    {short_id} [label="{leaf}" shape=ellipse style=filled fillcolor=lightgreen];')
+def _render_node(node: dict, tree_id: str, path: list, nodes: list, edges: list,
+                 definitions: dict = None, emitted: set = None) -> None:
+    """Recursively render a node and its children (shared subtrees once)."""
+    if REF_KEY in node:
+        name = node[REF_KEY]
+        if name in emitted:
+            return
+        emitted.add(name)
+        node, path = definitions[name], ref_path(name)
 
-    elif 'leaf-structured' in node:
-        rec = escape_dot(wrap_text(node['leaf-structured']['recommendation'], 30))
-        nodes.append(f'    {short_id} [label="{rec}" shape=ellipse style=filled fillcolor=lightgreen];')
+    short_id = _short_id(path)
+    nodes.append(_node_line(short_id, node))
 
+    if 'question' in node:
+        for i, branch in enumerate(node.get('branches', [])):
+            next_path = child_path(path, i, branch['next'])
+            edges.append(_edge_line(short_id, branch['condition'], _short_id(next_path)))
+            _render_node(branch['next'], tree_id, next_path, nodes, edges, definitions, emitted)
+
+
+def _render_compact(tree_data: dict, lines: list) -> None:
+    """Questions, then leaves (under hoisted leaf attributes), then edges."""
+    compact = compact_tree(tree_data)
+    strings = compact['s']
+    ids = [_dot_id(diagram_id) for diagram_id in diagram_ids(compact)]
+    drawn = set()
+    questions = []
+    leaves = []
+    for node_id, record in enumerate(compact['n']):
+        if ids[node_id] in drawn:
+            continue
+        drawn.add(ids[node_id])
+        if record[0] == QUESTION:
+            questions.append(f'    {ids[node_id]} [label="{escape_dot(wrap_text(strings[record[1]], 25))}"];')
+        else:
+            leaves.append(f'    {ids[node_id]} [label="{escape_dot(wrap_text(strings[record[1]], 30))}"];')
+
+    lines.extend(questions)
+    if leaves:
+        # Defaults apply to the nodes declared after them
+        lines.append('    node [shape=ellipse style=filled fillcolor=lightgreen];')
+        lines.extend(leaves)
+    lines.append('')
+    for node_id, record in enumerate(compact['n']):
+        if record[0] == QUESTION:
+            branches = record[2]
+            for i in range(0, len(branches), 2):
+                lines.append(_edge_line(ids[node_id], strings[branches[i]], ids[branches[i + 1]]))
 
-def render_graphviz(tree_data: dict, rankdir: str = 'TB') -> str:
+
+def _header(tree: dict, rankdir: str, node_attrs: str = '') -> list:
+    tree_id = tree['id'].replace('-', '_')
+    title = escape_dot(tree.get('title', 'Decision Tree'))
+    return [
+        f'// Decision Tree: {title}',
+        f'// Generated from: {tree_id}',
+        '',
+        'digraph G {',
+        f'    rankdir={rankdir};',
+        f'    node [fontname="Helvetica" fontsize=10{node_attrs}];',
+        '    edge [fontname="Helvetica" fontsize=9];',
+        '',
+    ]
+
+
+def render_graphviz(tree_data: dict, rankdir: str = 'TB', compact: bool = False) -> str:
     """
     Render decision tree to Graphviz DOT format.
 
     Args:
         tree_data: Tree dict with 'tree' key
         rankdir: Graph direction - TB (top-bottom), LR (left-right), etc.
+        compact: Smaller output: leaves with the same text drawn once, short
+            base-36 node ids, shared styling as node defaults (see
+            ``render_graphviz_to``)
 
     Returns:
         DOT format string
     """
-    tree = tree_data['tree']
-    tree_id = tree['id'].replace('-', '_')
-    title = escape_dot(tree.get('title', 'Decision Tree'))
+    return render_to_string(render_graphviz_to, tree_data, rankdir, compact)
 
-    lines = []
-    nodes = []
-    edges = []
 
-    lines.append(f'// Decision Tree: {title}')
-    lines.append(f'// Generated from: {tree_id}')
-    lines.append('')
-    lines.append('digraph G {')
-    lines.append(f'    rankdir={rankdir};')
-    lines.append('    node [fontname="Helvetica" fontsize=10];')
-    lines.append('    edge [fontname="Helvetica" fontsize=9];')
-    lines.append('')
+def render_graphviz_to(stream: TextIO, tree_data: dict, rankdir: str = 'TB',
+                       compact: bool = False) -> None:
+    """
+    Render decision tree to Graphviz DOT, writing lines to a text stream.
 
-    _render_node(tree['root'], tree_id, [], nodes, edges)
+    Nodes are listed before edges, so the tree is walked twice (once per
+    section) rather than buffering either list.
 
+    Args:
+        stream: Writable text stream (file, sys.stdout, StringIO, ...)
+        tree_data: Tree dict with 'tree' key
+        rankdir: Graph direction - TB (top-bottom), LR (left-right), etc.
+        compact: Draw leaves with the same text as one node with several
+            incoming edges, use ``n<base 36>`` ids in node order, and set
+            question and leaf shapes once as node defaults instead of on
+            every node
+    """
+    tree = tree_data['tree']
+    tree_id = tree['id'].replace('-', '_')
+    definitions = get_definitions(tree_data)
+
+    lines = LineWriter(stream)
+    if compact:
+        lines.extend(_header(tree, rankdir, ' shape=box'))
+        _render_compact(tree_data, lines)
+        lines.append('}')
+        return
+    lines.extend(_header(tree, rankdir))
     lines.append('    // Nodes')
-    lines.extend(nodes)
+    _render_node(tree['root'], tree_id, [], lines, NullSink(), definitions, set())
     lines.append('')
     lines.append('    // Edges')
-    lines.extend(edges)
+    _render_node(tree['root'], tree_id, [], NullSink(), lines, definitions, set())
     lines.append('}')
-    lines.append('')
 
-    return '\n'.join(lines)
+
+class GraphvizEmitter(Emitter):
+    """
+    ``fan_out`` emitter writing the same output as ``render_graphviz_to``.
+
+    Node lines are written as they are reached; edge lines, which DOT output
+    lists after all nodes, are buffered until the walk ends.
+    """
+
+    def __init__(self, stream: TextIO, rankdir: str = 'TB'):
+        self.stream = stream
+        self.rankdir = rankdir
+
+    def start(self, tree_data: dict) -> None:
+        self.lines = LineWriter(self.stream)
+        self.lines.extend(_header(tree_data['tree'], self.rankdir))
+        self.lines.append('    // Nodes')
+        self.edges = []
+        self.emitted = set()
+        self.ids = []               # ids of the entered questions, innermost last
+
+    def enter(self, node: dict, visit: Visit) -> bool:
+        short_id = _short_id(visit.path)
+        if visit.parent is not None:
+            self.edges.append(_edge_line(self.ids[-1], visit.condition, short_id))
+        if visit.ref is not None:
+            if visit.ref in self.emitted:
+                return False
+            self.emitted.add(visit.ref)
+        self.lines.append(_node_line(short_id, node))
+        if 'question' not in node:
+            return False
+        self.ids.append(short_id)
+        return True
+
+    def leave(self, node: dict, visit: Visit) -> None:
+        self.ids.pop()
+
+    def finish(self) -> None:
+        self.lines.append('')
+        self.lines.append('    // Edges')
+        self.lines.extend(self.edges)
+        self.lines.append('}')
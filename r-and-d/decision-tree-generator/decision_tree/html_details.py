@@ -3,73 +3,127 @@ HTML <details>/<summary> renderer for decision trees.
 """
 
 from html import escape as html_escape
+from typing import TextIO
 
+from .cache import FragmentCache, FragmentMemo, make_memo
+from .fanout import Emitter, Visit
+from .loader import REF_KEY, get_definitions
+from .streams import LineWriter, render_to_string
 
-def _render_node(node: dict, indent: int = 0, is_root: bool = False) -> list:
-    """Recursively render a node to HTML lines."""
+
+# Clones a shared subtree from its <template> the first time a $ref
+# placeholder is opened. 'toggle' does not bubble, so listen in capture phase;
+# names may hold quotes or brackets, so escape them for the selector.
+REF_EXPAND_SCRIPT = '''
+document.addEventListener('toggle', function (e) {
+  var d = e.target;
+  if (!d.open || !d.dataset || !d.dataset.ref || d.dataset.loaded) return;
+  var t = d.closest('.decision-tree').querySelector('template[data-ref-def="' + CSS.escape(d.dataset.ref) + '"]');
+  if (t) { d.appendChild(t.content.cloneNode(true)); d.dataset.loaded = '1'; }
+}, true);'''
+
+
+def _render_node(node: dict, lines, indent: int = 0, is_root: bool = False,
+                 definitions: dict = None, used: list = None, memo: FragmentMemo = None,
+                 ref_anchor: str = None) -> None:
+    """
+    Recursively render a node, appending HTML lines to ``lines``.
+
+    Branches into shared question subtrees become empty ``data-ref``
+    placeholders; the referenced names are appended to ``used`` so the caller
+    can emit each subtree once as a ``<template>``. With ``ref_anchor`` as
+    well, they become links to ``#<ref_anchor><name>`` instead, for script-free
+    output that renders each subtree once under that id. Without ``used``,
+    shared subtrees are rendered inline at every reference.
+
+    With ``memo``, question subtrees are spliced from the fragment cache when
+    their structural hash and indentation match an earlier render.
+    """
     prefix = '  ' * indent
-    lines = []
 
     if 'question' in node:
-        open_attr = ' open' if is_root else ''
-        lines.append(f'{prefix}<details{open_attr}>')
-        lines.append(f'{prefix}  <summary>{html_escape(node["question"])}</summary>')
+        if memo is None:
+            _render_question(node, lines, indent, is_root, definitions, used, memo, ref_anchor)
+            return
+        key, fragment = memo.lookup(node, indent, is_root, ref_anchor)
+        if fragment is None:
+            fragment = []
+            _render_question(node, lines if key is None else fragment, indent, is_root,
+                             definitions, used, memo, ref_anchor)
+            if key is None:
+                return
+            memo.store(key, fragment)
+        lines.extend(fragment)
 
-        for branch in node.get('branches', []):
-            condition = html_escape(branch['condition'])
+    else:
+        _render_leaf(node, lines, prefix)
 
-            if 'leaf' in branch['next']:
-                leaf = html_escape(branch['next']['leaf'])
-                lines.append(f'{prefix}  <p class="leaf"><strong>{condition}</strong> → {leaf}</p>')
 
-            elif 'leaf-structured' in branch['next']:
-                ls = branch['next']['leaf-structured']
-                rec = html_escape(ls['recommendation'])
-                lines.append(f'{prefix}  <div class="leaf-structured">')
-                lines.append(f'{prefix}    <p><strong>{condition}</strong> → {rec}</p>')
+def _render_leaf(node: dict, lines, prefix: str, condition: str = None) -> None:
+    """Render a leaf; ``condition`` (already escaped) labels a branch's answer."""
+    label = f'<strong>{condition}</strong> → ' if condition is not None else ''
 
-                if ls.get('projects'):
-                    lines.append(f'{prefix}    <ul class="projects">')
-                    for proj in ls['projects']:
-                        lines.append(f'{prefix}      <li>{html_escape(proj)}</li>')
-                    lines.append(f'{prefix}    </ul>')
+    if 'leaf' in node:
+        lines.append(f'{prefix}<p class="leaf">{label}{html_escape(node["leaf"])}</p>')
+        return
 
-                if ls.get('notes'):
-                    notes = html_escape(ls['notes'])
-                    lines.append(f'{prefix}    <p class="notes"><em>{notes}</em></p>')
+    ls = node['leaf-structured']
+    rec = html_escape(ls['recommendation'])
+    lines.append(f'{prefix}<div class="leaf-structured">')
+    lines.append(f'{prefix}  <p>{label}{rec}</p>')
 
-                lines.append(f'{prefix}  </div>')
+    if ls.get('projects'):
+        lines.append(f'{prefix}  <ul class="projects">')
+        for proj in ls['projects']:
+            lines.append(f'{prefix}    <li>{html_escape(proj)}</li>')
+        lines.append(f'{prefix}  </ul>')
 
-            else:
-                lines.append(f'{prefix}  <details>')
-                lines.append(f'{prefix}    <summary>{condition}</summary>')
-                child_lines = _render_node(branch['next'], indent + 2)
-                lines.extend(child_lines)
-                lines.append(f'{prefix}  </details>')
+    if ls.get('notes'):
+        lines.append(f'{prefix}  <p class="notes"><em>{html_escape(ls["notes"])}</em></p>')
+
+    lines.append(f'{prefix}</div>')
 
-        lines.append(f'{prefix}</details>')
 
-    elif 'leaf' in node:
-        lines.append(f'{prefix}<p class="leaf">{html_escape(node["leaf"])}</p>')
+def _render_question(node: dict, lines, indent: int, is_root: bool,
+                     definitions: dict, used: list, memo: FragmentMemo, ref_anchor: str = None) -> None:
+    """Render a question as <details>, with its branches (recursively)."""
+    prefix = '  ' * indent
+
+    open_attr = ' open' if is_root else ''
+    lines.append(f'{prefix}<details{open_attr}>')
+    lines.append(f'{prefix}  <summary>{html_escape(node["question"])}</summary>')
 
-    elif 'leaf-structured' in node:
-        ls = node['leaf-structured']
-        rec = html_escape(ls['recommendation'])
-        lines.append(f'{prefix}<div class="leaf-structured">')
-        lines.append(f'{prefix}  <p>{rec}</p>')
+    for branch in node.get('branches', []):
+        condition = html_escape(branch['condition'])
+        next_node = branch['next']
 
-        if ls.get('projects'):
-            lines.append(f'{prefix}  <ul class="projects">')
-            for proj in ls['projects']:
-                lines.append(f'{prefix}    <li>{html_escape(proj)}</li>')
-            lines.append(f'{prefix}  </ul>')
+        if REF_KEY in next_node:
+            name = next_node[REF_KEY]
+            next_node = definitions[name]
+            if 'question' in next_node and used is not None:
+                if name not in used:
+                    used.append(name)
+                if ref_anchor is not None:
+                    lines.append(f'{prefix}  <p class="ref"><strong>{condition}</strong> → '
+                                 f'<a href="#{html_escape(ref_anchor + name)}">'
+                                 f'{html_escape(next_node["question"])}</a></p>')
+                    continue
+                lines.append(f'{prefix}  <details data-ref="{html_escape(name)}">')
+                lines.append(f'{prefix}    <summary>{condition}</summary>')
+                lines.append(f'{prefix}  </details>')
+                continue
 
-        if ls.get('notes'):
-            lines.append(f'{prefix}  <p class="notes"><em>{html_escape(ls["notes"])}</em></p>')
+        if 'question' not in next_node:
+            _render_leaf(next_node, lines, prefix + '  ', condition)
 
-        lines.append(f'{prefix}</div>')
+        else:
+            lines.append(f'{prefix}  <details>')
+            lines.append(f'{prefix}    <summary>{condition}</summary>')
+            _render_node(next_node, lines, indent + 2, definitions=definitions, used=used, memo=memo,
+                         ref_anchor=ref_anchor)
+            lines.append(f'{prefix}  </details>')
 
-    return lines
+    lines.append(f'{prefix}</details>')
 
 
 DEFAULT_CSS = '''
@@ -117,7 +171,8 @@ DEFAULT_CSS = '''
 }'''
 
 
-def render_html(tree_data: dict, full_page: bool = False, css: str = None) -> str:
+def render_html(tree_data: dict, full_page: bool = False, css: str = None,
+                footer_html: str = '', cache: FragmentCache = None) -> str:
     """
     Render decision tree to HTML with <details>/<summary> elements.
 
@@ -125,32 +180,70 @@ def render_html(tree_data: dict, full_page: bool = False, css: str = None) -> st
         tree_data: Tree dict with 'tree' key
         full_page: If True, generate full HTML page with styling
         css: Custom CSS (only used with full_page=True)
+        footer_html: Markup inserted before </body> (only used with full_page=True)
+        cache: Optional FragmentCache; unchanged subtrees are reused from it
 
     Returns:
         HTML string
     """
+    return render_to_string(render_html_to, tree_data, full_page, css, footer_html, cache)
+
+
+def render_html_to(stream: TextIO, tree_data: dict, full_page: bool = False,
+                   css: str = None, footer_html: str = '', cache: FragmentCache = None) -> None:
+    """
+    Render decision tree to HTML, writing to a text stream as it goes.
+
+    Args:
+        stream: Writable text stream (file, sys.stdout, StringIO, ...)
+        tree_data: Tree dict with 'tree' key
+        full_page: If True, generate full HTML page with styling
+        css: Custom CSS (only used with full_page=True)
+        footer_html: Markup inserted before </body> (only used with full_page=True)
+        cache: Optional FragmentCache; unchanged subtrees are reused from it
+    """
     tree = tree_data['tree']
     title = html_escape(tree.get('title', 'Decision Tree'))
     tree_id = tree['id']
 
-    lines = []
+    if full_page:
+        write_page_head(stream, title, css)
+
+    lines = LineWriter(stream)
     lines.append(f'<!-- Decision Tree: {title} -->')
     lines.append(f'<section class="decision-tree" id="{tree_id}" aria-label="{title}">')
 
-    node_lines = _render_node(tree['root'], indent=1, is_root=True)
-    lines.extend(node_lines)
+    definitions = get_definitions(tree_data)
+    root = tree['root']
+    if REF_KEY in root:
+        root = definitions[root[REF_KEY]]
+
+    used = []
+    memo = make_memo(cache, 'html', __file__, tree_data)
+    _render_node(root, lines, indent=1, is_root=True, definitions=definitions, used=used, memo=memo)
+
+    # Shared subtrees: each rendered once, expanded on first open.
+    # Templates may reference further definitions, which extend `used`.
+    i = 0
+    while i < len(used):
+        name = used[i]
+        lines.append(f'  <template data-ref-def="{html_escape(name)}">')
+        _render_node(definitions[name], lines, indent=2, definitions=definitions, used=used, memo=memo)
+        lines.append('  </template>')
+        i += 1
+    if used:
+        lines.append(f'  <script>{REF_EXPAND_SCRIPT}\n  </script>')
 
     lines.append('</section>')
-    lines.append('')
 
-    fragment = '\n'.join(lines)
+    if full_page:
+        write_page_foot(stream, footer_html)
 
-    if not full_page:
-        return fragment
 
+def write_page_head(stream: TextIO, title: str, css: str = None) -> None:
+    """Write the full-page preamble up to ``<body>`` (``title`` already escaped)."""
     used_css = css or DEFAULT_CSS
-
-    return f'''<!DOCTYPE html>
+    stream.write(f'''<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="utf-8">
@@ -161,7 +254,113 @@ def render_html(tree_data: dict, full_page: bool = False, css: str = None) -> st
 </head>
 <body>
   <h1>{title}</h1>
-{fragment}
-</body>
+''')
+
+
+def write_page_foot(stream: TextIO, footer_html: str = '') -> None:
+    """Write ``footer_html`` and close the page opened by ``write_page_head``."""
+    stream.write(f'''
+{footer_html}</body>
 </html>
-'''
+''')
+
+
+class HtmlEmitter(Emitter):
+    """
+    ``fan_out`` emitter writing the same output as ``render_html_to``.
+
+    The main tree is written as it is walked. Shared subtrees are rendered
+    into buffers on their first reference and written as ``<template>``
+    elements once the walk ends.
+    """
+
+    def __init__(self, stream: TextIO, full_page: bool = False, css: str = None,
+                 footer_html: str = ''):
+        self.stream = stream
+        self.full_page = full_page
+        self.css = css
+        self.footer_html = footer_html
+
+    def start(self, tree_data: dict) -> None:
+        tree = tree_data['tree']
+        title = html_escape(tree.get('title', 'Decision Tree'))
+        tree_id = tree['id']
+        if self.full_page:
+            write_page_head(self.stream, title, self.css)
+        self.lines = LineWriter(self.stream)
+        self.lines.append(f'<!-- Decision Tree: {title} -->')
+        self.lines.append(f'<section class="decision-tree" id="{tree_id}" aria-label="{title}">')
+        self.frames = []            # (lines, indent, wrapped, template name) per open question
+        self.templates = {}         # definition name -> rendered lines
+        self.refs = {None: []}      # template name (None: main tree) -> $refs met, in order
+
+    def _open(self, node: dict, lines, indent: int, is_root: bool, wrapped: bool, unit) -> None:
+        prefix = '  ' * indent
+        open_attr = ' open' if is_root else ''
+        lines.append(f'{prefix}<details{open_attr}>')
+        lines.append(f'{prefix}  <summary>{html_escape(node["question"])}</summary>')
+        self.frames.append((lines, indent, wrapped, unit))
+
+    def enter(self, node: dict, visit: Visit) -> bool:
+        if visit.parent is None:
+            if 'question' not in node:
+                _render_leaf(node, self.lines, '  ')
+                return False
+            self._open(node, self.lines, 1, True, False, None)
+            return True
+
+        lines, indent, _, unit = self.frames[-1]
+        prefix = '  ' * indent
+        condition = html_escape(visit.condition)
+        if 'question' not in node:
+            _render_leaf(node, lines, prefix + '  ', condition)
+            return False
+
+        if visit.ref is not None:
+            name = visit.ref
+            self.refs[unit].append(name)
+            lines.append(f'{prefix}  <details data-ref="{html_escape(name)}">')
+            lines.append(f'{prefix}    <summary>{condition}</summary>')
+            lines.append(f'{prefix}  </details>')
+            if name in self.templates:
+                return False
+            self.templates[name] = []
+            self.refs[name] = []
+            self._open(node, self.templates[name], 2, False, False, name)
+            return True
+
+        lines.append(f'{prefix}  <details>')
+        lines.append(f'{prefix}    <summary>{condition}</summary>')
+        self._open(node, lines, indent + 2, False, True, unit)
+        return True
+
+    def leave(self, node: dict, visit: Visit) -> None:
+        lines, indent, wrapped, _ = self.frames.pop()
+        lines.append(f"{'  ' * indent}</details>")
+        if wrapped:
+            lines.append(f"{'  ' * (indent - 2)}  </details>")
+
+    def finish(self) -> None:
+        # Same template order as render_html_to: main-tree references first,
+        # then those first met inside earlier templates
+        used = []
+        for name in self.refs[None]:
+            if name not in used:
+                used.append(name)
+        i = 0
+        while i < len(used):
+            for name in self.refs[used[i]]:
+                if name not in used:
+                    used.append(name)
+            i += 1
+
+        for name in used:
+            self.lines.append(f'  <template data-ref-def="{html_escape(name)}">')
+            self.lines.extend(self.templates[name])
+            self.lines.append('  </template>')
+        if used:
+            self.lines.append(f'  <script>{REF_EXPAND_SCRIPT}\n  </script>')
+        self.lines.append('</section>')
+
+        if self.full_page:
+            write_page_foot(self.stream, self.footer_html)
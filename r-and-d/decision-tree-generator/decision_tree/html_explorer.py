@@ -0,0 +1,252 @@
+"""
+Lazy-loading HTML explorer for large decision trees.
+
+``render_html`` writes every node as ``<details>`` markup, so the browser
+parses and lays out the whole tree before the page is usable. The explorer
+embeds the tree once as compact JSON (see ``compact.py``) and a small script
+builds the children of a ``<details>`` only when it is first opened; the
+initial DOM is the root question alone, whatever the size of the tree.
+
+Without JavaScript, the ``<noscript>`` block shows the static tree, with
+each shared (``$ref``) subtree written once and linked from its references.
+
+With ``search=True`` a precomputed inverted index (see ``search.py``) is
+embedded too, and a search box opens and highlights the matching paths.
+"""
+
+from html import escape as html_escape
+from typing import TextIO
+
+from .compact import compact_json, compact_tree
+from .html_details import DEFAULT_CSS, _render_node, write_page_foot, write_page_head
+from .loader import REF_KEY, get_definitions
+from .search import build_search_index
+from .streams import LineWriter, render_to_string
+
+
+# Builds nodes from the embedded JSON on demand. A branch into a question is
+# a closed <details data-b=id>; opening it creates the question's
+# <details data-n=id>, and opening that creates its branches. 'toggle' does
+# not bubble, so listen in capture phase.
+_EXPLORER_JS = '''
+(function () {
+  var root = document.currentScript.closest('.decision-tree');
+  var data = JSON.parse(root.querySelector('script.dt-data').textContent);
+  var S = data.s, N = data.n;
+  function el(tag, cls, text) {
+    var e = document.createElement(tag);
+    if (cls) e.className = cls;
+    if (text != null) e.textContent = text;
+    return e;
+  }
+  function labelled(p, cond, text) {
+    if (cond != null) { p.appendChild(el('strong', null, cond)); p.appendChild(document.createTextNode(' \\u2192 ')); }
+    p.appendChild(document.createTextNode(text));
+    return p;
+  }
+  function leaf(node, cond) {
+    if (node[0] === 1) return labelled(el('p', 'leaf'), cond, S[node[1]]);
+    var div = el('div', 'leaf-structured');
+    div.appendChild(labelled(el('p'), cond, S[node[1]]));
+    if (node[2].length) {
+      var ul = el('ul', 'projects');
+      node[2].forEach(function (s) { ul.appendChild(el('li', null, S[s])); });
+      div.appendChild(ul);
+    }
+    if (node[3] >= 0) div.appendChild(el('p', 'notes')).appendChild(el('em', null, S[node[3]]));
+    return div;
+  }
+  function question(id) {
+    var d = el('details');
+    d.dataset.n = id;
+    d.appendChild(el('summary', null, S[N[id][1]]));
+    return d;
+  }
+  function fill(d) {
+    if (d.dataset.loaded) return;
+    d.dataset.loaded = '1';
+    if (d.dataset.b) { d.appendChild(question(+d.dataset.b)); return; }
+    var kids = N[d.dataset.n][2];
+    for (var i = 0; i < kids.length; i += 2) {
+      var cond = S[kids[i]], child = N[kids[i + 1]];
+      if (child[0] !== 0) { d.appendChild(leaf(child, cond)).dataset.id = kids[i + 1]; continue; }
+      var b = el('details');
+      b.dataset.b = kids[i + 1];
+      b.appendChild(el('summary', null, cond));
+      d.appendChild(b);
+    }
+  }
+  root.addEventListener('toggle', function (e) {
+    var d = e.target;
+    if (d.open && d.dataset && (d.dataset.n || d.dataset.b)) fill(d);
+  }, true);
+  var top = N[data.r][0] === 0 ? question(data.r) : leaf(N[data.r]);
+  if (top.tagName === 'DETAILS') { top.open = true; fill(top); }
+  root.querySelector('.dt-root').appendChild(top);'''
+
+# Answers queries from the embedded index: a full project name ('org/repo')
+# as is, otherwise every query token (the last one as a prefix, via binary search over the sorted
+# keys) must hit the node. Ancestors of the hits are found through parent
+# links, then only those paths are opened and the hits highlighted.
+_SEARCH_JS = '''
+  var X = JSON.parse(root.querySelector('script.dt-index').textContent);
+  var input = root.querySelector('.dt-search'), status = root.querySelector('.dt-search-status');
+  var parents = null, marked = [], MAX_REVEAL = 100;
+  function lookup(token, prefix) {
+    var lo = 0, hi = X.k.length;
+    while (lo < hi) { var mid = (lo + hi) >> 1; if (X.k[mid] < token) lo = mid + 1; else hi = mid; }
+    var ids = {};
+    for (var i = lo; i < X.k.length && (X.k[i] === token || (prefix && X.k[i].lastIndexOf(token, 0) === 0)); i++) {
+      X.v[i].forEach(function (id) { ids[id] = true; });
+    }
+    return ids;
+  }
+  function search(q) {
+    q = q.trim().toLowerCase();
+    if (q.indexOf('/') >= 0) {
+      var exact = lookup(q, false);
+      if (Object.keys(exact).length) return exact;
+    }
+    var tokens = q.match(/[0-9a-z]+/g) || [], hits = null;
+    tokens.forEach(function (t, i) {
+      var ids = lookup(t, i === tokens.length - 1);
+      if (hits === null) { hits = ids; return; }
+      Object.keys(hits).forEach(function (id) { if (!ids[id]) delete hits[id]; });
+    });
+    return hits || {};
+  }
+  function mark(e) { e.classList.add('dt-hit'); marked.push(e); }
+  function reveal(d, want, hits) {
+    d.open = true;
+    fill(d);
+    for (var i = 1; i < d.children.length; i++) {
+      var c = d.children[i], id = +(c.dataset.b || c.dataset.id);
+      if (hits[id]) mark(c);
+      if (c.dataset.b && want[id]) { c.open = true; fill(c); reveal(c.children[1], want, hits); }
+    }
+  }
+  input.addEventListener('input', function () {
+    marked.forEach(function (e) { e.classList.remove('dt-hit'); });
+    marked = [];
+    if (!input.value.trim()) { status.textContent = ''; return; }
+    var hits = search(input.value), ids = Object.keys(hits).slice(0, MAX_REVEAL);
+    status.textContent = Object.keys(hits).length ? Object.keys(hits).length + ' matching nodes' : 'No matches';
+    if (!parents) {
+      parents = {};
+      N.forEach(function (node, id) {
+        if (node[0] !== 0) return;
+        for (var i = 1; i < node[2].length; i += 2) (parents[node[2][i]] = parents[node[2][i]] || []).push(id);
+      });
+    }
+    var want = {}, shown = {}, queue = ids.map(Number);
+    ids.forEach(function (id) { shown[id] = true; });
+    while (queue.length) {
+      var id = queue.pop();
+      if (want[id]) continue;
+      want[id] = true;
+      (parents[id] || []).forEach(function (p) { queue.push(p); });
+    }
+    if (top.tagName !== 'DETAILS') { if (shown[data.r]) mark(top); return; }
+    if (shown[data.r]) mark(top.children[0]);
+    reveal(top, want, shown);
+  });'''
+
+_EXPLORER_END = '''
+})();'''
+
+EXPLORER_SCRIPT = _EXPLORER_JS + _EXPLORER_END
+SEARCH_SCRIPT = _EXPLORER_JS + _SEARCH_JS + _EXPLORER_END
+
+SEARCH_CSS = '''
+.decision-tree .dt-search {
+  width: 100%;
+  padding: 0.5rem;
+  font-size: 1rem;
+  box-sizing: border-box;
+}
+.decision-tree details.dt-hit > summary,
+.decision-tree .leaf.dt-hit,
+.decision-tree .leaf-structured.dt-hit {
+  outline: 2px solid #ff9800;
+  background: #fff3e0;
+}'''
+
+
+def render_html_explorer(tree_data: dict, full_page: bool = False, css: str = None,
+                         footer_html: str = '', search: bool = False) -> str:
+    """
+    Render decision tree as a lazy-loading HTML explorer.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        full_page: If True, generate full HTML page with styling
+        css: Custom CSS (only used with full_page=True)
+        footer_html: Markup inserted before </body> (only used with full_page=True)
+        search: If True, embed a search index and a search box
+
+    Returns:
+        HTML string
+    """
+    return render_to_string(render_html_explorer_to, tree_data, full_page, css, footer_html, search)
+
+
+def render_html_explorer_to(stream: TextIO, tree_data: dict, full_page: bool = False,
+                            css: str = None, footer_html: str = '', search: bool = False) -> None:
+    """
+    Render decision tree as a lazy-loading HTML explorer, writing to a stream.
+
+    Uses the same markup and CSS classes as ``render_html`` once nodes are
+    expanded, so custom stylesheets apply to both.
+
+    Args:
+        stream: Writable text stream (file, sys.stdout, StringIO, ...)
+        tree_data: Tree dict with 'tree' key
+        full_page: If True, generate full HTML page with styling
+        css: Custom CSS (only used with full_page=True)
+        footer_html: Markup inserted before </body> (only used with full_page=True)
+        search: If True, embed a search index and a search box
+    """
+    tree = tree_data['tree']
+    title = html_escape(tree.get('title', 'Decision Tree'))
+    tree_id = tree['id']
+    compact = compact_tree(tree_data)
+
+    if full_page:
+        write_page_head(stream, title, (css or DEFAULT_CSS) + SEARCH_CSS if search else css)
+
+    lines = LineWriter(stream)
+    lines.append(f'<!-- Decision Tree: {title} -->')
+    lines.append(f'<section class="decision-tree" id="{tree_id}" aria-label="{title}">')
+    lines.append(f'  <script type="application/json" class="dt-data">{compact_json(compact)}</script>')
+    if search:
+        lines.append(f'  <script type="application/json" class="dt-index">{compact_json(build_search_index(compact))}</script>')
+        lines.append('  <input type="search" class="dt-search" placeholder="Search questions, answers and projects"'
+                     ' aria-label="Search the decision tree">')
+        lines.append('  <p class="dt-search-status" aria-live="polite"></p>')
+    lines.append('  <div class="dt-root"></div>')
+
+    # Static fallback; templates need script, so each shared subtree is
+    # rendered once after the tree under an id its references link to
+    definitions = get_definitions(tree_data)
+    root = tree['root']
+    if REF_KEY in root:
+        root = definitions[root[REF_KEY]]
+    used = []
+    anchor = f'{tree_id}-ref-'
+    lines.append('  <noscript>')
+    _render_node(root, lines, indent=1, is_root=True, definitions=definitions, used=used, ref_anchor=anchor)
+    i = 0
+    while i < len(used):
+        name = used[i]
+        lines.append(f'  <div class="ref-def" id="{html_escape(anchor + name)}">')
+        _render_node(definitions[name], lines, indent=2, is_root=True, definitions=definitions,
+                     used=used, ref_anchor=anchor)
+        lines.append('  </div>')
+        i += 1
+    lines.append('  </noscript>')
+
+    lines.append(f'  <script>{SEARCH_SCRIPT if search else EXPLORER_SCRIPT}\n  </script>')
+    lines.append('</section>')
+
+    if full_page:
+        write_page_foot(stream, footer_html)
@@ -0,0 +1,243 @@
+"""
+Induce a decision tree from the facets of a project catalog.
+
+Boolean fields (``transports.sse``), free-form strings that are only
+present or absent (``installation.pip``) and small enumerations
+(``category``) under the chosen facet roots become yes/no tests. Each test
+is a bitset with one bit per project, and the split search at a node only
+ANDs and counts bits, ID3/CART style: the test with the best information
+gain (or Gini decrease) splits the node in two, until a depth or leaf-size
+limit is hit or nothing separates the remaining projects.
+
+    tree = induce_tree(load_projects(['projects/']), max_depth=4)
+
+The result is an ordinary tree (validated, renderable) whose branches
+carry ``when`` expressions, so ``Classifier`` routes every catalog project
+to the leaf listing it.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .classify import FIELD_KEY, _bits, _field
+
+# Facet roots used when none are given
+DEFAULT_FACETS = ('transports', 'authentication', 'category', 'installation')
+
+# Keys a ``when`` field path can name
+_KEY = re.compile(FIELD_KEY)
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(mask: int) -> int:
+        return bin(mask).count('1')
+
+
+def _quote(value: str) -> Optional[str]:
+    """Value as a ``when`` string literal (None if it cannot be quoted)."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return None
+
+
+def _scalars(value, path: str) -> Iterable[Tuple[str, object]]:
+    """``(dotted path, value)`` of the bool and string leaves below a field."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if _KEY.fullmatch(str(key)):
+                yield from _scalars(child, f'{path}.{key}')
+    elif isinstance(value, (bool, str)):
+        yield path, value
+
+
+def catalog_facets(projects: Dict[str, dict], roots: Iterable[str] = DEFAULT_FACETS,
+                   max_values: int = 32) -> List[Tuple[str, Optional[str], int]]:
+    """
+    Yes/no tests over the catalog, each with the bitset of projects passing it.
+
+    A string field whose values repeat across projects (at most
+    ``max_values`` of them) gives one test per value; any other string, and
+    every boolean, gives one truth test.
+
+    Args:
+        projects: ``{name: project fields}``; bit ``i`` is the ``i``-th project
+        roots: Top-level fields to take facets from
+        max_values: Most distinct values of a field treated as an enumeration
+
+    Returns:
+        ``(field path, value or None, mask)`` per test, sorted, without
+        tests every project passes or fails
+    """
+    booleans = {}
+    strings = {}
+    for i, project in enumerate(projects.values()):
+        for root in roots:
+            if root not in project:
+                continue
+            for path, value in _scalars(project[root], root):
+                if isinstance(value, bool):
+                    booleans[path] = booleans.get(path, 0) | (value << i)
+                elif value:
+                    values = strings.setdefault(path, {})
+                    values[value] = values.get(value, 0) | (1 << i)
+
+    facets = []
+    for path, values in strings.items():
+        if path in booleans:
+            # Mixed field: a truth test, like the ``when`` it becomes
+            for mask in values.values():
+                booleans[path] |= mask
+            continue
+        holders = sum(_popcount(mask) for mask in values.values())
+        if len(values) < holders and len(values) <= max_values:
+            facets.extend((path, value, mask) for value, mask in values.items() if _quote(value))
+        else:
+            present = 0
+            for mask in values.values():
+                present |= mask
+            facets.append((path, None, present))
+    facets.extend((path, None, mask) for path, mask in booleans.items())
+
+    everyone = (1 << len(projects)) - 1
+    return sorted(facet for facet in facets if 0 < facet[2] < everyone)
+
+
+def _impurity(counts: List[int], total: int, criterion: str) -> float:
+    if criterion == 'gini':
+        return 1.0 - sum(count * count for count in counts) / (total * total)
+    return -sum(count / total * math.log2(count / total) for count in counts if count)
+
+
+class _Inducer:
+    def __init__(self, projects: Dict[str, dict], facets: list, target: Optional[str],
+                 criterion: str, min_leaf: int):
+        self.names = list(projects)
+        self.facets = facets
+        self.criterion = criterion
+        self.min_leaf = min_leaf
+        self.target = target
+        # Class bitsets; without a target every project is a class of its own
+        self.classes = {}
+        if target is not None:
+            for i, project in enumerate(projects.values()):
+                label = str(_field(project, tuple(target.split('.'))))
+                self.classes[label] = self.classes.get(label, 0) | (1 << i)
+
+    def counts(self, mask: int) -> Dict[str, int]:
+        counts = {}
+        for label, members in self.classes.items():
+            count = _popcount(mask & members)
+            if count:
+                counts[label] = count
+        return counts
+
+    def impurity(self, mask: int, total: int) -> float:
+        if self.target is None:
+            # Identity classes: every project counts once
+            return math.log2(total) if self.criterion == 'entropy' else 1.0 - 1.0 / total
+        return _impurity(list(self.counts(mask).values()), total, self.criterion)
+
+    def best_split(self, mask: int) -> Optional[Tuple[float, tuple, int]]:
+        """Best ``(gain, facet, yes mask)`` at a node, or None."""
+        total = _popcount(mask)
+        parent = self.impurity(mask, total)
+        if parent <= 1e-12:
+            return None
+        best = None
+        for facet in self.facets:
+            yes = mask & facet[2]
+            yes_total = _popcount(yes)
+            no_total = total - yes_total
+            if yes_total < self.min_leaf or no_total < self.min_leaf:
+                continue
+            gain = parent - (yes_total * self.impurity(yes, yes_total)
+                             + no_total * self.impurity(mask & ~yes, no_total)) / total
+            if gain > 1e-12 and (best is None or gain > best[0] + 1e-12):
+                best = (gain, facet, yes)
+        return best
+
+    def leaf(self, mask: int) -> dict:
+        members = [self.names[i] for i in _bits(mask)]
+        if self.target is None:
+            recommendation = members[0] if len(members) == 1 else f'{len(members)} projects'
+            return {'leaf-structured': {'recommendation': recommendation, 'projects': members}}
+        counts = self.counts(mask)
+        label = max(sorted(counts), key=counts.get)
+        leaf = {'recommendation': f'{self.target}: {label}', 'projects': members}
+        if counts[label] < len(members):
+            leaf['notes'] = f'{counts[label]} of {len(members)} projects'
+        return {'leaf-structured': leaf}
+
+
+def _question(facet: tuple) -> Tuple[str, str, str]:
+    """Question text and the ``when`` of its yes and no branches."""
+    path, value, _ = facet
+    if value is None:
+        return f'{path}?', path, f'not {path}'
+    return f'{path} = {value}?', f'{path} == {_quote(value)}', f'{path} != {_quote(value)}'
+
+
+def induce_tree(projects: Dict[str, dict], facets: Iterable[str] = DEFAULT_FACETS,
+                target: Optional[str] = None, max_depth: Optional[int] = 6,
+                min_leaf: int = 1, criterion: str = 'entropy', tree_id: str = 'generated',
+                title: Optional[str] = None, generated_from: Optional[str] = None) -> dict:
+    """
+    Build a decision tree that splits a catalog on its facets.
+
+    Args:
+        projects: ``{name: project fields}``, e.g. from ``load_projects``
+        facets: Top-level fields to derive tests from (see ``catalog_facets``)
+        target: Field to predict (never split on); None separates projects
+            from each other
+        max_depth: Most questions on a path (None: no limit)
+        min_leaf: Fewest projects on either side of a split
+        criterion: 'entropy' (ID3 information gain) or 'gini' (CART)
+        tree_id: Tree id of the result
+        title: Tree title (default: derived from the target)
+        generated_from: ``metadata.generated-from`` value, e.g. "projects/*.yaml"
+
+    Returns:
+        Tree dict in the shape ``load_tree`` returns; leaves are
+        leaf-structured with the projects that reach them
+
+    Raises:
+        ValueError: For an empty catalog or an unknown criterion
+    """
+    if not projects:
+        raise ValueError("Cannot induce a tree from an empty catalog")
+    if criterion not in ('entropy', 'gini'):
+        raise ValueError(f"Unknown criterion '{criterion}' (choose from entropy, gini)")
+
+    tests = catalog_facets(projects, facets)
+    if target is not None:
+        # The target itself would answer every question
+        tests = [test for test in tests if test[0] != target and not test[0].startswith(target + '.')]
+    inducer = _Inducer(projects, tests, target, criterion, max(min_leaf, 1))
+    root = {}
+    stack = [(root, (1 << len(projects)) - 1, 0)]
+    while stack:
+        node, mask, depth = stack.pop()
+        split = None if max_depth is not None and depth >= max_depth else inducer.best_split(mask)
+        if split is None:
+            node.update(inducer.leaf(mask))
+            continue
+        _, facet, yes = split
+        question, when_yes, when_no = _question(facet)
+        yes_node, no_node = {}, {}
+        node['question'] = question
+        node['branches'] = [
+            {'condition': 'Yes', 'when': when_yes, 'next': yes_node},
+            {'condition': 'No', 'when': when_no, 'next': no_node},
+        ]
+        stack.append((no_node, mask & ~yes, depth + 1))
+        stack.append((yes_node, yes, depth + 1))
+
+    tree = {'id': tree_id, 'title': title or (f'Predict {target}' if target else 'Catalog by facets')}
+    if generated_from:
+        tree['metadata'] = {'generated-from': generated_from}
+    tree['root'] = root
+    return {'tree': tree}
@@ -0,0 +1,148 @@
+"""
+Tidy tree layout (Reingold-Tilford as improved by Walker and Buchheim et al.).
+
+Computes horizontal node centres in O(n): parents are centred over their
+children, subtrees are packed as closely as their contours allow, and
+identical subtrees are drawn identically. Nodes may have different widths;
+neighbours at the same depth are kept ``gap`` apart edge to edge.
+
+Both passes walk the tree with explicit stacks, so depth is not limited by
+the recursion limit.
+"""
+
+from typing import List
+
+
+def tidy_layout(children: List[List[int]], widths: List[float], gap: float = 20.0,
+                root: int = 0) -> List[float]:
+    """
+    Lay out a tree given as child lists.
+
+    Args:
+        children: ``children[v]`` lists the child indices of node ``v`` in order
+        widths: Width of each node
+        gap: Minimum horizontal space between neighbouring nodes
+        root: Index of the root node
+
+    Returns:
+        x coordinate of each node's centre (the root's leftmost subtree
+        edge is not normalized; callers shift the result as needed)
+    """
+    n = len(children)
+    parent = [-1] * n
+    number = [0] * n
+    for v in range(n):
+        for i, w in enumerate(children[v]):
+            parent[w] = v
+            number[w] = i
+
+    prelim = [0.0] * n
+    mod = [0.0] * n
+    change = [0.0] * n
+    shift = [0.0] * n
+    thread = [-1] * n
+    ancestor = list(range(n))
+    default_ancestor = [-1] * n   # per parent, while its children are placed
+
+    def sep(a: int, b: int) -> float:
+        return (widths[a] + widths[b]) / 2 + gap
+
+    def left_sibling(v: int) -> int:
+        return children[parent[v]][number[v] - 1] if number[v] > 0 else -1
+
+    def next_left(v: int) -> int:
+        return children[v][0] if children[v] else thread[v]
+
+    def next_right(v: int) -> int:
+        return children[v][-1] if children[v] else thread[v]
+
+    def move_subtree(wl: int, wr: int, amount: float) -> None:
+        subtrees = number[wr] - number[wl]
+        change[wr] -= amount / subtrees
+        shift[wr] += amount
+        change[wl] += amount / subtrees
+        prelim[wr] += amount
+        mod[wr] += amount
+
+    def apportion(v: int, default: int) -> int:
+        w = left_sibling(v)
+        if w == -1:
+            return default
+        vir = vor = v
+        vil = w
+        vol = children[parent[v]][0]
+        sir, sor, sil, sol = mod[vir], mod[vor], mod[vil], mod[vol]
+        while next_right(vil) != -1 and next_left(vir) != -1:
+            vil = next_right(vil)
+            vir = next_left(vir)
+            vol = next_left(vol)
+            vor = next_right(vor)
+            ancestor[vor] = v
+            amount = (prelim[vil] + sil) - (prelim[vir] + sir) + sep(vil, vir)
+            if amount > 0:
+                a = ancestor[vil]
+                if parent[a] != parent[v]:
+                    a = default
+                move_subtree(a, v, amount)
+                sir += amount
+                sor += amount
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) != -1 and next_right(vor) == -1:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        if next_left(vir) != -1 and next_left(vol) == -1:
+            thread[vol] = next_left(vir)
+            mod[vol] += sir - sol
+            default = v
+        return default
+
+    def execute_shifts(v: int) -> None:
+        total_shift = total_change = 0.0
+        for w in reversed(children[v]):
+            prelim[w] += total_shift
+            mod[w] += total_shift
+            total_change += change[w]
+            total_shift += shift[w] + total_change
+
+    # First walk: post-order, each child apportioned right after it is placed
+    stack = [(root, 0)]
+    while stack:
+        v, i = stack[-1]
+        if i < len(children[v]):
+            stack[-1] = (v, i + 1)
+            stack.append((children[v][i], 0))
+            continue
+        stack.pop()
+
+        kids = children[v]
+        w = left_sibling(v) if parent[v] != -1 else -1
+        if not kids:
+            prelim[v] = prelim[w] + sep(w, v) if w != -1 else 0.0
+        else:
+            execute_shifts(v)
+            midpoint = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+            if w != -1:
+                prelim[v] = prelim[w] + sep(w, v)
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+
+        p = parent[v]
+        if p != -1:
+            if number[v] == 0:
+                default_ancestor[p] = v
+            default_ancestor[p] = apportion(v, default_ancestor[p])
+
+    # Second walk: pre-order, accumulating modifiers into final positions
+    x = [0.0] * n
+    stack = [(root, 0.0)]
+    while stack:
+        v, m = stack.pop()
+        x[v] = prelim[v] + m
+        for w in children[v]:
+            stack.append((w, m + mod[v]))
+
+    return x
@@ -1,46 +1,311 @@
 """
 Decision tree YAML loader and validator.
+
+PyYAML is imported only when YAML is actually parsed; trees precompiled to
+JSON (``dt compile``) load with the standard library alone.
+
+A node may be ``{$include: path.yaml}``: the node stored in another YAML or
+JSON file, resolved relative to the including file. Included files may
+include further files (cycles are rejected) and are parsed once per content
+hash (``ParseCache``). With ``load_tree(..., lazy_includes=True)`` included
+files are read only when a traversal first touches their node.
 """
 
+import json
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
+
+# Key of a node that points at a named subtree in tree.definitions
+REF_KEY = '$ref'
+
+# Key of a node whose content is stored in another file
+INCLUDE_KEY = '$include'
+
+# Suffix of trees compiled to the memory-mapped binary format (binary.py)
+BINARY_SUFFIX = '.dtb'
+
+
+def _yaml():
+    """Import PyYAML on first use (it dominates startup time)."""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("PyYAML not installed. Run: pip install pyyaml") from None
+    return yaml
+
+
+def _parse(text: str, suffix: str):
+    """Parse file content as JSON (``.json``) or YAML."""
+    if suffix == '.json':
+        return json.loads(text)
+    return _yaml().safe_load(text)
+
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
+class ParseCache:
+    """
+    Parsed include files, keyed by a hash of their content.
+
+    A file included from several places, or by successive loads in one
+    process, is parsed once. Entries are kept pickled, so every lookup
+    returns fresh objects and loaded trees never share nodes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def parse(self, path: Path):
+        """Parse ``path`` (JSON or YAML by suffix), reusing an earlier parse of the same content."""
+        import hashlib
+        import pickle
 
+        content = path.read_bytes()
+        key = hashlib.sha256(path.suffix.encode() + b'\0' + content).hexdigest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return pickle.loads(entry)
 
-def load_tree(source: Union[str, Path, dict]) -> dict:
+        self.misses += 1
+        data = _parse(content.decode(), path.suffix)
+        self._entries[key] = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return data
+
+
+# Used by load_tree unless a ParseCache is passed in
+_parse_cache = ParseCache()
+
+
+def load_tree(source: Union[str, Path, dict], lazy_includes: bool = False,
+              parse_cache: ParseCache = None, includes: Optional[list] = None) -> dict:
     """
-    Load a decision tree from YAML file, string, or dict.
+    Load a decision tree from a YAML or JSON file, string, or dict.
+
+    Files ending in ``.json`` and strings starting with ``{`` are parsed as
+    JSON without importing PyYAML; ``.dtb`` files are memory-mapped binary
+    trees (see ``BinaryTree``, validated when compiled); everything else is
+    parsed as YAML. The mapping of a ``.dtb`` stays open until
+    ``close_tree(tree_data)``; code that loads many binary trees should close
+    each one, or use ``with BinaryTree(path) as binary``.
+
+    ``$include`` paths are relative to the file being loaded (the working
+    directory for strings and dicts), then to each included file.
 
     Args:
-        source: Path to YAML file, YAML string, or dict with tree structure
+        source: Path to YAML/JSON file, YAML/JSON string, or dict with tree structure
+        lazy_includes: Read included files below the root only when a traversal
+            first touches their node (see ``LazyInclude``); definitions are
+            always resolved at load time
+        parse_cache: ParseCache for included files (default: one shared per process)
+        includes: Optional list; the path of every included file read is appended
 
     Returns:
         Validated tree dict with 'tree' key
 
     Raises:
-        ValueError: If tree structure is invalid
-        ImportError: If PyYAML not installed
+        ValueError: If tree structure is invalid or includes form a cycle
+        FileNotFoundError: If an included file does not exist
+        ImportError: If PyYAML is needed but not installed
     """
-    if yaml is None:
-        raise ImportError("PyYAML not installed. Run: pip install pyyaml")
-
+    base_dir = Path.cwd()
+    chain = ()
     if isinstance(source, dict):
         tree_data = source
+        text = None
     elif isinstance(source, Path) or (isinstance(source, str) and Path(source).exists()):
-        with open(source) as f:
-            tree_data = yaml.safe_load(f)
+        path = Path(source)
+        if path.suffix == BINARY_SUFFIX:
+            from .binary import BinaryTree
+            return BinaryTree(path).tree_data
+        with open(path) as f:
+            text = f.read()
+        tree_data = _parse(text, path.suffix)
+        base_dir = path.resolve().parent
+        chain = (path.resolve(),)
     else:
-        # Assume it's a YAML string
-        tree_data = yaml.safe_load(source)
+        text = source
+        if source.lstrip().startswith('{'):
+            try:
+                tree_data = json.loads(source)
+            except ValueError:
+                # Flow-style YAML
+                tree_data = _yaml().safe_load(source)
+        else:
+            # Assume it's a YAML string
+            tree_data = _yaml().safe_load(source)
+
+    # Only walk for includes when the source can contain any
+    if isinstance(tree_data, dict) and isinstance(tree_data.get('tree'), dict) and (
+            text is None or INCLUDE_KEY in text):
+        resolver = _IncludeResolver(parse_cache or _parse_cache, includes)
+        tree = tree_data['tree']
+        definitions = tree.get('definitions')
+        if isinstance(definitions, dict):
+            for name in definitions:
+                definitions[name] = resolver.resolve(
+                    definitions[name], base_dir, chain, ['definitions', name])
+        if 'root' in tree:
+            resolver.lazy = lazy_includes
+            resolver.definitions = get_definitions(tree_data)
+            tree['root'] = resolver.resolve(tree['root'], base_dir, chain, [])
 
     validate_tree(tree_data)
     return tree_data
 
 
+class _IncludeResolver:
+    """Replaces $include nodes with the nodes they name (or LazyInclude stand-ins)."""
+
+    def __init__(self, cache: ParseCache, includes: Optional[list], lazy: bool = False,
+                 definitions: dict = None):
+        self.cache = cache
+        self.includes = includes
+        self.lazy = lazy
+        self.definitions = definitions
+
+    def resolve(self, node, base_dir: Path, chain: tuple, path: list):
+        """Return ``node`` with every $include at or below it resolved."""
+        if not isinstance(node, dict):
+            return node
+        if INCLUDE_KEY in node:
+            target = self._target(node, base_dir, chain, path)
+            # A root include is read now so that validate_tree checks the root
+            if self.lazy and path:
+                return LazyInclude(node[INCLUDE_KEY], target, chain, list(path), self)
+            return self.resolve(self.read(target, path), target.parent, chain + (target,), path)
+
+        branches = node.get('branches')
+        if isinstance(branches, list):
+            for i, branch in enumerate(branches):
+                if isinstance(branch, dict) and 'next' in branch:
+                    # Extended in place; copied only where a LazyInclude keeps it
+                    path.append(i)
+                    branch['next'] = self.resolve(branch['next'], base_dir, chain, path)
+                    path.pop()
+        return node
+
+    def read(self, target: Path, path: list):
+        """Parse an included file."""
+        try:
+            node = self.cache.parse(target)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{INCLUDE_KEY} file not found at {_path_str(path)}: {target}") from None
+        if self.includes is not None:
+            self.includes.append(target)
+        return node
+
+    @staticmethod
+    def _target(node: dict, base_dir: Path, chain: tuple, path: list) -> Path:
+        path_str = _path_str(path)
+        if len(node) != 1:
+            raise ValueError(f"{INCLUDE_KEY} node at {path_str} must not have other keys")
+        name = node[INCLUDE_KEY]
+        if not isinstance(name, str):
+            raise ValueError(f"{INCLUDE_KEY} at {path_str} must be a file path")
+        target = (base_dir / name).resolve()
+        if target in chain:
+            cycle = [p.name for p in chain[chain.index(target):]] + [target.name]
+            raise ValueError(f"Cycle in {INCLUDE_KEY}: {' -> '.join(cycle)}")
+        return target
+
+
+class LazyInclude(dict):
+    """
+    A ``$include`` node that reads its file on first access.
+
+    Until then it holds only its ``$include`` key. Any read (``in``, ``[]``,
+    ``get``, iteration, ``len``, comparison) parses and validates the
+    included node and replaces the contents in place, so renderers see an
+    ordinary node and only the files a traversal touches are read.
+    """
+
+    __slots__ = ('loaded', '_target', '_chain', '_path', '_resolver')
+
+    def __init__(self, name: str, target: Path, chain: tuple, path: list, resolver: _IncludeResolver):
+        super().__init__({INCLUDE_KEY: name})
+        self.loaded = False
+        self._target = target
+        self._chain = chain
+        self._path = path
+        self._resolver = resolver
+
+    def load(self) -> 'LazyInclude':
+        """Read the included file now (once); returns self."""
+        if not self.loaded:
+            resolver = self._resolver
+            path = list(self._path)
+            node = resolver.resolve(resolver.read(self._target, path), self._target.parent,
+                                    self._chain + (self._target,), path)
+            _validate_node(node, path, resolver.definitions)
+            dict.clear(self)
+            dict.update(self, node)
+            self.loaded = True
+        return self
+
+    def __getitem__(self, key):
+        return dict.__getitem__(self.load(), key)
+
+    def __contains__(self, key):
+        return dict.__contains__(self.load(), key)
+
+    def __iter__(self):
+        return dict.__iter__(self.load())
+
+    def __len__(self):
+        return dict.__len__(self.load())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyInclude):
+            other.load()
+        return dict.__eq__(self.load(), other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        if not self.loaded:
+            return f'LazyInclude({dict.__getitem__(self, INCLUDE_KEY)!r})'
+        return dict.__repr__(self)
+
+    def get(self, key, default=None):
+        return dict.get(self.load(), key, default)
+
+    def keys(self):
+        return dict.keys(self.load())
+
+    def values(self):
+        return dict.values(self.load())
+
+    def items(self):
+        return dict.items(self.load())
+
+    def copy(self):
+        return dict(self.items())
+
+
+def close_tree(tree_data: dict) -> None:
+    """Unmap the file behind a tree loaded from a ``.dtb`` (no-op for other trees)."""
+    binary = getattr(tree_data, 'binary', None)
+    if binary is not None:
+        binary.close()
+
+
+def dump_tree_json(tree_data: dict, stream) -> None:
+    """
+    Write a loaded tree as compact JSON that ``load_tree`` reads back
+    without PyYAML (values JSON lacks, such as dates, become strings).
+    """
+    json.dump(tree_data, stream, ensure_ascii=False, separators=(',', ':'), default=str)
+    stream.write('\n')
+
+
 def validate_tree(tree_data: dict) -> None:
     """
     Validate tree structure.
@@ -65,15 +330,58 @@ def validate_tree(tree_data: dict) -> None:
     if 'root' not in tree:
         raise ValueError("Tree missing required 'root' field")
 
-    _validate_node(tree['root'], path=[])
+    definitions = tree.get('definitions') or {}
+    if not isinstance(definitions, dict):
+        raise ValueError("Tree 'definitions' must be a dict of named subtrees")
+
+    # Renderers derive node ids from ref_path(name); two names must not share one
+    ref_names = {}
+    for name in definitions:
+        other = ref_names.setdefault(ref_path(name)[1], name)
+        if other != name:
+            raise ValueError(f"Definitions '{other}' and '{name}' would get the same node ids "
+                             f"(punctuation becomes '_'); rename one")
+
+    # Each definition is validated once, no matter how often it is referenced
+    ref_graph = {}
+    for name, node in definitions.items():
+        if isinstance(node, dict) and REF_KEY in node:
+            raise ValueError(f"Definition '{name}' cannot itself be a {REF_KEY}")
+        refs = []
+        _validate_node(node, path=['definitions', name], definitions=definitions, refs=refs)
+        ref_graph[name] = refs
 
+    _validate_node(tree['root'], path=[], definitions=definitions, refs=[])
+    _check_ref_cycles(ref_graph)
 
-def _validate_node(node: dict, path: list) -> None:
-    """Recursively validate node structure."""
-    path_str = '/'.join(map(str, path)) if path else 'root'
+
+def _path_str(path: list) -> str:
+    return '/'.join(map(str, path)) if path else 'root'
+
+
+def _validate_node(node: dict, path: list, definitions: dict = None, refs: list = None) -> None:
+    """
+    Recursively validate node structure.
+
+    ``path`` is extended in place while the children are checked, and only
+    formatted for an error message, so validation stays linear in deep trees.
+    """
+    if type(node) is LazyInclude and not node.loaded:
+        # Validated when first read
+        return
 
     if not isinstance(node, dict):
-        raise ValueError(f"Node at {path_str} must be a dict")
+        raise ValueError(f"Node at {_path_str(path)} must be a dict")
+
+    if REF_KEY in node:
+        if len(node) != 1:
+            raise ValueError(f"{REF_KEY} node at {_path_str(path)} must not have other keys")
+        name = node[REF_KEY]
+        if name not in (definitions or {}):
+            raise ValueError(f"Unknown {REF_KEY} '{name}' at {_path_str(path)}")
+        if refs is not None:
+            refs.append(name)
+        return
 
     has_question = 'question' in node
     has_leaf = 'leaf' in node
@@ -83,20 +391,72 @@ def _validate_node(node: dict, path: list) -> None:
     node_types = sum([has_question, has_leaf, has_leaf_structured])
     if node_types != 1:
         raise ValueError(
-            f"Node at {path_str} must have exactly one of: question, leaf, leaf-structured"
+            f"Node at {_path_str(path)} must have exactly one of: question, leaf, leaf-structured"
         )
 
     if has_question:
         if 'branches' not in node:
-            raise ValueError(f"Question node at {path_str} missing 'branches'")
+            raise ValueError(f"Question node at {_path_str(path)} missing 'branches'")
 
         for i, branch in enumerate(node['branches']):
             if 'condition' not in branch:
-                raise ValueError(f"Branch {i} at {path_str} missing 'condition'")
+                raise ValueError(f"Branch {i} at {_path_str(path)} missing 'condition'")
             if 'next' not in branch:
-                raise ValueError(f"Branch {i} at {path_str} missing 'next'")
+                raise ValueError(f"Branch {i} at {_path_str(path)} missing 'next'")
+            if not isinstance(branch.get('when', ''), str):
+                raise ValueError(f"Branch {i} at {_path_str(path)}: 'when' must be a string")
+
+            path.append(i)
+            _validate_node(branch['next'], path, definitions, refs)
+            path.pop()
+
+
+def _check_ref_cycles(ref_graph: dict) -> None:
+    """Reject definitions that (transitively) reference themselves."""
+    state = {}  # name -> 1 while on the DFS stack, 2 when finished
+
+    for start in ref_graph:
+        if state.get(start):
+            continue
+        stack = [(start, iter(ref_graph[start]))]
+        trail = [start]
+        state[start] = 1
+        while stack:
+            name, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                trail.pop()
+                state[name] = 2
+            elif state.get(child) == 1:
+                cycle = trail[trail.index(child):] + [child]
+                raise ValueError(f"Cycle in {REF_KEY} definitions: {' -> '.join(cycle)}")
+            elif not state.get(child):
+                state[child] = 1
+                trail.append(child)
+                stack.append((child, iter(ref_graph[child])))
+
+
+def get_definitions(tree_data: dict) -> dict:
+    """Return the tree's named subtree definitions (empty dict if none)."""
+    return tree_data['tree'].get('definitions') or {}
+
+
+def ref_path(name: str) -> list:
+    """
+    Path used for the node IDs of a shared subtree.
+
+    Shared subtrees are emitted once, so their IDs are anchored on the
+    definition name instead of the branch path of any one reference.
+    """
+    return ['ref', re.sub(r'\W', '_', name)]
+
 
-            _validate_node(branch['next'], path + [i])
+def child_path(path: list, index: int, child: dict) -> list:
+    """Path of a branch target: the definition path for $ref nodes."""
+    if REF_KEY in child:
+        return ref_path(child[REF_KEY])
+    return path + [index]
 
 
 def generate_node_id(tree_id: str, path: list, sep: str = '_') -> str:
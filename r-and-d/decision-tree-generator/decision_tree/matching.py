@@ -0,0 +1,198 @@
+"""
+Project-name matching for coverage analysis.
+
+Project references appear as GitHub URLs, ``owner--repo.yaml`` filenames,
+``owner/repo`` list entries and free leaf text ("Use a/b or c/d"). They are
+all reduced to one canonical key - lowercased ``owner/repo`` - so coverage
+can match them with a hash lookup. Names that have no canonical form are
+matched in a single pass over the tree text with an Aho-Corasick automaton.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# An owner/repo token inside free text
+_PROJECT_TOKEN = re.compile(r'[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+')
+_GITHUB_HOST = 'github.com/'
+
+
+def project_ref(text: str) -> Optional[str]:
+    """
+    Extract ``owner/repo`` (original case) from a single project reference.
+
+    Accepts GitHub URLs (``https://github.com/owner/repo[.git][/...]``),
+    project filenames (``projects/owner--repo.yaml``) and plain
+    ``owner/repo`` strings. Returns None for anything else.
+    """
+    if not text:
+        return None
+    text = text.strip()
+
+    host = text.find(_GITHUB_HOST)
+    if host != -1:
+        parts = text[host + len(_GITHUB_HOST):].split('/')
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            return None
+        repo = parts[1].split('#', 1)[0].split('?', 1)[0]
+        if repo.endswith('.git'):
+            repo = repo[:-4]
+        return f"{parts[0]}/{repo}" if repo else None
+
+    name = text.rsplit('/', 1)[-1] if text.endswith(('.yaml', '.yml')) else text
+    for suffix in ('.yaml', '.yml'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            if '--' in name:
+                owner, repo = name.split('--', 1)
+                return f"{owner}/{repo}"
+            return None
+
+    if _PROJECT_TOKEN.fullmatch(name):
+        return name
+    return None
+
+
+def canonical_project_key(text: str) -> Optional[str]:
+    """Canonical (lowercased ``owner/repo``) key of a project reference."""
+    ref = project_ref(text)
+    return ref.lower() if ref else None
+
+
+def project_keys_in_text(text: str) -> List[str]:
+    """Canonical keys of every ``owner/repo`` token in free text, in order."""
+    if _GITHUB_HOST in text:
+        text = text.replace('https://' + _GITHUB_HOST, '').replace(_GITHUB_HOST, '')
+    keys = []
+    for match in _PROJECT_TOKEN.finditer(text):
+        key = match.group(0).lower()
+        if key.endswith('.git'):
+            key = key[:-4]
+        key = key.rstrip('.')
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def _is_name_char(ch: str) -> bool:
+    return ch.isalnum() or ch in '_-'
+
+
+def _joins_name(text: str, i: int) -> bool:
+    """True if ``text[i]`` belongs to the name around it: a name character,
+    or a ``.`` between two of them (``next.js``, but not a full stop)."""
+    ch = text[i]
+    if ch == '.':
+        return (0 < i < len(text) - 1 and _is_name_char(text[i - 1])
+                and _is_name_char(text[i + 1]))
+    return _is_name_char(ch)
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher (Aho-Corasick automaton).
+
+    Building is linear in the total pattern length and scanning is linear
+    in the text length plus the number of matches, independent of how many
+    patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        self._goto = [{}]        # state -> {char: state}
+        self._fail = [0]         # state -> failure state
+        self._terminal = [[]]    # state -> ids of patterns ending here
+        self._dict_link = [0]    # state -> nearest failure state with output
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append([])
+                    self._dict_link.append(0)
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._terminal[state].append(pattern_id)
+
+        # Breadth-first so failure targets are always finished first
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._terminal[fail] else self._dict_link[fail]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start, pattern_id)`` for every occurrence in ``text``."""
+        goto, fail, terminal, dict_link = self._goto, self._fail, self._terminal, self._dict_link
+        patterns = self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            out = state if terminal[state] else dict_link[state]
+            while out:
+                for pattern_id in terminal[out]:
+                    yield i + 1 - len(patterns[pattern_id]), pattern_id
+                out = dict_link[out]
+
+
+def match_names_in_texts(names: List[str], texts: Iterable[str]) -> Dict[str, str]:
+    """
+    Find, for each name, the first text that contains it as a whole name.
+
+    Matching is case-insensitive and only counts occurrences delimited by
+    non-name characters, so ``f/mcptools`` does not match inside
+    ``posit-dev/mcptools`` while ``b1-main`` does match ``org/b1-main``.
+    A ``.`` inside a name is part of it: ``vercel/next`` does not match
+    ``vercel/next.js``, but does match at the end of a sentence.
+    All texts are scanned once, with one automaton for all names.
+
+    Returns:
+        Dict mapping each matched name to the first text containing it
+    """
+    by_pattern = {}
+    for name in names:
+        lowered = name.lower()
+        if lowered:
+            by_pattern.setdefault(lowered, []).append(name)
+    if not by_pattern:
+        return {}
+
+    automaton = AhoCorasick(by_pattern)
+    patterns = automaton.patterns
+    found = {}
+    remaining = len(patterns)
+
+    for text in texts:
+        lowered = text.lower()
+        for start, pattern_id in automaton.iter_matches(lowered):
+            pattern = patterns[pattern_id]
+            if pattern in found:
+                continue
+            end = start + len(pattern)
+            if start > 0 and _joins_name(lowered, start - 1):
+                continue
+            if end < len(lowered) and _joins_name(lowered, end):
+                continue
+            found[pattern] = text
+            remaining -= 1
+        if not remaining:
+            break
+
+    return {
+        name: found[pattern]
+        for pattern, pattern_names in by_pattern.items() if pattern in found
+        for name in pattern_names
+    }
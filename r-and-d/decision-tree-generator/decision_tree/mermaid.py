@@ -2,7 +2,14 @@
 Mermaid flowchart renderer for decision trees.
 """
 
-from .loader import generate_node_id
+from typing import Iterable, TextIO
+
+from .cache import FragmentCache, FragmentMemo, make_memo
+from .compact import QUESTION, compact_tree, diagram_ids
+from .fanout import Emitter, Visit
+from .loader import REF_KEY, child_path, generate_node_id, get_definitions, ref_path
+from .partition import navigation_index, partition_tree, section_id
+from .streams import LineWriter, render_to_string
 
 
 def escape_mermaid(text: str) -> str:
@@ -25,59 +32,164 @@ def truncate(text: str, max_len: int = 40) -> str:
     return text[:max_len - 3] + "..."
 
 
-def _render_node(node: dict, tree_id: str, path: list, lines: list) -> None:
-    """Recursively render a node and its children."""
-    node_id = generate_node_id(tree_id, path)
-
+def _node_label(node: dict) -> str:
+    """Short label of a node (its question, leaf or recommendation)."""
     if 'question' in node:
-        question = escape_mermaid(truncate(node['question']))
-        lines.append(f'    {node_id}["{question}"]')
+        return escape_mermaid(truncate(node['question']))
+    if 'leaf' in node:
+        return escape_mermaid(truncate(node['leaf'], 50))
+    return escape_mermaid(truncate(node['leaf-structured']['recommendation'], 50))
+
+
+def _edge_line(node_id: str, condition: str, child_id: str) -> str:
+    return f'    {node_id} -->|"{escape_mermaid(truncate(condition, 25))}"| {child_id}'
+
 
-        for i, branch in enumerate(node.get('branches', [])):
-            child_path = path + [i]
-            child_id = generate_node_id(tree_id, child_path)
-            condition = escape_mermaid(truncate(branch['condition'], 25))
+def _render_stub(node: dict, node_id: str, target: str, lines: list, emitted: set) -> None:
+    """Render a one-node link to the section continuing at ``node``."""
+    if node_id in emitted:
+        return
+    emitted.add(node_id)
+    lines.append(f'    {node_id}[["{_node_label(node)}"]]')
+    lines.append(f'    click {node_id} "#{target}"')
 
-            lines.append(f'    {node_id} -->|"{condition}"| {child_id}')
-            _render_node(branch['next'], tree_id, child_path, lines)
 
-    elif 'leaf' in node:
-        leaf = escape_mermaid(truncate(node['leaf'], 50))
-        lines.append(f'    {node_id}("{leaf}")')
+def _render_node(node: dict, tree_id: str, path: list, lines: list,
+                 definitions: dict = None, emitted: set = None, cuts: set = None,
+                 memo: FragmentMemo = None) -> None:
+    """
+    Recursively render a node and its children.
+
+    ``$ref`` nodes render their shared subtree only the first time they are
+    reached (tracked in ``emitted``); later references just add an edge.
 
-    elif 'leaf-structured' in node:
-        rec = escape_mermaid(truncate(node['leaf-structured']['recommendation'], 50))
-        lines.append(f'    {node_id}("{rec}")')
+    With ``cuts`` (partitioned rendering), children whose path is in
+    ``cuts`` and all ``$ref`` children are drawn as stubs linking to their
+    own sections instead of being expanded.
 
+    With ``memo``, question subtrees are spliced from the fragment cache
+    when their structural hash and path match an earlier render.
+    """
+    if REF_KEY in node:
+        name = node[REF_KEY]
+        if name in emitted:
+            return
+        emitted.add(name)
+        node, path = definitions[name], ref_path(name)
 
-def render_mermaid(tree_data: dict, direction: str = 'TD') -> str:
+    if 'question' in node:
+        if memo is None:
+            _render_question(node, tree_id, path, lines, definitions, emitted, cuts, memo)
+            return
+        key, fragment = memo.lookup(node, tree_id, path)
+        if fragment is None:
+            fragment = []
+            _render_question(node, tree_id, path, lines if key is None else fragment,
+                             definitions, emitted, cuts, memo)
+            if key is None:
+                return
+            memo.store(key, fragment)
+        lines.extend(fragment)
+
+    else:
+        lines.append(f'    {generate_node_id(tree_id, path)}("{_node_label(node)}")')
+
+
+def _render_question(node: dict, tree_id: str, path: list, lines: list,
+                     definitions: dict, emitted: set, cuts: set, memo: FragmentMemo) -> None:
+    """Render a question node, its edges and (recursively) its children."""
+    node_id = generate_node_id(tree_id, path)
+    lines.append(f'    {node_id}["{_node_label(node)}"]')
+
+    for i, branch in enumerate(node.get('branches', [])):
+        next_path = child_path(path, i, branch['next'])
+        child_id = generate_node_id(tree_id, next_path)
+
+        lines.append(_edge_line(node_id, branch['condition'], child_id))
+        if cuts is not None:
+            child = branch['next']
+            if REF_KEY in child:
+                _render_stub(definitions[child[REF_KEY]], child_id,
+                             section_id(next_path), lines, emitted)
+                continue
+            if tuple(next_path) in cuts:
+                _render_stub(child, child_id, section_id(next_path), lines, emitted)
+                continue
+        _render_node(branch['next'], tree_id, next_path, lines, definitions, emitted, cuts, memo)
+
+
+def _render_compact(tree_data: dict, lines: list) -> None:
+    """Render all nodes, then all edges, with merged leaves and short ids."""
+    compact = compact_tree(tree_data)
+    strings = compact['s']
+    ids = diagram_ids(compact)
+    drawn = set()
+    for node_id, record in enumerate(compact['n']):
+        if ids[node_id] in drawn:
+            continue
+        drawn.add(ids[node_id])
+        if record[0] == QUESTION:
+            lines.append(f'    {ids[node_id]}["{escape_mermaid(truncate(strings[record[1]]))}"]')
+        else:
+            lines.append(f'    {ids[node_id]}("{escape_mermaid(truncate(strings[record[1]], 50))}")')
+    for node_id, record in enumerate(compact['n']):
+        if record[0] == QUESTION:
+            branches = record[2]
+            for i in range(0, len(branches), 2):
+                lines.append(_edge_line(ids[node_id], strings[branches[i]], ids[branches[i + 1]]))
+
+
+def render_mermaid(tree_data: dict, direction: str = 'TD', cache: FragmentCache = None,
+                   compact: bool = False) -> str:
     """
     Render decision tree to Mermaid flowchart format.
 
     Args:
         tree_data: Tree dict with 'tree' key
         direction: Flowchart direction - TD (top-down), LR (left-right), etc.
+        cache: Optional FragmentCache; unchanged subtrees are reused from it
+        compact: Smaller output: leaves with the same text drawn once, short
+            base-36 node ids (see ``render_mermaid_to``)
 
     Returns:
         Mermaid flowchart as string
     """
+    return render_to_string(render_mermaid_to, tree_data, direction, cache, compact)
+
+
+def render_mermaid_to(stream: TextIO, tree_data: dict, direction: str = 'TD',
+                      cache: FragmentCache = None, compact: bool = False) -> None:
+    """
+    Render decision tree to Mermaid, writing lines to a text stream.
+
+    Args:
+        stream: Writable text stream (file, sys.stdout, StringIO, ...)
+        tree_data: Tree dict with 'tree' key
+        direction: Flowchart direction - TD (top-down), LR (left-right), etc.
+        cache: Optional FragmentCache; unchanged subtrees are reused from it
+        compact: Draw leaves with the same text as one node with several
+            incoming edges and use ``n<base 36>`` ids in node order, with
+            all nodes listed before the edges (``cache`` is not used)
+    """
     tree = tree_data['tree']
     tree_id = tree['id'].replace('-', '_')
     title = tree.get('title', 'Decision Tree')
 
-    lines = []
+    lines = LineWriter(stream)
     lines.append(f'%% Decision Tree: {title}')
     lines.append(f'%% Generated from: {tree_id}')
     lines.append('')
     lines.append(f'flowchart {direction}')
 
-    _render_node(tree['root'], tree_id, [], lines)
-
-    lines.append('')
-    return '\n'.join(lines)
+    if compact:
+        _render_compact(tree_data, lines)
+        return
+    memo = make_memo(cache, 'mermaid', __file__, tree_data)
+    _render_node(tree['root'], tree_id, [], lines, get_definitions(tree_data), set(), memo=memo)
 
 
-def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
+def render_mermaid_split(tree_data: dict, direction: str = 'TD', cache: FragmentCache = None,
+                         sections: Iterable[int] = None) -> dict:
     """
     Render decision tree as multiple smaller Mermaid diagrams.
 
@@ -88,6 +200,10 @@ def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
     Args:
         tree_data: Tree dict with 'tree' key
         direction: Flowchart direction
+        cache: Optional FragmentCache; unchanged subtrees are reused from it
+        sections: Branch indices to render as sections (default all). The
+            overview always lists every branch; with ``lazy_includes`` only
+            the chosen sections' included files are read.
 
     Returns:
         Dict with 'overview' (str) and 'sections' (list of dicts with
@@ -97,11 +213,12 @@ def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
     tree_id = tree['id'].replace('-', '_')
     title = tree.get('title', 'Decision Tree')
     root = tree['root']
+    definitions = get_definitions(tree_data)
 
     if 'question' not in root:
         # Not a question node, can't split
         return {
-            'overview': render_mermaid(tree_data, direction),
+            'overview': render_mermaid(tree_data, direction, cache),
             'sections': []
         }
 
@@ -115,7 +232,9 @@ def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
     root_question = escape_mermaid(truncate(root['question']))
     overview_lines.append(f'    {root_id}["{root_question}"]')
 
+    wanted = None if sections is None else set(sections)
     sections = []
+    memo = make_memo(cache, 'mermaid', __file__, tree_data)
 
     for i, branch in enumerate(root.get('branches', [])):
         condition = branch['condition']
@@ -127,6 +246,8 @@ def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
         overview_lines.append(f'    {root_id} -->|"{condition_escaped}"| {child_id}')
         overview_lines.append(f'    {child_id}("{condition_escaped}")')
         overview_lines.append(f'    click {child_id} "#{section_id}"')
+        if wanted is not None and i not in wanted:
+            continue
 
         # Build subtree diagram for this branch
         subtree_lines = []
@@ -134,7 +255,7 @@ def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
         subtree_lines.append('')
         subtree_lines.append(f'flowchart {direction}')
 
-        _render_node(branch['next'], tree_id, [i], subtree_lines)
+        _render_node(branch['next'], tree_id, [i], subtree_lines, definitions, set(), memo=memo)
 
         subtree_lines.append('')
 
@@ -152,3 +273,168 @@ def render_mermaid_split(tree_data: dict, direction: str = 'TD') -> dict:
         'overview': '\n'.join(overview_lines),
         'sections': sections
     }
+
+
+def render_mermaid_partitioned(tree_data: dict, max_nodes: int = 50,
+                               direction: str = 'TD') -> dict:
+    """
+    Render decision tree as Mermaid diagrams of at most ``max_nodes`` nodes.
+
+    Unlike ``render_mermaid_split``, which always cuts at the root, this
+    cuts wherever a subtree outgrows the budget (see ``partition_tree``),
+    so every diagram stays readable however deep or wide the tree is.
+    Cut children and ``$ref`` subtrees appear as stubs with click links to
+    their own sections; section ids are derived from node paths, so the
+    output is deterministic.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        max_nodes: Node budget per diagram (stubs included)
+        direction: Flowchart direction
+
+    Returns:
+        Dict with 'index' (nested markdown list linking all sections) and
+        'sections' (list of dicts with 'id', 'title', 'parent', 'depth',
+        'node_count', 'mermaid' keys, in pre-order)
+    """
+    tree = tree_data['tree']
+    tree_id = tree['id'].replace('-', '_')
+    definitions = get_definitions(tree_data)
+    partition = partition_tree(tree_data, max_nodes)
+
+    sections = []
+    for section in partition.sections:
+        lines = []
+        lines.append(f"%% Section: {section['title']}")
+        lines.append(f'%% Generated from: {tree_id}')
+        lines.append('')
+        lines.append(f'flowchart {direction}')
+        _render_node(section['node'], tree_id, section['path'], lines,
+                     definitions, set(), partition.cuts)
+        lines.append('')
+
+        sections.append({
+            'id': section['id'],
+            'title': section['title'],
+            'parent': section['parent'],
+            'depth': section['depth'],
+            'node_count': section['node_count'],
+            'mermaid': '\n'.join(lines),
+        })
+
+    return {
+        'index': navigation_index(partition),
+        'sections': sections,
+    }
+
+
+class MermaidEmitter(Emitter):
+    """``fan_out`` emitter writing the same output as ``render_mermaid_to``."""
+
+    def __init__(self, stream: TextIO, direction: str = 'TD'):
+        self.stream = stream
+        self.direction = direction
+
+    def start(self, tree_data: dict) -> None:
+        tree = tree_data['tree']
+        self.tree_id = tree['id'].replace('-', '_')
+        self.emitted = set()
+        self.ids = []               # ids of the entered questions, innermost last
+        self.lines = LineWriter(self.stream)
+        self.lines.extend(self._header(tree))
+
+    def _header(self, tree: dict) -> list:
+        title = tree.get('title', 'Decision Tree')
+        return [f'%% Decision Tree: {title}', f'%% Generated from: {self.tree_id}', '',
+                f'flowchart {self.direction}']
+
+    def enter(self, node: dict, visit: Visit) -> bool:
+        return self._draw(node, visit, visit.parent is not None)
+
+    def _draw(self, node: dict, visit: Visit, edge: bool) -> bool:
+        """Append the incoming edge and the node; True if its branches are wanted."""
+        node_id = generate_node_id(self.tree_id, visit.path)
+        if edge:
+            self.lines.append(_edge_line(self.ids[-1], visit.condition, node_id))
+        if visit.ref is not None:
+            if visit.ref in self.emitted:
+                return False
+            self.emitted.add(visit.ref)
+        if 'question' in node:
+            self.lines.append(f'    {node_id}["{_node_label(node)}"]')
+            self.ids.append(node_id)
+            return True
+        self.lines.append(f'    {node_id}("{_node_label(node)}")')
+        return False
+
+    def leave(self, node: dict, visit: Visit) -> None:
+        self.ids.pop()
+
+
+class MermaidSplitEmitter(MermaidEmitter):
+    """
+    ``fan_out`` emitter collecting ``render_mermaid_split`` output.
+
+    After the walk, ``result`` holds the same dict ``render_mermaid_split``
+    returns.
+    """
+
+    def __init__(self, direction: str = 'TD'):
+        super().__init__(None, direction)
+        self.result = None
+
+    def start(self, tree_data: dict) -> None:
+        tree = tree_data['tree']
+        self.tree_id = tree['id'].replace('-', '_')
+        self.title = tree.get('title', 'Decision Tree')
+        self.whole = REF_KEY in tree['root'] or 'question' not in tree['root']
+        self.emitted = set()
+        self.ids = []
+        self.lines = self._header(tree) if self.whole else None
+        self.overview = []
+        self.sections = []
+
+    def enter(self, node: dict, visit: Visit) -> bool:
+        if self.whole:
+            # Not a question at the root: one diagram, as render_mermaid_split does
+            return self._draw(node, visit, visit.parent is not None)
+
+        if visit.depth == 0:
+            self.overview.extend([f'%% Overview: {self.title}', '', f'flowchart {self.direction}'])
+            self.overview.append(f'    {self.tree_id}_root["{_node_label(node)}"]')
+            return True
+
+        if visit.depth == 1:
+            i = visit.index
+            condition = escape_mermaid(truncate(visit.condition, 30))
+            child_id = f'{self.tree_id}_{i}'
+            self.overview.append(f'    {self.tree_id}_root -->|"{condition}"| {child_id}')
+            self.overview.append(f'    {child_id}("{condition}")')
+            self.overview.append(f'    click {child_id} "#section-{i}"')
+
+            self.emitted = set()
+            self.lines = [f'%% Subtree: {visit.condition}', '', f'flowchart {self.direction}']
+            self.sections.append({
+                'id': f'section-{i}',
+                'index': i,
+                'condition': visit.condition,
+                'title': visit.condition,
+                'mermaid': self.lines,
+            })
+            return self._draw(node, visit, False)
+
+        return self._draw(node, visit, True)
+
+    def leave(self, node: dict, visit: Visit) -> None:
+        if self.whole or visit.depth > 0:
+            self.ids.pop()
+
+    def finish(self) -> None:
+        if self.whole:
+            self.result = {'overview': ''.join(line + '\n' for line in self.lines), 'sections': []}
+            return
+        self.overview.append('')
+        for section in self.sections:
+            section['mermaid'].append('')
+            section['mermaid'] = '\n'.join(section['mermaid'])
+        self.result = {'overview': '\n'.join(self.overview), 'sections': self.sections}
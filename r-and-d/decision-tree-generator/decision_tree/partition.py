@@ -0,0 +1,195 @@
+"""
+Size-budgeted partitioning of a decision tree into sections.
+
+Large trees are cut into sub-diagrams of at most ``max_nodes`` nodes each.
+A cut child stays in its parent section as a one-node stub that links to a
+continuation section rooted at that child. Shared ``$ref`` subtrees always
+get their own sections, so each is partitioned once however often it is
+referenced.
+
+The work is a single pre-order flattening plus one bottom-up pass over the
+flat arrays (no recursion, so deep trees are fine); only nodes whose
+subtree overflows the budget sort their children.
+"""
+
+from .loader import REF_KEY, get_definitions, ref_path
+
+
+def section_id(path: list) -> str:
+    """Deterministic section anchor for the node at ``path``."""
+    if not path:
+        return 'section-root'
+    return 'section-' + '-'.join(map(str, path))
+
+
+class Partition:
+    """
+    A tree cut into sections.
+
+    Attributes:
+        sections: Section dicts in pre-order (parents before children) with
+            keys 'id', 'title', 'parent' (section id or None), 'depth',
+            'node' (section root node), 'path' (its branch path) and
+            'node_count' (nodes drawn, stubs included)
+        cuts: Set of branch paths (tuples) that start a new section
+    """
+
+    def __init__(self):
+        self.sections = []
+        self.cuts = set()
+
+
+class _FlatTree:
+    """Pre-order arrays of one walk root (the tree root or a definition)."""
+
+    def __init__(self, node: dict, path: list):
+        self.nodes = []
+        self.paths = []
+        self.parents = []
+        self.conditions = []
+        self.children = []     # idx -> child indices aligned with branches (None for $ref)
+        self.refs = []         # idx -> $ref names among its branches
+
+        stack = [(node, path, -1, None)]
+        while stack:
+            node, path, parent, branch_i = stack.pop()
+            idx = len(self.nodes)
+            self.nodes.append(node)
+            self.paths.append(path)
+            self.parents.append(parent)
+            self.children.append([])
+            self.refs.append([])
+            if parent == -1:
+                self.conditions.append(None)
+            else:
+                self.conditions.append(self.nodes[parent]['branches'][branch_i]['condition'])
+                self.children[parent][branch_i] = idx
+
+            if 'question' in node:
+                branches = node.get('branches', [])
+                pushed = []
+                for i, branch in enumerate(branches):
+                    child = branch['next']
+                    if REF_KEY in child:
+                        self.children[idx].append(None)
+                        self.refs[idx].append(child[REF_KEY])
+                    else:
+                        self.children[idx].append(-1)
+                        pushed.append((child, path + [i], idx, i))
+                stack.extend(reversed(pushed))
+
+
+def partition_tree(tree_data: dict, max_nodes: int) -> Partition:
+    """
+    Cut a tree into sections of at most ``max_nodes`` nodes.
+
+    Bottom-up, every node totals the nodes its section would hold below
+    it; when that exceeds the budget, its largest children are cut (each
+    leaving a one-node stub) until it fits. A node with more branches than
+    the budget allows still keeps all its stubs in one section.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        max_nodes: Node budget per section (at least 2)
+
+    Returns:
+        Partition with sections in deterministic pre-order
+    """
+    if max_nodes < 2:
+        raise ValueError("max_nodes must be at least 2")
+
+    tree = tree_data['tree']
+    definitions = get_definitions(tree_data)
+    partition = Partition()
+
+    root = tree['root']
+    if REF_KEY in root:
+        pending = [(root[REF_KEY], None, 0)]
+    else:
+        pending = _partition_walk(
+            _FlatTree(root, []), tree.get('title', 'Decision Tree'), None, 0, max_nodes, partition
+        )
+
+    # Each definition is partitioned once, under the section that first references it
+    walked = set()
+    i = 0
+    while i < len(pending):
+        name, parent_section, depth = pending[i]
+        i += 1
+        if name in walked:
+            continue
+        walked.add(name)
+        pending.extend(_partition_walk(
+            _FlatTree(definitions[name], ref_path(name)), name, parent_section, depth,
+            max_nodes, partition
+        ))
+
+    return partition
+
+
+def _partition_walk(flat: _FlatTree, title: str, parent_section, depth: int,
+                    max_nodes: int, partition: Partition) -> list:
+    """Partition one flattened walk; return ``(ref, section, depth)`` it references."""
+    count = len(flat.nodes)
+    residual = [1] * count
+    cut = [False] * count
+
+    for idx in range(count - 1, -1, -1):
+        kids = [k for k in flat.children[idx] if k is not None]
+        total = 1 + len(flat.refs[idx]) + sum(residual[k] for k in kids)
+        if total > max_nodes:
+            for k in sorted(kids, key=lambda k: (-residual[k], k)):
+                if total <= max_nodes:
+                    break
+                total -= residual[k] - 1
+                cut[k] = True
+        residual[idx] = total
+
+    section_of = [0] * count
+    section_depth = {}
+    refs_found = []
+    for idx in range(count):
+        parent = flat.parents[idx]
+        if parent == -1 or cut[idx]:
+            sid = section_id(flat.paths[idx])
+            if parent == -1:
+                sec_title, sec_parent, sec_depth = title, parent_section, depth
+            else:
+                partition.cuts.add(tuple(flat.paths[idx]))
+                sec_parent = section_of[parent]
+                sec_title = flat.conditions[idx]
+                sec_depth = section_depth[sec_parent] + 1
+            section_of[idx] = sid
+            section_depth[sid] = sec_depth
+            partition.sections.append({
+                'id': sid,
+                'title': sec_title,
+                'parent': sec_parent,
+                'depth': sec_depth,
+                'node': flat.nodes[idx],
+                'path': flat.paths[idx],
+                'node_count': residual[idx],
+            })
+        else:
+            section_of[idx] = section_of[parent]
+
+        sid = section_of[idx]
+        for name in flat.refs[idx]:
+            refs_found.append((name, sid, section_depth[sid] + 1))
+
+    return refs_found
+
+
+def navigation_index(partition: Partition) -> str:
+    """Markdown list linking every section, nested under its parent section."""
+    children = {}
+    for section in partition.sections:
+        children.setdefault(section['parent'], []).append(section)
+
+    lines = []
+    stack = list(reversed(children.get(None, [])))
+    while stack:
+        section = stack.pop()
+        lines.append(f"{'  ' * section['depth']}* [{section['title']}](#{section['id']})")
+        stack.extend(reversed(children.get(section['id'], [])))
+    return '\n'.join(lines)
@@ -0,0 +1,77 @@
+"""
+Lazy root-to-leaf path enumeration.
+
+Unlike ``extract_referenced_items``, which builds every path of every item
+up front, ``iter_paths`` yields one ``(item, path)`` pair at a time and
+only keeps the branch iterators and conditions of the current depth.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from .loader import REF_KEY, get_definitions
+
+
+# Same as coverage._leaf_items; copied so that dt paths does not import coverage
+# (and matching) at startup. Keep the two in step.
+def _leaf_items(node: dict) -> list:
+    """Items named by a leaf, in coverage order (projects, then recommendation)."""
+    if 'leaf' in node:
+        return [node['leaf']]
+    ls = node.get('leaf-structured')
+    if ls is None:
+        return []
+    items = list(ls.get('projects', []))
+    if ls.get('recommendation'):
+        items.append(ls['recommendation'])
+    return items
+
+
+def iter_paths(tree_data: dict, item: Optional[str] = None) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+    """
+    Yield every ``(item, path)`` pair of the tree, lazily.
+
+    Pairs come in depth-first branch order (the order of
+    ``extract_referenced_items``); ``path`` is a tuple of branch conditions
+    from the root. ``$ref`` subtrees are followed, so each reference site
+    yields its own full paths. Extra memory is proportional to the current
+    depth, never to the number of paths.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        item: If given, only yield paths leading to this exact item
+
+    Yields:
+        Tuples of (item, conditions)
+    """
+    definitions = get_definitions(tree_data)
+
+    def resolve(node: dict) -> dict:
+        return definitions[node[REF_KEY]] if REF_KEY in node else node
+
+    root = resolve(tree_data['tree']['root'])
+    if 'question' not in root:
+        for leaf_item in _leaf_items(root):
+            if item is None or leaf_item == item:
+                yield leaf_item, ()
+        return
+
+    path = []
+    stack = [iter(root.get('branches', []))]
+    while stack:
+        branch = next(stack[-1], None)
+        if branch is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+
+        node = resolve(branch['next'])
+        path.append(branch['condition'])
+        if 'question' in node:
+            stack.append(iter(node.get('branches', [])))
+            continue
+
+        for leaf_item in _leaf_items(node):
+            if item is None or leaf_item == item:
+                yield leaf_item, tuple(path)
+        path.pop()
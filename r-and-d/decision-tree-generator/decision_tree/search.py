@@ -0,0 +1,102 @@
+"""
+Inverted search index over a compact tree.
+
+Built at render time and embedded next to the explorer's tree JSON, so the
+page can answer a query with a few dictionary lookups instead of scanning
+text or DOM. Tokens are lowercase ASCII letter/digit runs (the page
+tokenizes queries the same way); every ``leaf-structured`` project is also
+indexed under its full lowercased name, e.g. ``apify/mcp-cli``.
+
+A branch condition is indexed under the node it leads to, so a hit on an
+answer expands the path down to that answer.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List
+
+from .compact import QUESTION, STRUCTURED
+
+_TOKEN = re.compile(r'[0-9a-z]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Search tokens of a text (lowercase alphanumeric runs)."""
+    return _TOKEN.findall(text.lower())
+
+
+def build_search_index(compact: dict) -> Dict[str, list]:
+    """
+    Map search tokens to the ids of the nodes that mention them.
+
+    Args:
+        compact: Output of ``compact_tree``
+
+    Returns:
+        Dict with 'k' (sorted tokens) and 'v' (parallel lists of ascending
+        node ids), so output is deterministic and the page can binary-search
+        token prefixes
+    """
+    strings = compact['s']
+    string_tokens = {}
+    postings = {}
+
+    def add(string_id: int, node_id: int) -> None:
+        tokens = string_tokens.get(string_id)
+        if tokens is None:
+            tokens = string_tokens[string_id] = set(tokenize(strings[string_id]))
+        for token in tokens:
+            postings.setdefault(token, set()).add(node_id)
+
+    for node_id, node in enumerate(compact['n']):
+        add(node[1], node_id)
+        if node[0] == QUESTION:
+            branches = node[2]
+            for i in range(0, len(branches), 2):
+                add(branches[i], branches[i + 1])
+        elif node[0] == STRUCTURED:
+            for project in node[2]:
+                add(project, node_id)
+                postings.setdefault(strings[project].lower(), set()).add(node_id)
+            if node[3] >= 0:
+                add(node[3], node_id)
+
+    keys = sorted(postings)
+    return {'k': keys, 'v': [sorted(postings[key]) for key in keys]}
+
+
+def _lookup(index: Dict[str, list], token: str, prefix: bool) -> set:
+    keys = index['k']
+    ids = set()
+    i = bisect_left(keys, token)
+    while i < len(keys) and (keys[i] == token or (prefix and keys[i].startswith(token))):
+        ids.update(index['v'][i])
+        i += 1
+    return ids
+
+
+def search_index(index: Dict[str, list], query: str) -> List[int]:
+    """
+    Ids of the nodes matching ``query``, by the explorer page's rules.
+
+    A full project name (``org/repo``) matches as is; otherwise every query
+    token must hit the node, the last one as a prefix.
+
+    Args:
+        index: Output of ``build_search_index``
+        query: Search text
+
+    Returns:
+        Ascending node ids
+    """
+    query = query.strip().lower()
+    if '/' in query:
+        exact = _lookup(index, query, False)
+        if exact:
+            return sorted(exact)
+    tokens = tokenize(query)
+    hits = None
+    for i, token in enumerate(tokens):
+        ids = _lookup(index, token, i == len(tokens) - 1)
+        hits = ids if hits is None else hits & ids
+    return sorted(hits or ())
@@ -0,0 +1,249 @@
+"""
+Tree explorer service: serve a tree one level at a time over HTTP.
+
+Instead of shipping a whole rendered page, a client fetches only the nodes
+it expands:
+
+    GET /tree               tree id, title and root node id
+    GET /node/<id>          one node and its direct children
+    GET /paths?item=<name>  branch paths leading to an item (coverage index)
+    GET /search?q=<text>    nodes matching a query, with their ancestor ids
+
+Node ids are those of the compact tree (``compact.py``), the ids the HTML
+explorer uses. Every response carries an ETag derived from the structural
+hashes (``cache.StructuralHashes``) and ``Cache-Control: no-cache``, so
+clients revalidate with ``If-None-Match`` and get ``304 Not Modified``
+without a body. Serialized responses are kept in an in-process LRU.
+
+    dt serve examples/mcp-tool-chooser.yaml --port 8000
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .cache import StructuralHashes
+from .compact import QUESTION, LEAF, compact_tree
+from .coverage import CoverageIndex
+from .search import build_search_index, search_index
+
+# Most search hits returned in one response
+MAX_SEARCH_RESULTS = 100
+
+_KINDS = {QUESTION: 'question', LEAF: 'leaf'}
+
+
+def _etag(*parts: str) -> str:
+    return '"' + hashlib.sha256('\0'.join(parts).encode()).hexdigest()[:32] + '"'
+
+
+def _json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class TreeService:
+    """
+    Answers explorer requests for one loaded tree, independent of HTTP.
+
+    The coverage and search indexes are built on first use.
+    """
+
+    def __init__(self, tree_data: dict, cache_size: int = 1024):
+        tree = tree_data['tree']
+        self.tree_data = tree_data
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+        sources = []
+        self.compact = compact_tree(tree_data, sources=sources)
+        hashes = StructuralHashes(tree_data)
+        self._node_hashes = [hashes[node] for node in sources]
+        # Node ids follow from the root's content, so this covers every response
+        self.tree_etag = _etag(str(tree['id']), str(tree.get('title', '')), hashes[tree['root']])
+
+        self._coverage = None
+        self._search = None
+        self._parents = None
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, target: str, if_none_match: Optional[str] = None) -> Tuple[int, Optional[str], bytes]:
+        """
+        Answer ``GET target``.
+
+        Args:
+            target: Request path with query string, e.g. ``/node/3``
+            if_none_match: The request's If-None-Match header, if any
+
+        Returns:
+            (status, etag, body): 304 with an empty body when ``if_none_match``
+            names the current ETag; errors have a JSON body and no ETag
+        """
+        url = urlsplit(target)
+        try:
+            etag, build = self._route(url.path, parse_qs(url.query))
+        except LookupError as e:
+            return 404, None, _json({'error': str(e)})
+        except ValueError as e:
+            return 400, None, _json({'error': str(e)})
+
+        if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return 304, etag, b''
+
+        with self._lock:
+            body = self._responses.get(target)
+            if body is not None:
+                self.hits += 1
+                self._responses.move_to_end(target)
+                return 200, etag, body
+
+        try:
+            body = _json(build())
+        except LookupError as e:
+            return 404, None, _json({'error': str(e)})
+
+        with self._lock:
+            self.misses += 1
+            self._responses[target] = body
+            if len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+        return 200, etag, body
+
+    def _route(self, path: str, query: dict):
+        """ETag and body builder of a request (raises LookupError or ValueError)."""
+        parts = path.strip('/').split('/')
+        if parts == ['tree']:
+            return self.tree_etag, self._tree_response
+        if len(parts) == 2 and parts[0] == 'node':
+            node_id = self._node_id(parts[1])
+            return self._node_etag(node_id), lambda: self._node_response(node_id)
+        if parts == ['paths']:
+            item = self._param(query, 'item')
+            return self.tree_etag, lambda: self._paths_response(item)
+        if parts == ['search']:
+            text = self._param(query, 'q')
+            return self.tree_etag, lambda: self._search_response(text)
+        raise LookupError(f"Not found: {path}")
+
+    @staticmethod
+    def _param(query: dict, name: str) -> str:
+        values = query.get(name)
+        if not values:
+            raise ValueError(f"Missing query parameter '{name}'")
+        return values[0]
+
+    def _node_id(self, text: str) -> int:
+        if not text.isdigit() or int(text) >= len(self.compact['n']):
+            raise LookupError(f"Unknown node: {text}")
+        return int(text)
+
+    def _node_etag(self, node_id: int) -> str:
+        # Child ids shift when other parts of the tree change, so they are
+        # part of the tag along with the node's structural hash
+        record = self.compact['n'][node_id]
+        children = record[2][1::2] if record[0] == QUESTION else []
+        return _etag(self._node_hashes[node_id], ','.join(map(str, children)))
+
+    def _summary(self, node_id: int) -> dict:
+        record = self.compact['n'][node_id]
+        return {
+            'id': node_id,
+            'kind': _KINDS.get(record[0], 'leaf-structured'),
+            'label': self.compact['s'][record[1]],
+        }
+
+    def _tree_response(self) -> dict:
+        tree = self.tree_data['tree']
+        return {'id': tree['id'], 'title': tree.get('title', 'Decision Tree'), 'root': self.compact['r']}
+
+    def _node_response(self, node_id: int) -> dict:
+        strings = self.compact['s']
+        record = self.compact['n'][node_id]
+        response = self._summary(node_id)
+        if record[0] == QUESTION:
+            branches = record[2]
+            response['children'] = [
+                dict(self._summary(branches[i + 1]), condition=strings[branches[i]])
+                for i in range(0, len(branches), 2)
+            ]
+        elif record[0] != LEAF:
+            response['projects'] = [strings[project] for project in record[2]]
+            if record[3] >= 0:
+                response['notes'] = strings[record[3]]
+        return response
+
+    def _paths_response(self, item: str) -> dict:
+        if self._coverage is None:
+            self._coverage = CoverageIndex.from_tree(self.tree_data)
+        if item not in self._coverage:
+            raise LookupError(f"Unknown item: {item}")
+        return {'item': item, 'paths': self._coverage.paths(item)}
+
+    def _search_response(self, text: str) -> dict:
+        if self._search is None:
+            parents = {}
+            for node_id, record in enumerate(self.compact['n']):
+                if record[0] == QUESTION:
+                    for child in record[2][1::2]:
+                        parents.setdefault(child, node_id)
+            self._parents = parents
+            self._search = build_search_index(self.compact)
+
+        ids = search_index(self._search, text)
+        nodes = []
+        for node_id in ids[:MAX_SEARCH_RESULTS]:
+            ancestors = []
+            parent = self._parents.get(node_id)
+            while parent is not None:
+                ancestors.append(parent)
+                parent = self._parents.get(parent)
+            nodes.append(dict(self._summary(node_id), ancestors=ancestors[::-1]))
+        return {'query': text, 'total': len(ids), 'nodes': nodes}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive: an explorer fetches many small responses
+    protocol_version = 'HTTP/1.1'
+    service: TreeService = None
+    allow_origin: Optional[str] = None
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def _respond(self, head: bool) -> None:
+        status, etag, body = self.service.get(self.path, self.headers.get('If-None-Match'))
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if self.allow_origin:
+            self.send_header('Access-Control-Allow-Origin', self.allow_origin)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head and status != 304:
+            self.wfile.write(body)
+
+
+def make_server(service: TreeService, host: str = '127.0.0.1', port: int = 8000,
+                allow_origin: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    HTTP server for ``service``; call ``serve_forever()`` on it.
+
+    Args:
+        service: TreeService to answer from
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        allow_origin: Access-Control-Allow-Origin value, for pages on other origins
+    """
+    handler = type('TreeHandler', (_Handler,), {'service': service, 'allow_origin': allow_origin})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,44 @@
+"""
+Text stream helpers shared by the renderers.
+"""
+
+import io
+from typing import Callable
+
+
+class LineWriter:
+    """
+    Give a text stream the ``append``/``extend`` interface of a line list.
+
+    Renderers build output line by line; pointing them at a LineWriter
+    writes each line (plus its newline) straight to the stream instead of
+    collecting everything for a final ``'\\n'.join``.
+    """
+
+    def __init__(self, stream):
+        self._write = stream.write
+
+    def append(self, line: str) -> None:
+        self._write(line)
+        self._write('\n')
+
+    def extend(self, lines) -> None:
+        for line in lines:
+            self.append(line)
+
+
+class NullSink:
+    """Line sink that discards everything (for multi-pass renderers)."""
+
+    def append(self, line: str) -> None:
+        pass
+
+    def extend(self, lines) -> None:
+        pass
+
+
+def render_to_string(render_to: Callable, *args, **kwargs) -> str:
+    """Run a ``render_*_to(stream, ...)`` function and return its output."""
+    buf = io.StringIO()
+    render_to(buf, *args, **kwargs)
+    return buf.getvalue()
@@ -0,0 +1,271 @@
+"""
+SVG renderer for decision trees (no Graphviz needed).
+
+Node sizes come from estimated text widths, horizontal positions from the
+O(n) tidy tree layout in ``layout.py``, and depths are stacked into rows, so
+even very large trees render in milliseconds.
+
+Shared ``$ref`` subtrees are laid out once, below the main tree; each
+reference site is a dashed stub linking to that drawing.
+"""
+
+from html import escape
+from typing import TextIO
+
+from .graphviz import truncate, wrap_lines
+from .layout import tidy_layout
+from .loader import REF_KEY, get_definitions, ref_path
+from .streams import LineWriter, render_to_string
+
+FONT_SIZE = 12
+LINE_HEIGHT = 15
+PAD_X = 10
+PAD_Y = 8
+H_GAP = 16          # between neighbouring nodes
+V_GAP = 44          # between rows (room for condition labels)
+MARGIN = 20
+SECTION_GAP = 40    # between the main tree and shared subtrees
+
+SVG_STYLE = '''
+    .q { fill: #e3f2fd; stroke: #1976d2; }
+    .leaf { fill: #e8f5e9; stroke: #43a047; }
+    .ref { fill: #fff; stroke: #1976d2; stroke-dasharray: 4 3; }
+    .edge { fill: none; stroke: #888; }
+    .cond { font-size: 10px; fill: #555; paint-order: stroke; stroke: #fff; stroke-width: 3px; }
+    .heading { font-weight: 600; }'''
+
+# Approximate advance widths in em, for a generic sans-serif font
+_NARROW = set("il.,:;'|!()[]{}ftrjI ")
+_WIDE = set('mwMW@%')
+
+
+def estimate_text_width(text: str, font_size: float = FONT_SIZE) -> float:
+    """Estimate the rendered width of a single line of text."""
+    em = 0.0
+    for ch in text:
+        if ch in _NARROW:
+            em += 0.3
+        elif ch in _WIDE:
+            em += 0.85
+        elif ch.isupper() or ord(ch) > 0x2000:
+            em += 0.68
+        else:
+            em += 0.55
+    return em * font_size
+
+
+def _fmt(value: float) -> str:
+    """Compact, deterministic coordinate formatting."""
+    text = f'{value:.1f}'
+    if text.endswith('.0'):
+        text = text[:-2]
+    return '0' if text == '-0' else text
+
+
+def _node_lines(node: dict) -> list:
+    """Label lines of a node, wrapped like the Graphviz renderer."""
+    if 'question' in node:
+        return wrap_lines(node['question'], 25) or ['']
+    if 'leaf' in node:
+        return wrap_lines(node['leaf'], 30) or ['']
+    return wrap_lines(node['leaf-structured']['recommendation'], 30) or ['']
+
+
+class _Drawing:
+    """Flat arrays describing one laid-out tree (the root or a definition)."""
+
+    def __init__(self, node: dict, path: list, definitions: dict):
+        self.kinds = []        # 'q', 'leaf' or 'ref'
+        self.labels = []       # wrapped label lines
+        self.paths = []
+        self.targets = []      # referenced definition name, for 'ref' stubs
+        self.conditions = []   # incoming branch condition (None for the root)
+        self.children = []
+        self.depths = []
+        self.refs = []         # definition names, in order of first reference
+
+        stack = [(node, path, -1, None)]
+        while stack:
+            node, path, parent, condition = stack.pop()
+            v = len(self.kinds)
+            self.children.append([])
+            self.paths.append(path)
+            self.conditions.append(condition)
+            self.depths.append(self.depths[parent] + 1 if parent != -1 else 0)
+            if parent != -1:
+                self.children[parent].append(v)
+
+            if REF_KEY in node:
+                name = node[REF_KEY]
+                self.kinds.append('ref')
+                self.labels.append(_node_lines(definitions[name]))
+                self.targets.append(name)
+                if name not in self.refs:
+                    self.refs.append(name)
+                continue
+
+            self.targets.append(None)
+            self.labels.append(_node_lines(node))
+            if 'question' in node:
+                self.kinds.append('q')
+                # $ref stubs keep their branch path, so ids stay unique per site
+                for i, branch in reversed(list(enumerate(node.get('branches', [])))):
+                    stack.append((branch['next'], path + [i], v, branch['condition']))
+            else:
+                self.kinds.append('leaf')
+
+        count = len(self.kinds)
+        self.widths = [
+            max(estimate_text_width(line) for line in lines) + 2 * PAD_X
+            for lines in self.labels
+        ]
+        self.heights = [len(lines) * LINE_HEIGHT + 2 * PAD_Y for lines in self.labels]
+        self.cond_text = [truncate(c, 20) if c is not None else '' for c in self.conditions]
+
+        # Reserve room for the incoming condition label as well as the box
+        slot = [
+            max(self.widths[v], estimate_text_width(self.cond_text[v], 10) + 8)
+            for v in range(count)
+        ]
+        xs = tidy_layout(self.children, slot, H_GAP)
+        left = min(xs[v] - slot[v] / 2 for v in range(count))
+        self.xs = [x - left for x in xs]
+        self.width = max(self.xs[v] + slot[v] / 2 for v in range(count))
+
+        row_height = {}
+        for v in range(count):
+            d = self.depths[v]
+            row_height[d] = max(row_height.get(d, 0), self.heights[v])
+        self.row_top = {}
+        top = 0.0
+        for d in sorted(row_height):
+            self.row_top[d] = top
+            top += row_height[d] + V_GAP
+        self.height = top - V_GAP
+
+
+def _node_id(path: list) -> str:
+    return f"n_{'_'.join(map(str, path))}" if path else 'n_root'
+
+
+def _draw(lines, drawing: _Drawing, dx: float, dy: float) -> None:
+    """Append the SVG elements of one drawing, offset by (dx, dy)."""
+    def top_centre(v):
+        return dx + drawing.xs[v], dy + drawing.row_top[drawing.depths[v]]
+
+    lines.append('  <g class="edges">')
+    for v, kids in enumerate(drawing.children):
+        x1, top = top_centre(v)
+        y1 = top + drawing.heights[v]
+        for w in kids:
+            x2, y2 = top_centre(w)
+            ym = (y1 + y2) / 2
+            lines.append(
+                f'    <path class="edge" d="M{_fmt(x1)},{_fmt(y1)} C{_fmt(x1)},{_fmt(ym)} '
+                f'{_fmt(x2)},{_fmt(ym)} {_fmt(x2)},{_fmt(y2)}"/>'
+            )
+            lines.append(
+                f'    <text class="cond" x="{_fmt((x1 + x2) / 2)}" y="{_fmt(ym + 3)}" '
+                f'text-anchor="middle">{escape(drawing.cond_text[w])}</text>'
+            )
+    lines.append('  </g>')
+
+    lines.append('  <g class="nodes">')
+    for v, kind in enumerate(drawing.kinds):
+        cx, top = top_centre(v)
+        width, height = drawing.widths[v], drawing.heights[v]
+        rx = height / 2 if kind == 'leaf' else 4
+        node_id = _node_id(drawing.paths[v])
+        if kind == 'ref':
+            target = _node_id(ref_path(drawing.targets[v]))
+            lines.append(f'    <a href="#{target}">')
+        lines.append(f'    <g id="{node_id}">')
+        lines.append(
+            f'      <rect class="{kind}" x="{_fmt(cx - width / 2)}" y="{_fmt(top)}" '
+            f'width="{_fmt(width)}" height="{_fmt(height)}" rx="{_fmt(rx)}"/>'
+        )
+        lines.append(f'      <text x="{_fmt(cx)}" y="{_fmt(top + PAD_Y)}" text-anchor="middle">')
+        for i, line in enumerate(drawing.labels[v]):
+            lines.append(f'        <tspan x="{_fmt(cx)}" dy="{LINE_HEIGHT if i else FONT_SIZE}">{escape(line)}</tspan>')
+        lines.append('      </text>')
+        lines.append('    </g>')
+        if kind == 'ref':
+            lines.append('    </a>')
+    lines.append('  </g>')
+
+
+def render_svg(tree_data: dict) -> str:
+    """
+    Render decision tree to a standalone SVG image.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+
+    Returns:
+        SVG document as string
+    """
+    return render_to_string(render_svg_to, tree_data)
+
+
+def render_svg_to(stream: TextIO, tree_data: dict) -> None:
+    """
+    Render decision tree to SVG, writing to a text stream.
+
+    All positions are computed before anything is written (the image size
+    goes in the root element), in time linear in the number of nodes.
+
+    Args:
+        stream: Writable text stream (file, sys.stdout, StringIO, ...)
+        tree_data: Tree dict with 'tree' key
+    """
+    tree = tree_data['tree']
+    title = tree.get('title', 'Decision Tree')
+    definitions = get_definitions(tree_data)
+
+    root = tree['root']
+    if REF_KEY in root:
+        name = root[REF_KEY]
+        drawings = [(None, _Drawing(definitions[name], ref_path(name), definitions))]
+    else:
+        drawings = [(None, _Drawing(root, [], definitions))]
+
+    # Each shared subtree once, in order of first reference
+    seen = set()
+    i = 0
+    while i < len(drawings):
+        for name in drawings[i][1].refs:
+            if name not in seen:
+                seen.add(name)
+                drawings.append((name, _Drawing(definitions[name], ref_path(name), definitions)))
+        i += 1
+
+    # Stack the drawings vertically; shared subtrees get a heading line
+    placed = []
+    y = MARGIN
+    for name, drawing in drawings:
+        heading_y = y
+        if name is not None:
+            heading_y = y + SECTION_GAP
+            y = heading_y + LINE_HEIGHT + PAD_Y
+        placed.append((name, drawing, heading_y, y))
+        y += drawing.height
+    width = max(drawing.width for _, drawing in drawings) + 2 * MARGIN
+    height = y + MARGIN
+
+    lines = LineWriter(stream)
+    lines.append(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_fmt(width)}" height="{_fmt(height)}" '
+        f'viewBox="0 0 {_fmt(width)} {_fmt(height)}" font-family="Helvetica, Arial, sans-serif" '
+        f'font-size="{FONT_SIZE}">'
+    )
+    lines.append(f'  <title>{escape(title)}</title>')
+    lines.append(f'  <style>{SVG_STYLE}')
+    lines.append('  </style>')
+    for name, drawing, heading_y, top in placed:
+        if name is not None:
+            lines.append(
+                f'  <text class="heading" x="{MARGIN}" y="{_fmt(heading_y + FONT_SIZE)}">'
+                f'Shared: {escape(name)}</text>'
+            )
+        _draw(lines, drawing, MARGIN, top)
+    lines.append('</svg>')
@@ -0,0 +1,106 @@
+"""
+Tests for the scripted questionnaire (dt ask).
+"""
+
+import io
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import Questionnaire, iter_paths, load_tree
+from decision_tree.ask import read_sequences
+from decision_tree.cli import main
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+SHARED_TREE = {
+    'tree': {
+        'id': 'shared',
+        'definitions': {
+            'lang': {
+                'question': 'Language?',
+                'branches': [
+                    {'condition': 'Python', 'next': {'leaf': 'Use pip'}},
+                    {'condition': 'Node  JS', 'next': {'leaf-structured': {
+                        'recommendation': 'Use npm', 'projects': ['org/npm-tool'], 'notes': 'Node 18'}}},
+                ],
+            },
+        },
+        'root': {
+            'question': 'Where?',
+            'branches': [
+                {'condition': 'Local', 'next': {'$ref': 'lang'}},
+                {'condition': '1', 'next': {'leaf': 'Branch named one'}},
+                {'condition': 'Remote', 'next': {'$ref': 'lang'}},
+            ],
+        },
+    }
+}
+
+NPM = {'status': 'leaf', 'recommendation': 'Use npm', 'projects': ['org/npm-tool'], 'notes': 'Node 18'}
+
+
+class TestQuestionnaire:
+    def test_answers(self):
+        questionnaire = Questionnaire(SHARED_TREE)
+        assert questionnaire.answer(['Local', 'node js']) == NPM
+        assert questionnaire.answer(['remote', '2']) == NPM
+        assert questionnaire.answer(['3', 'Python']) == {
+            'status': 'leaf', 'recommendation': 'Use pip', 'projects': [], 'notes': None}
+        # A condition wins over the branch number it collides with
+        assert questionnaire.answer(['1'])['recommendation'] == 'Branch named one'
+
+    def test_incomplete_and_invalid(self):
+        questionnaire = Questionnaire(SHARED_TREE)
+        assert questionnaire.answer(['Local']) == {
+            'status': 'incomplete', 'question': 'Language?', 'options': ['Python', 'Node  JS']}
+        assert questionnaire.answer(['Local', 'Rust']) == {
+            'status': 'invalid', 'answer': 'Rust', 'question': 'Language?', 'options': ['Python', 'Node  JS']}
+        assert questionnaire.answer(['Local', 'Python', 'more']) == {
+            'status': 'invalid', 'answer': 'more', 'question': None, 'options': []}
+
+    def test_every_path_of_example(self):
+        tree = load_tree(EXAMPLES_DIR / 'mcp-tool-chooser.yaml')
+        questionnaire = Questionnaire(tree)
+        for item, path in iter_paths(tree):
+            result = questionnaire.answer(path)
+            assert result['status'] == 'leaf'
+            assert item in result['projects'] + [result['recommendation']]
+
+    def test_answer_many(self):
+        questionnaire = Questionnaire(SHARED_TREE)
+        lines = ['Local\tNode JS\n', '["Remote", "Node JS"]\n', '\n', 'Local\n', 'Nowhere\n']
+        results = [json.loads(line) for line in questionnaire.answer_many(read_sequences(lines))]
+        assert results[:2] == [NPM, NPM]
+        assert [result['status'] for result in results] == ['leaf', 'leaf', 'incomplete', 'invalid']
+
+
+class TestAskCommand:
+    def test_argv_and_batch(self, tmp_path, capsys):
+        tree_file = tmp_path / 'tree.json'
+        tree_file.write_text(json.dumps(SHARED_TREE))
+        main(['ask', str(tree_file), 'Local', 'Node JS'])
+        assert json.loads(capsys.readouterr().out) == NPM
+
+        with pytest.raises(SystemExit) as exc:
+            main(['ask', str(tree_file), 'Local'])
+        assert exc.value.code == 1
+
+        batch = tmp_path / 'answers.tsv'
+        batch.write_text('Local\tPython\nRemote\t2\n')
+        main(['ask', str(tree_file), '--batch', str(batch), '-o', str(tmp_path / 'out.ndjson')])
+        results = (tmp_path / 'out.ndjson').read_text().splitlines()
+        assert [json.loads(line)['recommendation'] for line in results] == ['Use pip', 'Use npm']
+
+    def test_interactive(self, tmp_path, capsys, monkeypatch):
+        tree_file = tmp_path / 'tree.json'
+        tree_file.write_text(json.dumps(SHARED_TREE))
+        monkeypatch.setattr(sys, 'stdin', io.StringIO('Remote\nRust\n2\n'))
+        main(['ask', str(tree_file)])
+        out = capsys.readouterr()
+        assert json.loads(out.out) == NPM
+        assert '  2. Node  JS\n' in out.err
+        assert "Unknown answer: 'Rust'" in out.err
@@ -0,0 +1,120 @@
+"""
+Tests for batch rendering (dt-build).
+"""
+
+import json
+import shutil
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import load_tree, render_mermaid, render_graphviz, render_html, render_svg
+from decision_tree.batch import MANIFEST_NAME, build, expand_inputs, output_names
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+
+@pytest.fixture
+def trees(tmp_path):
+    """Two trees with the same file name in different directories."""
+    (tmp_path / 'team-a').mkdir()
+    (tmp_path / 'team-b').mkdir()
+    shutil.copy(EXAMPLES_DIR / 'mcp-tool-chooser.yaml', tmp_path / 'team-a' / 'tree.yaml')
+    shutil.copy(EXAMPLES_DIR / 'laptop-chooser.yaml', tmp_path / 'team-b' / 'tree.yaml')
+    return tmp_path
+
+
+def statuses(results):
+    return [result['status'] for result in results]
+
+
+class TestBatchBuild:
+    def test_expand_inputs(self, trees):
+        inputs = expand_inputs([str(trees / '**' / '*.yaml'), str(trees / 'team-a' / 'tree.yaml')])
+        assert inputs == [trees / 'team-a' / 'tree.yaml', trees / 'team-b' / 'tree.yaml']
+        with pytest.raises(FileNotFoundError):
+            expand_inputs([str(trees / 'missing.yaml')])
+
+    def test_output_names_keep_directories(self, trees):
+        inputs = expand_inputs([str(trees / '*' / 'tree.yaml')])
+        assert sorted(output_names(inputs).values()) == ['team-a/tree', 'team-b/tree']
+
+    def test_outputs_match_renderers(self, trees, tmp_path):
+        out = tmp_path / 'out'
+        results = build([str(trees / '*' / '*.yaml')], ['mermaid', 'graphviz', 'html', 'svg'], out)
+        assert statuses(results) == ['rendered', 'rendered']
+
+        tree = load_tree(trees / 'team-a' / 'tree.yaml')
+        assert (out / 'team-a' / 'tree.mmd').read_text() == render_mermaid(tree)
+        assert (out / 'team-a' / 'tree.dot').read_text() == render_graphviz(tree)
+        assert (out / 'team-a' / 'tree.html').read_text() == render_html(tree, full_page=True)
+        assert (out / 'team-a' / 'tree.svg').read_text() == render_svg(tree)
+
+    def test_unchanged_inputs_are_skipped(self, trees, tmp_path):
+        out = tmp_path / 'out'
+        pattern = [str(trees / '*' / '*.yaml')]
+        build(pattern, ['mermaid'], out)
+        assert statuses(build(pattern, ['mermaid'], out)) == ['unchanged', 'unchanged']
+
+        edited = trees / 'team-b' / 'tree.yaml'
+        edited.write_text(edited.read_text().replace('Laptop', 'Notebook'))
+        assert statuses(build(pattern, ['mermaid'], out)) == ['unchanged', 'rendered']
+
+        (out / 'team-a' / 'tree.mmd').unlink()
+        assert statuses(build(pattern, ['mermaid'], out)) == ['rendered', 'unchanged']
+        assert statuses(build(pattern, ['mermaid', 'svg'], out)) == ['rendered', 'rendered']
+        assert statuses(build(pattern, ['svg', 'mermaid'], out, force=True)) == ['rendered', 'rendered']
+
+    def test_incomplete_manifest_entries_are_stale(self, trees, tmp_path):
+        out = tmp_path / 'out'
+        pattern = [str(trees / '*' / '*.yaml')]
+        build(pattern, ['mermaid'], out)
+        manifest = json.loads((out / MANIFEST_NAME).read_text())
+        del manifest['team-a/tree']['includes']
+        manifest['team-b/tree'] = {'hash': None}
+        (out / MANIFEST_NAME).write_text(json.dumps(manifest))
+        assert statuses(build(pattern, ['mermaid'], out)) == ['rendered', 'rendered']
+        assert statuses(build(pattern, ['mermaid'], out)) == ['unchanged', 'unchanged']
+
+    def test_included_files_are_tracked(self, trees, tmp_path):
+        (trees / 'parts').mkdir()
+        (trees / 'parts' / 'leaf.yaml').write_text('leaf: Included\n')
+        (trees / 'team-a' / 'tree.yaml').write_text(
+            'tree:\n  id: inc\n  root:\n    question: Q?\n    branches:\n'
+            '      - condition: A\n        next: {$include: ../parts/leaf.yaml}\n'
+        )
+        out = tmp_path / 'out'
+        pattern = [str(trees / 'team-*' / '*.yaml')]
+        build(pattern, ['mermaid'], out)
+        assert statuses(build(pattern, ['mermaid'], out)) == ['unchanged', 'unchanged']
+
+        (trees / 'parts' / 'leaf.yaml').write_text('leaf: Edited\n')
+        assert statuses(build(pattern, ['mermaid'], out)) == ['rendered', 'unchanged']
+        assert 'Edited' in (out / 'team-a' / 'tree.mmd').read_text()
+
+    def test_failures_are_reported_not_raised(self, trees, tmp_path):
+        (trees / 'team-b' / 'broken.yaml').write_text('tree: {id: broken}\n')
+        out = tmp_path / 'out'
+        results = build([str(trees / '*' / '*.yaml')], ['mermaid'], out)
+        assert statuses(results) == ['rendered', 'failed', 'rendered']
+        assert 'root' in results[1]['error']
+        manifest = json.loads((out / MANIFEST_NAME).read_text())
+        assert sorted(manifest) == ['team-a/tree', 'team-b/tree']
+
+    def test_worker_pool(self, trees, tmp_path):
+        serial, parallel = tmp_path / 'serial', tmp_path / 'parallel'
+        pattern = [str(trees / '*' / '*.yaml')]
+        build(pattern, ['mermaid', 'html'], serial)
+        assert statuses(build(pattern, ['mermaid', 'html'], parallel, jobs=2)) == ['rendered', 'rendered']
+        for name in ('team-a/tree.mmd', 'team-b/tree.html'):
+            assert (parallel / name).read_text() == (serial / name).read_text()
+
+    def test_invalid_arguments(self, trees, tmp_path):
+        with pytest.raises(ValueError, match='Unknown format'):
+            build([str(trees / '*' / '*.yaml')], ['png'], tmp_path)
+        with pytest.raises(ValueError):
+            build([str(trees / '*' / '*.yaml')], [], tmp_path)
+        with pytest.raises(ValueError):
+            build([str(trees / '*' / '*.yaml')], ['mermaid'], tmp_path, jobs=0)
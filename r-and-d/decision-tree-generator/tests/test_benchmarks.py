@@ -0,0 +1,70 @@
+"""
+Tests for the benchmark suite and its synthetic data generators.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from decision_tree import load_projects, validate_tree
+from synthetic import SPEC_FILE, make_catalog, make_tree, project_name, tree_size, write_catalog
+from suite import compare, run_suite
+
+SCRIPTS_DIR = SPEC_FILE.parent / 'scripts'
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(b['next']) for b in node.get('branches', []))
+
+
+class TestSyntheticTrees:
+    def test_shape_and_determinism(self):
+        tree = make_tree(depth=3, branching=3, label_length=20)
+        validate_tree(tree)
+        assert count_nodes(tree['tree']['root']) == tree_size(3, 3) == 40
+        assert make_tree(3, 3, 20) == tree
+        assert make_tree(3, 3, 20, seed=1) != tree
+        assert len(tree['tree']['root']['question']) <= 21
+
+    def test_leaves_name_projects(self):
+        text = str(make_tree(2, 2, structured_rate=1.0))
+        assert all(project_name(i) in text for i in range(4))
+
+
+class TestSyntheticCatalog:
+    def test_catalog_passes_check_yaml(self, tmp_path):
+        sys.path.insert(0, str(SCRIPTS_DIR))
+        spec = importlib.util.spec_from_file_location('check_yaml', SCRIPTS_DIR / 'check-yaml.py')
+        check_yaml = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(check_yaml)
+
+        paths = write_catalog(tmp_path, 30)
+        assert len(paths) == 30
+        spec_fields = check_yaml.load_spec()
+        for path in paths:
+            errors, _ = check_yaml.validate_project_yaml(path, spec_fields)
+            assert errors == [], path
+
+        catalog = make_catalog(30)
+        assert load_projects([tmp_path]) == catalog
+        assert make_catalog(30) == catalog
+        # Each project is independent of the catalog size
+        assert make_catalog(5) == {name: catalog[name] for name in list(catalog)[:5]}
+
+
+class TestSuite:
+    def test_results_shape(self):
+        results = run_suite([(2, 2)], [5], repeat=1, only='render_mermaid')
+        assert results['meta']['repeat'] == 1
+        [result] = results['results']
+        assert result['operation'] == 'render_mermaid'
+        assert result['size'] == 7
+        assert result['params'] == {'depth': 2, 'branching': 2, 'label_length': 40}
+        assert 0 < result['seconds'] <= result['median_seconds']
+        assert result['peak_bytes'] > 0
+
+        lines = compare(results, results)
+        assert lines[1].split()[3] == '1.00'
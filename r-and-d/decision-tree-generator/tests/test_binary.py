@@ -0,0 +1,114 @@
+"""
+Tests for the memory-mapped binary tree format.
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import (
+    load_tree, close_tree, compile_binary, BinaryTree, iter_paths, CoverageIndex,
+    render_mermaid, render_mermaid_split, render_graphviz, render_html, render_svg,
+)
+from decision_tree.cli import main
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+SHARED_TREE = {
+    'tree': {
+        'id': 'shared',
+        'definitions': {
+            'lang': {
+                'question': 'Language?',
+                'branches': [
+                    {'condition': 'Python', 'next': {'leaf': 'Use pip'}},
+                    {'condition': 'Node', 'next': {'$ref': 'done'}},
+                ],
+            },
+            'done': {'leaf-structured': {'recommendation': 'Use npm', 'notes': 'Node >= 18'}},
+            'unused': {'leaf-structured': {'recommendation': 'Nothing', 'projects': []}},
+        },
+        'root': {
+            'question': 'Where?',
+            'branches': [
+                {'condition': 'Local', 'next': {'$ref': 'lang'}},
+                {'condition': 'Remote', 'next': {'$ref': 'lang'}},
+                {'condition': 'Both', 'next': {'leaf-structured': {
+                    'recommendation': 'Use both', 'projects': ['org/a', 'org/b']}}},
+            ],
+        },
+    }
+}
+
+RENDERERS = [
+    render_mermaid, render_graphviz, render_html, render_svg,
+    lambda tree: json.dumps(render_mermaid_split(tree)),
+    lambda tree: list(iter_paths(tree)),
+    lambda tree: CoverageIndex.from_tree(tree).to_dict(),
+]
+
+
+def compiled(tree, tmp_path):
+    path = tmp_path / 'tree.dtb'
+    path.write_bytes(compile_binary(tree))
+    return path
+
+
+class TestBinaryTree:
+    @pytest.mark.parametrize('tree', [
+        load_tree(EXAMPLES_DIR / 'mcp-tool-chooser.yaml'),
+        load_tree(EXAMPLES_DIR / 'laptop-chooser.yaml'),
+        SHARED_TREE,
+    ], ids=lambda t: t['tree']['id'])
+    def test_renderers_match_source(self, tree, tmp_path):
+        with BinaryTree(compiled(tree, tmp_path)) as binary:
+            for render in RENDERERS:
+                assert render(binary.tree_data) == render(tree)
+
+    def test_node_access(self, tmp_path):
+        with BinaryTree(compiled(SHARED_TREE, tmp_path)) as binary:
+            root = binary.root
+            assert root.kind == 'question' and root.label == 'Where?'
+            (local, lang), (remote, again), (both, leaf) = root.children
+            assert (local, remote, both) == ('Local', 'Remote', 'Both')
+            # $ref resolves to one shared definition node
+            assert lang is again and lang.label == 'Language?'
+            assert lang.children[1][1].label == 'Use npm'
+            assert leaf['leaf-structured'] == {'recommendation': 'Use both', 'projects': ['org/a', 'org/b']}
+            assert dict(root['branches'][0]['next']) == {'$ref': 'lang'}
+            assert binary.tree_data['tree']['definitions']['unused']['leaf-structured'] == {
+                'recommendation': 'Nothing', 'projects': []}
+
+    def test_strings_are_deduplicated(self, tmp_path):
+        tree = {'tree': {'id': 'dup', 'root': {'question': 'Q?', 'branches': [
+            {'condition': 'Same', 'next': {'leaf': 'Same'}} for _ in range(100)]}}}
+        single = {'tree': {'id': 'dup', 'root': {'question': 'Q?', 'branches': [
+            {'condition': 'Same', 'next': {'leaf': 'Same'}}]}}}
+        # 99 extra branches cost only their node records and table entries
+        assert len(compile_binary(tree)) - len(compile_binary(single)) == 99 * (20 + 8)
+
+    def test_load_tree_and_compile_command(self, tmp_path):
+        source = EXAMPLES_DIR / 'mcp-tool-chooser.yaml'
+        output = tmp_path / 'tree.dtb'
+        main(['compile', str(source), '-o', str(output)])
+        assert render_mermaid(load_tree(output)) == render_mermaid(load_tree(source))
+
+    def test_load_tree_can_be_closed(self, tmp_path):
+        path = tmp_path / 'tree.dtb'
+        path.write_bytes(compile_binary(load_tree(EXAMPLES_DIR / 'mcp-tool-chooser.yaml')))
+        tree = load_tree(path)
+        assert isinstance(tree.binary, BinaryTree)
+        close_tree(tree)
+        assert tree.binary._buf.closed
+        close_tree({'tree': {'id': 't', 'root': {'leaf': 'x'}}})     # no-op for other trees
+
+    def test_invalid_input(self, tmp_path):
+        path = tmp_path / 'tree.dtb'
+        path.write_bytes(b'not a tree')
+        with pytest.raises(ValueError, match='Not a binary decision tree'):
+            BinaryTree(path)
+        with pytest.raises(ValueError, match='strings only'):
+            compile_binary({'tree': {'id': 'x', 'root': {'leaf': 42}}})
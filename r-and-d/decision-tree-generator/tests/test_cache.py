@@ -0,0 +1,156 @@
+"""
+Tests for structural hashing and the rendered-fragment cache.
+"""
+
+import copy
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import (
+    FragmentCache, StructuralHashes,
+    render_html, render_mermaid, render_mermaid_split,
+)
+
+
+def make_tree(width: int = 3, depth: int = 3) -> dict:
+    """Complete tree with distinct labels everywhere."""
+    def build(prefix, level):
+        if level == depth:
+            return {'leaf': f'Result {prefix}'}
+        return {
+            'question': f'Question {prefix}?',
+            'branches': [
+                {'condition': f'Option {prefix}.{i}', 'next': build(f'{prefix}.{i}', level + 1)}
+                for i in range(width)
+            ],
+        }
+    return {'tree': {'id': 'cache-test', 'title': 'Cache Test', 'root': build('r', 0)}}
+
+
+SHARED_TREE = {
+    'tree': {
+        'id': 'shared',
+        'title': 'Shared',
+        'definitions': {
+            'lang': {
+                'question': 'Language?',
+                'branches': [
+                    {'condition': 'Python', 'next': {'leaf': 'Use pip'}},
+                    {'condition': 'Node', 'next': {'leaf': 'Use npm'}},
+                ],
+            },
+        },
+        'root': {
+            'question': 'Where?',
+            'branches': [
+                {'condition': 'Local', 'next': {'$ref': 'lang'}},
+                {'condition': 'Remote', 'next': {
+                    'question': 'Hosted?',
+                    'branches': [
+                        {'condition': 'Yes', 'next': {'$ref': 'lang'}},
+                        {'condition': 'No', 'next': {'leaf': 'Self-host'}},
+                    ],
+                }},
+            ],
+        },
+    }
+}
+
+
+def edit_one_leaf(tree_data: dict) -> dict:
+    edited = copy.deepcopy(tree_data)
+    edited['tree']['root']['branches'][0]['next']['branches'][0]['next']['branches'][0]['next'] = {
+        'leaf': 'Edited result'
+    }
+    return edited
+
+
+class TestStructuralHashes:
+    def test_equal_content_equal_hash(self):
+        a, b = make_tree(), make_tree()
+        assert StructuralHashes(a)[a['tree']['root']] == StructuralHashes(b)[b['tree']['root']]
+
+    def test_edit_changes_only_the_spine(self):
+        tree = make_tree()
+        edited = edit_one_leaf(tree)
+        before, after = StructuralHashes(tree), StructuralHashes(edited)
+
+        root, new_root = tree['tree']['root'], edited['tree']['root']
+        assert before[root] != after[new_root]
+        assert before[root['branches'][0]['next']] != after[new_root['branches'][0]['next']]
+        for i in (1, 2):
+            assert before[root['branches'][i]['next']] == after[new_root['branches'][i]['next']]
+
+    def test_condition_is_part_of_parent_hash(self):
+        tree = make_tree(2, 1)
+        edited = copy.deepcopy(tree)
+        edited['tree']['root']['branches'][0]['condition'] = 'Renamed'
+        assert StructuralHashes(tree)[tree['tree']['root']] != StructuralHashes(edited)[edited['tree']['root']]
+
+    def test_ref_hashes_like_definition(self):
+        hashes = StructuralHashes(SHARED_TREE)
+        tree = SHARED_TREE['tree']
+        ref = tree['root']['branches'][0]['next']
+        assert hashes[ref] == hashes[tree['definitions']['lang']]
+        assert hashes.has_refs(tree['root'])
+        assert not hashes.has_refs(tree['definitions']['lang'])
+
+
+class TestFragmentCache:
+    @pytest.mark.parametrize('render', [
+        lambda t, c: render_mermaid(t, cache=c),
+        lambda t, c: render_mermaid_split(t, cache=c),
+        lambda t, c: render_html(t, cache=c),
+        lambda t, c: render_html(t, full_page=True, cache=c),
+    ])
+    def test_cached_output_is_identical(self, tmp_path, render):
+        for tree in (make_tree(), SHARED_TREE):
+            cache = FragmentCache(tmp_path)
+            expected = render(tree, None)
+            assert render(tree, cache) == expected    # cold
+            assert render(tree, cache) == expected    # warm
+            assert cache.hits > 0 or tree is SHARED_TREE
+
+    def test_edit_reuses_untouched_subtrees(self, tmp_path):
+        tree = make_tree()
+        edited = edit_one_leaf(tree)
+        cache = FragmentCache(tmp_path)
+        render_html(tree, cache=cache)
+
+        cache.hits = cache.misses = 0
+        assert render_html(edited, cache=cache) == render_html(edited)
+        assert cache.hits == 4        # root.1, root.2, and two siblings below root.0
+        assert cache.misses == 3      # the edited spine
+
+    def test_no_stale_fragments_across_renderers(self, tmp_path):
+        tree = make_tree()
+        cache = FragmentCache(tmp_path)
+        render_html(tree, cache=cache)
+        assert render_mermaid(tree, cache=cache) == render_mermaid(tree)
+
+    def test_html_ref_anchor_survives_memo(self, tmp_path):
+        from decision_tree import html_details
+        from decision_tree.cache import make_memo
+        tree = SHARED_TREE['tree']
+
+        def render(memo):
+            lines = []
+            html_details._render_node(tree['root'], lines, is_root=True, definitions=tree['definitions'],
+                                      used=[], memo=memo, ref_anchor='shared-ref-')
+            return lines
+
+        expected = render(None)
+        assert any('href="#shared-ref-' in line for line in expected)
+        for inline_refs in (False, True):
+            memo = make_memo(FragmentCache(tmp_path / str(inline_refs)), 'html', html_details.__file__,
+                             SHARED_TREE, inline_refs=inline_refs)
+            assert render(memo) == expected     # cold
+            assert render(memo) == expected     # warm
+
+    def test_missing_directory_is_created(self, tmp_path):
+        cache = FragmentCache(tmp_path / 'nested' / 'cache')
+        assert render_html(make_tree(), cache=cache) == render_html(make_tree())
+        assert (tmp_path / 'nested' / 'cache').is_dir()
@@ -0,0 +1,147 @@
+"""
+Tests for when: branch expressions and batch project classification.
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import BinaryTree, Classifier, compile_binary, load_projects, load_tree, validate_tree
+from decision_tree.classify import parse_when
+from decision_tree.cli import main
+
+TREE = {
+    'tree': {
+        'id': 'clients',
+        'definitions': {
+            'remote': {
+                'question': 'Which remote transport?',
+                'branches': [
+                    {'condition': 'SSE bridge', 'when': "transports.sse and category == 'http-bridge'",
+                     'next': {'leaf-structured': {'recommendation': 'Bridge', 'projects': ['org/bridge']}}},
+                    {'condition': 'HTTP', 'when': 'transports.http',
+                     'next': {'leaf': 'Use org/http-client'}},
+                ],
+            },
+        },
+        'root': {
+            'question': 'Local only?',
+            'branches': [
+                {'condition': 'Free text only', 'next': {'leaf': 'Never reached'}},
+                {'condition': 'Yes', 'when': 'transports.stdio and not (transports.http or transports.sse)',
+                 'next': {'leaf-structured': {'recommendation': 'Local', 'projects': ['org/local']}}},
+                {'condition': 'Popular', 'when': "stars >= 1000 and 'Go' in languages",
+                 'next': {'leaf': 'Popular Go'}},
+                {'condition': 'No', 'when': 'transports.http or transports.sse', 'next': {'$ref': 'remote'}},
+            ],
+        },
+    }
+}
+
+PROJECTS = {
+    'org/local': {'transports': {'stdio': True, 'http': False}, 'stars': 5000, 'languages': ['Go']},
+    'org/bridge': {'transports': {'sse': True}, 'category': 'http-bridge'},
+    'org/http-client': {'transports': {'http': True}, 'stars': 'many'},
+    'org/other': {'transports': {'sse': True}, 'category': 'cli-client'},
+    'org/popular': {'stars': 2000, 'languages': ['Go', 'Rust']},
+    'org/nothing': {},
+}
+
+
+class TestParseWhen:
+    def test_grammar(self):
+        assert parse_when("transports.sse and category == 'http-bridge'") == (
+            'and', ('test', ('field', ('transports', 'sse'))),
+            ('cmp', '==', ('field', ('category',)), ('const', 'http-bridge')))
+        assert parse_when('not reputable-source') == ('not', ('test', ('field', ('reputable-source',))))
+        assert parse_when('language not in ["Go", null]') == (
+            'cmp', 'not in', ('field', ('language',)), ('const', ('Go', None)))
+        assert parse_when('a or b and c') == ('or', ('test', ('field', ('a',))), (
+            'and', ('test', ('field', ('b',))), ('test', ('field', ('c',)))))
+
+    @pytest.mark.parametrize('text', ['', 'a ==', 'a b', '(a', 'a = 1', '__import__("os")', 'x in [a]'])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_when(text)
+
+
+class TestClassifier:
+    def test_routes_catalog(self):
+        results = Classifier(TREE).classify(PROJECTS)
+        assert list(results) == list(PROJECTS)
+        assert results['org/local'] == {'status': 'listed', 'node': 'Local', 'path': ['Yes']}
+        assert results['org/bridge'] == {'status': 'listed', 'node': 'Bridge', 'path': ['No', 'SSE bridge']}
+        assert results['org/http-client'] == {'status': 'listed', 'node': 'Use org/http-client',
+                                              'path': ['No', 'HTTP']}
+        assert results['org/popular'] == {'status': 'elsewhere', 'node': 'Popular Go', 'path': ['Popular']}
+        # Reaches the remote question, but neither of its branches matches
+        assert results['org/other'] == {'status': 'stuck', 'node': 'Which remote transport?', 'path': ['No']}
+        assert results['org/nothing'] == {'status': 'stuck', 'node': 'Local only?', 'path': []}
+
+    def test_each_value_is_tested_once(self, monkeypatch):
+        import decision_tree.classify as classify
+        calls = []
+        compare = classify._compare
+        monkeypatch.setattr(classify, '_compare', lambda *args: calls.append(args) or compare(*args))
+
+        projects = {f'org/p{i}': {'category': ['a', 'b', 'c'][i % 3]} for i in range(300)}
+        tree = {'tree': {'id': 't', 'root': {'question': 'Q?', 'branches': [
+            {'condition': c, 'when': f"category == '{c}'", 'next': {'leaf': c}} for c in 'abc']}}}
+        results = Classifier(tree).classify(projects)
+        assert results['org/p4'] == {'status': 'elsewhere', 'node': 'b', 'path': ['b']}
+        assert len(calls) == 3 * 3
+
+    def test_errors(self):
+        bad = json.loads(json.dumps(TREE))
+        bad['tree']['definitions']['remote']['branches'][1]['when'] = 'transports.http =='
+        with pytest.raises(ValueError, match="Invalid 'when' at definitions/remote/1"):
+            Classifier(bad)
+        bad['tree']['definitions']['remote']['branches'][1]['when'] = True
+        with pytest.raises(ValueError, match="'when' must be a string"):
+            validate_tree(bad)
+
+
+class TestClassifyCommand:
+    def test_project_files(self, tmp_path, capsys):
+        tree_file = tmp_path / 'tree.json'
+        tree_file.write_text(json.dumps(TREE))
+        projects = tmp_path / 'projects'
+        projects.mkdir()
+        (projects / 'org--local.yaml').write_text('transports:\n  stdio: true\n')
+        (projects / 'renamed.yaml').write_text(
+            'repo-url: https://github.com/org/bridge\ntransports:\n  sse: true\ncategory: http-bridge\n')
+        assert list(load_projects([projects])) == ['org/local', 'org/bridge']
+
+        main(['classify', str(tree_file), str(projects), '-f', 'ndjson'])
+        lines = capsys.readouterr().out.splitlines()
+        assert json.loads(lines[1]) == {'project': 'org/bridge', 'status': 'listed', 'node': 'Bridge',
+                                        'path': ['No', 'SSE bridge']}
+
+        (projects / 'org--nothing.yaml').write_text('{}\n')
+        with pytest.raises(SystemExit) as exc:
+            main(['classify', str(tree_file), str(projects), '--check'])
+        assert exc.value.code == 1
+        out = capsys.readouterr()
+        assert out.out.splitlines()[0] == 'project\tstatus\tnode\tpath'
+        assert out.err.strip() == '2 listed, 1 stuck'
+
+    def test_binary_tree_is_rejected(self, tmp_path, capsys):
+        binary_file = tmp_path / 'tree.dtb'
+        binary_file.write_bytes(compile_binary(load_tree(TREE)))
+        with BinaryTree(binary_file) as binary:
+            with pytest.raises(ValueError, match="Binary trees do not store 'when'"):
+                Classifier(binary.tree_data)
+
+        (tmp_path / 'org--local.yaml').write_text('transports:\n  stdio: true\n')
+        with pytest.raises(SystemExit) as exc:
+            main(['classify', str(binary_file), str(tmp_path / 'org--local.yaml')])
+        assert exc.value.code == 1
+        assert "do not store 'when'" in capsys.readouterr().err
+
+    def test_example_tree_without_when(self):
+        tree = load_tree(Path(__file__).parent.parent / 'examples' / 'mcp-tool-chooser.yaml')
+        results = Classifier(tree).classify({'org/a': {}})
+        assert results['org/a']['status'] == 'stuck'
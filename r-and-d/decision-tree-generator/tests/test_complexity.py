@@ -0,0 +1,53 @@
+"""
+Complexity-regression tests: every operation's log-log slope stays within
+its declared complexity class (see benchmarks/complexity.py).
+"""
+
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from decision_tree import load_tree, validate_tree
+from complexity import LINEAR, QUADRATIC, TOLERANCE, fit_slope, operations, scaling
+from synthetic import make_chain
+
+OPERATIONS = operations()
+
+
+class TestFitSlope:
+    def test_recovers_exponents(self):
+        sizes = [100, 200, 400, 800]
+        assert fit_slope(sizes, [n * 1e-6 for n in sizes]) == pytest.approx(LINEAR)
+        assert fit_slope(sizes, [n * n * 1e-9 for n in sizes]) == pytest.approx(QUADRATIC)
+        assert fit_slope(sizes, [5e-3] * 4) == pytest.approx(0.0)
+
+
+class TestScaling:
+    @pytest.mark.parametrize('name', list(OPERATIONS))
+    def test_within_declared_class(self, name):
+        exponent, sizes, make_input, run = OPERATIONS[name]
+        result = scaling(make_input, run, sizes)
+        if result['slope'] > exponent + TOLERANCE:
+            # One slow run (a busy machine) must not fail the build
+            result = scaling(make_input, run, sizes, repeat=9)
+        assert result['slope'] <= exponent + TOLERANCE, result
+
+
+class TestDeepTrees:
+    def test_error_paths(self):
+        tree = make_chain(300)
+        node = tree['tree']['root']
+        for _ in range(299):
+            node = node['branches'][1]['next']
+        del node['branches'][1]['next']['leaf']
+        with pytest.raises(ValueError, match='Node at ' + '/'.join(['1'] * 300) + ' must have'):
+            validate_tree(tree)
+
+        # The path grows and shrinks in place; siblings get their own
+        tree = make_chain(3)
+        tree['tree']['root']['branches'][0]['next'] = {'question': 'q', 'branches': [{'condition': 'c'}]}
+        with pytest.raises(ValueError, match="Branch 0 at 0 missing 'next'"):
+            load_tree(tree)
@@ -9,6 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from decision_tree import (
+    CoverageIndex,
     load_tree,
     extract_referenced_items,
     find_paths_to_item,
@@ -235,6 +236,124 @@ def test_coverage_with_real_tree():
     assert result['coverage_percent'] == 100.0
 
 
+SHARED_TREE = {
+    'tree': {
+        'id': 'shared-test',
+        'title': 'Shared',
+        'definitions': {
+            'auth-needs': {
+                'question': 'Need auth?',
+                'branches': [
+                    {'condition': 'OAuth', 'next': {'leaf-structured': {
+                        'recommendation': 'Use OAuth tool', 'projects': ['org/oauth-tool']}}},
+                    {'condition': 'None', 'next': {'leaf': 'Use org/plain-tool'}},
+                ]
+            }
+        },
+        'root': {
+            'question': 'Q?',
+            'branches': [
+                {'condition': 'CLI', 'next': {'$ref': 'auth-needs'}},
+                {'condition': 'HTTP', 'next': {'$ref': 'auth-needs'}},
+            ]
+        }
+    }
+}
+
+
+def test_shared_subtree_items_walked_once():
+    """Items inside a shared subtree get one definition-relative path."""
+    paths = find_paths_to_item(SHARED_TREE, 'org/oauth-tool')
+    assert paths == [['$ref:auth-needs', 'OAuth']]
+
+    # Reference sites are reported separately
+    sites = find_paths_to_item(SHARED_TREE, '$ref:auth-needs')
+    assert sites == [['CLI'], ['HTTP']]
+
+
+def test_shared_subtree_coverage():
+    """Coverage should see projects inside shared subtrees."""
+    result = check_coverage(SHARED_TREE, ['org/oauth-tool', 'org/missing'])
+    assert 'org/oauth-tool' in result['covered']
+    assert result['missing'] == ['org/missing']
+    assert get_all_tree_projects(SHARED_TREE) == {'org/oauth-tool', 'Use org/plain-tool'}
+
+
+def test_coverage_index_exact_lookup():
+    """CoverageIndex answers exact lookups and rebuilds paths on demand."""
+    index = CoverageIndex.from_tree(SAMPLE_TREE)
+
+    assert 'org/b1-main' in index
+    assert 'b1-main' not in index
+    assert index.paths('org/b1-main') == [['Option B', 'Sub B1']]
+    assert index.paths('nonexistent') == []
+    assert len(index.leaf_ids('Use B1 tools')) == 1
+
+
+def test_coverage_index_matches_legacy_dict():
+    """to_dict() keeps the extract_referenced_items format and order."""
+    index = CoverageIndex.from_tree(SAMPLE_TREE)
+    items = index.to_dict()
+
+    assert list(items) == [
+        'Use tool-a/project', 'org/b1-main', 'org/b1-alt', 'Use B1 tools',
+        'Use org/b2-tool', 'org/c-project', 'Use C tools',
+    ]
+    assert items == extract_referenced_items(SAMPLE_TREE['tree']['root'])
+
+
+def test_coverage_index_reused():
+    """Module functions accept a prebuilt index."""
+    index = CoverageIndex.from_tree(SAMPLE_TREE)
+
+    assert get_all_tree_items(SAMPLE_TREE, index=index) == get_all_tree_items(SAMPLE_TREE)
+    assert get_all_tree_projects(SAMPLE_TREE, index=index) == get_all_tree_projects(SAMPLE_TREE)
+    assert find_paths_to_item(SAMPLE_TREE, 'org/c-project', index=index) == [['Option C']]
+    lines, all_covered = generate_coverage_report(SAMPLE_TREE, ['org/c-project'], index=index)
+    assert all_covered is True
+
+
+def test_extract_with_path_prefix():
+    """extract_referenced_items prefixes paths with the given path."""
+    node = SAMPLE_TREE['tree']['root']['branches'][1]['next']
+    items = extract_referenced_items(node, ['Option B'])
+    assert items['Use org/b2-tool'] == [['Option B', 'Sub B2']]
+
+
+def test_check_coverage_canonical_keys():
+    """URLs, filenames and other casings resolve to the same project."""
+    required = [
+        'https://github.com/Org/B1-Main',
+        'projects/org--c-project.yaml',
+        'ORG/B2-TOOL',
+    ]
+    result = check_coverage(SAMPLE_TREE, required)
+
+    assert result['missing'] == []
+    assert result['covered']['https://github.com/Org/B1-Main'] == [['Option B', 'Sub B1']]
+    # Found via the owner/repo token in the leaf text "Use org/b2-tool"
+    assert result['covered']['ORG/B2-TOOL'] == [['Option B', 'Sub B2']]
+
+
+def test_check_coverage_no_owner_false_positive():
+    """f/mcptools must not be covered by posit-dev/mcptools."""
+    tree = {
+        'tree': {
+            'id': 't',
+            'root': {
+                'question': 'Q?',
+                'branches': [
+                    {'condition': 'R', 'next': {'leaf-structured': {
+                        'recommendation': 'Use posit-dev/mcptools',
+                        'projects': ['posit-dev/mcptools']}}},
+                ]
+            }
+        }
+    }
+    result = check_coverage(tree, ['f/mcptools', 'posit-dev/mcptools'])
+    assert result['missing'] == ['f/mcptools']
+
+
 def run_tests():
     """Run all tests and report results."""
     tests = [
@@ -252,6 +371,14 @@ def run_tests():
         test_get_all_tree_items,
         test_get_all_tree_projects,
         test_coverage_with_real_tree,
+        test_shared_subtree_items_walked_once,
+        test_shared_subtree_coverage,
+        test_coverage_index_exact_lookup,
+        test_coverage_index_matches_legacy_dict,
+        test_coverage_index_reused,
+        test_extract_with_path_prefix,
+        test_check_coverage_canonical_keys,
+        test_check_coverage_no_owner_false_positive,
     ]
 
     passed = 0
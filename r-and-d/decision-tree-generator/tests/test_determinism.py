@@ -6,13 +6,17 @@ is deterministic and reproducible.
 """
 
 import hashlib
+import io
 import pytest
 from pathlib import Path
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from decision_tree import load_tree, render_mermaid, render_html, render_graphviz
+from decision_tree import (
+    load_tree, render_mermaid, render_html, render_graphviz, render_svg,
+    render_mermaid_to, render_html_to, render_graphviz_to,
+)
 
 
 # Test fixtures
@@ -92,6 +96,12 @@ class TestDeterminism:
 
         assert len(set(outputs)) == 1, "HTML output varies between runs!"
 
+    def test_svg_determinism_multiple_runs(self):
+        """SVG output (including computed layout) must be identical across runs."""
+        outputs = [render_svg(SIMPLE_TREE) for _ in range(10)]
+
+        assert len(set(outputs)) == 1, "SVG output varies between runs!"
+
     def test_html_full_page_determinism(self):
         """Full page HTML output must be identical across multiple runs."""
         outputs = [render_html(SIMPLE_TREE, full_page=True) for _ in range(10)]
@@ -243,6 +253,36 @@ class TestEdgeCases:
         assert len(set(outputs)) == 1
 
 
+class TestStreaming:
+    """Streaming renderers must write exactly what the string renderers return."""
+
+    @staticmethod
+    def _stream(render_to, *args, **kwargs):
+        buf = io.StringIO()
+        render_to(buf, *args, **kwargs)
+        return buf.getvalue()
+
+    @pytest.mark.parametrize('tree', [SIMPLE_TREE, STRUCTURED_LEAF_TREE])
+    def test_stream_matches_string(self, tree):
+        assert self._stream(render_mermaid_to, tree, 'LR') == render_mermaid(tree, 'LR')
+        assert self._stream(render_graphviz_to, tree, 'LR') == render_graphviz(tree, 'LR')
+        assert self._stream(render_html_to, tree) == render_html(tree)
+        assert self._stream(render_html_to, tree, full_page=True) == render_html(tree, full_page=True)
+
+    def test_example_files_stream_identically(self):
+        examples_dir = Path(__file__).parent.parent / 'examples'
+        for yaml_file in sorted(examples_dir.glob('*.yaml')):
+            tree = load_tree(yaml_file)
+            assert self._stream(render_mermaid_to, tree) == render_mermaid(tree)
+            assert self._stream(render_graphviz_to, tree) == render_graphviz(tree)
+            assert self._stream(render_html_to, tree, full_page=True) == render_html(tree, full_page=True)
+
+    def test_footer_html_placed_before_body_end(self):
+        html = render_html(SIMPLE_TREE, full_page=True, footer_html='\n<!-- footer -->\n')
+        plain = render_html(SIMPLE_TREE, full_page=True)
+        assert html == plain.replace('</body>', '\n<!-- footer -->\n</body>')
+
+
 class TestSnapshotHashes:
     """
     Snapshot tests using SHA256 hashes.
@@ -251,9 +291,15 @@ class TestSnapshotHashes:
     Update the expected hashes only if the change was intentional.
     """
 
-    EXPECTED_SIMPLE_MERMAID_HASH = None  # Set after first run
-    EXPECTED_SIMPLE_HTML_HASH = None
-    EXPECTED_SIMPLE_DOT_HASH = None
+    EXPECTED_SIMPLE_MERMAID_HASH = '970dfc75daa83165f6135bf753c66b4014d684095502912bd477d524e4ee4e92'
+    EXPECTED_SIMPLE_HTML_HASH = '44613a622b281e544a7ded4ee2a0e589daabfbdb58ebc1a8cbc47b9c04127bbb'
+    EXPECTED_SIMPLE_DOT_HASH = '953971e2ae2b4dedaac0fdfbb6c06cbb2c5b51a51823c33d23b82bb315f8bf56'
+
+    def test_simple_hashes_unchanged(self):
+        """Output format must not drift."""
+        assert sha256(render_mermaid(SIMPLE_TREE)) == self.EXPECTED_SIMPLE_MERMAID_HASH
+        assert sha256(render_html(SIMPLE_TREE)) == self.EXPECTED_SIMPLE_HTML_HASH
+        assert sha256(render_graphviz(SIMPLE_TREE)) == self.EXPECTED_SIMPLE_DOT_HASH
 
     def test_record_hashes(self):
         """Record current hashes (run this to update expected values)."""
@@ -0,0 +1,126 @@
+"""
+Tests for single-walk rendering to several formats (fan_out).
+"""
+
+import io
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import (
+    load_tree, fan_out, Emitter,
+    MermaidEmitter, MermaidSplitEmitter, GraphvizEmitter, HtmlEmitter, CoverageCollector,
+    CoverageIndex, render_mermaid, render_mermaid_split, render_graphviz, render_html,
+)
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+SHARED_TREE = {
+    'tree': {
+        'id': 'shared',
+        'title': 'Shared <Subtrees>',
+        'definitions': {
+            'lang': {
+                'question': 'Language?',
+                'branches': [
+                    {'condition': 'Python', 'next': {'leaf': 'Use pip'}},
+                    {'condition': 'Node', 'next': {'$ref': 'done'}},
+                ],
+            },
+            'done': {
+                'leaf-structured': {
+                    'recommendation': 'Use npm',
+                    'projects': ['org/npm-tool'],
+                    'notes': 'Needs "node" >= 18',
+                },
+            },
+        },
+        'root': {
+            'question': 'Where?',
+            'branches': [
+                {'condition': 'Local', 'next': {'$ref': 'lang'}},
+                {'condition': 'Remote', 'next': {
+                    'question': 'Hosted?',
+                    'branches': [
+                        {'condition': 'Yes', 'next': {'$ref': 'lang'}},
+                        {'condition': 'No', 'next': {'leaf': 'Self-host'}},
+                    ],
+                }},
+            ],
+        },
+    }
+}
+
+LEAF_TREE = {'tree': {'id': 'leaf', 'title': 'Leaf', 'root': {'leaf': 'Always this'}}}
+
+
+def all_trees():
+    return [
+        load_tree(EXAMPLES_DIR / 'mcp-tool-chooser.yaml'),
+        load_tree(EXAMPLES_DIR / 'laptop-chooser.yaml'),
+        SHARED_TREE,
+        LEAF_TREE,
+    ]
+
+
+class CountingEmitter(Emitter):
+    """Counts nodes entered; optionally declines every subtree."""
+
+    def __init__(self, descend: bool = True):
+        self.descend = descend
+        self.entered = 0
+
+    def enter(self, node, visit):
+        self.entered += 1
+        return self.descend
+
+
+class TestFanOut:
+    @pytest.mark.parametrize('tree', all_trees(), ids=lambda t: t['tree']['id'])
+    def test_outputs_match_standalone_renderers(self, tree):
+        mermaid, dot, html, page = io.StringIO(), io.StringIO(), io.StringIO(), io.StringIO()
+        split = MermaidSplitEmitter('LR')
+        coverage = CoverageCollector()
+        fan_out(tree, [
+            MermaidEmitter(mermaid), GraphvizEmitter(dot, 'LR'), HtmlEmitter(html),
+            HtmlEmitter(page, full_page=True, footer_html='<p>F</p>'), split, coverage,
+        ])
+
+        assert mermaid.getvalue() == render_mermaid(tree)
+        assert dot.getvalue() == render_graphviz(tree, 'LR')
+        assert html.getvalue() == render_html(tree)
+        assert page.getvalue() == render_html(tree, full_page=True, footer_html='<p>F</p>')
+        assert json.dumps(split.result) == json.dumps(render_mermaid_split(tree, 'LR'))
+
+        expected = CoverageIndex.from_tree(tree)
+        assert list(coverage.index.keys()) == list(expected.keys())
+        assert coverage.index.to_dict() == expected.to_dict()
+
+    def test_root_ref(self):
+        tree = {'tree': dict(SHARED_TREE['tree'], root={'$ref': 'lang'})}
+        mermaid, html = io.StringIO(), io.StringIO()
+        coverage = CoverageCollector()
+        fan_out(tree, [MermaidEmitter(mermaid), HtmlEmitter(html), coverage])
+        assert mermaid.getvalue() == render_mermaid(tree)
+        assert html.getvalue() == render_html(tree)
+        assert coverage.index.to_dict() == CoverageIndex.from_tree(tree).to_dict()
+
+    def test_shared_subtrees_walked_at_every_reference(self):
+        counter = CountingEmitter()
+        fan_out(SHARED_TREE, [counter])
+        # root, Hosted?, Self-host + 2 x (Language?, Use pip, done)
+        assert counter.entered == 9
+
+    def test_declined_subtrees_are_not_walked(self):
+        counter = CountingEmitter(descend=False)
+        fan_out(SHARED_TREE, [counter])
+        assert counter.entered == 1
+
+    def test_each_emitter_sees_only_what_it_asked_for(self):
+        full, mermaid = CountingEmitter(), io.StringIO()
+        fan_out(SHARED_TREE, [full, MermaidEmitter(mermaid)])
+        assert full.entered == 9
+        assert mermaid.getvalue() == render_mermaid(SHARED_TREE)
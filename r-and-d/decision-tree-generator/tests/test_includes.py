@@ -0,0 +1,161 @@
+"""
+Tests for multi-file trees ($include).
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import (
+    load_tree, LazyInclude, ParseCache, render_mermaid, render_mermaid_split, render_html,
+)
+
+INLINE = {
+    'tree': {
+        'id': 'inc',
+        'title': 'Included',
+        'definitions': {'shared': {'leaf': 'Shared leaf'}},
+        'root': {
+            'question': 'Which?',
+            'branches': [
+                {'condition': 'A', 'next': {
+                    'question': 'A sub?',
+                    'branches': [
+                        {'condition': 'deep', 'next': {'leaf': 'Deep leaf'}},
+                        {'condition': 'ref', 'next': {'$ref': 'shared'}},
+                    ],
+                }},
+                {'condition': 'B', 'next': {'leaf': 'B leaf'}},
+            ],
+        },
+    }
+}
+
+
+@pytest.fixture
+def tree_dir(tmp_path):
+    """INLINE split over several files and directories."""
+    (tmp_path / 'parts').mkdir()
+    (tmp_path / 'deep').mkdir()
+    (tmp_path / 'main.yaml').write_text(
+        'tree:\n'
+        '  id: inc\n'
+        '  title: Included\n'
+        '  definitions:\n'
+        '    shared: {$include: parts/shared.yaml}\n'
+        '  root:\n'
+        '    question: Which?\n'
+        '    branches:\n'
+        '      - condition: A\n'
+        '        next: {$include: parts/a.yaml}\n'
+        '      - condition: B\n'
+        '        next: {$include: parts/b.json}\n'
+    )
+    (tmp_path / 'parts' / 'a.yaml').write_text(
+        'question: A sub?\n'
+        'branches:\n'
+        '  - condition: deep\n'
+        '    next: {$include: ../deep/d.yaml}\n'
+        '  - condition: ref\n'
+        '    next: {$ref: shared}\n'
+    )
+    (tmp_path / 'parts' / 'b.json').write_text('{"leaf": "B leaf"}')
+    (tmp_path / 'parts' / 'shared.yaml').write_text('leaf: Shared leaf\n')
+    (tmp_path / 'deep' / 'd.yaml').write_text('leaf: Deep leaf\n')
+    return tmp_path
+
+
+def names(paths):
+    return sorted(Path(p).name for p in paths)
+
+
+class TestIncludes:
+    def test_includes_resolve_relative_to_parent(self, tree_dir):
+        includes = []
+        tree = load_tree(tree_dir / 'main.yaml', includes=includes)
+        assert tree == INLINE
+        assert names(includes) == ['a.yaml', 'b.json', 'd.yaml', 'shared.yaml']
+        assert render_mermaid(tree) == render_mermaid(INLINE)
+
+    def test_include_cycle(self, tree_dir):
+        (tree_dir / 'deep' / 'd.yaml').write_text('{$include: ../parts/a.yaml}\n')
+        with pytest.raises(ValueError, match=r"Cycle in \$include: a.yaml -> d.yaml -> a.yaml"):
+            load_tree(tree_dir / 'main.yaml')
+
+    def test_missing_include(self, tree_dir):
+        (tree_dir / 'parts' / 'b.json').unlink()
+        with pytest.raises(FileNotFoundError, match=r"\$include file not found at 1"):
+            load_tree(tree_dir / 'main.yaml')
+
+    def test_include_with_extra_keys(self, tree_dir):
+        (tree_dir / 'parts' / 'b.json').write_text('{"$include": "x.yaml", "leaf": "X"}')
+        with pytest.raises(ValueError, match="must not have other keys"):
+            load_tree(tree_dir / 'main.yaml')
+
+    def test_parse_cache_keyed_by_content(self, tree_dir):
+        # Two files with the same bytes are parsed once, yet loaded independently
+        (tree_dir / 'deep' / 'd.yaml').write_text('leaf: B leaf\n')
+        (tree_dir / 'parts' / 'b.json').unlink()
+        main = tree_dir / 'main.yaml'
+        main.write_text(main.read_text().replace('parts/b.json', 'deep/copy.yaml'))
+        (tree_dir / 'deep' / 'copy.yaml').write_text('leaf: B leaf\n')
+
+        cache = ParseCache()
+        first = load_tree(main, parse_cache=cache)
+        assert (cache.misses, cache.hits) == (3, 1)
+        second = load_tree(main, parse_cache=cache)
+        assert (cache.misses, cache.hits) == (3, 5)
+        assert first == second
+        assert first['tree']['root'] is not second['tree']['root']
+
+
+class TestLazyIncludes:
+    def test_files_read_on_first_touch(self, tree_dir):
+        includes = []
+        tree = load_tree(tree_dir / 'main.yaml', lazy_includes=True, includes=includes)
+        # Definitions are always resolved up front
+        assert names(includes) == ['shared.yaml']
+        a = tree['tree']['root']['branches'][0]['next']
+        assert isinstance(a, LazyInclude) and not a.loaded
+
+        assert a['question'] == 'A sub?'
+        assert names(includes) == ['a.yaml', 'shared.yaml']
+        assert isinstance(a['branches'][0]['next'], LazyInclude)
+
+    def test_renders_match_eager_load(self, tree_dir):
+        eager = load_tree(tree_dir / 'main.yaml')
+        for render in (render_mermaid, render_html, json.dumps):
+            assert render(load_tree(tree_dir / 'main.yaml', lazy_includes=True)) == render(eager)
+
+    def test_split_reads_only_chosen_sections(self, tree_dir):
+        includes = []
+        tree = load_tree(tree_dir / 'main.yaml', lazy_includes=True, includes=includes)
+        split = render_mermaid_split(tree, sections=[1])
+        assert names(includes) == ['b.json', 'shared.yaml']
+
+        full = render_mermaid_split(load_tree(tree_dir / 'main.yaml'))
+        assert split['overview'] == full['overview']
+        assert split['sections'] == full['sections'][1:]
+
+    def test_root_include_is_validated_at_load(self, tree_dir):
+        main = tree_dir / 'main.yaml'
+        main.write_text('tree:\n  id: t\n  root: {$include: parts/root.yaml}\n')
+        (tree_dir / 'parts' / 'root.yaml').write_text(
+            'question: Q?\nbranches:\n  - condition: A\n    next: {$include: a.yaml}\n')
+        tree = load_tree(main, lazy_includes=True)
+        root = tree['tree']['root']
+        assert type(root) is dict and root['question'] == 'Q?'
+        assert isinstance(root['branches'][0]['next'], LazyInclude)
+
+        (tree_dir / 'parts' / 'root.yaml').write_text('invalid: X\n')
+        with pytest.raises(ValueError, match="Node at root must have exactly one of"):
+            load_tree(main, lazy_includes=True)
+
+    def test_errors_surface_when_touched(self, tree_dir):
+        (tree_dir / 'parts' / 'b.json').write_text('{"invalid": "X"}')
+        tree = load_tree(tree_dir / 'main.yaml', lazy_includes=True)
+        with pytest.raises(ValueError, match="Node at 1 must have exactly one of"):
+            render_mermaid(tree)
@@ -0,0 +1,117 @@
+"""
+Tests for decision-tree induction from catalog facets.
+"""
+
+import json
+import random
+import pytest
+import yaml
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import Classifier, induce_tree, load_tree, render_mermaid, validate_tree
+from decision_tree.cli import main
+from decision_tree.induce import catalog_facets
+
+PROJECTS = {
+    'org/local': {'transports': {'stdio': True, 'http': False}, 'category': 'cli-client'},
+    'org/cli': {'transports': {'stdio': True, 'http': True}, 'category': 'cli-client',
+                'installation': {'pip': 'pip install cli'}},
+    'org/bridge': {'transports': {'stdio': True, 'sse': True}, 'category': 'http-bridge',
+                   'installation': {'npm': 'npx bridge'}},
+    'org/proxy': {'transports': {'http': True, 'sse': True}, 'category': 'http-bridge',
+                  'authentication': {'oauth2': True}},
+    'org/gateway': {'transports': {'http': True}, 'category': 'enterprise-gateway',
+                    'authentication': {'oauth2': True}, 'installation': {'pip': 'pip install gw'}},
+}
+
+
+def leaves(node):
+    if 'question' not in node:
+        return [node['leaf-structured']]
+    return [leaf for branch in node['branches'] for leaf in leaves(branch['next'])]
+
+
+def depth(node):
+    return 0 if 'question' not in node else 1 + max(depth(b['next']) for b in node['branches'])
+
+
+class TestCatalogFacets:
+    def test_facet_kinds(self):
+        facets = {(path, value): mask for path, value, mask in catalog_facets(PROJECTS)}
+        assert facets[('transports.sse', None)] == 0b01100
+        # Repeated strings are enumerations, one-off strings presence tests
+        assert facets[('category', 'http-bridge')] == 0b01100
+        assert facets[('installation.pip', None)] == 0b10010
+        assert facets[('category', 'enterprise-gateway')] == 0b10000
+        # Missing booleans count as false
+        assert facets[('transports.stdio', None)] == 0b00111
+
+        # Tests that split nobody are dropped
+        same = {name: dict(project, category='x') for name, project in PROJECTS.items()}
+        assert not [facet for facet in catalog_facets(same) if facet[0] == 'category']
+
+
+class TestInduceTree:
+    def test_separates_projects(self):
+        tree = induce_tree(PROJECTS, generated_from='projects/*.yaml')
+        validate_tree(tree)
+        assert tree['tree']['metadata'] == {'generated-from': 'projects/*.yaml'}
+        assert sorted(p for leaf in leaves(tree['tree']['root']) for p in leaf['projects']) == sorted(PROJECTS)
+        assert all(len(leaf['projects']) == 1 for leaf in leaves(tree['tree']['root']))
+        results = Classifier(tree).classify(PROJECTS)
+        assert {result['status'] for result in results.values()} == {'listed'}
+        assert 'flowchart TD' in render_mermaid(tree)
+
+    def test_target_and_limits(self):
+        tree = induce_tree(PROJECTS, target='category', criterion='gini')
+        root = tree['tree']['root']
+        assert not any(b['when'].startswith('category') for b in root['branches'])
+        assert {leaf['recommendation'] for leaf in leaves(root)} == {
+            'category: cli-client', 'category: http-bridge', 'category: enterprise-gateway'}
+
+        shallow = induce_tree(PROJECTS, max_depth=1)['tree']['root']
+        assert depth(shallow) == 1
+        assert induce_tree(PROJECTS, min_leaf=3)['tree']['root'] == {'leaf-structured': {
+            'recommendation': '5 projects', 'projects': list(PROJECTS)}}
+
+    def test_larger_catalog(self):
+        rng = random.Random(7)
+        categories = ['a', 'b', 'c', 'd']
+        projects = {}
+        for i in range(2000):
+            category = rng.choice(categories)
+            facets = {f'f{j}': rng.random() < 0.3 for j in range(100)}
+            # f0 and f1 together decide the category
+            facets['f0'], facets['f1'] = category in 'ab', category in 'ac'
+            projects[f'org/p{i}'] = {'transports': facets, 'category': category}
+        tree = induce_tree(projects, target='category', max_depth=2)
+        assert all('notes' not in leaf for leaf in leaves(tree['tree']['root']))
+        assert depth(tree['tree']['root']) == 2
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match='empty catalog'):
+            induce_tree({})
+        with pytest.raises(ValueError, match='Unknown criterion'):
+            induce_tree(PROJECTS, criterion='chi2')
+
+
+class TestInduceCommand:
+    def test_writes_loadable_tree(self, tmp_path):
+        projects = tmp_path / 'projects'
+        projects.mkdir()
+        for name, data in PROJECTS.items():
+            (projects / (name.replace('/', '--') + '.yaml')).write_text(yaml.safe_dump(data))
+
+        output = tmp_path / 'tree.yaml'
+        main(['induce', str(projects), '-o', str(output), '--id', 'catalog', '-d', '2'])
+        tree = load_tree(output)
+        assert tree['tree']['id'] == 'catalog'
+        assert depth(tree['tree']['root']) == 2
+
+        main(['induce', str(projects), '-o', str(tmp_path / 'tree.json')])
+        assert json.loads((tmp_path / 'tree.json').read_text()) == induce_tree(
+            {name: PROJECTS[name] for name in sorted(PROJECTS, key=lambda n: n.replace('/', '--'))},
+            generated_from=f'{projects}/*.yaml')
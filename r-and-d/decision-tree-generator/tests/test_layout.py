@@ -0,0 +1,75 @@
+"""
+Tests for the tidy tree layout.
+"""
+
+import random
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree.layout import tidy_layout
+
+
+def random_tree(size: int, seed: int) -> list:
+    """Child lists of a random tree with nodes numbered in pre-order."""
+    rng = random.Random(seed)
+    children = [[] for _ in range(size)]
+    spine = [0]
+    for v in range(1, size):
+        # Attach to a node on the current rightmost path, keeping pre-order
+        spine = spine[:rng.randrange(1, len(spine) + 1)]
+        children[spine[-1]].append(v)
+        spine.append(v)
+    return children
+
+
+def rows(children: list) -> dict:
+    """Nodes of each depth, left to right."""
+    by_depth = {}
+    stack = [(0, 0)]
+    while stack:
+        v, depth = stack.pop()
+        by_depth.setdefault(depth, []).append(v)
+        stack.extend((w, depth + 1) for w in reversed(children[v]))
+    return by_depth
+
+
+class TestTidyLayout:
+    """Test layout invariants."""
+
+    def test_single_node(self):
+        assert tidy_layout([[]], [50.0]) == [0.0]
+
+    def test_parent_centred_over_children(self):
+        children = [[1, 2, 3], [], [], []]
+        x = tidy_layout(children, [40.0] * 4, gap=10)
+        assert x[0] == pytest.approx((x[1] + x[3]) / 2)
+        assert x[2] - x[1] == pytest.approx(50)
+
+    @pytest.mark.parametrize('seed', range(25))
+    def test_no_overlap_and_centred(self, seed):
+        """Neighbours keep the gap and parents stay centred, for any widths."""
+        rng = random.Random(seed)
+        children = random_tree(rng.randrange(2, 120), seed)
+        widths = [rng.uniform(10, 150) for _ in children]
+        x = tidy_layout(children, widths, gap=8)
+
+        for row in rows(children).values():
+            for a, b in zip(row, row[1:]):
+                assert x[b] - x[a] >= (widths[a] + widths[b]) / 2 + 8 - 1e-6
+        for v, kids in enumerate(children):
+            if kids:
+                assert x[v] == pytest.approx((x[kids[0]] + x[kids[-1]]) / 2)
+
+    def test_deep_chain(self):
+        """Deep trees do not hit the recursion limit."""
+        size = sys.getrecursionlimit() * 3
+        children = [[v + 1] for v in range(size - 1)] + [[]]
+        x = tidy_layout(children, [30.0] * size)
+        assert len(set(x)) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
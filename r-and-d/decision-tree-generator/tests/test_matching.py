@@ -0,0 +1,102 @@
+"""
+Tests for project-name matching (canonical keys, Aho-Corasick).
+"""
+
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import check_coverage
+from decision_tree.matching import (
+    AhoCorasick,
+    canonical_project_key,
+    match_names_in_texts,
+    project_keys_in_text,
+    project_ref,
+)
+
+
+class TestCanonicalKeys:
+    """Test owner/repo normalization."""
+
+    @pytest.mark.parametrize('text, expected', [
+        ('https://github.com/Adhikasp/MCP-Client-CLI', 'adhikasp/mcp-client-cli'),
+        ('https://github.com/org/repo.git', 'org/repo'),
+        ('https://github.com/org/repo/tree/main/docs', 'org/repo'),
+        ('projects/Org--Repo.yaml', 'org/repo'),
+        ('f--mcptools.yaml', 'f/mcptools'),
+        ('Org/Repo', 'org/repo'),
+        ('Use org/repo', None),
+        ('https://example.com/not/github', None),
+        ('', None),
+    ])
+    def test_canonical_project_key(self, text, expected):
+        assert canonical_project_key(text) == expected
+
+    def test_project_ref_keeps_case(self):
+        assert project_ref('https://github.com/MladenSU/cli-mcp-server') == 'MladenSU/cli-mcp-server'
+
+    def test_keys_in_leaf_text(self):
+        text = 'Use winterfx/mcpcli or Deniscartin/mcp-cli.'
+        assert project_keys_in_text(text) == ['winterfx/mcpcli', 'deniscartin/mcp-cli']
+
+
+class TestAhoCorasick:
+    """Test the multi-pattern matcher."""
+
+    def test_classic_example(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+        matches = sorted(
+            (start, automaton.patterns[pid]) for start, pid in automaton.iter_matches('ushers')
+        )
+        assert matches == [(1, 'she'), (2, 'he'), (2, 'hers')]
+
+    def test_matches_naive_search(self):
+        patterns = ['ab', 'b', 'bab', 'aab', 'abab']
+        text = 'aababbabab'
+        automaton = AhoCorasick(patterns)
+        expected = sorted(
+            (i, pid) for pid, p in enumerate(patterns)
+            for i in range(len(text)) if text.startswith(p, i)
+        )
+        assert sorted(automaton.iter_matches(text)) == expected
+
+
+class TestWholeNameMatching:
+    """Test match_names_in_texts boundaries."""
+
+    def test_no_match_inside_other_owner(self):
+        """f/mcptools must not match posit-dev/mcptools."""
+        assert match_names_in_texts(['f/mcptools'], ['posit-dev/mcptools']) == {}
+
+    def test_bare_repo_name_matches(self):
+        assert match_names_in_texts(['b1-main'], ['org/b1-main']) == {'b1-main': 'org/b1-main'}
+
+    def test_case_insensitive_first_text_wins(self):
+        texts = ['Use Org/Tool here', 'org/tool']
+        assert match_names_in_texts(['org/TOOL'], texts) == {'org/TOOL': 'Use Org/Tool here'}
+
+
+    def test_dotted_names(self):
+        """A '.' inside a name is part of it; a full stop is not."""
+        texts = ['Use vercel/next.js', 'See org/mcp.tools']
+        assert match_names_in_texts(['vercel/next', 'org/mcp'], texts) == {}
+        assert match_names_in_texts(['vercel/next.js', 'mcp.tools'], texts) == {
+            'vercel/next.js': 'Use vercel/next.js', 'mcp.tools': 'See org/mcp.tools'}
+        assert match_names_in_texts(['org/mcp'], ['Try org/mcp.', 'x.org/mcp']) == {'org/mcp': 'Try org/mcp.'}
+
+    def test_coverage_of_dotted_names(self):
+        tree = {'tree': {'id': 't', 'root': {'question': 'Q?', 'branches': [
+            {'condition': 'A', 'next': {'leaf': 'Use vercel/next.js'}},
+            {'condition': 'B', 'next': {'leaf-structured': {'recommendation': 'Tools',
+                                                             'projects': ['org/mcp.tools']}}},
+        ]}}}
+        report = check_coverage(tree, ['vercel/next', 'org/mcp', 'org/mcp.tools'])
+        assert list(report['covered']) == ['org/mcp.tools']
+        assert report['missing'] == ['vercel/next', 'org/mcp']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,137 @@
+"""
+Tests for lazy path enumeration.
+"""
+
+import io
+import json
+import itertools
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import load_tree, iter_paths, extract_referenced_items
+from decision_tree.cli import write_paths
+
+
+SAMPLE_TREE = {
+    'tree': {
+        'id': 'test-tree',
+        'title': 'Test Decision Tree',
+        'root': {
+            'question': 'What do you need?',
+            'branches': [
+                {'condition': 'Option A', 'next': {'leaf': 'Use tool-a/project'}},
+                {
+                    'condition': 'Option B',
+                    'next': {
+                        'question': 'More specific?',
+                        'branches': [
+                            {
+                                'condition': 'Sub B1',
+                                'next': {
+                                    'leaf-structured': {
+                                        'recommendation': 'Use B1 tools',
+                                        'projects': ['org/b1-main', 'org/b1-alt'],
+                                    }
+                                }
+                            },
+                            {'condition': 'Sub B2', 'next': {'leaf': 'Use org/b2-tool'}},
+                        ]
+                    }
+                },
+                {
+                    'condition': 'Option C',
+                    'next': {
+                        'leaf-structured': {
+                            'recommendation': 'Use C tools',
+                            'projects': ['org/c-project'],
+                        }
+                    }
+                },
+            ]
+        }
+    }
+}
+
+
+def _chained_definitions(depth: int) -> dict:
+    """Tree whose $ref DAG expands to 2**depth root-to-leaf paths."""
+    definitions = {f'd{depth}': {'leaf': 'End'}}
+    for i in range(depth - 1, -1, -1):
+        definitions[f'd{i}'] = {
+            'question': f'Level {i}?',
+            'branches': [
+                {'condition': 'L', 'next': {'$ref': f'd{i + 1}'}},
+                {'condition': 'R', 'next': {'$ref': f'd{i + 1}'}},
+            ]
+        }
+    return {'tree': {'id': 'wide', 'definitions': definitions, 'root': {'$ref': 'd0'}}}
+
+
+class TestIterPaths:
+    """Test iter_paths generator."""
+
+    def test_matches_extract_referenced_items(self):
+        """Same pairs, same depth-first order as the eager extraction."""
+        eager = [
+            (item, tuple(path))
+            for item, paths in extract_referenced_items(SAMPLE_TREE['tree']['root']).items()
+            for path in paths
+        ]
+        lazy = list(iter_paths(SAMPLE_TREE))
+        assert sorted(lazy) == sorted(eager)
+        assert lazy[0] == ('Use tool-a/project', ('Option A',))
+        assert lazy[1] == ('org/b1-main', ('Option B', 'Sub B1'))
+
+    def test_item_filter(self):
+        assert list(iter_paths(SAMPLE_TREE, item='org/c-project')) == [
+            ('org/c-project', ('Option C',))
+        ]
+        assert list(iter_paths(SAMPLE_TREE, item='missing')) == []
+
+    def test_leaf_root(self):
+        tree = {'tree': {'id': 't', 'root': {'leaf': 'Only'}}}
+        assert list(iter_paths(tree)) == [('Only', ())]
+
+    def test_is_lazy_on_exponential_dag(self):
+        """2**40 paths: only the requested ones are ever produced."""
+        tree = _chained_definitions(40)
+        first = list(itertools.islice(iter_paths(tree), 3))
+        assert first[0] == ('End', ('L',) * 40)
+        assert first[1] == ('End', ('L',) * 39 + ('R',))
+        assert first[2] == ('End', ('L',) * 38 + ('R', 'L'))
+
+    def test_deterministic(self):
+        tree = load_tree(Path(__file__).parent.parent / 'examples' / 'mcp-tool-chooser.yaml')
+        runs = [list(iter_paths(tree)) for _ in range(3)]
+        assert runs[0] == runs[1] == runs[2]
+
+
+class TestPathsCli:
+    """Test dt-paths output formats."""
+
+    def test_tsv(self):
+        buf = io.StringIO()
+        write_paths(buf, SAMPLE_TREE, 'tsv')
+        lines = buf.getvalue().splitlines()
+        assert lines[0] == 'item\tpath'
+        assert 'org/b1-main\tOption B → Sub B1' in lines
+
+    def test_tsv_escapes_tabs(self):
+        tree = {'tree': {'id': 't', 'root': {'question': 'Q', 'branches': [
+            {'condition': 'a\tb', 'next': {'leaf': 'x\ny'}}]}}}
+        buf = io.StringIO()
+        write_paths(buf, tree, 'tsv')
+        assert buf.getvalue().splitlines()[1] == 'x\\ny\ta\\tb'
+
+    def test_ndjson(self):
+        buf = io.StringIO()
+        write_paths(buf, SAMPLE_TREE, 'ndjson', item='org/b1-alt')
+        records = [json.loads(line) for line in buf.getvalue().splitlines()]
+        assert records == [{'item': 'org/b1-alt', 'path': ['Option B', 'Sub B1']}]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
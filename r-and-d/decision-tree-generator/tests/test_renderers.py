@@ -8,7 +8,15 @@ from pathlib import Path
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from decision_tree import render_mermaid, render_html, render_graphviz
+import json
+
+from decision_tree import (
+    render_mermaid, render_mermaid_partitioned, render_html, render_html_explorer, render_graphviz,
+    render_svg,
+)
+import xml.etree.ElementTree as ET
+from decision_tree.compact import compact_tree, compact_json, short_id
+from decision_tree.search import build_search_index, tokenize
 
 
 SAMPLE_TREE = {
@@ -193,5 +201,387 @@ class TestStructuredLeaf:
         assert 'class="notes"' in output
 
 
+class TestSharedSubtrees:
+    """Test that $ref subtrees are emitted once."""
+
+    SHARED_TREE = {
+        'tree': {
+            'id': 'shared-test',
+            'title': 'Shared',
+            'definitions': {
+                'auth-needs': {
+                    'question': 'Need auth?',
+                    'branches': [
+                        {'condition': 'OAuth', 'next': {'leaf': 'Use org/oauth-tool'}},
+                        {'condition': 'None', 'next': {'leaf': 'Use org/plain-tool'}},
+                    ]
+                }
+            },
+            'root': {
+                'question': 'Q?',
+                'branches': [
+                    {'condition': 'CLI', 'next': {'$ref': 'auth-needs'}},
+                    {'condition': 'HTTP', 'next': {'$ref': 'auth-needs'}},
+                    {'condition': 'Other', 'next': {'leaf': 'Ask around'}},
+                ]
+            }
+        }
+    }
+
+    def test_mermaid_emits_shared_subtree_once(self):
+        """Mermaid should have one shared node with two incoming edges."""
+        output = render_mermaid(self.SHARED_TREE)
+        assert output.count('Need auth?') == 1
+        assert output.count('Use org/oauth-tool') == 1
+        assert 'shared_test_root -->|"CLI"| shared_test_ref_auth_needs' in output
+        assert 'shared_test_root -->|"HTTP"| shared_test_ref_auth_needs' in output
+        assert 'shared_test_ref_auth_needs -->|"OAuth"| shared_test_ref_auth_needs_0' in output
+
+    def test_graphviz_emits_shared_subtree_once(self):
+        """Graphviz should have one shared node with two incoming edges."""
+        output = render_graphviz(self.SHARED_TREE)
+        assert output.count('Need auth?') == 1
+        assert 'n_root -> n_ref_auth_needs [label="CLI"];' in output
+        assert 'n_root -> n_ref_auth_needs [label="HTTP"];' in output
+
+    def test_html_uses_template_once(self):
+        """HTML should render the shared subtree once in a <template>."""
+        output = render_html(self.SHARED_TREE)
+        assert output.count('Need auth?') == 1
+        assert output.count('<details data-ref="auth-needs">') == 2
+        assert '<template data-ref-def="auth-needs">' in output
+        assert '<script>' in output
+
+    def test_html_ref_names_are_escaped(self):
+        """Names with quotes or brackets match their template via CSS.escape."""
+        tree = json.loads(json.dumps(self.SHARED_TREE).replace('auth-needs', 'auth[\\"needs\\"]'))
+        output = render_html(tree)
+        assert output.count('<details data-ref="auth[&quot;needs&quot;]">') == 2
+        assert '<template data-ref-def="auth[&quot;needs&quot;]">' in output
+        assert 'CSS.escape(d.dataset.ref)' in output
+
+    def test_html_without_refs_has_no_script(self):
+        """Trees without $ref should not get the expand script."""
+        assert '<script>' not in render_html(SAMPLE_TREE)
+
+
+def make_wide_tree(width: int, depth: int) -> dict:
+    """Complete tree with ``width`` branches per question, ``depth`` levels deep."""
+    def build(level, label):
+        if level == depth:
+            return {'leaf': f'Leaf {label}'}
+        return {
+            'question': f'Q {label}?',
+            'branches': [
+                {'condition': f'C{label}.{i}', 'next': build(level + 1, f'{label}.{i}')}
+                for i in range(width)
+            ]
+        }
+    return {'tree': {'id': 'wide', 'title': 'Wide', 'root': build(0, 'r')}}
+
+
+class TestMermaidPartitioned:
+    """Test size-budgeted Mermaid partitioning."""
+
+    def test_small_tree_is_one_section(self):
+        """A tree within the budget is not cut."""
+        result = render_mermaid_partitioned(SAMPLE_TREE, max_nodes=10)
+        assert len(result['sections']) == 1
+        section = result['sections'][0]
+        assert section['id'] == 'section-root'
+        assert section['node_count'] == 3
+        assert 'click' not in section['mermaid']
+
+    def test_sections_respect_budget(self):
+        """Every section stays within max_nodes, and all nodes are drawn."""
+        tree = make_wide_tree(3, 4)  # 121 nodes
+        for max_nodes in (4, 10, 30):
+            result = render_mermaid_partitioned(tree, max_nodes=max_nodes)
+            assert all(s['node_count'] <= max_nodes for s in result['sections'])
+            labels = ''.join(s['mermaid'] for s in result['sections'])
+            assert labels.count('("Leaf ') == 81
+
+    def test_stubs_link_to_sections(self):
+        """Cut children are stubs with click links to existing sections."""
+        result = render_mermaid_partitioned(make_wide_tree(3, 3), max_nodes=6)
+        ids = {s['id'] for s in result['sections']}
+        root = result['sections'][0]['mermaid']
+        assert 'wide_0[["Q r.0?"]]' in root
+        assert 'click wide_0 "#section-0"' in root
+        assert 'section-0' in ids
+        assert '  * [Cr.0](#section-0)' in result['index']
+
+    def test_shared_subtree_gets_one_section(self):
+        """$ref children become stubs to a single definition section."""
+        result = render_mermaid_partitioned(TestSharedSubtrees.SHARED_TREE, max_nodes=10)
+        ids = [s['id'] for s in result['sections']]
+        assert ids == ['section-root', 'section-ref-auth_needs']
+        root = result['sections'][0]['mermaid']
+        assert root.count('click shared_test_ref_auth_needs "#section-ref-auth_needs"') == 1
+        assert 'Use org/oauth-tool' in result['sections'][1]['mermaid']
+
+    def test_deterministic(self):
+        """Partitioning the same tree twice gives identical output."""
+        tree = make_wide_tree(4, 3)
+        assert render_mermaid_partitioned(tree, max_nodes=7) == render_mermaid_partitioned(tree, max_nodes=7)
+
+    def test_rejects_tiny_budget(self):
+        """A budget below two nodes cannot hold a stub and its parent."""
+        with pytest.raises(ValueError):
+            render_mermaid_partitioned(SAMPLE_TREE, max_nodes=1)
+
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+
+
+class TestSvgRenderer:
+    """Test the direct SVG renderer."""
+
+    def parse(self, tree):
+        return ET.fromstring(render_svg(tree))
+
+    def test_well_formed(self):
+        """Output parses as XML with an svg root and a title."""
+        root = self.parse(SAMPLE_TREE)
+        assert root.tag == SVG_NS + 'svg'
+        assert root.find(SVG_NS + 'title').text == 'Sample Decision Tree'
+
+    def test_one_group_per_node(self):
+        """Every node becomes a <g> with a path-based id."""
+        root = self.parse(SAMPLE_TREE)
+        ids = [g.get('id') for g in root.iter(SVG_NS + 'g') if g.get('id')]
+        assert ids == ['n_root', 'n_0', 'n_1']
+
+    def test_nodes_fit_in_viewbox(self):
+        """All boxes lie within the declared image size."""
+        root = self.parse(make_wide_tree(3, 3))
+        width, height = float(root.get('width')), float(root.get('height'))
+        for rect in root.iter(SVG_NS + 'rect'):
+            x, y = float(rect.get('x')), float(rect.get('y'))
+            assert 0 <= x and x + float(rect.get('width')) <= width
+            assert 0 <= y and y + float(rect.get('height')) <= height
+
+    def test_labels_escaped(self):
+        """Markup characters in labels are escaped."""
+        tree = {'tree': {'id': 't', 'root': {'leaf': 'a < b & c'}}}
+        output = render_svg(tree)
+        assert 'a &lt; b &amp; c' in output
+        ET.fromstring(output)
+
+    def test_shared_subtree_drawn_once(self):
+        """$ref sites are linked stubs; the definition is drawn once."""
+        output = render_svg(TestSharedSubtrees.SHARED_TREE)
+        assert output.count('Use org/oauth-tool') == 1
+        assert output.count('<a href="#n_ref_auth_needs">') == 2
+        assert '<g id="n_ref_auth_needs">' in output
+        assert 'Shared: auth-needs' in output
+
+
+class TestCompactDiagrams:
+    """Test compact Mermaid and Graphviz output."""
+
+    REPEATED_TREE = {
+        'tree': {
+            'id': 'repeated',
+            'definitions': {'auth': {'question': 'Auth?', 'branches': [
+                {'condition': 'Yes', 'next': {'leaf': 'Use org/tool'}},
+                {'condition': 'No', 'next': {'leaf': 'Use org/plain'}},
+            ]}},
+            'root': {
+                'question': 'Where?',
+                'branches': [
+                    {'condition': 'Local', 'next': {'leaf': 'Use org/tool'}},
+                    {'condition': 'Remote', 'next': {'$ref': 'auth'}},
+                    {'condition': 'Cloud', 'next': {'$ref': 'auth'}},
+                    {'condition': 'Other', 'next': {'leaf-structured': {
+                        'recommendation': 'Use org/tool', 'projects': ['org/tool']}}},
+                ],
+            },
+        }
+    }
+
+    def test_short_ids(self):
+        assert [short_id(i) for i in (0, 35, 36, 18985)] == ['n0', 'nz', 'n10', 'nend']
+
+    def test_graphviz_quotes_keyword_ids(self):
+        """Node 31586 gets the short id 'node', which DOT reads as a keyword."""
+        assert short_id(31586) == 'node'
+        output = render_graphviz(make_wide_tree(4, 8), compact=True)
+        assert '    "node" [label=' in output
+        assert ' -> "node" [label=' in output
+        assert not any(line.startswith('    node [label=') for line in output.splitlines())
+
+    def test_mermaid_merges_identical_leaves(self):
+        output = render_mermaid(self.REPEATED_TREE, compact=True)
+        assert output.count('("Use org/tool")') == 1
+        assert output.count('["Auth?"]') == 1
+        tool = next(line.split('(')[0].strip() for line in output.splitlines() if 'Use org/tool' in line)
+        # Local, the Auth? question (shared) and Other all point at one node
+        assert sum(line.endswith(f'| {tool}') for line in output.splitlines()) == 3
+        assert 'repeated_' not in output.split('flowchart TD')[1]
+
+    def test_graphviz_hoists_leaf_style(self):
+        output = render_graphviz(self.REPEATED_TREE, compact=True)
+        assert output.count('fillcolor=lightgreen') == 1
+        assert output.count('label="Use org/tool"') == 1
+        assert 'node [fontname="Helvetica" fontsize=10 shape=box];' in output
+        # Leaves are declared after the leaf defaults, questions before
+        lines = output.splitlines()
+        defaults = lines.index('    node [shape=ellipse style=filled fillcolor=lightgreen];')
+        assert all('Use org' in line for line in lines[defaults + 1:defaults + 3])
+
+    def test_smaller_than_default(self):
+        from decision_tree import load_tree
+        tree = load_tree(Path(__file__).parent.parent / 'examples' / 'mcp-tool-chooser.yaml')
+        for render in (render_mermaid, render_graphviz):
+            assert len(render(tree, compact=True)) < 0.8 * len(render(tree))
+        assert render_mermaid(tree, compact=True).count('-->') == render_mermaid(tree).count('-->')
+
+
+class TestCompactTree:
+    """Test the compact JSON form used by the explorer."""
+
+    def test_strings_interned(self):
+        """Repeated strings are stored once."""
+        yes_no = {'question': 'Sure?', 'branches': [
+            {'condition': 'Yes', 'next': {'leaf': 'Go'}},
+            {'condition': 'No', 'next': {'leaf': 'Stop'}},
+        ]}
+        tree = {'tree': {'id': 't', 'root': {'question': 'Sure?', 'branches': [
+            {'condition': 'Yes', 'next': yes_no},
+            {'condition': 'No', 'next': {'leaf': 'Stop'}},
+        ]}}}
+        compact = compact_tree(tree)
+        assert compact['s'] == ['Sure?', 'Yes', 'No', 'Go', 'Stop']
+        assert len(compact['n']) == 5
+
+    def test_node_records(self):
+        """Questions list (condition, child) pairs; leaves their text."""
+        compact = compact_tree(SAMPLE_TREE)
+        s, n = compact['s'], compact['n']
+        root = n[compact['r']]
+        assert root[0] == 0 and s[root[1]] == 'First question?'
+        assert [s[root[2][0]], s[n[root[2][1]][1]]] == ['Yes', 'Do this']
+
+    def test_shared_subtree_stored_once(self):
+        """Both $ref branches point at the same node id."""
+        compact = compact_tree(TestSharedSubtrees.SHARED_TREE)
+        kids = compact['n'][compact['r']][2]
+        assert kids[1] == kids[3]
+        assert sum(1 for node in compact['n'] if node[0] == 0) == 2
+
+    def test_json_safe_in_script(self):
+        """Embedded JSON cannot close its <script> element."""
+        tree = {'tree': {'id': 't', 'root': {'leaf': '</script><!-- x'}}}
+        text = compact_json(compact_tree(tree))
+        assert '<' not in text
+        assert json.loads(text)['s'] == ['</script><!-- x']
+
+
+class TestHtmlExplorer:
+    """Test the lazy-loading HTML explorer."""
+
+    def test_tree_embedded_once(self):
+        """Labels appear once in the JSON, plus once in the <noscript> fallback."""
+        output = render_html_explorer(SAMPLE_TREE)
+        assert output.count('Do this') == 2
+        assert '<script type="application/json" class="dt-data">' in output
+        assert '<div class="dt-root"></div>' in output
+
+    def test_noscript_fallback(self):
+        """The fallback is the static tree with each shared subtree once, linked."""
+        output = render_html_explorer(TestSharedSubtrees.SHARED_TREE)
+        fallback = output.split('<noscript>')[1].split('</noscript>')[0]
+        assert fallback.count('Use org/oauth-tool') == 1
+        assert fallback.count('<a href="#shared-test-ref-auth-needs">Need auth?</a>') == 2
+        assert '<div class="ref-def" id="shared-test-ref-auth-needs">' in fallback
+        assert 'data-ref' not in fallback
+
+    def test_noscript_fallback_size_with_nested_refs(self):
+        """Definitions that each reference the next twice stay linear in size."""
+        levels = 15
+        definitions = {f'd{levels}': {'question': f'Q{levels}?', 'branches': [
+            {'condition': 'a', 'next': {'leaf': 'Use org/a'}}, {'condition': 'b', 'next': {'leaf': 'Use org/b'}}]}}
+        for i in range(levels - 1, -1, -1):
+            definitions[f'd{i}'] = {'question': f'Q{i}?', 'branches': [
+                {'condition': 'a', 'next': {'$ref': f'd{i + 1}'}}, {'condition': 'b', 'next': {'$ref': f'd{i + 1}'}}]}
+        tree = {'tree': {'id': 'nested', 'definitions': definitions, 'root': {'$ref': 'd0'}}}
+        output = render_html_explorer(tree)
+        assert len(output) < 20000
+        fallback = output.split('<noscript>')[1]
+        assert fallback.count('Use org/a') == 1
+        assert fallback.count('id="nested-ref-d15"') == 1
+
+    def test_full_page(self):
+        """Full page mode wraps the explorer like render_html."""
+        output = render_html_explorer(SAMPLE_TREE, full_page=True, footer_html='<footer>f</footer>\n')
+        assert output.startswith('<!DOCTYPE html>')
+        assert '<footer>f</footer>\n</body>' in output
+
+    def test_deterministic(self):
+        """Rendering twice gives identical output."""
+        tree = make_wide_tree(3, 3)
+        assert render_html_explorer(tree) == render_html_explorer(tree)
+
+
+class TestSearchIndex:
+    """Test the explorer's precomputed search index."""
+
+    STRUCTURED_TREE = {
+        'tree': {
+            'id': 'search-test',
+            'root': {
+                'question': 'Which transport?',
+                'branches': [
+                    {'condition': 'HTTP with OAuth', 'next': {'leaf-structured': {
+                        'recommendation': 'Use apify/mcp-cli',
+                        'projects': ['apify/mcp-cli'],
+                        'notes': 'Keychain storage',
+                    }}},
+                    {'condition': 'stdio', 'next': {'leaf': 'Use the SDK'}},
+                ]
+            }
+        }
+    }
+
+    def index(self, tree):
+        compact = compact_tree(tree)
+        search = build_search_index(compact)
+        return compact, dict(zip(search['k'], search['v']))
+
+    def test_tokenize(self):
+        """Tokens are lowercase alphanumeric runs."""
+        assert tokenize('Use apify/mcp-cli (OAuth 2.1)') == ['use', 'apify', 'mcp', 'cli', 'oauth', '2', '1']
+
+    def test_conditions_index_their_target(self):
+        """A branch condition points at the node it leads to."""
+        compact, index = self.index(self.STRUCTURED_TREE)
+        leaf_id = compact['n'][compact['r']][2][1]
+        assert index['oauth'] == [leaf_id]
+        assert index['transport'] == [compact['r']]
+
+    def test_projects_and_notes(self):
+        """Projects are indexed as full names and tokens; notes as tokens."""
+        compact, index = self.index(self.STRUCTURED_TREE)
+        leaf_id = compact['n'][compact['r']][2][1]
+        assert index['apify/mcp-cli'] == [leaf_id]
+        assert index['keychain'] == [leaf_id]
+
+    def test_sorted_and_deterministic(self):
+        """Keys are sorted and id lists ascending."""
+        search = build_search_index(compact_tree(make_wide_tree(3, 3)))
+        assert search['k'] == sorted(search['k'])
+        assert all(ids == sorted(ids) for ids in search['v'])
+        assert search == build_search_index(compact_tree(make_wide_tree(3, 3)))
+
+    def test_explorer_embeds_index(self):
+        """search=True adds the index, the search box and its styles."""
+        output = render_html_explorer(self.STRUCTURED_TREE, full_page=True, search=True)
+        assert '<script type="application/json" class="dt-index">' in output
+        assert 'class="dt-search"' in output
+        assert '.dt-hit' in output
+        assert 'dt-index' not in render_html_explorer(self.STRUCTURED_TREE)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,164 @@
+"""
+Tests for AUTOGEN templates and field-level section caching in the README
+and table generators (scripts/autogen.py): markers pair up as documented,
+declared fields are complete, and a section is regenerated exactly when a
+field it reads changes.
+"""
+
+import copy
+from pathlib import Path
+
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from decision_tree import FragmentCache
+from suite import load_script
+from synthetic import make_catalog
+
+readme = load_script('generate-readme')
+tables = load_script('generate-tables')
+autogen = sys.modules['autogen']
+
+GENERATORS = {
+    **{f'readme.{name}': (getattr(readme, name), arguments) for name, arguments in [
+        ('generate_stats', ()), ('generate_cli_clients', (6,)), ('generate_rest_bridges', ()),
+        ('generate_transport_bridges', (6,)), ('generate_enterprise', ()), ('generate_grpc_bridge', ()),
+        ('generate_specialized', ()), ('generate_category', (['cli-client', 'http-bridge'],)),
+        ('generate_transport', ('sse',)), ('generate_security', ()),
+    ]},
+    **{f'tables.{name}': (getattr(tables, name), ()) for name in [
+        'generate_stats', 'generate_overview_table', 'generate_by_category', 'generate_transport_matrix',
+        'generate_reputable_sources', 'generate_authentication_matrix', 'generate_enterprise_auth_table',
+        'generate_installation_methods_table',
+    ]},
+}
+
+
+def catalog_rows(count=200):
+    """Synthetic catalog as the scripts' load_projects() returns it."""
+    return [dict(data, _filename=name.replace('/', '--')) for name, data in sorted(make_catalog(count).items())]
+
+
+def undeclared(rows, fields):
+    """(top-level key, nested key or None) of every field no declaration covers."""
+    keys = {key for row in rows for key in row}
+    top = {path.split('.')[0] for path in fields}
+    nested = {path.split('.')[0] for path in fields if '.' in path}
+    found = [(key, None) for key in sorted(keys - top)]
+    for parent in sorted(nested):
+        subkeys = {key for row in rows if isinstance(row.get(parent), dict) for key in row[parent]}
+        found += [(parent, key) for key in sorted(subkeys) if f'{parent}.{key}' not in fields]
+    return found
+
+
+class TestDeclaredFields:
+    @pytest.mark.parametrize('name', list(GENERATORS))
+    def test_undeclared_fields_do_not_affect_output(self, name):
+        generator, arguments = GENERATORS[name]
+        rows = catalog_rows()
+        expected = generator(rows, *arguments)
+        assert expected.count('\n') > 3     # the catalog exercises the section
+        for key, subkey in undeclared(rows, generator.fields):
+            edited = copy.deepcopy(rows)
+            for row in edited:
+                if subkey is None:
+                    row.pop(key, None)
+                elif isinstance(row.get(key), dict):
+                    row[key].pop(subkey, None)
+            assert generator(edited, *arguments) == expected, (key, subkey)
+
+    def test_select_paths(self):
+        project = {'a': {'b': 1, 'c': None}, 'd': 2}
+        assert autogen._select(project, ('a.b', 'a.c', 'a.x', 'd.e', 'x')) == {'a.b': 1, 'a.c': None}
+
+
+class TestCompileTemplate:
+    def test_markers_pair_with_next_end_of_their_name(self):
+        text = ('<!-- AUTOGEN:A --> <!-- AUTOGEN:B:x>y --> <!-- /AUTOGEN:B -->'
+                '<!-- /AUTOGEN:A --> <!-- /AUTOGEN:A --> <!-- AUTOGEN:C:1:<b> -->'
+                '<!-- AUTOGEN:B:2:3 --><!-- /AUTOGEN:B --><!-- AUTOGEN:D: -->')
+        segments = autogen._scan(text)
+        sections = [s for s in segments if isinstance(s, autogen.Section)]
+        # B:x>y is not a marker; A swallows it; C has no end
+        assert [(s.name, s.args) for s in sections] == [('A', []), ('B', ['2', '3'])]
+        assert sections[0].source.endswith('<!-- /AUTOGEN:A -->')
+        assert ''.join(s if isinstance(s, str) else s.source for s in segments) == text
+
+
+TEMPLATE = """# Catalog
+<!-- AUTOGEN:STATS --><!-- /AUTOGEN:STATS -->
+<!-- AUTOGEN:CLI_CLIENTS:4 --><!-- /AUTOGEN:CLI_CLIENTS -->
+<!-- AUTOGEN:TRANSPORT:sse --><!-- /AUTOGEN:TRANSPORT -->
+<!-- AUTOGEN:SECURITY --><!-- /AUTOGEN:SECURITY -->
+"""
+
+
+class TestSectionCache:
+    def render(self, rows, directory):
+        store = FragmentCache(directory)
+        cache = autogen.SectionCache(store, rows, readme.__file__)
+        output = readme.process_template(TEMPLATE, rows, cache)
+        assert output == readme.process_template(TEMPLATE, rows)
+        return output, (store.hits, store.misses)
+
+    def test_regenerates_only_sections_reading_edited_fields(self, tmp_path):
+        rows = catalog_rows()
+        cold, counts = self.render(rows, tmp_path)
+        assert counts == (0, 4)
+
+        # No section renders notes
+        for row in rows:
+            row['notes'] = ['edited']
+        warm, counts = self.render(rows, tmp_path)
+        assert warm == cold
+        assert counts == (4, 0)
+
+        # Only the security table reads security findings
+        rows[0]['security'] = {'analyzed': True, 'eval-usage': 'edited'}
+        assert self.render(rows, tmp_path)[1] == (3, 1)
+
+        # Every section reads stars
+        rows[-1]['stars'] = 10 ** 9
+        assert self.render(rows, tmp_path)[1] == (0, 4)
+
+    def test_key_order_is_an_input(self, tmp_path):
+        rows = catalog_rows()
+        for row in rows:
+            row['transports'] = {'stdio': True, 'sse': True, 'http': True}
+        self.render(rows, tmp_path)
+        # Sections list transports in their loaded order
+        rows[0]['transports'] = {'http': True, 'sse': True, 'stdio': True}
+        output, counts = self.render(rows, tmp_path)
+        assert 'http, sse, stdio' in output
+        assert counts == (3, 1)
+
+    def test_hits_skip_the_index(self, tmp_path, monkeypatch):
+        rows = catalog_rows()
+        self.render(rows, tmp_path)
+        cache = autogen.SectionCache(FragmentCache(tmp_path), rows, readme.__file__)
+        monkeypatch.setattr(readme, 'project_index', lambda projects: pytest.fail('index built'))
+        readme.process_template(TEMPLATE, rows, cache)
+
+
+class TestOutput:
+    def test_refuses_to_overwrite_hand_written_documents(self, tmp_path, monkeypatch, capsys):
+        template = tmp_path / 'notes.empty.md'
+        template.write_text('# Notes\n<!-- AUTOGEN:STATS --><!-- /AUTOGEN:STATS -->\n')
+        curated = tmp_path / 'notes.md'
+        curated.write_text('# Notes\n\nHand-written analysis.\n')
+        monkeypatch.setattr(sys, 'argv', ['generate-readme.py', '--template', str(template)])
+        with pytest.raises(SystemExit):
+            readme.main()
+        assert 'Refusing to overwrite' in capsys.readouterr().out
+        assert curated.read_text() == '# Notes\n\nHand-written analysis.\n'
+
+        generated = tmp_path / 'notes-tables.md'
+        monkeypatch.setattr(sys, 'argv', ['generate-readme.py', '--template', str(template),
+                                          '--output', str(generated)])
+        readme.main()
+        readme.main()   # its own output is replaced
+        assert readme.is_generated(generated)
+        assert '| **Total** |' in generated.read_text()
@@ -0,0 +1,139 @@
+"""
+Tests for the tree explorer service (dt serve).
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from decision_tree import load_tree, CoverageIndex, TreeService
+from decision_tree.server import make_server
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+SHARED_TREE = {
+    'tree': {
+        'id': 'shared',
+        'title': 'Shared',
+        'definitions': {
+            'lang': {
+                'question': 'Language?',
+                'branches': [
+                    {'condition': 'Python', 'next': {'leaf': 'Use pip'}},
+                    {'condition': 'Node', 'next': {'leaf-structured': {
+                        'recommendation': 'Use npm', 'projects': ['org/npm-tool'], 'notes': 'Node 18'}}},
+                ],
+            },
+        },
+        'root': {
+            'question': 'Where?',
+            'branches': [
+                {'condition': 'Local', 'next': {'$ref': 'lang'}},
+                {'condition': 'Remote', 'next': {'$ref': 'lang'}},
+                {'condition': 'Nowhere', 'next': {'leaf': 'Stay home'}},
+            ],
+        },
+    }
+}
+
+
+def get_json(service, target):
+    status, etag, body = service.get(target)
+    return status, json.loads(body)
+
+
+class TestTreeService:
+    def test_tree_and_nodes(self):
+        service = TreeService(SHARED_TREE)
+        assert get_json(service, '/tree') == (200, {'id': 'shared', 'title': 'Shared', 'root': 0})
+
+        status, root = get_json(service, '/node/0')
+        assert status == 200
+        assert [(c['condition'], c['kind'], c['label']) for c in root['children']] == [
+            ('Local', 'question', 'Language?'),
+            ('Remote', 'question', 'Language?'),
+            ('Nowhere', 'leaf', 'Stay home'),
+        ]
+        # Both references lead to the one shared node
+        assert root['children'][0]['id'] == root['children'][1]['id']
+
+        lang = get_json(service, f"/node/{root['children'][0]['id']}")[1]
+        npm = get_json(service, f"/node/{lang['children'][1]['id']}")[1]
+        assert npm['kind'] == 'leaf-structured'
+        assert (npm['projects'], npm['notes']) == (['org/npm-tool'], 'Node 18')
+        assert 'children' not in npm
+
+    def test_paths_match_coverage_index(self):
+        tree = load_tree(EXAMPLES_DIR / 'mcp-tool-chooser.yaml')
+        service = TreeService(tree)
+        index = CoverageIndex.from_tree(tree)
+        item = next(iter(index.keys()))
+        assert get_json(service, f'/paths?item={item}') == (200, {'item': item, 'paths': index.paths(item)})
+
+    def test_search(self):
+        service = TreeService(SHARED_TREE)
+        status, result = get_json(service, '/search?q=use+n')
+        assert status == 200 and result['total'] == 1
+        hit = result['nodes'][0]
+        assert hit['label'] == 'Use npm'
+        assert hit['ancestors'] == [0, get_json(service, '/node/0')[1]['children'][0]['id']]
+        assert get_json(service, '/search?q=org/npm-tool')[1]['nodes'][0]['id'] == hit['id']
+
+    def test_errors(self):
+        service = TreeService(SHARED_TREE)
+        assert service.get('/node/999')[0] == 404
+        assert service.get('/node/abc')[0] == 404
+        assert service.get('/nothing')[0] == 404
+        assert service.get('/paths?item=nope')[0] == 404
+        assert service.get('/search')[0] == 400
+
+    def test_etags_and_response_cache(self):
+        service = TreeService(SHARED_TREE)
+        status, etag, body = service.get('/node/0')
+        assert service.get('/node/0') == (200, etag, body)
+        assert (service.hits, service.misses) == (1, 1)
+        assert service.get('/node/0', if_none_match=etag) == (304, etag, b'')
+        assert service.get('/node/0', if_none_match=f'"other", {etag}')[0] == 304
+
+        # Unchanged subtrees keep their tag, changed ones get a new one
+        edited = json.loads(json.dumps(SHARED_TREE))
+        edited['tree']['root']['branches'][2]['next']['leaf'] = 'Go out'
+        other = TreeService(edited)
+        lang_id = get_json(service, '/node/0')[1]['children'][0]['id']
+        assert other.get(f'/node/{lang_id}')[1] == service.get(f'/node/{lang_id}')[1]
+        assert other.get('/node/0')[1] != etag
+        assert other.tree_etag != service.tree_etag
+
+
+class TestHttp:
+    @pytest.fixture
+    def server(self):
+        server = make_server(TreeService(SHARED_TREE), port=0, allow_origin='*')
+        server.RequestHandlerClass.log_message = lambda *args: None
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+        server.shutdown()
+        server.server_close()
+
+    def test_round_trip(self, server):
+        with urllib.request.urlopen(f'{server}/node/0') as response:
+            etag = response.headers['ETag']
+            assert response.headers['Access-Control-Allow-Origin'] == '*'
+            assert json.load(response)['label'] == 'Where?'
+
+        request = urllib.request.Request(f'{server}/node/0', headers={'If-None-Match': etag})
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(request)
+        assert exc.value.code == 304
+
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(f'{server}/node/99')
+        assert exc.value.code == 404
+        assert json.load(exc.value) == {'error': 'Unknown node: 99'}
@@ -0,0 +1,80 @@
+"""
+Tests for the dt command: dispatch, JSON input and the startup budget.
+"""
+
+import json
+import subprocess
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'benchmarks'))
+
+from decision_tree import load_tree, render_mermaid
+from decision_tree.cli import main
+
+from startup import PROJECT_DIR, SUBCOMMANDS, run_all
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+
+@pytest.fixture(scope='module')
+def startup():
+    return run_all(repeat=3)
+
+
+class TestDtCommand:
+    def test_compile_round_trip(self, tmp_path):
+        source = EXAMPLES_DIR / 'mcp-tool-chooser.yaml'
+        compiled = tmp_path / 'tree.json'
+        main(['compile', str(source), '-o', str(compiled)])
+        assert json.loads(compiled.read_text()) == load_tree(source)
+        assert render_mermaid(load_tree(compiled)) == render_mermaid(load_tree(source))
+
+    def test_compile_refuses_to_overwrite_input(self, tmp_path, capsys):
+        tree = load_tree(EXAMPLES_DIR / 'laptop-chooser.yaml')
+        (tmp_path / 'root.json').write_text(json.dumps(tree['tree']['root']))
+        source = tmp_path / 'tree.json'
+        text = json.dumps({'tree': dict(tree['tree'], root={'$include': 'root.json'})})
+        source.write_text(text)
+        with pytest.raises(SystemExit) as exc:
+            main(['compile', str(source)])
+        assert exc.value.code == 1
+        assert 'refusing to overwrite' in capsys.readouterr().err
+        assert source.read_text() == text
+
+        compiled = tmp_path / 'compiled.json'
+        main(['compile', str(source), '-o', str(compiled)])
+        assert json.loads(compiled.read_text()) == load_tree(source)
+
+    def test_dispatch(self, tmp_path, capsys):
+        out = tmp_path / 'tree.mmd'
+        main(['mermaid', str(EXAMPLES_DIR / 'laptop-chooser.yaml'), '-o', str(out)])
+        assert out.read_text() == render_mermaid(load_tree(EXAMPLES_DIR / 'laptop-chooser.yaml'))
+
+        with pytest.raises(SystemExit) as exc:
+            main(['nonsense'])
+        assert exc.value.code == 2
+        with pytest.raises(SystemExit) as exc:
+            main(['--help'])
+        assert exc.value.code == 0
+        assert 'compile' in capsys.readouterr().out
+
+    def test_package_import_is_lazy(self):
+        code = ('import sys, decision_tree; '
+                'print(sorted(m for m in sys.modules if m.startswith("decision_tree.")))')
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == '[]'
+
+
+class TestStartupBudget:
+    @pytest.mark.parametrize('name', list(SUBCOMMANDS))
+    def test_forbidden_modules_not_imported(self, startup, name):
+        imported = startup[name]['modules']
+        assert [m for m in SUBCOMMANDS[name][1] if m in imported] == []
+
+    @pytest.mark.parametrize('name', list(SUBCOMMANDS))
+    def test_import_time_within_budget(self, startup, name):
+        assert startup[name]['import_ms'] <= SUBCOMMANDS[name][2]
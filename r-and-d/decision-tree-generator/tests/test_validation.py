@@ -147,6 +147,65 @@ class TestValidation:
             })
 
 
+class TestSharedSubtrees:
+    """Test $ref / definitions validation."""
+
+    @staticmethod
+    def _tree(definitions, root):
+        return {'tree': {'id': 'test', 'definitions': definitions, 'root': root}}
+
+    def test_valid_ref(self):
+        """A $ref to an existing definition should pass."""
+        validate_tree(self._tree(
+            {'auth': {'question': 'Auth?', 'branches': [
+                {'condition': 'Yes', 'next': {'leaf': 'OAuth'}}]}},
+            {'question': 'Q?', 'branches': [
+                {'condition': 'A', 'next': {'$ref': 'auth'}},
+                {'condition': 'B', 'next': {'$ref': 'auth'}},
+            ]},
+        ))
+
+    def test_unknown_ref(self):
+        """A $ref to a missing definition should fail."""
+        with pytest.raises(ValueError, match="Unknown \\$ref 'nope' at 0"):
+            validate_tree(self._tree({}, {'question': 'Q?', 'branches': [
+                {'condition': 'A', 'next': {'$ref': 'nope'}}]}))
+
+    def test_ref_with_extra_keys(self):
+        """A $ref node must not carry other node keys."""
+        with pytest.raises(ValueError, match="must not have other keys"):
+            validate_tree(self._tree(
+                {'x': {'leaf': 'X'}},
+                {'$ref': 'x', 'leaf': 'Y'},
+            ))
+
+    def test_invalid_definition(self):
+        """Definitions are validated even when unreferenced."""
+        with pytest.raises(ValueError, match="definitions/broken"):
+            validate_tree(self._tree({'broken': {'invalid': 'X'}}, {'leaf': 'X'}))
+
+    def test_colliding_definition_names(self):
+        """Names that differ only in punctuation would share node ids."""
+        leaf = {'leaf': 'X'}
+        with pytest.raises(ValueError, match="Definitions 'a-b' and 'a_b' would get the same node ids"):
+            validate_tree(self._tree({'a-b': leaf, 'a_b': leaf}, {'question': 'Q?', 'branches': [
+                {'condition': 'A', 'next': {'$ref': 'a-b'}}, {'condition': 'B', 'next': {'$ref': 'a_b'}}]}))
+        validate_tree(self._tree({'a-b': leaf, 'a.c': leaf}, leaf))
+
+    def test_ref_cycle(self):
+        """Definitions that reference themselves transitively should fail."""
+        with pytest.raises(ValueError, match="Cycle in \\$ref definitions: a -> b -> a"):
+            validate_tree(self._tree(
+                {
+                    'a': {'question': 'A?', 'branches': [
+                        {'condition': 'x', 'next': {'$ref': 'b'}}]},
+                    'b': {'question': 'B?', 'branches': [
+                        {'condition': 'y', 'next': {'$ref': 'a'}}]},
+                },
+                {'$ref': 'a'},
+            ))
+
+
 class TestLoader:
     """Test tree loading."""
 
@@ -0,0 +1,239 @@
+"""
+AUTOGEN template engine for generated markdown documents.
+
+A template is markdown with generated sections between markers:
+
+    <!-- AUTOGEN:NAME:ARG1:ARG2 -->
+    (anything; replaced on every run)
+    <!-- /AUTOGEN:NAME -->
+
+compile_template() finds the markers in one linear scan and returns the
+template as a list of literal text and section segments; compiled
+templates are cached by the hash of their text. Rendering writes the
+segments to a stream in order and calls only the generators of the
+sections the template contains, each with its arguments.
+
+Generators declare the project fields they read with @reads. A
+SectionCache keys each section's output by those fields' values across the
+catalog, so after an edit only the sections reading an edited field are
+generated again; the rest are read back byte for byte.
+
+Usage:
+    from autogen import compile_template
+
+    template = compile_template(Path("README.template.md").read_text())
+    template.render_to(sys.stdout, {"STATS": lambda args: generate_stats(projects)})
+"""
+
+import hashlib
+import io
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+START = "<!-- AUTOGEN:"
+_NAME = re.compile(r'\w+')
+_END = re.compile(r'<!-- /AUTOGEN:(\w+) -->')
+
+# Compiled templates by SHA-256 of their text
+_compiled = {}
+
+
+class Section(NamedTuple):
+    """A generated section: its marker name and arguments, and the original text."""
+    name: str
+    args_str: Optional[str]
+    source: str
+
+    @property
+    def args(self) -> List[str]:
+        return self.args_str.split(':') if self.args_str else []
+
+
+class Template:
+    """A compiled template: literal strings and Section segments, in order."""
+
+    def __init__(self, segments: list):
+        self.segments = segments
+
+    @property
+    def sections(self) -> List[str]:
+        """Names of the sections the template contains, in order."""
+        return [s.name for s in self.segments if isinstance(s, Section)]
+
+    def render_to(self, stream: TextIO, generators: Dict[str, Callable[[List[str]], str]]) -> None:
+        """Write the template with every known section regenerated.
+
+        Sections without a generator keep their text, with a warning.
+        """
+        for segment in self.segments:
+            if not isinstance(segment, Section):
+                stream.write(segment)
+            elif segment.name in generators:
+                content = generators[segment.name](segment.args)
+                args = ':' + segment.args_str if segment.args_str else ''
+                stream.write(f"{START}{segment.name}{args} -->\n{content}\n<!-- /AUTOGEN:{segment.name} -->")
+            else:
+                print(f"Warning: Unknown AUTOGEN section: {segment.name}", file=sys.stderr)
+                stream.write(segment.source)
+
+    def render(self, generators: Dict[str, Callable[[List[str]], str]]) -> str:
+        stream = io.StringIO()
+        self.render_to(stream, generators)
+        return stream.getvalue()
+
+
+def _header(text: str, pos: int, close: int) -> Optional[Tuple[str, Optional[str], int]]:
+    """``(name, args_str, end)`` of the start marker at ``pos``, or None.
+
+    The grammar is ``<!-- AUTOGEN:(\\w+)(?::([^>]+))? -->``. Arguments cannot
+    contain ">", so they end at ``close``, the first ">" after ``pos``.
+    """
+    name = _NAME.match(text, pos + len(START))
+    if not name:
+        return None
+    after = name.end()
+    if text.startswith(' -->', after):
+        return name.group(), None, after + 4
+    if (close != -1 and text.startswith(':', after) and close - 3 > after + 1
+            and text.startswith(' --', close - 3)):
+        return name.group(), text[after + 1:close - 3], close + 1
+    return None
+
+
+def _scan(text: str) -> list:
+    """Split ``text`` into literal strings and Sections in one pass.
+
+    Every end marker is found once up front; a start marker pairs with the
+    first end marker of its name after it. Start markers are visited in
+    order, so the per-name cursors into the end positions, like the cursor
+    to the next ``>`` that closes a header, only move forward.
+    """
+    ends = defaultdict(list)        # name -> (start, end) of its end markers
+    for marker in _END.finditer(text):
+        ends[marker.group(1)].append(marker.span())
+    cursors = defaultdict(int)
+    close = text.find('>')          # first ">" at or after the current start marker
+
+    segments = []
+    copied = 0      # text before this is in segments
+    pos = text.find(START)
+    while pos != -1:
+        if close != -1 and close < pos:
+            close = text.find('>', pos)
+        header = _header(text, pos, close)
+        if header:
+            name, args_str, header_end = header
+            spans = ends.get(name, ())
+            i = cursors[name]
+            while i < len(spans) and spans[i][0] < header_end:
+                i += 1
+            cursors[name] = i
+            if i < len(spans):
+                end = spans[i][1]
+                if pos > copied:
+                    segments.append(text[copied:pos])
+                segments.append(Section(name, args_str, text[pos:end]))
+                copied = end
+                pos = text.find(START, end)
+                continue
+        # Not a complete section: keep scanning after this marker start
+        pos = text.find(START, pos + 1)
+    if copied < len(text):
+        segments.append(text[copied:])
+    return segments
+
+
+def compile_template(text: str) -> Template:
+    """Compile (or fetch the cached compilation of) a template's text."""
+    key = hashlib.sha256(text.encode()).hexdigest()
+    template = _compiled.get(key)
+    if template is None:
+        template = _compiled[key] = Template(_scan(text))
+    return template
+
+
+def reads(*fields: str):
+    """Declare the project fields a generator reads.
+
+    A field is a top-level key or a dotted path into nested mappings
+    ("authentication.oidc"); a key covers everything below it. Project
+    order and count are always part of a section's inputs.
+    """
+    def declare(generator):
+        generator.fields = fields
+        return generator
+    return declare
+
+
+def _select(project: dict, fields: tuple) -> dict:
+    """The values of ``fields`` present in ``project``, by path."""
+    selected = {}
+    for path in fields:
+        value = project
+        for key in path.split('.'):
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            selected[path] = value
+    return selected
+
+
+class SectionCache:
+    """
+    Generated sections reused while the fields they read are unchanged.
+
+    A section's key hashes the generating script's source, the section
+    name and arguments, and the declared fields of every project in load
+    order. Digests of the catalog are computed once per field set, so a run
+    costs one pass over the catalog per distinct declaration plus the
+    sections whose fields changed.
+
+    Args:
+        store: Keyed line store with ``get(key)`` and ``put(key, lines)``
+            (decision_tree.FragmentCache)
+        projects: Catalog as loaded, in load order
+        source: Path of the script whose generators are cached
+    """
+
+    def __init__(self, store, projects: list, source):
+        self.store = store
+        self.projects = projects
+        self._source = hashlib.sha256(Path(source).read_bytes()).hexdigest()
+        self._digests = {}
+
+    def digest(self, fields: tuple) -> str:
+        """Hash of ``fields`` across the catalog.
+
+        Mappings are hashed in their loaded key order: generators write
+        keys in that order, so reordering them changes the output.
+        """
+        fields = tuple(sorted(set(fields)))
+        digest = self._digests.get(fields)
+        if digest is None:
+            h = hashlib.sha256(repr(fields).encode())
+            for project in self.projects:
+                h.update(b'\n')
+                h.update(json.dumps(_select(project, fields), ensure_ascii=False, default=str).encode())
+            digest = self._digests[fields] = h.hexdigest()
+        return digest
+
+    def section(self, name: str, args: List[str], generate: Callable[[], str], fields: tuple) -> str:
+        """Output of ``generate()`` for section ``name``, from the store if unchanged."""
+        key = hashlib.sha256(
+            f'{self._source}\0{name}\0{args!r}\0{self.digest(fields)}'.encode()
+        ).hexdigest()
+        lines = self.store.get(key)
+        if lines is not None:
+            return '\n'.join(lines)
+        content = generate()
+        self.store.put(key, content.split('\n'))
+        return content
+
+    def wrap(self, name: str, generator: Callable[[List[str]], str], fields: tuple) -> Callable[[List[str]], str]:
+        """AUTOGEN generator(args) for ``name`` that goes through the cache."""
+        return lambda args: self.section(name, args, lambda: generator(args), fields)
@@ -11,10 +11,17 @@ Usage:
     ./scripts/generate-decision-tree.py
     ./scripts/generate-decision-tree.py --dry-run
     ./scripts/generate-decision-tree.py --check-coverage
+    ./scripts/generate-decision-tree.py --max-nodes 40   (size-budgeted diagrams)
+    ./scripts/generate-decision-tree.py --lazy-html      (JSON-backed HTML explorer)
+    ./scripts/generate-decision-tree.py --search         (explorer with search box)
+    ./scripts/generate-decision-tree.py --cache-dir DIR  (reuse unchanged rendered subtrees)
+
+By default all outputs and the coverage index come from a single walk of
+the tree (see generate_all).
 """
 
+import io
 import sys
-import re
 from pathlib import Path
 
 import yaml
@@ -27,8 +34,14 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DECISION_TREE_DIR = PROJECT_ROOT / "r-and-d" / "decision-tree-generator"
 sys.path.insert(0, str(DECISION_TREE_DIR))
 
-from decision_tree import load_tree, render_mermaid, render_mermaid_split, render_html
-from decision_tree import check_coverage, generate_coverage_report, get_all_tree_projects
+from decision_tree import (
+    load_tree, render_mermaid, render_mermaid_split, render_mermaid_partitioned,
+    render_html, render_html_to, render_html_explorer_to, FragmentCache,
+    fan_out, Emitter, MermaidSplitEmitter, HtmlEmitter,
+)
+from decision_tree.cache import FragmentMemo, make_memo
+from decision_tree import CoverageCollector, CoverageIndex, check_coverage, generate_coverage_report
+from decision_tree.matching import project_ref
 
 # Paths
 TREE_SOURCE = DECISION_TREE_DIR / "examples" / "mcp-tool-chooser.yaml"
@@ -43,13 +56,17 @@ INPUT_PATTERNS = [
 ]
 
 
-def generate_mermaid_markdown(tree_data: dict, metadata_footer: str = "", split: bool = True) -> str:
+def generate_mermaid_markdown(tree_data: dict, metadata_footer: str = "", split: bool = True,
+                              max_nodes: int = None, cache: FragmentCache = None) -> str:
     """Generate markdown file with Mermaid decision tree.
 
     Args:
         tree_data: Tree dict with 'tree' key
         metadata_footer: Reproducible metadata footer string
         split: If True, split into overview + per-category sections (default)
+        max_nodes: If set, partition into diagrams of at most this many nodes
+            instead of splitting at the root
+        cache: Optional FragmentCache for incremental re-rendering
     """
     title = tree_data['tree'].get('title', 'Decision Tree')
     description = tree_data['tree'].get('description', '')
@@ -58,7 +75,7 @@ def generate_mermaid_markdown(tree_data: dict, metadata_footer: str = "", split:
 
     if not split:
         # Single large diagram (legacy mode)
-        mermaid = render_mermaid(tree_data, direction='TD')
+        mermaid = render_mermaid(tree_data, direction='TD', cache=cache)
         return f"""# {title}
 
 {description}
@@ -71,8 +88,18 @@ def generate_mermaid_markdown(tree_data: dict, metadata_footer: str = "", split:
 *Auto-generated from `r-and-d/decision-tree-generator/examples/mcp-tool-chooser.yaml`*{footer_line}
 """
 
+    if max_nodes is not None:
+        return _partitioned_markdown(tree_data, max_nodes, metadata_footer)
+
     # Split mode: overview + sections
-    split_data = render_mermaid_split(tree_data, direction='TD')
+    split_data = render_mermaid_split(tree_data, direction='TD', cache=cache)
+    return _split_markdown(tree_data, split_data, metadata_footer)
+
+
+def _split_markdown(tree_data: dict, split_data: dict, metadata_footer: str) -> str:
+    """Markdown for ``render_mermaid_split`` output: navigation, overview, sections."""
+    title = tree_data['tree'].get('title', 'Decision Tree')
+    description = tree_data['tree'].get('description', '')
 
     lines = []
     lines.append(f'# {title}')
@@ -119,6 +146,44 @@ def generate_mermaid_markdown(tree_data: dict, metadata_footer: str = "", split:
     return '\n'.join(lines)
 
 
+def _partitioned_markdown(tree_data: dict, max_nodes: int, metadata_footer: str) -> str:
+    """Markdown for ``render_mermaid_partitioned`` output: nested index + one diagram per section."""
+    title = tree_data['tree'].get('title', 'Decision Tree')
+    description = tree_data['tree'].get('description', '')
+    partitioned = render_mermaid_partitioned(tree_data, max_nodes=max_nodes, direction='TD')
+
+    lines = []
+    lines.append(f'# {title}')
+    lines.append('')
+    lines.append(description)
+    lines.append('')
+    lines.append('## Quick Navigation')
+    lines.append('')
+    lines.append(f'Each diagram shows at most {max_nodes} nodes; click a boxed node to continue in its section:')
+    lines.append('')
+    lines.append(partitioned['index'])
+    lines.append('')
+
+    for section in partitioned['sections']:
+        lines.append(f'## {section["title"]} {{#{section["id"]}}}')
+        lines.append('')
+        lines.append('```mermaid')
+        lines.append(section['mermaid'].strip())
+        lines.append('```')
+        lines.append('')
+
+    lines.append('---')
+    lines.append('')
+    lines.append('**Other views:** [Unfoldable Tree](decision-tree-unfoldable.md) | [Full Tables](auto-generated.md)')
+    lines.append('')
+    lines.append('*Auto-generated from `r-and-d/decision-tree-generator/examples/mcp-tool-chooser.yaml`*')
+    if metadata_footer:
+        lines.append('')
+        lines.append(f'*{metadata_footer}*')
+
+    return '\n'.join(lines)
+
+
 def generate_html_page(tree_data: dict, metadata_footer: str = "") -> str:
     """Generate standalone HTML page with interactive details tree.
 
@@ -126,15 +191,31 @@ def generate_html_page(tree_data: dict, metadata_footer: str = "") -> str:
         tree_data: Tree dict with 'tree' key
         metadata_footer: Reproducible metadata footer string
     """
-    html = render_html(tree_data, full_page=True)
-    # Insert metadata footer as HTML comment before closing body tag
-    if metadata_footer:
-        footer_comment = f"\n<!-- {metadata_footer} -->\n"
-        html = html.replace("</body>", f"{footer_comment}</body>")
-    return html
+    return render_html(tree_data, full_page=True, footer_html=_html_footer(metadata_footer))
 
 
-def generate_unfoldable_markdown(tree_data: dict, metadata_footer: str = "") -> str:
+def write_html_page(stream, tree_data: dict, metadata_footer: str = "", lazy: bool = False,
+                    search: bool = False, cache: FragmentCache = None) -> None:
+    """Stream the standalone HTML page (see generate_html_page) to a text stream.
+
+    With ``lazy``, write the JSON-backed explorer that builds nodes on expand;
+    ``search`` adds its search box and index (and implies ``lazy``). ``cache``
+    applies to the static page only.
+    """
+    footer_html = _html_footer(metadata_footer)
+    if lazy or search:
+        render_html_explorer_to(stream, tree_data, full_page=True, footer_html=footer_html, search=search)
+    else:
+        render_html_to(stream, tree_data, full_page=True, footer_html=footer_html, cache=cache)
+
+
+def _html_footer(metadata_footer: str) -> str:
+    """Metadata footer as an HTML comment placed before the closing body tag."""
+    return f"\n<!-- {metadata_footer} -->\n" if metadata_footer else ""
+
+
+def generate_unfoldable_markdown(tree_data: dict, metadata_footer: str = "",
+                                 cache: FragmentCache = None) -> str:
     """Generate markdown file with embedded HTML <details>/<summary> tree.
 
     Uses only basic HTML that GitHub renders natively (no <style> tags).
@@ -142,13 +223,22 @@ def generate_unfoldable_markdown(tree_data: dict, metadata_footer: str = "") ->
     Args:
         tree_data: Tree dict with 'tree' key
         metadata_footer: Reproducible metadata footer string
+        cache: Optional FragmentCache for incremental re-rendering
     """
+    # Generate clean HTML without wrapper classes (GitHub strips most attributes)
+    html_fragment = _render_details_tree(
+        tree_data['tree']['root'], is_root=True,
+        definitions=tree_data['tree'].get('definitions') or {},
+        memo=make_memo(cache, 'details-markdown', __file__, tree_data, inline_refs=True),
+    )
+    return _unfoldable_page(tree_data, html_fragment, metadata_footer)
+
+
+def _unfoldable_page(tree_data: dict, html_fragment: str, metadata_footer: str) -> str:
+    """Unfoldable markdown page around a rendered details tree."""
     title = tree_data['tree'].get('title', 'Decision Tree')
     description = tree_data['tree'].get('description', '')
 
-    # Generate clean HTML without wrapper classes (GitHub strips most attributes)
-    html_fragment = _render_details_tree(tree_data['tree']['root'], is_root=True)
-
     footer_line = f"\n\n*{metadata_footer}*" if metadata_footer else ""
 
     return f"""# {title}
@@ -169,71 +259,57 @@ def generate_unfoldable_markdown(tree_data: dict, metadata_footer: str = "") ->
 """
 
 
-def _render_details_tree(node: dict, depth: int = 0, is_root: bool = False) -> str:
+def _render_details_tree(node: dict, depth: int = 0, is_root: bool = False,
+                         definitions: dict = None, memo: FragmentMemo = None) -> str:
     """Render node as clean HTML <details>/<summary> for GitHub markdown.
 
-    Uses visual indentation prefix at each level for hierarchy.
+    Uses visual indentation prefix at each level for hierarchy. GitHub
+    strips scripts, so shared `$ref` subtrees are expanded inline here.
+    With ``memo``, unchanged question subtrees come from the fragment cache.
     """
     lines = []
-    # Visual indent: use box-drawing chars for tree structure
-    indent = '│  ' * depth if depth > 0 else ''
-    branch = '├─ ' if depth > 0 else ''
+    _details_tree_lines(node, lines, depth, is_root, definitions, memo)
+    return '\n'.join(lines)
+
+
+def _details_tree_lines(node: dict, lines: list, depth: int, is_root: bool,
+                        definitions: dict, memo: FragmentMemo) -> None:
+    """Append the lines of ``_render_details_tree`` to ``lines``.
+
+    Nested questions append to the same list, so each line is joined once
+    instead of once per enclosing question.
+    """
+    if '$ref' in node:
+        node = definitions[node['$ref']]
 
     if 'question' in node:
-        open_attr = ' open' if is_root else ''
-        lines.append(f'<details{open_attr}>')
-        if is_root:
-            lines.append(f'<summary>🔍 <strong>{node["question"]}</strong></summary>')
-        else:
-            lines.append(f'<summary>{indent}{branch}❓ {node["question"]}</summary>')
-        lines.append('')
+        _details_question_open(node, lines, depth, is_root)
 
         for i, branch_item in enumerate(node.get('branches', [])):
             condition = branch_item['condition']
             next_node = branch_item['next']
-            child_indent = '│  ' * (depth + 1)
+            if '$ref' in next_node:
+                next_node = definitions[next_node['$ref']]
             is_last = (i == len(node.get('branches', [])) - 1)
-            child_branch = '└─ ' if is_last else '├─ '
-
-            if 'leaf' in next_node:
-                lines.append(f'<details>')
-                lines.append(f'<summary>{child_indent}{child_branch}📌 {condition}</summary>')
-                lines.append('')
-                lines.append(f'{child_indent}│')
-                lines.append(f'{child_indent}└── ✅ **{next_node["leaf"]}**')
-                lines.append('')
-                lines.append('</details>')
-                lines.append('')
-
-            elif 'leaf-structured' in next_node:
-                ls = next_node['leaf-structured']
-                lines.append(f'<details>')
-                lines.append(f'<summary>{child_indent}{child_branch}📌 {condition}</summary>')
-                lines.append('')
-                lines.append(f'{child_indent}│')
-                lines.append(f'{child_indent}├── ✅ **{ls["recommendation"]}**')
-                if ls.get('projects'):
-                    for proj in ls['projects']:
-                        lines.append(f'{child_indent}│   • `{proj}`')
-                if ls.get('notes'):
-                    lines.append(f'{child_indent}│')
-                    lines.append(f'{child_indent}└── *{ls["notes"]}*')
-                lines.append('')
-                lines.append('</details>')
-                lines.append('')
+
+            if 'question' not in next_node:
+                _details_branch_leaf(next_node, lines, depth, condition, is_last)
 
             else:
-                lines.append(f'<details>')
-                lines.append(f'<summary>{child_indent}{child_branch}📂 {condition}</summary>')
-                lines.append('')
-                nested = _render_details_tree(next_node, depth + 2)
-                lines.append(nested)
-                lines.append('</details>')
-                lines.append('')
+                _details_branch_open(lines, depth, condition, is_last)
+                _details_subtree_lines(next_node, lines, depth + 2, definitions, memo)
+                _details_branch_close(lines)
 
         lines.append('</details>')
 
-    elif 'leaf' in node:
+    else:
+        # Visual indent: use box-drawing chars for tree structure
+        _details_leaf(node, lines, '│  ' * depth if depth > 0 else '')
+
+
+def _details_leaf(node: dict, lines: list, indent: str) -> None:
+    """A leaf on its own (only reached when the whole tree is a leaf)."""
+    if 'leaf' in node:
         lines.append(f'{indent}└── ✅ **{node["leaf"]}**')
 
     elif 'leaf-structured' in node:
@@ -245,12 +321,139 @@ def _render_details_tree(node: dict, depth: int = 0, is_root: bool = False) -> s
         if ls.get('notes'):
             lines.append(f'{indent}└── *{ls["notes"]}*')
 
-    return '\n'.join(lines)
+
+def _details_question_open(node: dict, lines: list, depth: int, is_root: bool) -> None:
+    """Opening <details> and summary of a question in the unfoldable tree."""
+    indent = '│  ' * depth if depth > 0 else ''
+    branch = '├─ ' if depth > 0 else ''
+    open_attr = ' open' if is_root else ''
+    lines.append(f'<details{open_attr}>')
+    if is_root:
+        lines.append(f'<summary>🔍 <strong>{node["question"]}</strong></summary>')
+    else:
+        lines.append(f'<summary>{indent}{branch}❓ {node["question"]}</summary>')
+    lines.append('')
+
+
+def _details_branch_open(lines: list, depth: int, condition: str, is_last: bool) -> None:
+    """Opening <details> of a branch into a nested question."""
+    child_indent = '│  ' * (depth + 1)
+    child_branch = '└─ ' if is_last else '├─ '
+    lines.append(f'<details>')
+    lines.append(f'<summary>{child_indent}{child_branch}📂 {condition}</summary>')
+    lines.append('')
+
+
+def _details_branch_close(lines: list) -> None:
+    lines.append('</details>')
+    lines.append('')
+
+
+def _details_branch_leaf(next_node: dict, lines: list, depth: int, condition: str,
+                         is_last: bool) -> None:
+    """A branch of a question at ``depth`` ending in a leaf."""
+    child_indent = '│  ' * (depth + 1)
+    child_branch = '└─ ' if is_last else '├─ '
+
+    if 'leaf' in next_node:
+        lines.append(f'<details>')
+        lines.append(f'<summary>{child_indent}{child_branch}📌 {condition}</summary>')
+        lines.append('')
+        lines.append(f'{child_indent}│')
+        lines.append(f'{child_indent}└── ✅ **{next_node["leaf"]}**')
+        lines.append('')
+        lines.append('</details>')
+        lines.append('')
+
+    elif 'leaf-structured' in next_node:
+        ls = next_node['leaf-structured']
+        lines.append(f'<details>')
+        lines.append(f'<summary>{child_indent}{child_branch}📌 {condition}</summary>')
+        lines.append('')
+        lines.append(f'{child_indent}│')
+        lines.append(f'{child_indent}├── ✅ **{ls["recommendation"]}**')
+        if ls.get('projects'):
+            for proj in ls['projects']:
+                lines.append(f'{child_indent}│   • `{proj}`')
+        if ls.get('notes'):
+            lines.append(f'{child_indent}│')
+            lines.append(f'{child_indent}└── *{ls["notes"]}*')
+        lines.append('')
+        lines.append('</details>')
+        lines.append('')
+
+
+def _details_subtree_lines(node: dict, lines: list, depth: int, definitions: dict,
+                           memo: FragmentMemo) -> None:
+    """``_details_tree_lines`` for a nested question, via the fragment cache if any."""
+    if memo is None:
+        _details_tree_lines(node, lines, depth, False, definitions, None)
+        return
+    key, cached = memo.lookup(node, depth)
+    if cached is None:
+        cached = []
+        _details_tree_lines(node, cached, depth, False, definitions, memo)
+        memo.store(key, cached)
+    lines.extend(cached)
+
+
+class DetailsMarkdownEmitter(Emitter):
+    """``fan_out`` emitter collecting the ``_render_details_tree`` lines of the root."""
+
+    def start(self, tree_data: dict) -> None:
+        self.lines = []
+
+    def enter(self, node: dict, visit) -> bool:
+        # Questions nest two levels of indentation deeper than their parent
+        if 'question' in node:
+            if visit.parent is not None:
+                _details_branch_open(self.lines, 2 * visit.depth - 2, visit.condition, visit.is_last)
+            _details_question_open(node, self.lines, 2 * visit.depth, visit.parent is None)
+            return True
+        if visit.parent is None:
+            _details_leaf(node, self.lines, '')
+        else:
+            _details_branch_leaf(node, self.lines, 2 * visit.depth - 2, visit.condition, visit.is_last)
+        return False
+
+    def leave(self, node: dict, visit) -> None:
+        self.lines.append('</details>')
+        if visit.parent is not None:
+            _details_branch_close(self.lines)
+
+
+def generate_all(tree_data: dict, html_stream, metadata_footer: str = "") -> tuple:
+    """Render the split Mermaid and unfoldable markdown, the HTML page and the
+    coverage index in a single walk of the tree.
+
+    Output is identical to generate_mermaid_markdown, generate_unfoldable_markdown,
+    write_html_page and CoverageIndex.from_tree called one by one.
+
+    Args:
+        tree_data: Tree dict with 'tree' key
+        html_stream: Text stream the HTML page is written to
+        metadata_footer: Reproducible metadata footer string
+
+    Returns:
+        (mermaid markdown, unfoldable markdown, CoverageIndex)
+    """
+    mermaid = MermaidSplitEmitter('TD')
+    details = DetailsMarkdownEmitter()
+    coverage = CoverageCollector()
+    html = HtmlEmitter(html_stream, full_page=True, footer_html=_html_footer(metadata_footer))
+    fan_out(tree_data, [mermaid, details, html, coverage])
+
+    mermaid_md = _split_markdown(tree_data, mermaid.result, metadata_footer)
+    unfoldable_md = _unfoldable_page(tree_data, '\n'.join(details.lines), metadata_footer)
+    return mermaid_md, unfoldable_md, coverage.index
 
 
 def load_projects_from_yaml() -> list:
     """Load all project YAML files and extract org/repo names.
 
+    The name comes from the GitHub repo-url when there is one, otherwise
+    from the owner--repo filename (e.g. cloud services without a repo).
+
     Returns:
         List of project names in 'org/repo' format
     """
@@ -264,24 +467,23 @@ def load_projects_from_yaml() -> list:
             with open(yaml_file) as f:
                 data = yaml.safe_load(f)
 
-            repo_url = data.get('repo-url', '')
-            # Extract org/repo from GitHub URL
-            # e.g., "https://github.com/adhikasp/mcp-client-cli" -> "adhikasp/mcp-client-cli"
-            match = re.search(r'github\.com/([^/]+/[^/]+)', repo_url)
-            if match:
-                projects.append(match.group(1))
+            name = project_ref(data.get('repo-url', '')) or project_ref(yaml_file.name)
+            if name:
+                projects.append(name)
         except Exception as e:
             print(f"Warning: Failed to parse {yaml_file}: {e}", file=sys.stderr)
 
     return projects
 
 
-def run_coverage_check(tree_data: dict, verbose: bool = False) -> bool:
+def run_coverage_check(tree_data: dict, verbose: bool = False,
+                       index: CoverageIndex = None) -> bool:
     """Check that all projects in projects/ are covered by the decision tree.
 
     Args:
         tree_data: Loaded decision tree
         verbose: If True, print covered items too
+        index: Prebuilt CoverageIndex (built here if omitted)
 
     Returns:
         True if all projects are covered, False if any are missing
@@ -292,7 +494,9 @@ def run_coverage_check(tree_data: dict, verbose: bool = False) -> bool:
         print("No projects found in projects/ directory")
         return True
 
-    lines, all_covered = generate_coverage_report(tree_data, projects, verbose=verbose)
+    if index is None:
+        index = CoverageIndex.from_tree(tree_data)
+    lines, all_covered = generate_coverage_report(tree_data, projects, verbose=verbose, index=index)
 
     # Print the report lines
     for line in lines:
@@ -301,7 +505,7 @@ def run_coverage_check(tree_data: dict, verbose: bool = False) -> bool:
     if all_covered:
         print(f"\n✓ All {len(projects)} projects are covered by the decision tree")
     else:
-        result = check_coverage(tree_data, projects)
+        result = check_coverage(tree_data, projects, index=index)
         print(f"\n✗ Coverage: {result['coverage_percent']:.1f}% ({len(result['covered'])}/{len(projects)})")
 
     return all_covered
@@ -311,6 +515,14 @@ def main():
     dry_run = '--dry-run' in sys.argv
     check_only = '--check-coverage' in sys.argv
     verbose = '--verbose' in sys.argv or '-v' in sys.argv
+    lazy_html = '--lazy-html' in sys.argv
+    search_html = '--search' in sys.argv
+    max_nodes = None
+    if '--max-nodes' in sys.argv:
+        max_nodes = int(sys.argv[sys.argv.index('--max-nodes') + 1])
+    cache = None
+    if '--cache-dir' in sys.argv:
+        cache = FragmentCache(sys.argv[sys.argv.index('--cache-dir') + 1])
 
     if not TREE_SOURCE.exists():
         print(f"Error: Tree source not found: {TREE_SOURCE}")
@@ -330,8 +542,22 @@ def main():
     metadata_footer = get_reproducible_footer(INPUT_PATTERNS, PROJECT_ROOT)
     print(f"Metadata: {metadata_footer}")
 
-    # Generate Mermaid markdown
-    mermaid_md = generate_mermaid_markdown(tree_data, metadata_footer=metadata_footer)
+    # Every output from one walk, unless an option needs its own renderer
+    html_stream = io.StringIO() if dry_run else open(OUTPUT_HTML, 'w')
+    with html_stream:
+        if max_nodes is None and cache is None and not (lazy_html or search_html):
+            mermaid_md, unfoldable_md, index = generate_all(tree_data, html_stream, metadata_footer)
+        else:
+            mermaid_md = generate_mermaid_markdown(tree_data, metadata_footer=metadata_footer,
+                                                   max_nodes=max_nodes, cache=cache)
+            unfoldable_md = generate_unfoldable_markdown(tree_data, metadata_footer=metadata_footer,
+                                                         cache=cache)
+            write_html_page(html_stream, tree_data, metadata_footer=metadata_footer, lazy=lazy_html,
+                            search=search_html, cache=cache)
+            index = None
+        html = html_stream.getvalue() if dry_run else None
+
+    # Mermaid markdown
     if dry_run:
         print("\n=== Mermaid Markdown ===")
         print(mermaid_md[:500] + "...")
@@ -339,8 +565,7 @@ def main():
         OUTPUT_MERMAID.write_text(mermaid_md)
         print(f"Generated: {OUTPUT_MERMAID}")
 
-    # Generate unfoldable markdown (HTML <details> in markdown)
-    unfoldable_md = generate_unfoldable_markdown(tree_data, metadata_footer=metadata_footer)
+    # Unfoldable markdown (HTML <details> in markdown)
     if dry_run:
         print("\n=== Unfoldable Markdown ===")
         print(unfoldable_md[:500] + "...")
@@ -348,18 +573,19 @@ def main():
         OUTPUT_UNFOLDABLE.write_text(unfoldable_md)
         print(f"Generated: {OUTPUT_UNFOLDABLE}")
 
-    # Generate standalone HTML page
-    html = generate_html_page(tree_data, metadata_footer=metadata_footer)
+    # Standalone HTML page
     if dry_run:
         print("\n=== HTML (first 500 chars) ===")
         print(html[:500] + "...")
     else:
-        OUTPUT_HTML.write_text(html)
         print(f"Generated: {OUTPUT_HTML}")
 
+    if cache is not None:
+        print(f"Fragment cache: {cache.hits} hits, {cache.misses} misses")
+
     # Run coverage check (always, after generation)
     print("\n=== Coverage Check ===")
-    all_covered = run_coverage_check(tree_data, verbose=verbose)
+    all_covered = run_coverage_check(tree_data, verbose=verbose, index=index)
 
     if not dry_run:
         if all_covered:
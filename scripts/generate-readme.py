@@ -5,9 +5,26 @@ Generate README.md from template and project YAML files.
 Usage:
     ./scripts/generate-readme.py              # Generate README.md
     ./scripts/generate-readme.py --dry-run    # Print to stdout instead
+    ./scripts/generate-readme.py --template comparisons/features.empty.md
+                                              # Generate comparisons/features.md
+    ./scripts/generate-readme.py --template comparisons/features.empty.md --output PATH
+                                              # Generate PATH instead
+
+An existing output is only replaced if it starts with the AUTO-GENERATED
+header this script writes; hand-written documents are never overwritten.
+
+AUTOGEN sections (see autogen.py):
+    STATS, CLI_CLIENTS[:limit], REST_BRIDGES, TRANSPORT_BRIDGES[:limit],
+    ENTERPRISE, GRPC_BRIDGE, SPECIALIZED, CATEGORY:category[:category...],
+    TRANSPORT:transport, SECURITY
+
+    ./scripts/generate-readme.py --cache-dir DIR
+                                              # Reuse sections whose fields are unchanged
 """
 
-import re
+import heapq
+import itertools
+import os
 import sys
 from pathlib import Path
 from collections import defaultdict
@@ -18,15 +35,20 @@ except ImportError:
     print("Error: PyYAML not installed. Run: pip install pyyaml")
     sys.exit(1)
 
+from autogen import SectionCache, compile_template, reads
 from git_metadata import get_reproducible_footer, warn_uncommitted
 
 
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 PROJECTS_DIR = PROJECT_ROOT / "projects"
+DECISION_TREE_DIR = PROJECT_ROOT / "r-and-d" / "decision-tree-generator"
 TEMPLATE_FILE = PROJECT_ROOT / "README.template.md"
 OUTPUT_FILE = PROJECT_ROOT / "README.md"
 
+# First line of every document this script writes
+GENERATED_HEADER = "<!-- AUTO-GENERATED"
+
 # Input patterns for reproducible metadata
 INPUT_PATTERNS = [
     "README.template.md",
@@ -84,28 +106,100 @@ def format_org_project_cell(project):
         return f"{display_name} {yaml_link}".strip()
 
 
+def _star_key(p):
+    """Sort key for stars descending: unknown counts last."""
+    return (p.get('stars') is not None, p.get('stars') or 0)
+
+
+class ProjectIndex:
+    """Lookup tables over one load of the catalog, built in a single pass.
+
+    Projects are referred to by their position in the loaded list, and
+    sections merged from several keys are deduplicated by identity instead
+    of by comparing dicts. With the index, each AUTOGEN generator takes
+    time proportional to the rows it writes, not to the catalog size.
+    """
+
+    def __init__(self, projects):
+        self.projects = projects
+        # Catalog-wide star order; stable, so ties keep load order exactly
+        # as sorting each category on its own would
+        self.order = sorted(range(len(projects)), key=lambda i: _star_key(projects[i]), reverse=True)
+        self.by_stars = defaultdict(list)       # category -> ranks in that order
+        self.by_transport = defaultdict(list)   # transport -> ranks of its projects
+        self.analyzed_ranks = []                # ranks of security-analyzed projects
+        for rank, i in enumerate(self.order):
+            p = projects[i]
+            self.by_stars[p.get('category')].append(rank)
+            for transport, enabled in (p.get('transports') or {}).items():
+                if enabled:
+                    self.by_transport[transport].append(rank)
+            if (p.get('security') or {}).get('analyzed'):
+                self.analyzed_ranks.append(rank)
+
+        self.by_load = defaultdict(list)        # (category, reputable) -> ids, load order
+        self.reputable = set()                  # ids of reputable sources
+        self.category_counts = defaultdict(int)
+        self.total_stars = 0
+        for i, p in enumerate(projects):
+            reputable = bool(p.get('reputable-source'))
+            self.by_load[(p.get('category'), reputable)].append(i)
+            if reputable:
+                self.reputable.add(i)
+            self.category_counts[p.get('category', 'uncategorized')] += 1
+            if p.get('stars'):
+                self.total_stars += p.get('stars') or 0
+
+    def __len__(self):
+        return len(self.projects)
+
+    def _ranked(self, ranks, limit=None):
+        return [self.projects[self.order[rank]] for rank in itertools.islice(ranks, limit)]
+
+    def top(self, *categories, limit=None):
+        """Projects of ``categories``, most stars first (at most ``limit``)."""
+        return self._ranked(heapq.merge(*(self.by_stars.get(c, ()) for c in categories)), limit)
+
+    def with_transport(self, transport):
+        """Projects supporting ``transport``, most stars first."""
+        return self._ranked(self.by_transport.get(transport, ()))
+
+    def analyzed(self):
+        """Projects with a security analysis, most stars first."""
+        return self._ranked(self.analyzed_ranks)
+
+    def in_load_order(self, *keys):
+        """Ids under the ``(category, reputable)`` keys, in load order."""
+        return heapq.merge(*(self.by_load.get(key, ()) for key in keys))
+
+    def extend(self, listed, ids):
+        """``listed`` plus the projects of ``ids`` not already in it."""
+        seen = {id(p) for p in listed}
+        for i in ids:
+            p = self.projects[i]
+            if id(p) not in seen:
+                seen.add(id(p))
+                listed.append(p)
+        return listed
+
+
+def project_index(projects):
+    """``projects`` as a ProjectIndex (built once per load, reused)."""
+    return projects if isinstance(projects, ProjectIndex) else ProjectIndex(projects)
+
+
 def get_projects_by_category(projects, category):
     """Get projects filtered by category, sorted by stars descending."""
-    filtered = [p for p in projects if p.get('category') == category]
-    return sorted(
-        filtered,
-        key=lambda p: (p.get('stars') is not None, p.get('stars') or 0),
-        reverse=True
-    )
+    return project_index(projects).top(category)
 
 
+@reads('category', 'stars', 'reputable-source')
 def generate_stats(projects):
     """Generate ecosystem overview stats table."""
-    by_category = defaultdict(int)
-    total_stars = 0
-    reputable_count = 0
-
-    for p in projects:
-        by_category[p.get('category', 'uncategorized')] += 1
-        if p.get('stars'):
-            total_stars += p.get('stars') or 0
-        if p.get('reputable-source'):
-            reputable_count += 1
+    index = project_index(projects)
+    by_category = index.category_counts
+    total_stars = index.total_stars
+    reputable_count = len(index.reputable)
 
     # Map categories to display names
     category_display = {
@@ -157,7 +251,7 @@ def generate_stats(projects):
             desc = descriptions.get(cat, '')
             lines.append(f"| {cat} | {count} | {desc} |")
 
-    total = len(projects)
+    total = len(index)
     lines.append(f"| **Total** | **{total}** | All tracked projects |")
     lines.append("")
     lines.append(f"**Top projects:** {total_stars:,}+ combined GitHub stars | {reputable_count} reputable/official sources")
@@ -165,6 +259,7 @@ def generate_stats(projects):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'language', 'features', 'description', '_filename', 'name', 'repo-url')
 def generate_cli_clients(projects, limit=6):
     """Generate CLI clients table."""
     cli_projects = get_projects_by_category(projects, 'cli-client')[:limit]
@@ -189,6 +284,7 @@ def generate_cli_clients(projects, limit=6):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'language', 'description', '_filename', 'name', 'repo-url')
 def generate_rest_bridges(projects):
     """Generate REST API bridges table."""
     rest_projects = get_projects_by_category(projects, 'rest-api-bridge')
@@ -209,18 +305,11 @@ def generate_rest_bridges(projects):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'language', 'transports', '_filename', 'name', 'repo-url')
 def generate_transport_bridges(projects, limit=6):
     """Generate transport bridges table."""
     # Include http-bridge, websocket-bridge categories
-    bridge_projects = [
-        p for p in projects
-        if p.get('category') in ('http-bridge', 'websocket-bridge')
-    ]
-    bridge_projects = sorted(
-        bridge_projects,
-        key=lambda p: (p.get('stars') is not None, p.get('stars') or 0),
-        reverse=True
-    )[:limit]
+    bridge_projects = project_index(projects).top('http-bridge', 'websocket-bridge', limit=limit)
 
     lines = []
     lines.append("| Org/Project | Stars | Type | Transports |")
@@ -239,14 +328,14 @@ def generate_transport_bridges(projects, limit=6):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'reputable-source', 'organization', 'features', 'description',
+       '_filename', 'name', 'repo-url')
 def generate_enterprise(projects):
     """Generate enterprise gateways table."""
-    enterprise = get_projects_by_category(projects, 'enterprise-gateway')
+    index = project_index(projects)
     # Also include docker and cloud integrations with reputable source
-    for p in projects:
-        if p.get('reputable-source') and p.get('category') in ('docker-integration', 'cloud-integration'):
-            if p not in enterprise:
-                enterprise.append(p)
+    enterprise = index.extend(index.top('enterprise-gateway'), index.in_load_order(
+        ('docker-integration', True), ('cloud-integration', True)))
 
     lines = []
     lines.append("| Org/Project | Organization | Features |")
@@ -266,6 +355,7 @@ def generate_enterprise(projects):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'organization', 'description', '_filename', 'name', 'repo-url')
 def generate_grpc_bridge(projects):
     """Generate gRPC bridge table."""
     grpc_projects = get_projects_by_category(projects, 'grpc-bridge')
@@ -285,14 +375,13 @@ def generate_grpc_bridge(projects):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'description', '_filename', 'name', 'repo-url')
 def generate_specialized(projects):
     """Generate specialized adapters table."""
-    specialized = get_projects_by_category(projects, 'specialized-adapter')
+    index = project_index(projects)
     # Also include kubernetes integration
-    for p in projects:
-        if p.get('category') == 'kubernetes-integration':
-            if p not in specialized:
-                specialized.append(p)
+    specialized = index.extend(index.top('specialized-adapter'), index.in_load_order(
+        ('kubernetes-integration', False), ('kubernetes-integration', True)))
 
     lines = []
     lines.append("| Org/Project | Type | Description |")
@@ -309,41 +398,143 @@ def generate_specialized(projects):
     return "\n".join(lines)
 
 
-def process_template(template, projects):
-    """Replace AUTOGEN markers with generated content."""
-    generators = {
-        'STATS': lambda args: generate_stats(projects),
-        'CLI_CLIENTS': lambda args: generate_cli_clients(projects, int(args[0]) if args else 6),
-        'REST_BRIDGES': lambda args: generate_rest_bridges(projects),
-        'TRANSPORT_BRIDGES': lambda args: generate_transport_bridges(projects, int(args[0]) if args else 6),
-        'ENTERPRISE': lambda args: generate_enterprise(projects),
-        'GRPC_BRIDGE': lambda args: generate_grpc_bridge(projects),
-        'SPECIALIZED': lambda args: generate_specialized(projects),
+@reads('category', 'stars', 'language', 'description', '_filename', 'name', 'repo-url')
+def generate_category(projects, categories):
+    """Generate a table of the projects in any of ``categories``."""
+    lines = []
+    lines.append("| Org/Project | Stars | Language | Description |")
+    lines.append("|-------------|------:|----------|-------------|")
+
+    for p in project_index(projects).top(*categories):
+        cell = format_org_project_cell(p)
+        stars = format_stars(p.get('stars'))
+        lang = p.get('language', '')
+        desc = p.get('description', '')[:50]
+        if len(p.get('description', '')) > 50:
+            desc += '...'
+        lines.append(f"| {cell} | {stars} | {lang} | {desc} |")
+
+    return "\n".join(lines)
+
+
+@reads('transports', 'stars', 'category', '_filename', 'name', 'repo-url')
+def generate_transport(projects, transport):
+    """Generate a table of the projects supporting ``transport``."""
+    lines = []
+    lines.append("| Org/Project | Stars | Category | Transports |")
+    lines.append("|-------------|------:|----------|------------|")
+
+    for p in project_index(projects).with_transport(transport):
+        cell = format_org_project_cell(p)
+        stars = format_stars(p.get('stars'))
+        cat = p.get('category', '')
+        enabled = [k for k, v in p.get('transports', {}).items() if v]
+        lines.append(f"| {cell} | {stars} | {cat} | {', '.join(enabled)} |")
+
+    return "\n".join(lines)
+
+
+@reads('security', 'stars', '_filename', 'name', 'repo-url')
+def generate_security(projects):
+    """Generate the security findings table of analyzed projects."""
+    lines = []
+    lines.append("| Org/Project | eval/exec | Subprocess | Network | Input Validation | Sandboxing |")
+    lines.append("|-------------|-----------|------------|---------|------------------|------------|")
+
+    for p in project_index(projects).analyzed():
+        cell = format_org_project_cell(p)
+        sec = p['security']
+        sandboxing = {True: 'yes', False: 'no'}.get(sec.get('sandboxing'), '-')
+        lines.append(f"| {cell} | {sec.get('eval-usage', '-')} | {sec.get('subprocess-usage', '-')} | "
+                     f"{sec.get('network-isolation', '-')} | {sec.get('input-validation', '-')} | {sandboxing} |")
+
+    return "\n".join(lines)
+
+
+def autogen_generators(projects, cache=None):
+    """AUTOGEN section name -> generator(args); the index is built on first use.
+
+    With a SectionCache, sections whose declared fields are unchanged are
+    read from it and never touch the index.
+    """
+    index = []
+
+    def indexed():
+        if not index:
+            index.append(project_index(projects))
+        return index[0]
+
+    sections = {
+        'STATS': (generate_stats, lambda args: ()),
+        'CLI_CLIENTS': (generate_cli_clients, lambda args: (int(args[0]) if args else 6,)),
+        'REST_BRIDGES': (generate_rest_bridges, lambda args: ()),
+        'TRANSPORT_BRIDGES': (generate_transport_bridges, lambda args: (int(args[0]) if args else 6,)),
+        'ENTERPRISE': (generate_enterprise, lambda args: ()),
+        'GRPC_BRIDGE': (generate_grpc_bridge, lambda args: ()),
+        'SPECIALIZED': (generate_specialized, lambda args: ()),
+        'CATEGORY': (generate_category, lambda args: (args,)),
+        'TRANSPORT': (generate_transport, lambda args: (args[0],)),
+        'SECURITY': (generate_security, lambda args: ()),
     }
 
-    # Pattern: <!-- AUTOGEN:NAME:ARG1:ARG2 --> ... <!-- /AUTOGEN:NAME -->
-    pattern = r'<!-- AUTOGEN:(\w+)(?::([^>]+))? -->\s*\n?.*?<!-- /AUTOGEN:\1 -->'
+    def section(generator, arguments):
+        return lambda args: generator(indexed(), *arguments(args))
 
-    def replacer(match):
-        name = match.group(1)
-        args_str = match.group(2)
-        args = args_str.split(':') if args_str else []
+    if cache is None:
+        return {name: section(*spec) for name, spec in sections.items()}
+    return {name: cache.wrap(name, section(generator, arguments), generator.fields)
+            for name, (generator, arguments) in sections.items()}
+
+
+def process_template(template, projects, cache=None):
+    """Replace AUTOGEN markers with generated content."""
+    return compile_template(template).render(autogen_generators(projects, cache))
+
+
+def output_path(template_file):
+    """Document generated from a template: README.template.md -> README.md,
+    comparisons/features.empty.md -> comparisons/features.md."""
+    for suffix in ('.template.md', '.empty.md'):
+        if template_file.name.endswith(suffix):
+            return template_file.with_name(template_file.name[:-len(suffix)] + '.md')
+    return None
 
-        if name in generators:
-            content = generators[name](args)
-            return f"<!-- AUTOGEN:{name}{':' + args_str if args_str else ''} -->\n{content}\n<!-- /AUTOGEN:{name} -->"
-        else:
-            print(f"Warning: Unknown AUTOGEN section: {name}", file=sys.stderr)
-            return match.group(0)
 
-    return re.sub(pattern, replacer, template, flags=re.DOTALL)
+def is_generated(path):
+    """True if ``path`` does not exist or was written by this script."""
+    try:
+        with open(path) as f:
+            return f.readline().startswith(GENERATED_HEADER)
+    except FileNotFoundError:
+        return True
+
+
+def _project_relative(path):
+    try:
+        return path.relative_to(PROJECT_ROOT.resolve()).as_posix()
+    except ValueError:
+        return str(path)
 
 
 def main():
     dry_run = '--dry-run' in sys.argv
-
-    if not TEMPLATE_FILE.exists():
-        print(f"Error: Template file not found: {TEMPLATE_FILE}")
+    template_file = TEMPLATE_FILE.resolve()
+    if '--template' in sys.argv:
+        template_file = Path(sys.argv[sys.argv.index('--template') + 1]).resolve()
+    output_file = OUTPUT_FILE if template_file == TEMPLATE_FILE.resolve() else output_path(template_file)
+    if '--output' in sys.argv:
+        output_file = Path(sys.argv[sys.argv.index('--output') + 1]).resolve()
+
+    if not template_file.exists():
+        print(f"Error: Template file not found: {template_file}")
+        sys.exit(1)
+    if output_file is None:
+        print(f"Error: Template name must end in .template.md or .empty.md "
+              f"(or pass --output PATH): {template_file}")
+        sys.exit(1)
+    if not dry_run and not is_generated(output_file):
+        print(f"Error: Refusing to overwrite {output_file}: it has no AUTO-GENERATED header.")
+        print("  Write elsewhere with --output PATH, or preview with --dry-run.")
         sys.exit(1)
 
     projects = load_projects()
@@ -351,27 +542,49 @@ def main():
         print("No project files found in projects/")
         sys.exit(1)
 
+    # The template and the projects are the inputs of the metadata footer
+    template_name = _project_relative(template_file)
+    input_patterns = [template_name] + INPUT_PATTERNS[1:]
+    run = './scripts/generate-readme.py'
+    if template_file != TEMPLATE_FILE.resolve():
+        run += f' --template {template_name}'
+    if '--output' in sys.argv:
+        run += f' --output {_project_relative(output_file)}'
+
     # Check for uncommitted changes and generate reproducible metadata footer
-    warn_uncommitted(INPUT_PATTERNS, PROJECT_ROOT)
-    metadata_footer = get_reproducible_footer(INPUT_PATTERNS, PROJECT_ROOT)
+    warn_uncommitted(input_patterns, PROJECT_ROOT)
+    metadata_footer = get_reproducible_footer(input_patterns, PROJECT_ROOT)
     print(f"Metadata: {metadata_footer}")
 
-    template = TEMPLATE_FILE.read_text()
-    readme = process_template(template, projects)
+    cache = None
+    if '--cache-dir' in sys.argv:
+        sys.path.insert(0, str(DECISION_TREE_DIR))
+        from decision_tree import FragmentCache
+        cache = SectionCache(FragmentCache(sys.argv[sys.argv.index('--cache-dir') + 1]), projects, __file__)
 
-    # Add auto-generated header
-    header = "<!-- AUTO-GENERATED from README.template.md - Run: ./scripts/generate-readme.py -->\n\n"
-    readme = header + readme
+    template = compile_template(template_file.read_text())
+    generators = autogen_generators(projects, cache)
 
-    # Add reproducible metadata footer
-    readme += f"\n\n---\n\n*{metadata_footer}*\n"
+    def write(stream):
+        # Add auto-generated header
+        stream.write(f"{GENERATED_HEADER} from {template_name} - Run: {run} -->\n\n")
+        template.render_to(stream, generators)
+        # Add reproducible metadata footer
+        stream.write(f"\n\n---\n\n*{metadata_footer}*\n")
 
     if dry_run:
-        print(readme)
+        write(sys.stdout)
+        print()
     else:
-        OUTPUT_FILE.write_text(readme)
-        print(f"Generated {OUTPUT_FILE} from {TEMPLATE_FILE}")
+        # Written next to the output and moved into place when complete
+        partial = output_file.with_name(output_file.name + '.tmp')
+        with open(partial, 'w') as f:
+            write(f)
+        os.replace(partial, output_file)
+        print(f"Generated {output_file} from {template_file}")
         print(f"  - {len(projects)} projects loaded")
+    if cache:
+        print(f"Section cache: {cache.store.hits} hits, {cache.store.misses} misses")
 
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ Usage:
     ./scripts/generate-tables.py --enterprise-auth  # Enterprise auth features
     ./scripts/generate-tables.py --installation     # Installation methods
     ./scripts/generate-tables.py --json             # Output as JSON
+    ./scripts/generate-tables.py --cache-dir DIR    # Reuse tables whose fields are unchanged
 """
 
 import sys
@@ -25,12 +26,14 @@ except ImportError:
     print("Error: PyYAML not installed. Run: pip install pyyaml")
     sys.exit(1)
 
+from autogen import SectionCache, reads
 from git_metadata import get_reproducible_footer, warn_uncommitted
 
 
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 PROJECTS_DIR = PROJECT_ROOT / "projects"
+DECISION_TREE_DIR = PROJECT_ROOT / "r-and-d" / "decision-tree-generator"
 
 # Input patterns for reproducible metadata
 INPUT_PATTERNS = [
@@ -91,6 +94,7 @@ def format_org_project_cell(project):
         return f"{display_name} {yaml_link}".strip()
 
 
+@reads('stars', 'language', 'category', 'transports', '_filename', 'name', 'repo-url')
 def generate_overview_table(projects):
     """Generate main overview table sorted by stars."""
     # Sort by stars (descending), None values last
@@ -120,6 +124,7 @@ def generate_overview_table(projects):
     return "\n".join(lines)
 
 
+@reads('category', 'stars', 'language', 'description', '_filename', 'name', 'repo-url')
 def generate_by_category(projects):
     """Generate tables grouped by category."""
     by_category = defaultdict(list)
@@ -158,6 +163,8 @@ def generate_by_category(projects):
     return "\n".join(lines)
 
 
+@reads('stars', 'transports.stdio', 'transports.sse', 'transports.http', 'transports.websocket',
+       'transports.grpc', '_filename', 'name', 'repo-url')
 def generate_transport_matrix(projects):
     """Generate transport support matrix."""
     lines = []
@@ -184,6 +191,7 @@ def generate_transport_matrix(projects):
     return "\n".join(lines)
 
 
+@reads('reputable-source', 'organization', 'category', 'description', '_filename', 'name', 'repo-url')
 def generate_reputable_sources(projects):
     """Generate table of reputable/official sources."""
     reputable = [p for p in projects if p.get('reputable-source')]
@@ -206,6 +214,7 @@ def generate_reputable_sources(projects):
     return "\n".join(lines)
 
 
+@reads('authentication', 'stars', '_filename', 'name', 'repo-url')
 def generate_authentication_matrix(projects):
     """Generate authentication support matrix."""
     lines = []
@@ -261,6 +270,8 @@ def generate_authentication_matrix(projects):
     return "\n".join(lines)
 
 
+@reads('authentication.entra-id', 'authentication.rbac', 'authentication.multi-tenant',
+       'authentication.auth-bridging', 'authentication.oidc', 'organization', '_filename', 'name', 'repo-url')
 def generate_enterprise_auth_table(projects):
     """Generate table of enterprise authentication features."""
     # Filter to projects with enterprise features
@@ -301,6 +312,7 @@ def generate_enterprise_auth_table(projects):
     return "\n".join(lines)
 
 
+@reads('installation', 'stars', '_filename', 'name', 'repo-url')
 def generate_installation_methods_table(projects):
     """Generate table of available installation methods."""
     # Filter to projects with installation data
@@ -340,6 +352,7 @@ def generate_installation_methods_table(projects):
     return "\n".join(lines)
 
 
+@reads('category', 'language', 'reputable-source', 'stars')
 def generate_stats(projects):
     """Generate summary statistics."""
     total = len(projects)
@@ -395,43 +408,54 @@ def main():
     warn_uncommitted(INPUT_PATTERNS, PROJECT_ROOT)
     metadata_footer = get_reproducible_footer(INPUT_PATTERNS, PROJECT_ROOT)
 
+    cache = None
+    if '--cache-dir' in sys.argv:
+        sys.path.insert(0, str(DECISION_TREE_DIR))
+        from decision_tree import FragmentCache
+        cache = SectionCache(FragmentCache(sys.argv[sys.argv.index('--cache-dir') + 1]), projects, __file__)
+
+    def generate(generator):
+        if cache is None:
+            return generator(projects)
+        return cache.section(generator.__name__, [], lambda: generator(projects), generator.fields)
+
     output_parts = []
 
     if '--by-category' in args:
-        output_parts.append(generate_by_category(projects))
+        output_parts.append(generate(generate_by_category))
     elif '--by-transport' in args:
-        output_parts.append(generate_transport_matrix(projects))
+        output_parts.append(generate(generate_transport_matrix))
     elif '--reputable-only' in args:
-        output_parts.append(generate_reputable_sources(projects))
+        output_parts.append(generate(generate_reputable_sources))
     elif '--by-stars' in args:
-        output_parts.append(generate_overview_table(projects))
+        output_parts.append(generate(generate_overview_table))
     elif '--auth' in args:
-        output_parts.append(generate_authentication_matrix(projects))
+        output_parts.append(generate(generate_authentication_matrix))
     elif '--enterprise-auth' in args:
-        output_parts.append(generate_enterprise_auth_table(projects))
+        output_parts.append(generate(generate_enterprise_auth_table))
     elif '--installation' in args:
-        output_parts.append(generate_installation_methods_table(projects))
+        output_parts.append(generate(generate_installation_methods_table))
     else:
         # Generate all sections
-        output_parts.append(generate_stats(projects))
+        output_parts.append(generate(generate_stats))
         output_parts.append("")
-        output_parts.append(generate_overview_table(projects))
+        output_parts.append(generate(generate_overview_table))
         output_parts.append("")
-        output_parts.append(generate_authentication_matrix(projects))
+        output_parts.append(generate(generate_authentication_matrix))
         output_parts.append("")
-        enterprise_auth = generate_enterprise_auth_table(projects)
+        enterprise_auth = generate(generate_enterprise_auth_table)
         if enterprise_auth:
             output_parts.append(enterprise_auth)
             output_parts.append("")
-        output_parts.append(generate_reputable_sources(projects))
+        output_parts.append(generate(generate_reputable_sources))
         output_parts.append("")
-        output_parts.append(generate_transport_matrix(projects))
+        output_parts.append(generate(generate_transport_matrix))
         output_parts.append("")
-        installation = generate_installation_methods_table(projects)
+        installation = generate(generate_installation_methods_table)
         if installation:
             output_parts.append(installation)
             output_parts.append("")
-        output_parts.append(generate_by_category(projects))
+        output_parts.append(generate(generate_by_category))
 
     # Add reproducible metadata footer
     output_parts.append("")
@@ -440,6 +464,9 @@ def main():
     output_parts.append(f"*{metadata_footer}*")
 
     print("\n".join(output_parts))
+    if cache:
+        # stderr: the tables themselves are usually redirected to a file
+        print(f"Section cache: {cache.store.hits} hits, {cache.store.misses} misses", file=sys.stderr)
 
 
 if __name__ == "__main__":